@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Concurrent read benchmark
+Runs the API's per-request read pattern (consent check, recently viewed
+content, daily recommendation count) from many threads while one thread keeps
+writing recommendations, once through database_transaction and once through
+database_read, and reports read throughput and latency for each as JSON.
+
+Usage:
+    python -m benchmarks.db_reads --readers 8 --seconds 5
+"""
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.db.connection import close_pools, database_read, database_transaction, get_pool, initialize_db
+
+SCHEMA_PATH = str(project_root / "db" / "schema.sql")
+
+# How read requests open their transaction in each mode
+READ_MODES = {
+    'transaction': database_transaction,  # BEGIN IMMEDIATE on a read-write connection
+    'read': database_read,  # Deferred BEGIN on a query_only connection
+}
+
+
+def build_read_db(db_path: str, users: int, recs_per_user: int, seed: int = 42) -> Dict[str, Any]:
+    """Create a schema-initialized database with users and viewed recommendations."""
+    if Path(db_path).exists():
+        raise FileExistsError(f"Refusing to overwrite existing database: {db_path}")
+
+    start = time.perf_counter()
+    initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    user_rows = [(f"user_{idx:06d}", rng.random() < 0.8) for idx in range(users)]
+    rec_rows = [
+        (f"rec_{idx:06d}_{n}", user_id, f"content_{rng.randrange(50)}", "benchmark",
+         (now - timedelta(days=rng.randrange(60))).isoformat(),
+         (now - timedelta(days=rng.randrange(30))).isoformat())
+        for idx, (user_id, _) in enumerate(user_rows)
+        for n in range(recs_per_user)
+    ]
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany("INSERT INTO users (user_id, consent_status) VALUES (?, ?)", user_rows)
+        conn.executemany("""
+            INSERT INTO recommendations (rec_id, user_id, content_id, rationale, created_at, viewed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rec_rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {'seconds': time.perf_counter() - start, 'users': users, 'recommendations': len(rec_rows)}
+
+
+def read_request(conn: sqlite3.Connection, user_id: str, since: str, today: str) -> int:
+    """The reads one recommendation request makes; returns the rows read."""
+    consent = conn.execute("SELECT consent_status FROM users WHERE user_id = ?", (user_id,)).fetchone()
+    viewed = conn.execute("""
+        SELECT DISTINCT content_id FROM recommendations
+        WHERE user_id = ? AND viewed_at IS NOT NULL AND viewed_at > ?
+    """, (user_id, since)).fetchall()
+    count = conn.execute("""
+        SELECT COUNT(*) FROM recommendations WHERE user_id = ? AND created_at >= ?
+    """, (user_id, today)).fetchone()
+    return 1 + len(viewed) + (1 if consent and count else 0)
+
+
+def bench_mode(db_path: str, mode: str, user_ids: List[str], readers: int, seconds: float,
+               write_hold_ms: float, seed: int = 42) -> Dict[str, Any]:
+    """Run `readers` reader threads and one writer for `seconds` through one read mode."""
+    read_context = READ_MODES[mode]
+    close_pools()
+    # Room for every thread, so pool waits don't mask lock waits
+    get_pool(db_path, max_size=readers + 1)
+    get_pool(db_path, max_size=readers, read_only=True)
+
+    now = datetime.now()
+    since = (now - timedelta(days=7)).isoformat()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+    stop = threading.Event()
+    latencies: List[List[float]] = [[] for _ in range(readers)]
+    errors: List[str] = []
+    writes = [0]
+
+    def reader(slot: int):
+        rng = random.Random(seed + slot)
+        try:
+            while not stop.is_set():
+                user_id = rng.choice(user_ids)
+                start = time.perf_counter()
+                with read_context(db_path) as conn:
+                    read_request(conn, user_id, since, today)
+                latencies[slot].append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e))
+
+    def writer():
+        rng = random.Random(seed - 1)
+        try:
+            while not stop.is_set():
+                with database_transaction(db_path) as conn:
+                    conn.execute("""
+                        INSERT INTO recommendations (rec_id, user_id, content_id, rationale)
+                        VALUES (?, ?, 'content_bench', 'benchmark')
+                    """, (f"bench_{mode}_{writes[0]}", rng.choice(user_ids)))
+                    # Stand-in for the work a writer does while holding the lock
+                    time.sleep(write_hold_ms / 1000)
+                writes[0] += 1
+        except Exception as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    close_pools()
+
+    all_latencies = np.array([value for slot in latencies for value in slot]) * 1000
+    return {
+        'mode': mode,
+        'readers': readers,
+        'seconds': elapsed,
+        'reads': len(all_latencies),
+        'reads_per_sec': len(all_latencies) / elapsed if elapsed > 0 else None,
+        'latency_ms': {
+            'p50': float(np.percentile(all_latencies, 50)) if len(all_latencies) else None,
+            'p95': float(np.percentile(all_latencies, 95)) if len(all_latencies) else None,
+            'max': float(all_latencies.max()) if len(all_latencies) else None,
+        },
+        'writes': writes[0],
+        'errors': errors,
+    }
+
+
+def run_benchmark(users: int = 1000, recs_per_user: int = 10, readers: int = 8, seconds: float = 5.0,
+                  write_hold_ms: float = 5.0, seed: int = 42, db_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build a database and time concurrent reads through each READ_MODES entry.
+
+    Args:
+        users: Number of users
+        recs_per_user: Recommendations per user
+        readers: Reader threads
+        seconds: Run time per mode
+        write_hold_ms: How long the writer holds each write transaction
+        seed: Seed for data generation and request order
+        db_path: New database file to build (kept afterwards); a temporary file when omitted
+
+    Returns:
+        JSON-serializable report
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = db_path or str(Path(tmp_dir) / "reads.db")
+        report = {
+            'config': {
+                'users': users, 'recs_per_user': recs_per_user, 'readers': readers, 'seconds': seconds,
+                'write_hold_ms': write_hold_ms, 'seed': seed,
+            },
+            'environment': {
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+            },
+            'build': build_read_db(db_path, users, recs_per_user, seed),
+        }
+
+        with database_read(db_path) as conn:
+            user_ids = [row['user_id'] for row in conn.execute("SELECT user_id FROM users")]
+
+        report['modes'] = {
+            mode: bench_mode(db_path, mode, user_ids, readers, seconds, write_hold_ms, seed)
+            for mode in READ_MODES
+        }
+        baseline = report['modes']['transaction']['reads_per_sec']
+        improved = report['modes']['read']['reads_per_sec']
+        report['read_speedup'] = improved / baseline if baseline and improved else None
+        return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Benchmark concurrent reads with and without database_read')
+    parser.add_argument('--users', type=int, default=1000, help='Number of users (default: 1000)')
+    parser.add_argument('--recs-per-user', type=int, default=10, help='Recommendations per user (default: 10)')
+    parser.add_argument('--readers', type=int, default=8, help='Reader threads (default: 8)')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Run time per mode (default: 5)')
+    parser.add_argument('--write-hold-ms', type=float, default=5.0,
+                        help='How long the writer holds each write transaction (default: 5)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--db-path', help='Build the benchmark database here instead of a temporary file')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--verbose', action='store_true', help='Keep INFO logging')
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+
+    report = run_benchmark(args.users, args.recs_per_user, args.readers, args.seconds, args.write_hold_ms,
+                           args.seed, args.db_path)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Hot query plan benchmark
+Builds a database with `rows` recommendations and `rows` transactions, then
+runs every HOT_QUERIES statement against it, reporting its EXPLAIN QUERY PLAN,
+any plan problems and its execution time as JSON. With --check the run exits
+non-zero when a statement no longer uses its expected indexes.
+
+Usage:
+    python -m benchmarks.query_plans --rows 1000000 --check
+"""
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.db.connection import close_pools, database_read, initialize_db
+from src.db.hot_queries import HOT_QUERIES, explain_query_plan, plan_problems
+
+SCHEMA_PATH = str(project_root / "db" / "schema.sql")
+
+# Recommendations and transactions per user in the built database
+ROWS_PER_USER = 100
+
+# Rows handed to executemany at a time while building
+INSERT_CHUNK_ROWS = 50_000
+
+
+def _insert_chunks(conn: sqlite3.Connection, sql: str, rows) -> int:
+    inserted = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= INSERT_CHUNK_ROWS:
+            conn.executemany(sql, chunk)
+            inserted += len(chunk)
+            chunk = []
+    if chunk:
+        conn.executemany(sql, chunk)
+        inserted += len(chunk)
+    return inserted
+
+
+def build_plan_db(db_path: str, rows: int, seed: int = 42) -> Dict[str, Any]:
+    """Create a schema-initialized database with `rows` recommendations and transactions.
+
+    Users get ROWS_PER_USER of each, two accounts (one a credit card with a
+    liability) and a 180d user_signals row. About 5% of recommendations are
+    pending approval and a third have been viewed.
+    """
+    if Path(db_path).exists():
+        raise FileExistsError(f"Refusing to overwrite existing database: {db_path}")
+
+    start = time.perf_counter()
+    initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    users = max(1, rows // ROWS_PER_USER)
+    user_ids = [f"user_{idx:07d}" for idx in range(users)]
+
+    def recommendations():
+        for idx in range(rows):
+            created = now - timedelta(minutes=rng.randrange(90 * 24 * 60))
+            viewed = (created + timedelta(hours=rng.randrange(48))).isoformat() if rng.random() < 0.33 else None
+            roll = rng.random()
+            approved = None if roll < 0.05 else int(roll < 0.9)
+            yield (f"rec_{idx:08d}", user_ids[idx % users], f"content_{rng.randrange(50)}", "benchmark",
+                   created.isoformat(), approved, viewed)
+
+    def transactions():
+        for idx in range(rows):
+            user_idx = idx % users
+            day = (now - timedelta(days=rng.randrange(365))).date().isoformat()
+            yield (f"txn_{idx:08d}", f"acct_{user_idx:07d}_0", user_ids[user_idx], day,
+                   round(rng.uniform(-250, 100), 2), f"merchant_{rng.randrange(500)}")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany("INSERT INTO users (user_id, consent_status) VALUES (?, ?)",
+                         [(user_id, rng.random() < 0.8) for user_id in user_ids])
+        conn.executemany("INSERT INTO accounts (account_id, user_id, type, subtype) VALUES (?, ?, ?, ?)", [
+            (f"acct_{idx:07d}_{n}", user_id, account_type, account_type)
+            for idx, user_id in enumerate(user_ids)
+            for n, account_type in enumerate(('checking', 'credit card'))
+        ])
+        conn.executemany("INSERT INTO liabilities (account_id, apr_percentage) VALUES (?, ?)",
+                         [(f"acct_{idx:07d}_1", 22.9) for idx in range(users)])
+        conn.executemany("INSERT INTO user_signals (user_id, window, signals) VALUES (?, '180d', '{}')",
+                         [(user_id,) for user_id in user_ids])
+        recommendation_count = _insert_chunks(conn, """
+            INSERT INTO recommendations (rec_id, user_id, content_id, rationale, created_at, approved, viewed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, recommendations())
+        transaction_count = _insert_chunks(conn, """
+            INSERT INTO transactions (transaction_id, account_id, user_id, date, amount, merchant_name)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, transactions())
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {'seconds': time.perf_counter() - start, 'users': users,
+            'recommendations': recommendation_count, 'transactions': transaction_count}
+
+
+def sample_params(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Values for the named parameters of HOT_QUERIES, picked from the database."""
+    now = datetime.now()
+    users = conn.execute("SELECT user_id FROM users ORDER BY user_id").fetchall()
+    rec = conn.execute("SELECT rec_id FROM recommendations LIMIT 1").fetchone()
+    return {
+        'user_id': users[len(users) // 2][0] if users else '',
+        'after': users[0][0] if users else '',
+        'rec_id': rec[0] if rec else '',
+        'window': '180d',
+        'today': now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat(),
+        'since': (now - timedelta(days=30)).isoformat(),
+        'cutoff': (now - timedelta(days=180)).date().isoformat(),
+        'limit': 50,
+        'low': 0,
+        'high': conn.execute("SELECT COALESCE(MAX(change_id), 0) FROM signal_change_log").fetchone()[0],
+        'feedback_id': 'feedback_sample',
+        'helpful': True,
+        'comment': None,
+        'created_at': now.isoformat(),
+    }
+
+
+def time_hot_queries(db_path: str, repeat: int = 5) -> Dict[str, Dict[str, Any]]:
+    """Plan, plan problems and execution time of every HOT_QUERIES entry, keyed by name."""
+    results = {}
+    with database_read(db_path) as conn:
+        params = sample_params(conn)
+        for query in HOT_QUERIES:
+            plan = explain_query_plan(conn, query, params)
+            timings = []
+            returned = 0
+            for _ in range(max(1, repeat)):
+                start = time.perf_counter()
+                returned = len(conn.execute(query.sql, params).fetchall())
+                timings.append((time.perf_counter() - start) * 1000)
+            results[query.name] = {
+                'source': query.source,
+                'plan': plan,
+                'problems': plan_problems(query, plan),
+                'rows': returned,
+                'median_ms': statistics.median(timings),
+                'max_ms': max(timings),
+            }
+    return results
+
+
+def run_benchmark(rows: int = 1_000_000, repeat: int = 5, seed: int = 42,
+                  db_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build a database and check and time every hot query against it.
+
+    Args:
+        rows: Recommendations (and transactions) to load
+        repeat: Executions per query; the median is reported
+        seed: Seed for data generation
+        db_path: New database file to build (kept afterwards); a temporary file when omitted
+
+    Returns:
+        JSON-serializable report
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = db_path or str(Path(tmp_dir) / "query_plans.db")
+        report = {
+            'config': {'rows': rows, 'repeat': repeat, 'seed': seed},
+            'environment': {
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+            },
+            'build': build_plan_db(db_path, rows, seed),
+        }
+        try:
+            report['queries'] = time_hot_queries(db_path, repeat)
+        finally:
+            close_pools()
+        report['plan_problems'] = {
+            name: result['problems'] for name, result in report['queries'].items() if result['problems']
+        }
+        return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Check query plans and time the hot SQL statements')
+    parser.add_argument('--rows', type=int, default=1_000_000,
+                        help='Recommendations and transactions to load (default: 1000000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Executions per query (default: 5)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--db-path', help='Build the benchmark database here instead of a temporary file')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--check', action='store_true', help='Exit with status 1 if any plan has problems')
+    parser.add_argument('--verbose', action='store_true', help='Keep INFO logging')
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+
+    report = run_benchmark(args.rows, args.repeat, args.seed, args.db_path)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+    if args.check and report['plan_problems']:
+        for name, problems in report['plan_problems'].items():
+            logger.error(f"{name}: {'; '.join(problems)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
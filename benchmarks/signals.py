@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Signal pipeline benchmark
+Builds a synthetic database of a given size and times single-user, batch and
+full-population signal computation, reporting throughput, peak RSS and
+per-stage timings as JSON.
+
+Usage:
+    python -m benchmarks.signals --users 10000 --txns-per-user 500
+"""
+import argparse
+import json
+import platform
+import random
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from scripts.compute_signals import compute_all_user_signals, compute_bulk_user_signals, compute_user_signals
+from src.db.connection import database_read, database_transaction, initialize_db
+from src.features.daily_aggregates import refresh_daily_aggregates
+from src.features.stage_timing import stage_timer
+from src.features.transaction_classes import classify_transactions
+from src.ingest.data_generator import SyntheticDataGenerator
+
+# Days of history covered by resized transactions (the generator produces ~200)
+HISTORY_DAYS = 200
+
+# Synthetic rosters generated per run; larger populations are cloned from them
+GENERATED_REPLICAS = 4
+
+# Full-population modes and the compute_all_user_signals options behind them
+FULL_POPULATION_MODES = {
+    'sequential': {},
+    'bulk': {'bulk': True},
+    'aggregates': {'aggregates': True},
+    'parallel': {},  # workers filled in from --workers
+}
+
+SCHEMA_PATH = str(project_root / "db" / "schema.sql")
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Peak resident set size so far, for this process and its reaped children."""
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    }
+
+
+def _prefixed(frames: Dict[str, pd.DataFrame], prefix: str) -> Dict[str, pd.DataFrame]:
+    """Copy of frames with user, account and transaction ids prefixed."""
+    renamed = {}
+    for table, frame in frames.items():
+        frame = frame.copy()
+        for column in ('user_id', 'account_id', 'transaction_id'):
+            if column in frame.columns:
+                frame[column] = prefix + frame[column].astype(str)
+        renamed[table] = frame
+    return renamed
+
+
+def generate_population(users: int, seed: int = 42) -> Dict[str, pd.DataFrame]:
+    """Synthetic users, accounts, transactions and liabilities for exactly `users` users.
+
+    SyntheticDataGenerator produces a fixed roster of persona users and is slow
+    per user, so up to GENERATED_REPLICAS rosters are generated with consecutive
+    seeds and the rest of the population is cloned from them with prefixed ids.
+    resize_transactions then samples each clone's rows independently.
+    """
+    tables = ['users', 'accounts', 'transactions', 'liabilities']
+    base = []
+    generated = 0
+    for replica in range(GENERATED_REPLICAS):
+        if generated >= users:
+            break
+        data = SyntheticDataGenerator(seed=seed + replica).generate_all(users)
+        frames = {table: pd.DataFrame(data[table]) for table in tables}
+        if frames['users'].empty:
+            raise ValueError("SyntheticDataGenerator produced no users")
+        base.append(_prefixed(frames, f"g{replica}_") if replica else frames)
+        generated += len(frames['users'])
+    base = {table: pd.concat([frames[table] for frames in base], ignore_index=True) for table in tables}
+
+    copies = [base]
+    while len(copies) * len(base['users']) < users:
+        copies.append(_prefixed(base, f"c{len(copies):05d}_"))
+    population = {table: pd.concat([frames[table] for frames in copies], ignore_index=True) for table in tables}
+
+    population['users'] = population['users'].iloc[:users]
+    keep = population['users']['user_id']
+    population['accounts'] = population['accounts'][population['accounts']['user_id'].isin(keep)]
+    population['transactions'] = population['transactions'][population['transactions']['user_id'].isin(keep)]
+    population['liabilities'] = population['liabilities'][
+        population['liabilities']['account_id'].isin(population['accounts']['account_id'])
+    ]
+    return population
+
+
+def resize_transactions(transactions: pd.DataFrame, per_user: int, seed: int = 42) -> pd.DataFrame:
+    """Give every user exactly per_user transactions.
+
+    Users with more rows are subsampled; users with fewer keep all their
+    generated rows (so recurring payments stay recurring) and are topped up
+    with copies of their own rows on random days within HISTORY_DAYS.
+    """
+    rng = np.random.default_rng(seed)
+    picks, filler = [], []
+    for positions in transactions.groupby('user_id', sort=True).indices.values():
+        if len(positions) >= per_user:
+            picks.append(np.sort(rng.choice(positions, per_user, replace=False)))
+            filler.append(np.zeros(per_user, dtype=bool))
+        else:
+            extra = per_user - len(positions)
+            picks.append(np.concatenate([positions, rng.choice(positions, extra)]))
+            filler.append(np.concatenate([np.zeros(len(positions), dtype=bool), np.ones(extra, dtype=bool)]))
+
+    resized = transactions.iloc[np.concatenate(picks)].reset_index(drop=True)
+    filler = np.concatenate(filler)
+
+    today = date.today()
+    offsets = rng.integers(0, HISTORY_DAYS, int(filler.sum()))
+    resized.loc[filler, 'date'] = [(today - timedelta(days=int(days))).isoformat() for days in offsets]
+    resized['transaction_id'] = [f"bench_txn_{idx}" for idx in range(len(resized))]
+    return resized
+
+
+def build_benchmark_db(db_path: str, users: int, txns_per_user: int, seed: int = 42) -> Dict[str, Any]:
+    """Create a schema-initialized database with synthetic users, classified and rolled up."""
+    if Path(db_path).exists():
+        raise FileExistsError(f"Refusing to overwrite existing database: {db_path}")
+
+    start = time.perf_counter()
+    initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+
+    frames = generate_population(users, seed)
+    frames['transactions'] = resize_transactions(frames['transactions'], txns_per_user, seed)
+
+    # Classify before inserting so the load doesn't need an UPDATE pass
+    accounts = frames['accounts']
+    savings_ids = accounts.loc[accounts['subtype'] == 'savings', 'account_id']
+    frames['transactions']['txn_class'] = classify_transactions(frames['transactions'], savings_ids)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        for table, frame in frames.items():
+            frame.to_sql(table, conn, if_exists='append', index=False, chunksize=50000)
+        # The load itself is not a change for incremental runs to pick up
+        conn.execute("DELETE FROM signal_change_log")
+        conn.commit()
+    finally:
+        conn.close()
+
+    with database_transaction(db_path) as conn:
+        rollup_rows = refresh_daily_aggregates(conn)
+
+    return {
+        'seconds': time.perf_counter() - start,
+        'users': len(frames['users']),
+        'accounts': len(frames['accounts']),
+        'transactions': len(frames['transactions']),
+        'liabilities': len(frames['liabilities']),
+        'daily_aggregate_rows': rollup_rows,
+    }
+
+
+def _phase_result(users: int, seconds: float) -> Dict[str, Any]:
+    return {
+        'users': users,
+        'seconds': seconds,
+        'users_per_sec': users / seconds if seconds > 0 else None,
+        'stages': stage_timer.summary(),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def bench_single_user(db_path: str, user_ids: List[str], window_days: int) -> Dict[str, Any]:
+    """Time compute_user_signals one user at a time."""
+    stage_timer.reset()
+    start = time.perf_counter()
+    for user_id in user_ids:
+        compute_user_signals(user_id, window_days, db_path)
+    return _phase_result(len(user_ids), time.perf_counter() - start)
+
+
+def bench_batch(db_path: str, user_ids: List[str], window_days: int) -> Dict[str, Any]:
+    """Time one bulk computation over a batch of users (no writes)."""
+    stage_timer.reset()
+    start = time.perf_counter()
+    compute_bulk_user_signals(window_days, db_path, user_ids=user_ids)
+    return _phase_result(len(user_ids), time.perf_counter() - start)
+
+
+def bench_full_population(db_path: str, mode: str, total_users: int, window_days: int,
+                          workers: int) -> Dict[str, Any]:
+    """Time a full compute-and-save run in the given mode."""
+    options = dict(FULL_POPULATION_MODES[mode])
+    if mode == 'parallel':
+        options['workers'] = workers
+
+    start = time.perf_counter()
+    success, errors = compute_all_user_signals(window_days, db_path, **options)
+    result = _phase_result(total_users, time.perf_counter() - start)
+    result.update({'mode': mode, 'success': success, 'errors': errors})
+    return result
+
+
+def run_benchmark(users: int = 1000, txns_per_user: int = 100, seed: int = 42, window_days: int = 180,
+                  single_sample: int = 100, batch_users: int = 1000,
+                  modes: Optional[List[str]] = None, workers: int = 4,
+                  db_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build a synthetic database and time each way of computing signals.
+
+    Args:
+        users: Number of synthetic users
+        txns_per_user: Transactions per user
+        seed: Seed for data generation and resizing
+        window_days: Signal window in days
+        single_sample: Users timed through the per-user path
+        batch_users: Users in the bulk batch phase
+        modes: Full-population modes to time (see FULL_POPULATION_MODES)
+        workers: Worker processes for the parallel mode
+        db_path: New database file to build (kept afterwards); a temporary file when omitted
+
+    Returns:
+        JSON-serializable report
+    """
+    modes = modes or ['bulk', 'aggregates']
+    unknown = set(modes) - set(FULL_POPULATION_MODES)
+    if unknown:
+        raise ValueError(f"Unknown modes: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = db_path or str(Path(tmp_dir) / "benchmark.db")
+        report = {
+            'config': {
+                'users': users, 'txns_per_user': txns_per_user, 'seed': seed, 'window_days': window_days,
+                'single_sample': single_sample, 'batch_users': batch_users, 'modes': modes, 'workers': workers,
+            },
+            'environment': {
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'pandas': pd.__version__,
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+            },
+            'build': build_benchmark_db(db_path, users, txns_per_user, seed),
+        }
+
+        with database_read(db_path) as conn:
+            user_ids = [row['user_id'] for row in conn.execute("SELECT user_id FROM users ORDER BY user_id")]
+
+        sample = random.Random(seed).sample(user_ids, min(single_sample, len(user_ids)))
+        report['single_user'] = bench_single_user(db_path, sample, window_days)
+        report['batch'] = bench_batch(db_path, user_ids[:batch_users], window_days)
+        report['full_population'] = {
+            mode: bench_full_population(db_path, mode, len(user_ids), window_days, workers)
+            for mode in modes
+        }
+        report['peak_rss_mb'] = peak_rss_mb()
+        return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Benchmark signal computation on a synthetic database')
+    parser.add_argument('--users', type=int, default=1000, help='Number of synthetic users (default: 1000)')
+    parser.add_argument('--txns-per-user', type=int, default=100, help='Transactions per user (default: 100)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--window-days', type=int, default=180, help='Signal window in days (default: 180)')
+    parser.add_argument('--single-sample', type=int, default=100,
+                        help='Users timed through the per-user path (default: 100)')
+    parser.add_argument('--batch-users', type=int, default=1000, help='Users in the batch phase (default: 1000)')
+    parser.add_argument('--modes', type=lambda value: value.split(','), default=['bulk', 'aggregates'],
+                        help=f"Comma-separated full-population modes ({', '.join(FULL_POPULATION_MODES)}; "
+                             f"default: bulk,aggregates)")
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes for the parallel mode')
+    parser.add_argument('--db-path', help='Build the benchmark database here instead of a temporary file')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--verbose', action='store_true', help='Keep pipeline INFO logging')
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+
+    report = run_benchmark(args.users, args.txns_per_user, args.seed, args.window_days, args.single_sample,
+                           args.batch_users, args.modes, args.workers, args.db_path)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
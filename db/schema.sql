@@ -49,6 +49,7 @@ CREATE TABLE transactions (
     transaction_type TEXT,  -- purchase, transfer, refund, deposit, withdrawal, fee
     amount_category TEXT,  -- small, medium, large, very_large, extra_large
     status TEXT,  -- approved, declined, pending
+    txn_class INTEGER,  -- Classification bitmask set at ingest (see src/features/transaction_classes.py)
     FOREIGN KEY (account_id) REFERENCES accounts(account_id),
     FOREIGN KEY (user_id) REFERENCES users(user_id)
 );
@@ -75,6 +76,41 @@ CREATE TABLE user_signals (
     FOREIGN KEY (user_id) REFERENCES users(user_id)
 );
 
+-- Typed copy of the scalar UserSignals fields (written with the JSON blob; see SIGNAL_VALUE_COLUMNS)
+CREATE TABLE user_signal_values (
+    user_id TEXT NOT NULL,
+    window TEXT NOT NULL,
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    credit_utilization_max REAL,
+    has_interest_charges INTEGER,
+    is_overdue INTEGER,
+    minimum_payment_only INTEGER,
+    income_pay_gap INTEGER,
+    cash_flow_buffer REAL,
+    income_variability REAL,
+    subscription_count INTEGER,
+    monthly_subscription_spend REAL,
+    subscription_share REAL,
+    savings_growth_rate REAL,
+    monthly_savings_inflow REAL,
+    emergency_fund_months REAL,
+    monthly_bank_fees REAL,
+    bank_fee_count INTEGER,
+    has_overdraft_fees INTEGER,
+    has_atm_fees INTEGER,
+    has_maintenance_fees INTEGER,
+    fraud_transaction_count INTEGER,
+    fraud_rate REAL,
+    has_fraud_history INTEGER,
+    fraud_risk_score REAL,
+    impossible_travel_count INTEGER,
+    geo_velocity_max REAL,
+    insufficient_data INTEGER,
+    data_quality_score REAL,
+    computation_error_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, window)
+);
+
 -- Persona assignments
 CREATE TABLE persona_assignments (
     user_id TEXT NOT NULL,
@@ -113,6 +149,135 @@ CREATE TABLE feedback (
     FOREIGN KEY (rec_id) REFERENCES recommendations(rec_id)
 );
 
+-- Per-user daily rollup of transactions (one row per user, day and category class)
+CREATE TABLE user_daily_aggregates (
+    user_id TEXT NOT NULL,
+    day DATE NOT NULL,
+    category_class INTEGER NOT NULL,  -- OR of CLASS_* bits in src/features/daily_aggregates.py
+    txn_count INTEGER NOT NULL,
+    amount_sum REAL NOT NULL,
+    amount_abs_sum REAL NOT NULL,
+    amount_sq_sum REAL NOT NULL,
+    outflow_sum REAL NOT NULL,  -- Sum of outflows as a positive number
+    amount_min REAL,
+    amount_max REAL,
+    fraud_count INTEGER NOT NULL DEFAULT 0,
+    fraud_declined_count INTEGER NOT NULL DEFAULT 0,
+    fraud_high_risk_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, category_class)
+);
+
+-- Per-stage timing of signal computation runs (one row per run and stage)
+CREATE TABLE signal_run_stats (
+    run_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    mode TEXT,  -- sequential, bulk, aggregates, parallel, multi_window, streaming or single_user
+    windows TEXT,  -- Comma-separated window labels, e.g. '30d,180d'
+    calls INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    total_ms REAL NOT NULL,
+    p50_ms REAL NOT NULL,
+    p95_ms REAL NOT NULL,
+    max_ms REAL NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, stage)
+);
+
+-- Background jobs started from the dashboard (see src/jobs/runner.py)
+CREATE TABLE jobs (
+    job_id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,  -- e.g. compute_signals
+    status TEXT NOT NULL DEFAULT 'queued',  -- queued, running, succeeded, failed, cancelled
+    params JSON,
+    users_total INTEGER,
+    users_done INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    users_per_second REAL,
+    error_message TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    owner_pid INTEGER,  -- Process whose runner runs the job
+    owner_identity TEXT  -- Boot id and start time of that process, to tell a reused pid apart
+);
+
+CREATE INDEX idx_jobs_status ON jobs(status, created_at);
+
+-- Applied schema migrations (see MIGRATIONS in src/db/connection.py); initialize_db
+-- records every migration for a database created from this file
+CREATE TABLE schema_version (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Change log for incremental signal recomputation (fed by triggers below)
+CREATE TABLE signal_change_log (
+    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    source_table TEXT NOT NULL,  -- transactions, accounts, liabilities, load
+    operation TEXT NOT NULL,  -- insert, update, delete, reload
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Last change_id consumed by a signal run, per window
+CREATE TABLE signal_watermarks (
+    window TEXT PRIMARY KEY,
+    last_change_id INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER trg_transactions_insert_log AFTER INSERT ON transactions BEGIN
+    INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (NEW.user_id, 'transactions', 'insert');
+END;
+
+CREATE TRIGGER trg_transactions_update_log AFTER UPDATE ON transactions BEGIN
+    INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (NEW.user_id, 'transactions', 'update');
+    INSERT INTO signal_change_log (user_id, source_table, operation)
+        SELECT OLD.user_id, 'transactions', 'update' WHERE OLD.user_id IS NOT NEW.user_id;
+END;
+
+CREATE TRIGGER trg_transactions_delete_log AFTER DELETE ON transactions BEGIN
+    INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (OLD.user_id, 'transactions', 'delete');
+END;
+
+CREATE TRIGGER trg_accounts_insert_log AFTER INSERT ON accounts BEGIN
+    INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (NEW.user_id, 'accounts', 'insert');
+END;
+
+CREATE TRIGGER trg_accounts_update_log AFTER UPDATE ON accounts BEGIN
+    INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (NEW.user_id, 'accounts', 'update');
+    INSERT INTO signal_change_log (user_id, source_table, operation)
+        SELECT OLD.user_id, 'accounts', 'update' WHERE OLD.user_id IS NOT NEW.user_id;
+END;
+
+CREATE TRIGGER trg_accounts_delete_log AFTER DELETE ON accounts BEGIN
+    INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (OLD.user_id, 'accounts', 'delete');
+END;
+
+CREATE TRIGGER trg_liabilities_insert_log AFTER INSERT ON liabilities BEGIN
+    INSERT INTO signal_change_log (user_id, source_table, operation)
+        SELECT user_id, 'liabilities', 'insert' FROM accounts WHERE account_id = NEW.account_id;
+END;
+
+CREATE TRIGGER trg_liabilities_update_log AFTER UPDATE ON liabilities BEGIN
+    INSERT INTO signal_change_log (user_id, source_table, operation)
+        SELECT user_id, 'liabilities', 'update' FROM accounts WHERE account_id = NEW.account_id;
+END;
+
+CREATE TRIGGER trg_liabilities_delete_log AFTER DELETE ON liabilities BEGIN
+    INSERT INTO signal_change_log (user_id, source_table, operation)
+        SELECT user_id, 'liabilities', 'delete' FROM accounts WHERE account_id = OLD.account_id;
+END;
+
+-- Clear a stored txn_class when a column its classification reads changes
+CREATE TRIGGER trg_transactions_reset_class
+    AFTER UPDATE OF amount, merchant_name, category_primary, category_detailed, account_id, user_id ON transactions
+    WHEN NEW.txn_class IS NOT NULL AND NEW.txn_class IS OLD.txn_class BEGIN
+    UPDATE transactions SET txn_class = NULL WHERE rowid = NEW.rowid;
+END;
+
 -- Create indexes for performance
 CREATE INDEX idx_transactions_user_date ON transactions(user_id, date);
 CREATE INDEX idx_transactions_merchant ON transactions(merchant_name);
@@ -120,8 +285,13 @@ CREATE INDEX idx_transactions_fraud ON transactions(is_fraud, user_id);
 CREATE INDEX idx_transactions_location ON transactions(latitude, longitude);
 CREATE INDEX idx_accounts_user_type ON accounts(user_id, type);
 CREATE INDEX idx_recommendations_user_created ON recommendations(user_id, created_at);
+CREATE INDEX idx_recommendations_approval ON recommendations(approved, created_at);
+CREATE INDEX idx_recommendations_created ON recommendations(created_at);
 CREATE INDEX idx_feedback_user ON feedback(user_id);
 CREATE INDEX idx_feedback_rec ON feedback(rec_id);
 CREATE INDEX idx_users_demographic_group ON users(demographic_group);
+CREATE INDEX idx_signal_values_quality ON user_signal_values(window, data_quality_score);
+CREATE INDEX idx_signal_values_insufficient ON user_signal_values(window, insufficient_data);
+CREATE INDEX idx_signal_values_fraud_risk ON user_signal_values(window, fraud_risk_score);
 
 
@@ -4,7 +4,6 @@ Clean up users with insufficient data quality
 Either deletes them or regenerates data for them
 """
 import sqlite3
-import json
 import argparse
 from pathlib import Path
 import sys
@@ -13,6 +12,8 @@ import sys
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
+from src.db.connection import ensure_schema_current
+
 
 def get_insufficient_users(db_path: str = "db/spend_sense.db", min_quality: float = 0.1) -> list:
     """Get list of users with insufficient data quality."""
@@ -21,31 +22,22 @@ def get_insufficient_users(db_path: str = "db/spend_sense.db", min_quality: floa
 
     insufficient = []
 
-    # Get all users with signals
+    # Get all users with signals (typed columns, no blob parsing)
     signals = conn.execute("""
-        SELECT user_id, signals
-        FROM user_signals
+        SELECT user_id, data_quality_score, insufficient_data
+        FROM user_signal_values
         WHERE window = '180d'
     """).fetchall()
 
     for row in signals:
-        try:
-            sig = json.loads(row['signals'])
-            quality = sig.get('data_quality_score', 0.0)
-            insufficient_flag = sig.get('insufficient_data', True)
-
-            if quality < min_quality or insufficient_flag:
-                insufficient.append({
-                    'user_id': row['user_id'],
-                    'quality': quality,
-                    'insufficient': insufficient_flag
-                })
-        except Exception:
-            # If can't parse, consider insufficient
+        quality = row['data_quality_score'] if row['data_quality_score'] is not None else 0.0
+        insufficient_flag = bool(row['insufficient_data']) if row['insufficient_data'] is not None else True
+
+        if quality < min_quality or insufficient_flag:
             insufficient.append({
                 'user_id': row['user_id'],
-                'quality': 0.0,
-                'insufficient': True
+                'quality': quality,
+                'insufficient': insufficient_flag
             })
 
     # Also get users without signals at all
@@ -82,6 +74,8 @@ def delete_users(user_ids: list, db_path: str = "db/spend_sense.db"):
             conn.execute("DELETE FROM recommendations WHERE user_id = ?", (user_id,))
         if 'persona_assignments' in table_names:
             conn.execute("DELETE FROM persona_assignments WHERE user_id = ?", (user_id,))
+        if 'user_signal_values' in table_names:
+            conn.execute("DELETE FROM user_signal_values WHERE user_id = ?", (user_id,))
         if 'user_signals' in table_names:
             conn.execute("DELETE FROM user_signals WHERE user_id = ?", (user_id,))
         if 'transactions' in table_names:
@@ -106,6 +100,7 @@ def main():
     parser.add_argument('--delete', action='store_true', help='Actually delete insufficient users')
 
     args = parser.parse_args()
+    ensure_schema_current(args.db_path)
 
     print("🔍 Finding users with insufficient data...")
     insufficient = get_insufficient_users(args.db_path, args.min_quality)
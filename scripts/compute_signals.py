@@ -6,8 +6,14 @@ This script extracts signals from transactions and saves them to the database
 import argparse
 import sqlite3
 import sys
+import time
+import uuid
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import pandas as pd
 from loguru import logger
@@ -16,10 +22,94 @@ from loguru import logger
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from src.db.connection import database_transaction, save_user_signals
-from src.features.bank_fees import detect_bank_fees
-from src.features.fraud_detection import extract_fraud_signals
+from src.db.connection import (
+    SIGNALS_BATCH_SIZE, DatabaseError, database_read, database_transaction, ensure_schema_current,
+    get_table_columns, save_signal_run_stats, save_user_signals, save_user_signals_bulk
+)
+from src.features.bank_fees import detect_bank_fees, detect_bank_fees_by_user
+from src.features.credit import CREDIT_DEFAULTS, compute_credit_signals_by_user
+from src.features.daily_aggregates import (
+    AGGREGATES_WATERMARK, aggregate_activity, aggregate_bank_fee_signals, aggregate_fraud_signals,
+    aggregate_income_signals, aggregate_savings_signals, aggregate_subscription_signals,
+    load_subscription_candidates, load_window_aggregates, refresh_changed_daily_aggregates
+)
+from src.features.fraud_detection import extract_fraud_signals, extract_fraud_signals_by_user
 from src.features.schema import UserSignals
+from src.features.stage_timing import format_stage_summary, stage_timer
+from src.features.subscriptions import subscription_mask, subscription_signals_by_user
+from src.features.transaction_classes import (
+    CLASS_INCOME, has_class, transaction_classes
+)
+from src.features.transaction_snapshot import TransactionSnapshot, load_transaction_snapshot
+
+
+# Optional transaction columns and the value used when a database predates them
+_OPTIONAL_TRANSACTION_COLUMNS = {
+    'is_fraud': '0', 'transaction_type': 'NULL', 'status': 'NULL', 'txn_class': 'NULL',
+    'latitude': 'NULL', 'longitude': 'NULL'
+}
+
+
+# Transaction columns every schema version has
+BASE_TRANSACTION_COLUMNS = (
+    "transaction_id", "user_id", "account_id", "date", "amount", "merchant_name",
+    "category_primary", "category_detailed", "payment_channel"
+)
+
+# Statements on the per-user and chunked read paths; src/db/hot_queries.py checks
+# their query plans. {projection} is filled from _transaction_projection
+TRANSACTIONS_SQL = """
+    SELECT {projection}
+    FROM transactions
+    WHERE {where_clause}
+    ORDER BY date DESC
+"""
+USER_WINDOW_CLAUSE = "user_id = :user_id AND date >= :cutoff"
+USER_ACCOUNTS_SQL = """
+    SELECT account_id, type, subtype, current_balance, credit_limit
+    FROM accounts
+    WHERE user_id = :user_id
+"""
+USER_LIABILITIES_SQL = """
+    SELECT account_id, apr_percentage, is_overdue,
+           minimum_payment_amount, last_payment_amount
+    FROM liabilities
+    WHERE account_id IN (SELECT account_id FROM accounts WHERE user_id = :user_id)
+"""
+# {cursor_clause} is CHUNK_CURSOR_CLAUSE after the first chunk, empty before it
+TRANSACTION_CHUNK_SQL = """
+    SELECT {projection}
+    FROM transactions
+    WHERE {cursor_clause}date >= :cutoff
+    ORDER BY user_id, date
+    LIMIT :limit
+"""
+CHUNK_CURSOR_CLAUSE = "user_id > :after AND "
+
+
+def _transaction_projection(conn: sqlite3.Connection, db_path: str) -> str:
+    """SELECT list for transactions, filling columns this database lacks with defaults."""
+    columns = get_table_columns('transactions', db_path, conn)
+    optional = [
+        name if name in columns else f"{default} AS {name}"
+        for name, default in _OPTIONAL_TRANSACTION_COLUMNS.items()
+    ]
+    return ", ".join([*BASE_TRANSACTION_COLUMNS, *optional])
+
+
+def _read_transactions(conn: sqlite3.Connection, where_clause: str, params: Union[tuple, Dict[str, Any]],
+                       db_path: str) -> pd.DataFrame:
+    """Read transactions matching where_clause, tolerating older schemas.
+
+    Newer columns (is_fraud, transaction_type, status) are filled with defaults
+    when the database predates them; which ones exist is probed once per db_path.
+    Rows ingested before classification get their txn_class computed here.
+    """
+    transactions_df = pd.read_sql_query(TRANSACTIONS_SQL.format(
+        projection=_transaction_projection(conn, db_path), where_clause=where_clause
+    ), conn, params=params)
+    transactions_df['txn_class'] = transaction_classes(transactions_df)
+    return transactions_df
 
 
 def compute_user_signals(user_id: str, window_days: int = 180, db_path: str = "db/spend_sense.db") -> UserSignals:
@@ -37,65 +127,20 @@ def compute_user_signals(user_id: str, window_days: int = 180, db_path: str = "d
     try:
         cutoff_date = (datetime.now() - timedelta(days=window_days)).date()
 
-        with database_transaction(db_path) as conn:
+        fetch_start = time.perf_counter()
+        with database_read(db_path) as conn:
             # Get transactions (include account_id for savings computation)
-            # Check which columns exist (is_fraud may not exist in older schemas)
-            try:
-                # Try with all columns first
-                transactions_df = pd.read_sql_query("""
-                    SELECT
-                        transaction_id, account_id, date, amount, merchant_name,
-                        category_primary, category_detailed, payment_channel,
-                        is_fraud, transaction_type, status
-                    FROM transactions
-                    WHERE user_id = ? AND date >= ?
-                    ORDER BY date DESC
-                """, conn, params=(user_id, cutoff_date))
-            except (sqlite3.OperationalError, Exception) as e:
-                # Fallback if transaction_type/status columns don't exist
-                try:
-                    # Try with is_fraud column (most common case)
-                    transactions_df = pd.read_sql_query("""
-                        SELECT
-                            transaction_id, account_id, date, amount, merchant_name,
-                            category_primary, category_detailed, payment_channel,
-                            is_fraud
-                        FROM transactions
-                        WHERE user_id = ? AND date >= ?
-                        ORDER BY date DESC
-                    """, conn, params=(user_id, cutoff_date))
-                    # Add missing columns with defaults
-                    transactions_df['transaction_type'] = None
-                    transactions_df['status'] = None
-                except (sqlite3.OperationalError, Exception):
-                    # Final fallback if is_fraud also doesn't exist
-                    transactions_df = pd.read_sql_query("""
-                        SELECT
-                            transaction_id, account_id, date, amount, merchant_name,
-                            category_primary, category_detailed, payment_channel
-                        FROM transactions
-                        WHERE user_id = ? AND date >= ?
-                        ORDER BY date DESC
-                    """, conn, params=(user_id, cutoff_date))
-                    # Add missing columns with defaults
-                    transactions_df['is_fraud'] = 0
-                    transactions_df['transaction_type'] = None
-                    transactions_df['status'] = None
+            transactions_df = _read_transactions(
+                conn, USER_WINDOW_CLAUSE, {'user_id': user_id, 'cutoff': cutoff_date}, db_path
+            )
 
             # Get accounts
-            accounts_df = pd.read_sql_query("""
-                SELECT account_id, type, subtype, current_balance, credit_limit
-                FROM accounts
-                WHERE user_id = ?
-            """, conn, params=(user_id,))
+            accounts_df = pd.read_sql_query(USER_ACCOUNTS_SQL, conn, params={'user_id': user_id})
 
             # Get liabilities
-            liabilities_df = pd.read_sql_query("""
-                SELECT account_id, apr_percentage, is_overdue,
-                       minimum_payment_amount, last_payment_amount
-                FROM liabilities
-                WHERE account_id IN (SELECT account_id FROM accounts WHERE user_id = ?)
-            """, conn, params=(user_id,))
+            liabilities_df = pd.read_sql_query(USER_LIABILITIES_SQL, conn, params={'user_id': user_id})
+        row_count = len(transactions_df)
+        stage_timer.record('fetch', time.perf_counter() - fetch_start, row_count)
 
         # Initialize signals with defaults
         signals_dict = {
@@ -105,56 +150,63 @@ def compute_user_signals(user_id: str, window_days: int = 180, db_path: str = "d
         }
 
         # Compute credit signals
-        try:
-            credit_signals = compute_credit_signals(accounts_df, liabilities_df, transactions_df)
-            signals_dict.update(credit_signals)
-        except Exception as e:
-            logger.warning(f"Error computing credit signals for {user_id}: {e}")
-            signals_dict['computation_errors'].append(f"Credit signals: {str(e)}")
+        with stage_timer.stage('credit', row_count):
+            try:
+                credit_signals = compute_credit_signals(accounts_df, liabilities_df, transactions_df)
+                signals_dict.update(credit_signals)
+            except Exception as e:
+                logger.warning(f"Error computing credit signals for {user_id}: {e}")
+                signals_dict['computation_errors'].append(f"Credit signals: {str(e)}")
 
         # Compute income signals
-        try:
-            income_signals = compute_income_signals(transactions_df, window_days)
-            signals_dict.update(income_signals)
-        except Exception as e:
-            logger.warning(f"Error computing income signals for {user_id}: {e}")
-            signals_dict['computation_errors'].append(f"Income signals: {str(e)}")
+        with stage_timer.stage('income', row_count):
+            try:
+                income_signals = compute_income_signals(transactions_df, window_days)
+                signals_dict.update(income_signals)
+            except Exception as e:
+                logger.warning(f"Error computing income signals for {user_id}: {e}")
+                signals_dict['computation_errors'].append(f"Income signals: {str(e)}")
 
         # Compute subscription signals
-        try:
-            subscription_signals = compute_subscription_signals(transactions_df, window_days)
-            signals_dict.update(subscription_signals)
-        except Exception as e:
-            logger.warning(f"Error computing subscription signals for {user_id}: {e}")
-            signals_dict['computation_errors'].append(f"Subscription signals: {str(e)}")
+        with stage_timer.stage('subscriptions', row_count):
+            try:
+                subscription_signals = compute_subscription_signals(transactions_df, window_days)
+                signals_dict.update(subscription_signals)
+            except Exception as e:
+                logger.warning(f"Error computing subscription signals for {user_id}: {e}")
+                signals_dict['computation_errors'].append(f"Subscription signals: {str(e)}")
 
         # Compute savings signals
-        try:
-            savings_signals = compute_savings_signals(transactions_df, accounts_df, window_days)
-            signals_dict.update(savings_signals)
-        except Exception as e:
-            logger.warning(f"Error computing savings signals for {user_id}: {e}")
-            signals_dict['computation_errors'].append(f"Savings signals: {str(e)}")
+        with stage_timer.stage('savings', row_count):
+            try:
+                savings_signals = compute_savings_signals(transactions_df, accounts_df, window_days)
+                signals_dict.update(savings_signals)
+            except Exception as e:
+                logger.warning(f"Error computing savings signals for {user_id}: {e}")
+                signals_dict['computation_errors'].append(f"Savings signals: {str(e)}")
 
         # Compute bank fee signals
-        try:
-            bank_fee_signals = detect_bank_fees(transactions_df, window_days)
-            signals_dict.update(bank_fee_signals)
-        except Exception as e:
-            logger.warning(f"Error computing bank fee signals for {user_id}: {e}")
-            signals_dict['computation_errors'].append(f"Bank fee signals: {str(e)}")
+        with stage_timer.stage('bank_fees', row_count):
+            try:
+                bank_fee_signals = detect_bank_fees(transactions_df, window_days)
+                signals_dict.update(bank_fee_signals)
+            except Exception as e:
+                logger.warning(f"Error computing bank fee signals for {user_id}: {e}")
+                signals_dict['computation_errors'].append(f"Bank fee signals: {str(e)}")
 
         # Compute fraud signals
-        try:
-            fraud_signals = extract_fraud_signals(transactions_df)
-            signals_dict.update(fraud_signals)
-        except Exception as e:
-            logger.warning(f"Error computing fraud signals for {user_id}: {e}")
-            signals_dict['computation_errors'].append(f"Fraud signals: {str(e)}")
+        with stage_timer.stage('fraud', row_count):
+            try:
+                fraud_signals = extract_fraud_signals(transactions_df)
+                signals_dict.update(fraud_signals)
+            except Exception as e:
+                logger.warning(f"Error computing fraud signals for {user_id}: {e}")
+                signals_dict['computation_errors'].append(f"Fraud signals: {str(e)}")
 
         # Compute data quality score
-        signals_dict['data_quality_score'] = compute_data_quality_score(signals_dict, transactions_df)
-        signals_dict['insufficient_data'] = signals_dict['data_quality_score'] < 0.1
+        with stage_timer.stage('data_quality', row_count):
+            signals_dict['data_quality_score'] = compute_data_quality_score(signals_dict, transactions_df)
+            signals_dict['insufficient_data'] = signals_dict['data_quality_score'] < 0.1
 
         # Create UserSignals object
         signals = UserSignals(**signals_dict)
@@ -172,40 +224,15 @@ def compute_user_signals(user_id: str, window_days: int = 180, db_path: str = "d
         )
 
 
-def compute_credit_signals(accounts_df: pd.DataFrame, liabilities_df: pd.DataFrame, transactions_df: pd.DataFrame) -> dict:
-    """Compute credit-related signals."""
-    signals = {
-        'credit_utilization_max': None,
-        'has_interest_charges': False,
-        'is_overdue': False,
-        'minimum_payment_only': False
-    }
-
-    if liabilities_df.empty:
-        return signals
-
-    # Credit utilization
-    credit_accounts = accounts_df[accounts_df['subtype'] == 'credit card']
-    if not credit_accounts.empty:
-        utilizations = []
-        for _, account in credit_accounts.iterrows():
-            if account.get('credit_limit') and account.get('credit_limit') > 0:
-                balance = account.get('current_balance', 0) or 0
-                utilization = balance / account['credit_limit']
-                utilizations.append(utilization)
-
-        if utilizations:
-            signals['credit_utilization_max'] = max(utilizations)
-
-    # Interest charges and overdue
-    if not liabilities_df.empty:
-        signals['has_interest_charges'] = (liabilities_df['apr_percentage'] > 0).any()
-        signals['is_overdue'] = liabilities_df['is_overdue'].any() if 'is_overdue' in liabilities_df.columns else False
+# Key used when running a by-user kernel over one user's frames
+_SINGLE_USER = '_'
 
-    # Minimum payment only (simplified - would need payment history)
-    signals['minimum_payment_only'] = False
 
-    return signals
+def compute_credit_signals(accounts_df: pd.DataFrame, liabilities_df: pd.DataFrame, transactions_df: pd.DataFrame) -> dict:
+    """Compute credit-related signals."""
+    # Same kernel as the bulk path, with this user's rows under a single key
+    by_user = compute_credit_signals_by_user(accounts_df.assign(user_id=_SINGLE_USER), liabilities_df)
+    return by_user.get(_SINGLE_USER, dict(CREDIT_DEFAULTS))
 
 
 def compute_income_signals(transactions_df: pd.DataFrame, window_days: int) -> dict:
@@ -220,10 +247,7 @@ def compute_income_signals(transactions_df: pd.DataFrame, window_days: int) -> d
         return signals
 
     # Income transactions (positive amounts, payroll category)
-    income_txns = transactions_df[
-        (transactions_df['amount'] > 0) &
-        (transactions_df['category_primary'].str.contains('Payroll|Deposit|Income', case=False, na=False))
-    ]
+    income_txns = transactions_df[has_class(transaction_classes(transactions_df), CLASS_INCOME)]
 
     if len(income_txns) >= 2:
         income_txns = income_txns.sort_values('date')
@@ -257,11 +281,8 @@ def compute_subscription_signals(transactions_df: pd.DataFrame, window_days: int
     if transactions_df.empty:
         return signals
 
-    # Subscription transactions (recurring, subscription category)
-    subscription_txns = transactions_df[
-        (transactions_df['category_primary'].str.contains('Subscription|Recurring', case=False, na=False)) |
-        (transactions_df['category_detailed'].str.contains('Subscription', case=False, na=False))
-    ]
+    # Subscription transactions (subscription category or detected recurring payments)
+    subscription_txns = transactions_df[subscription_mask(transactions_df)]
 
     # Count unique subscriptions (by merchant)
     if not subscription_txns.empty:
@@ -316,14 +337,25 @@ def compute_data_quality_score(signals_dict: dict, transactions_df: pd.DataFrame
     - Data recency issues
     - Incomplete account coverage
     """
-    score = 1.0
-
     # Penalize for missing transactions
     if transactions_df.empty:
         return 0.1
-    
-    transaction_count = len(transactions_df)
-    
+
+    try:
+        most_recent = pd.to_datetime(transactions_df['date']).max()
+    except Exception:
+        most_recent = None  # Skip recency check if date parsing fails
+
+    return _score_data_quality(signals_dict, len(transactions_df), most_recent)
+
+
+def _score_data_quality(signals_dict: dict, transaction_count: int, most_recent) -> float:
+    """Score data quality from transaction count and most recent transaction date.
+
+    Shared by the per-user and bulk paths so both produce identical scores.
+    """
+    score = 1.0
+
     # Transaction volume penalty (more realistic thresholds)
     if transaction_count < 10:
         score *= 0.3
@@ -348,10 +380,8 @@ def compute_data_quality_score(signals_dict: dict, transactions_df: pd.DataFrame
     # 0.5+ transactions/day = no penalty
     
     # Data recency penalty (how recent is the most recent transaction)
-    if not transactions_df.empty:
-        from datetime import datetime, timedelta
+    if most_recent is not None:
         try:
-            most_recent = pd.to_datetime(transactions_df['date']).max()
             days_old = (datetime.now() - most_recent.to_pydatetime()).days
             if days_old > 90:  # No transactions in last 90 days
                 score *= 0.5
@@ -390,42 +420,947 @@ def compute_data_quality_score(signals_dict: dict, transactions_df: pd.DataFrame
     return max(0.0, min(1.0, round(score, 2)))
 
 
-def compute_all_user_signals(window_days: int = 180, db_path: str = "db/spend_sense.db", limit: int = None):
-    """Compute signals for all users in the database."""
+# ---------------------------------------------------------------------------
+# Bulk (set-based) signal engine
+#
+# Reads transactions, accounts and liabilities for a window once and computes
+# every UserSignals field for all users with grouped operations. Results match
+# compute_user_signals() for each user.
+# ---------------------------------------------------------------------------
+
+# SQLite's default limit on host parameters is 999; stay well below it
+_IN_CLAUSE_CHUNK = 900
+
+_INCOME_DEFAULTS = {
+    'income_pay_gap': None,
+    'cash_flow_buffer': None,
+    'income_variability': None
+}
+
+_SUBSCRIPTION_DEFAULTS = {
+    'subscription_count': 0,
+    'monthly_subscription_spend': 0.0,
+    'subscription_share': 0.0
+}
+
+_SAVINGS_DEFAULTS = {
+    'savings_growth_rate': None,
+    'monthly_savings_inflow': 0.0,
+    'emergency_fund_months': None
+}
+
+
+def _chunked(items: List[str], size: int = _IN_CLAUSE_CHUNK):
+    """Yield successive slices of items of at most size elements."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+_ACCOUNTS_SQL = """
+    SELECT user_id, account_id, type, subtype, current_balance, credit_limit
+    FROM accounts
+"""
+
+_LIABILITIES_SQL = """
+    SELECT a.user_id, l.account_id, l.apr_percentage, l.is_overdue,
+           l.minimum_payment_amount, l.last_payment_amount
+    FROM liabilities l
+    JOIN accounts a ON a.account_id = l.account_id
+"""
+
+
+def load_account_frames(conn: sqlite3.Connection,
+                        user_ids: Optional[List[str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Load accounts and liabilities (with user_id) for many users at once."""
+    if user_ids is None:
+        return pd.read_sql_query(_ACCOUNTS_SQL, conn), pd.read_sql_query(_LIABILITIES_SQL, conn)
+
+    account_parts, liability_parts = [], []
+    # An empty chunk still runs once so the frames keep their columns
+    for chunk in list(_chunked(list(user_ids))) or [[]]:
+        placeholders = ", ".join("?" * len(chunk))
+        account_parts.append(pd.read_sql_query(
+            _ACCOUNTS_SQL + f" WHERE user_id IN ({placeholders})", conn, params=chunk
+        ))
+        liability_parts.append(pd.read_sql_query(
+            _LIABILITIES_SQL + f" WHERE a.user_id IN ({placeholders})", conn, params=chunk
+        ))
+
+    return pd.concat(account_parts, ignore_index=True), pd.concat(liability_parts, ignore_index=True)
+
+
+def load_signal_frames(conn: sqlite3.Connection, cutoff_date, user_ids: Optional[List[str]] = None,
+                       db_path: str = "db/spend_sense.db",
+                       snapshot: Optional[TransactionSnapshot] = None
+                       ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Load transactions, accounts and liabilities for many users at once.
+
+    Args:
+        conn: Open database connection
+        cutoff_date: Earliest transaction date to include
+        user_ids: Users to load; None loads the whole population
+        db_path: Path conn was opened on (keys the schema probe)
+        snapshot: Read transactions from this columnar snapshot instead of SQLite
+
+    Returns:
+        (transactions_df, accounts_df, liabilities_df), each with a user_id column
+    """
+    accounts_df, liabilities_df = load_account_frames(conn, user_ids)
+
+    if snapshot is not None:
+        return snapshot.to_frame(user_ids, cutoff_date), accounts_df, liabilities_df
+
+    if user_ids is None:
+        transactions_df = _read_transactions(conn, "date >= ?", (cutoff_date,), db_path)
+        return transactions_df, accounts_df, liabilities_df
+
+    transaction_parts = [
+        _read_transactions(
+            conn, f"user_id IN ({', '.join('?' * len(chunk))}) AND date >= ?", (*chunk, cutoff_date), db_path
+        )
+        for chunk in list(_chunked(list(user_ids))) or [[]]
+    ]
+    return pd.concat(transaction_parts, ignore_index=True), accounts_df, liabilities_df
+
+
+def _bulk_income_signals(transactions_df: pd.DataFrame) -> Dict[str, dict]:
+    """Income pay gap and variability for users with 2+ income deposits."""
+    income_txns = transactions_df[has_class(transaction_classes(transactions_df), CLASS_INCOME)]
+    if income_txns.empty:
+        return {}
+
+    stats = income_txns.groupby('user_id').agg(
+        n=('amount', 'size'),
+        first=('date', 'min'),
+        last=('date', 'max'),
+        mean=('amount', 'mean'),
+    )
+    stats['std'] = income_txns.groupby('user_id')['amount'].std(ddof=0)
+    stats = stats[stats['n'] >= 2]
+    if stats.empty:
+        return {}
+
+    # Consecutive gaps telescope, so their mean is (last - first) / (n - 1)
+    first = pd.to_datetime(stats['first'], format='mixed').dt.normalize()
+    last = pd.to_datetime(stats['last'], format='mixed').dt.normalize()
+    span_days = (last - first).dt.days
+
+    results = {}
+    for user_id, n, days, mean, std in zip(stats.index, stats['n'], span_days, stats['mean'], stats['std']):
+        results[user_id] = {
+            'income_pay_gap': int(days / (n - 1)),
+            'cash_flow_buffer': None,
+            'income_variability': float(std / mean) if mean > 0 else None
+        }
+    return results
+
+
+def _bulk_savings_signals(transactions_df: pd.DataFrame, accounts_df: pd.DataFrame,
+                          window_days: int) -> Dict[str, dict]:
+    """Monthly savings inflow from deposits into each user's own savings accounts."""
+    savings_accounts = accounts_df.loc[accounts_df['subtype'] == 'savings', ['user_id', 'account_id']]
+    if savings_accounts.empty or transactions_df.empty:
+        return {}
+
+    deposits = transactions_df.loc[transactions_df['amount'] > 0, ['user_id', 'account_id', 'amount']]
+    deposits = deposits.merge(savings_accounts.drop_duplicates(), on=['user_id', 'account_id'])
+    if deposits.empty:
+        return {}
+
+    inflow = deposits.groupby('user_id')['amount'].sum() / (window_days / 30.0)
+    return {
+        user_id: {**_SAVINGS_DEFAULTS, 'monthly_savings_inflow': float(value)}
+        for user_id, value in inflow.items()
+    }
+
+
+def compute_signals_from_frames(user_ids: List[str], transactions_df: pd.DataFrame,
+                                accounts_df: pd.DataFrame, liabilities_df: pd.DataFrame,
+                                window_days: int = 180) -> Dict[str, UserSignals]:
+    """
+    Compute UserSignals for many users from pre-loaded population frames.
+
+    Args:
+        user_ids: Users to produce signals for (users without rows get defaults)
+        transactions_df: Transactions in the window, with a user_id column
+        accounts_df: Accounts with a user_id column
+        liabilities_df: Liabilities with a user_id column
+        window_days: Number of days in the window
+
+    Returns:
+        Dict of user_id -> UserSignals
+    """
+    computed_at = datetime.now()
+    empty_transactions = transactions_df.iloc[0:0]
+
+    stages = [
+        ("Credit signals", CREDIT_DEFAULTS,
+         lambda: compute_credit_signals_by_user(accounts_df, liabilities_df)),
+        ("Income signals", _INCOME_DEFAULTS,
+         lambda: _bulk_income_signals(transactions_df)),
+        ("Subscription signals", _SUBSCRIPTION_DEFAULTS,
+         lambda: subscription_signals_by_user(transactions_df, window_days)),
+        ("Savings signals", _SAVINGS_DEFAULTS,
+         lambda: _bulk_savings_signals(transactions_df, accounts_df, window_days)),
+        ("Bank fee signals", detect_bank_fees(empty_transactions, window_days),
+         lambda: detect_bank_fees_by_user(transactions_df, window_days)),
+        ("Fraud signals", extract_fraud_signals(empty_transactions),
+         lambda: extract_fraud_signals_by_user(transactions_df)),
+    ]
+
+    stage_results = _run_stages(stages, len(transactions_df))
+
+    with stage_timer.stage('data_quality', len(transactions_df)):
+        # Per-user transaction count and most recent date for the data quality score
+        if transactions_df.empty:
+            activity = pd.DataFrame(columns=['count', 'most_recent'])
+        else:
+            activity = transactions_df.groupby('user_id').agg(count=('date', 'size'), most_recent=('date', 'max'))
+            try:
+                activity['most_recent'] = pd.to_datetime(activity['most_recent'], format='mixed')
+            except Exception:
+                activity['most_recent'] = None
+
+        return _assemble_user_signals(user_ids, stage_results, activity['count'].to_dict(),
+                                      activity['most_recent'].to_dict(), window_days, computed_at)
+
+
+# Stage timing keys, shared by the per-user and bulk paths
+_STAGE_KEYS = {
+    "Credit signals": 'credit',
+    "Income signals": 'income',
+    "Subscription signals": 'subscriptions',
+    "Savings signals": 'savings',
+    "Bank fee signals": 'bank_fees',
+    "Fraud signals": 'fraud',
+}
+
+
+def _run_stages(stages, row_count: int = 0) -> list:
+    """Run (name, defaults, compute) bulk stages, capturing population-wide failures."""
+    stage_results = []
+    for name, defaults, compute in stages:
+        with stage_timer.stage(_STAGE_KEYS.get(name, name), row_count):
+            try:
+                stage_results.append((name, defaults, compute()))
+            except Exception as e:
+                # A population-wide failure is reported against every user
+                logger.warning(f"Error computing {name.lower()} in bulk: {e}")
+                stage_results.append((name, defaults, e))
+    return stage_results
+
+
+def _assemble_user_signals(user_ids: List[str], stage_results: list, counts: Dict[str, int],
+                           most_recent: Dict[str, Any], window_days: int,
+                           computed_at: datetime) -> Dict[str, UserSignals]:
+    """Merge per-stage results into one UserSignals per user, as compute_user_signals does."""
+    results = {}
+    for user_id in user_ids:
+        try:
+            signals_dict = {
+                'window': f'{window_days}d',
+                'computed_at': computed_at,
+                'computation_errors': []
+            }
+            for name, defaults, per_user in stage_results:
+                user_result = per_user if isinstance(per_user, Exception) else per_user.get(user_id, defaults)
+                if isinstance(user_result, Exception):
+                    signals_dict['computation_errors'].append(f"{name}: {str(user_result)}")
+                else:
+                    signals_dict.update(user_result)
+
+            transaction_count = counts.get(user_id, 0)
+            if transaction_count == 0:
+                signals_dict['data_quality_score'] = 0.1
+            else:
+                recent = most_recent.get(user_id)
+                signals_dict['data_quality_score'] = _score_data_quality(
+                    signals_dict, transaction_count, recent if pd.notna(recent) else None
+                )
+            signals_dict['insufficient_data'] = signals_dict['data_quality_score'] < 0.1
+
+            results[user_id] = UserSignals(**signals_dict)
+
+        except Exception as e:
+            logger.error(f"Error computing signals for {user_id}: {e}")
+            results[user_id] = UserSignals(
+                window=f'{window_days}d',
+                computation_errors=[f"Signal computation failed: {str(e)}"],
+                data_quality_score=0.0,
+                insufficient_data=True
+            )
+
+    return results
+
+
+def _open_snapshot(snapshot_dir: Optional[str], db_path: str) -> Optional[TransactionSnapshot]:
+    """Open a transaction snapshot, warning if the database has changed since it was taken."""
+    if snapshot_dir is None:
+        return None
+    snapshot = load_transaction_snapshot(snapshot_dir)
+    if snapshot.is_stale(db_path):
+        logger.warning(f"Transaction snapshot {snapshot_dir} predates logged changes; "
+                       f"re-export it for current signals")
+    return snapshot
+
+
+def _load_population(db_path: str, cutoff_date, user_ids: Optional[List[str]] = None,
+                     limit: Optional[int] = None, snapshot_dir: Optional[str] = None):
+    """Resolve the users to compute and load their signal frames in one transaction."""
+    snapshot = _open_snapshot(snapshot_dir, db_path)
+    fetch_start = time.perf_counter()
+    with database_read(db_path) as conn:
+        scoped = user_ids is not None or limit is not None
+        if user_ids is None:
+            query = "SELECT DISTINCT user_id FROM users"
+            if limit:
+                query += f" LIMIT {int(limit)}"
+            user_ids = [row['user_id'] for row in conn.execute(query).fetchall()]
+
+        frames = load_signal_frames(conn, cutoff_date, user_ids if scoped else None, db_path, snapshot)
+
+    transactions_df, accounts_df, liabilities_df = frames
+    stage_timer.record('fetch', time.perf_counter() - fetch_start, len(transactions_df))
+    logger.info(f"Loaded {len(transactions_df)} transactions, {len(accounts_df)} accounts "
+                f"and {len(liabilities_df)} liabilities for {len(user_ids)} users")
+    return user_ids, frames
+
+
+def compute_bulk_user_signals(window_days: int = 180, db_path: str = "db/spend_sense.db",
+                              user_ids: Optional[List[str]] = None,
+                              limit: Optional[int] = None,
+                              snapshot_dir: Optional[str] = None) -> Dict[str, UserSignals]:
+    """
+    Compute signals for many users with one read of each source table.
+
+    Args:
+        window_days: Number of days to look back
+        db_path: Database path
+        user_ids: Users to compute; defaults to every user in the users table
+        limit: Limit number of users when user_ids is not given
+        snapshot_dir: Memory-map transactions from this snapshot instead of querying them
+
+    Returns:
+        Dict of user_id -> UserSignals, identical to calling
+        compute_user_signals() for each user
+    """
+    cutoff_date = (datetime.now() - timedelta(days=window_days)).date()
+    user_ids, frames = _load_population(db_path, cutoff_date, user_ids, limit, snapshot_dir)
+    return compute_signals_from_frames(user_ids, *frames, window_days)
+
+
+# ---------------------------------------------------------------------------
+# Daily-aggregate signal computation
+#
+# Transaction-derived signals come from user_daily_aggregates (at most one row
+# per user, day and category class) instead of raw rows. Only subscription
+# signals still read raw rows, since recurring payments are detected per charge.
+# ---------------------------------------------------------------------------
+
+def compute_aggregate_user_signals(window_days: int = 180, db_path: str = "db/spend_sense.db",
+                                   user_ids: Optional[List[str]] = None,
+                                   limit: Optional[int] = None) -> Dict[str, UserSignals]:
+    """
+    Compute signals for many users from the daily aggregate rollup.
+
+    The rollup keeps no transaction locations, so the geo velocity signals
+    (impossible_travel_count, geo_velocity_max) are left at their defaults.
+
+    Args:
+        window_days: Number of days to look back
+        db_path: Database path
+        user_ids: Users to compute; defaults to every user in the users table
+        limit: Limit number of users when user_ids is not given
+
+    Returns:
+        Dict of user_id -> UserSignals
+    """
+    cutoff_date = (datetime.now() - timedelta(days=window_days)).date()
+
+    # Fold in any changes logged since the rollup was last refreshed
     try:
         with database_transaction(db_path) as conn:
-            # Get all user IDs
+            refresh_changed_daily_aggregates(conn)
+    except DatabaseError as e:
+        logger.warning(f"Could not refresh daily aggregates from the change log: {e}")
+
+    fetch_start = time.perf_counter()
+    with database_read(db_path) as conn:
+        scoped = user_ids is not None or limit is not None
+        if user_ids is None:
             query = "SELECT DISTINCT user_id FROM users"
             if limit:
-                query += f" LIMIT {limit}"
-            users = conn.execute(query).fetchall()
+                query += f" LIMIT {int(limit)}"
+            user_ids = [row['user_id'] for row in conn.execute(query).fetchall()]
+
+        load_ids = user_ids if scoped else None
+        aggregates = load_window_aggregates(conn, cutoff_date, load_ids)
+        subscription_candidates = load_subscription_candidates(conn, cutoff_date, load_ids)
+        accounts_df, liabilities_df = load_account_frames(conn, load_ids)
+    stage_timer.record('fetch', time.perf_counter() - fetch_start, len(aggregates) + len(subscription_candidates))
+
+    logger.info(f"Loaded {len(aggregates)} daily aggregate rows for {len(user_ids)} users")
+    logger.warning("Daily aggregates carry no locations; geo velocity signals are left at their defaults")
+
+    empty_transactions = pd.DataFrame()
+    stages = [
+        ("Credit signals", CREDIT_DEFAULTS,
+         lambda: compute_credit_signals_by_user(accounts_df, liabilities_df)),
+        ("Income signals", _INCOME_DEFAULTS,
+         lambda: aggregate_income_signals(aggregates)),
+        ("Subscription signals", _SUBSCRIPTION_DEFAULTS,
+         lambda: aggregate_subscription_signals(aggregates, subscription_candidates, window_days)),
+        ("Savings signals", _SAVINGS_DEFAULTS,
+         lambda: aggregate_savings_signals(aggregates, window_days)),
+        ("Bank fee signals", detect_bank_fees(empty_transactions, window_days),
+         lambda: aggregate_bank_fee_signals(aggregates, window_days)),
+        ("Fraud signals", extract_fraud_signals(empty_transactions),
+         lambda: aggregate_fraud_signals(aggregates)),
+    ]
 
-        total_users = len(users)
-        logger.info(f"Computing signals for {total_users} users...")
+    stage_results = _run_stages(stages, len(aggregates))
+    with stage_timer.stage('data_quality', len(aggregates)):
+        activity = aggregate_activity(aggregates)
+        return _assemble_user_signals(user_ids, stage_results, activity['count'].to_dict(),
+                                      activity['most_recent'].to_dict(), window_days, datetime.now())
 
-        success_count = 0
-        error_count = 0
 
-        for idx, row in enumerate(users, 1):
-            user_id = row['user_id']
-            try:
-                logger.info(f"[{idx}/{total_users}] Computing signals for {user_id}...")
-                signals = compute_user_signals(user_id, window_days, db_path)
+# ---------------------------------------------------------------------------
+# Multi-window signal computation
+#
+# Transactions are fetched once for the widest window; narrower windows are
+# derived from the same in-memory frame with boolean date masks.
+# ---------------------------------------------------------------------------
 
-                # Save to database
-                signals_dict = signals.model_dump()
-                save_user_signals(user_id, f'{window_days}d', signals_dict, db_path)
+DEFAULT_WINDOWS = (30, 90, 180)
 
-                success_count += 1
-                logger.info(f"✅ Saved signals for {user_id} (quality: {signals.data_quality_score:.2f})")
 
-            except Exception as e:
-                error_count += 1
-                logger.error(f"❌ Error computing signals for {user_id}: {e}")
+def compute_signals_for_windows(user_ids: List[str], transactions_df: pd.DataFrame,
+                                accounts_df: pd.DataFrame, liabilities_df: pd.DataFrame,
+                                windows=DEFAULT_WINDOWS) -> Dict[str, Dict[str, UserSignals]]:
+    """
+    Compute UserSignals for several windows from one transactions frame.
+
+    transactions_df must cover at least the widest window.
+
+    Returns:
+        Dict of window label ('30d', ...) -> user_id -> UserSignals
+    """
+    # ISO date strings compare the same way SQLite compares them in `date >= ?`
+    dates = transactions_df['date'].to_numpy(dtype=str)
+    now = datetime.now()
+
+    results = {}
+    for window_days in sorted(windows, reverse=True):
+        cutoff = (now - timedelta(days=window_days)).date().isoformat()
+        window_transactions = transactions_df[dates >= cutoff]
+        results[f'{window_days}d'] = compute_signals_from_frames(
+            user_ids, window_transactions, accounts_df, liabilities_df, window_days
+        )
+    return results
+
+
+def compute_multi_window_signals(windows=DEFAULT_WINDOWS, db_path: str = "db/spend_sense.db",
+                                 user_ids: Optional[List[str]] = None,
+                                 limit: Optional[int] = None,
+                                 snapshot_dir: Optional[str] = None) -> Dict[str, Dict[str, UserSignals]]:
+    """
+    Compute signals for several windows with a single read of each source table.
+
+    Args:
+        windows: Window lengths in days
+        db_path: Database path
+        user_ids: Users to compute; defaults to every user in the users table
+        limit: Limit number of users when user_ids is not given
+        snapshot_dir: Memory-map transactions from this snapshot instead of querying them
+
+    Returns:
+        Dict of window label -> user_id -> UserSignals
+    """
+    cutoff_date = (datetime.now() - timedelta(days=max(windows))).date()
+    user_ids, frames = _load_population(db_path, cutoff_date, user_ids, limit, snapshot_dir)
+    return compute_signals_for_windows(user_ids, *frames, windows)
+
+
+# ---------------------------------------------------------------------------
+# Streaming (memory-bounded) signal computation
+#
+# Users are walked in user_id order with a keyset cursor over
+# idx_transactions_user_date. Each chunk reads at most chunk_rows transaction
+# rows, holds back the last (possibly cut-off) user for the next chunk, is
+# computed with the bulk engine, saved, and released before the next read.
+# ---------------------------------------------------------------------------
+
+# Initial estimate of peak working memory per transaction row (frame plus stage intermediates)
+STREAM_BYTES_PER_ROW = 4096
+
+# Measured frame size is scaled by this to cover the intermediates the stages build
+STREAM_WORKING_SET_FACTOR = 4
+
+MIN_STREAM_CHUNK_ROWS = 1_000
+
+
+def stream_chunk_rows(max_memory_mb: float, bytes_per_row: float = STREAM_BYTES_PER_ROW) -> int:
+    """Transaction rows per streaming chunk that fit in max_memory_mb."""
+    return max(MIN_STREAM_CHUNK_ROWS, int(max_memory_mb * 1024 * 1024 / max(bytes_per_row, 1.0)))
+
+
+def _read_user_range(conn: sqlite3.Connection, sql: str, after: Optional[str], upto: Optional[str],
+                     column: str = 'user_id', params: tuple = ()) -> pd.DataFrame:
+    """Run sql restricted to after < column <= upto (either bound may be None)."""
+    clauses, bounds = [], []
+    if after is not None:
+        clauses.append(f"{column} > ?")
+        bounds.append(after)
+    if upto is not None:
+        clauses.append(f"{column} <= ?")
+        bounds.append(upto)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return pd.read_sql_query(sql + where, conn, params=(*params, *bounds))
+
+
+def _read_transaction_chunk(conn: sqlite3.Connection, cutoff_date, after: Optional[str],
+                            chunk_rows: int, db_path: str) -> Tuple[pd.DataFrame, Optional[str]]:
+    """Read the next chunk of whole users' transactions after the cursor.
+
+    Returns:
+        (transactions_df, upto): the chunk covers users in (after, upto];
+        upto is None when the chunk reaches the end of the table
+    """
+    projection = _transaction_projection(conn, db_path)
+    cursor_clause = CHUNK_CURSOR_CLAUSE if after is not None else ""
+    transactions_df = pd.read_sql_query(
+        TRANSACTION_CHUNK_SQL.format(projection=projection, cursor_clause=cursor_clause),
+        conn, params={'after': after, 'cutoff': cutoff_date, 'limit': chunk_rows}
+    )
+
+    if len(transactions_df) < chunk_rows:
+        upto = None
+    else:
+        # The last user may continue past the limit; leave it for the next chunk
+        last_user = transactions_df['user_id'].iloc[-1]
+        complete = transactions_df[transactions_df['user_id'] != last_user]
+        if complete.empty:
+            # One user fills the whole chunk: read all of that user's rows
+            complete = pd.read_sql_query(f"""
+                SELECT {projection}
+                FROM transactions
+                WHERE user_id = ? AND date >= ?
+                ORDER BY date
+            """, conn, params=(last_user, cutoff_date))
+            logger.warning(
+                f"User {last_user} has {len(complete)} transactions in the window, more than the "
+                f"{chunk_rows}-row chunk; reading them whole exceeds the chunk's memory budget"
+            )
+            upto = last_user
+        else:
+            upto = complete['user_id'].iloc[-1]
+        transactions_df = complete.reset_index(drop=True)
+
+    transactions_df['txn_class'] = transaction_classes(transactions_df)
+    return transactions_df, upto
+
+
+def iter_signal_chunks(cutoff_date, db_path: str = "db/spend_sense.db",
+                       max_memory_mb: Optional[float] = None, chunk_rows: Optional[int] = None,
+                       user_ids: Optional[List[str]] = None, limit: Optional[int] = None):
+    """
+    Yield the population's signal frames in user_id-ordered chunks of bounded size.
+
+    Each chunk is read in its own short read transaction, so writes made
+    between chunks are never blocked. With max_memory_mb the chunk size is
+    derived from the budget and re-derived from the measured size of each
+    chunk; chunk_rows fixes it instead.
+
+    The budget is a soft limit: chunks hold whole users, so a single user with
+    more rows than a chunk is read in full (and a warning logged) rather than
+    split, and that chunk exceeds the budget.
+
+    Args:
+        cutoff_date: Earliest transaction date to include
+        db_path: Database path
+        max_memory_mb: Working memory budget per chunk (soft; see above)
+        chunk_rows: Transaction rows per chunk (overrides max_memory_mb)
+        user_ids: Only yield these users (the table is still walked in order)
+        limit: Stop after this many users from the users table when user_ids is not given
+
+    Yields:
+        (user_ids, transactions_df, accounts_df, liabilities_df) for each chunk
+    """
+    fixed_rows = chunk_rows
+    rows_per_chunk = fixed_rows or stream_chunk_rows(max_memory_mb or 512)
+    wanted = set(user_ids) if user_ids is not None else None
+    remaining = limit or None if user_ids is None else None
+    after = None
+
+    while True:
+        fetch_start = time.perf_counter()
+        # One read snapshot per chunk, without taking the write lock
+        with database_read(db_path) as conn:
+            transactions_df, upto = _read_transaction_chunk(conn, cutoff_date, after, rows_per_chunk, db_path)
+
+            users_sql = "SELECT user_id FROM users"
+            chunk_users = _read_user_range(conn, users_sql, after, upto)['user_id'].sort_values().tolist()
+            if remaining is not None and len(chunk_users) >= remaining:
+                chunk_users = chunk_users[:remaining]
+                upto = chunk_users[-1]
+                transactions_df = transactions_df[transactions_df['user_id'] <= upto]
+                remaining = 0
+            elif remaining is not None:
+                remaining -= len(chunk_users)
+
+            accounts_df = _read_user_range(conn, _ACCOUNTS_SQL, after, upto)
+            liabilities_df = _read_user_range(conn, _LIABILITIES_SQL, after, upto, column='a.user_id')
+        stage_timer.record('fetch', time.perf_counter() - fetch_start, len(transactions_df))
+
+        if wanted is not None:
+            chunk_users = [user_id for user_id in chunk_users if user_id in wanted]
+            transactions_df = transactions_df[transactions_df['user_id'].isin(chunk_users)]
+
+        if chunk_users:
+            yield chunk_users, transactions_df, accounts_df, liabilities_df
+
+        if upto is None or remaining == 0:
+            return
+        after = upto
+
+        if fixed_rows is None and len(transactions_df):
+            measured = transactions_df.memory_usage(deep=True).sum() / len(transactions_df)
+            rows_per_chunk = stream_chunk_rows(max_memory_mb or 512, measured * STREAM_WORKING_SET_FACTOR)
+
+
+def compute_streaming_user_signals(windows=(180,), db_path: str = "db/spend_sense.db",
+                                   max_memory_mb: Optional[float] = None, chunk_rows: Optional[int] = None,
+                                   user_ids: Optional[List[str]] = None, limit: Optional[int] = None):
+    """
+    Compute signals chunk by chunk, holding one chunk of the population in memory at a time.
+
+    Args:
+        windows: Window lengths in days; all are computed from each chunk
+        db_path: Database path
+        max_memory_mb: Working memory budget that picks the chunk size
+        chunk_rows: Fixed transaction rows per chunk (overrides max_memory_mb)
+        user_ids: Users to compute; defaults to every user in the users table
+        limit: Limit number of users when user_ids is not given
+
+    Yields:
+        Dict of window label -> user_id -> UserSignals for each chunk
+    """
+    cutoff_date = (datetime.now() - timedelta(days=max(windows))).date()
+    for chunk_users, *frames in iter_signal_chunks(cutoff_date, db_path, max_memory_mb, chunk_rows,
+                                                   user_ids, limit):
+        yield compute_signals_for_windows(chunk_users, *frames, windows)
+
 
-        logger.info("\n✅ Signal computation complete!")
-        logger.info(f"   Success: {success_count}/{total_users}")
-        logger.info(f"   Errors: {error_count}/{total_users}")
+# ---------------------------------------------------------------------------
+# Parallel (process pool) signal computation
+#
+# Users are hash-sharded across worker processes. Each worker opens its own
+# read connection and computes its shard with the bulk engine; the parent is
+# the single writer that persists user_signals as shards complete.
+# ---------------------------------------------------------------------------
+
+def shard_for_user(user_id: str, num_shards: int) -> int:
+    """Stable shard index for a user (independent of PYTHONHASHSEED)."""
+    return zlib.crc32(user_id.encode('utf-8')) % num_shards
+
+
+def shard_user_ids(user_ids: List[str], num_shards: int) -> List[List[str]]:
+    """Split user_ids into num_shards hash shards, preserving input order."""
+    shards = [[] for _ in range(num_shards)]
+    for user_id in user_ids:
+        shards[shard_for_user(user_id, num_shards)].append(user_id)
+    return shards
+
+
+def _compute_shard(user_ids: List[str], window_days: int, db_path: str,
+                   snapshot_dir: Optional[str] = None) -> Tuple[Dict[str, dict], Dict[str, Dict]]:
+    """Worker entry point: compute one shard on a private read connection.
+
+    Returns the shard's signals and its stage timings, for the parent to merge.
+    """
+    cutoff_date = (datetime.now() - timedelta(days=window_days)).date()
+    stage_timer.reset()
+    snapshot = load_transaction_snapshot(snapshot_dir) if snapshot_dir else None
+
+    fetch_start = time.perf_counter()
+    with database_read(db_path) as conn:
+        frames = load_signal_frames(conn, cutoff_date, user_ids, db_path, snapshot)
+    stage_timer.record('fetch', time.perf_counter() - fetch_start, len(frames[0]))
+
+    signals_by_user = compute_signals_from_frames(user_ids, *frames, window_days)
+    return ({user_id: signals.model_dump() for user_id, signals in signals_by_user.items()},
+            stage_timer.snapshot())
+
+
+def compute_all_user_signals_parallel(window_days: int = 180, db_path: str = "db/spend_sense.db",
+                                      limit: Optional[int] = None, workers: int = 4,
+                                      max_retries: int = 2, user_ids: Optional[List[str]] = None,
+                                      batch_size: int = SIGNALS_BATCH_SIZE,
+                                      snapshot_dir: Optional[str] = None):
+    """
+    Compute and save signals for all users using a pool of worker processes.
+
+    Args:
+        window_days: Number of days to look back
+        db_path: Database path
+        limit: Limit number of users to process
+        workers: Number of worker processes (and hash shards)
+        max_retries: Times a failed shard is resubmitted before giving up
+        user_ids: Users to compute; defaults to every user in the users table
+        batch_size: Rows per write transaction when persisting a shard
+        snapshot_dir: Workers memory-map transactions from this snapshot instead of querying them
+
+    Returns:
+        (success_count, error_count)
+    """
+    window = f'{window_days}d'
+    _open_snapshot(snapshot_dir, db_path)
+
+    with database_read(db_path) as conn:
+        # Database clock, in the format computed_at defaults to
+        run_start = conn.execute("SELECT CURRENT_TIMESTAMP").fetchone()[0]
+
+    if user_ids is None:
+        with database_read(db_path) as conn:
+            query = "SELECT DISTINCT user_id FROM users"
+            if limit:
+                query += f" LIMIT {int(limit)}"
+            user_ids = [row['user_id'] for row in conn.execute(query).fetchall()]
+
+    total_users = len(user_ids)
+    shards = [shard for shard in shard_user_ids(user_ids, workers) if shard]
+    logger.info(f"Computing signals for {total_users} users in {len(shards)} shards "
+                f"across {workers} worker processes...")
+
+    success_count = 0
+    error_count = 0
+    failed_shards = []
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+
+    def submit(idx: int):
+        nonlocal pool
+        try:
+            return pool.submit(_compute_shard, shards[idx], window_days, db_path, snapshot_dir)
+        except BrokenProcessPool:
+            # A worker process died, which breaks the whole pool: every shard still
+            # in it fails with BrokenProcessPool and is resubmitted to a fresh pool
+            logger.warning("Worker pool broken by an exited worker process; starting a new pool")
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = ProcessPoolExecutor(max_workers=workers)
+            return pool.submit(_compute_shard, shards[idx], window_days, db_path, snapshot_dir)
+
+    try:
+        attempts = {idx: 1 for idx in range(len(shards))}
+        pending = {submit(idx): idx for idx in range(len(shards))}
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx = pending.pop(future)
+                shard = shards[idx]
+
+                try:
+                    shard_signals, shard_timings = future.result()
+                except Exception as e:
+                    if attempts[idx] <= max_retries:
+                        attempts[idx] += 1
+                        logger.warning(f"Shard {idx + 1}/{len(shards)} failed ({e}), "
+                                       f"retrying (attempt {attempts[idx]})")
+                        pending[submit(idx)] = idx
+                    else:
+                        logger.error(f"❌ Shard {idx + 1}/{len(shards)} failed after "
+                                     f"{attempts[idx]} attempts: {e}")
+                        failed_shards.append(idx)
+                        error_count += len(shard)
+                    continue
+
+                stage_timer.merge(shard_timings)
+
+                # Single writer: only the parent process persists results
+                saved, failed = _save_signal_rows(
+                    [(user_id, window, signals_dict) for user_id, signals_dict in shard_signals.items()],
+                    db_path, batch_size
+                )
+                success_count += saved
+                error_count += failed
+
+                logger.info(f"✅ Shard {idx + 1}/{len(shards)} complete: {len(shard)} users "
+                            f"(progress: {success_count + error_count}/{total_users})")
+    finally:
+        pool.shutdown()
+
+    # Reconcile what was written against what was requested: only this run's
+    # rows count, not ones an earlier run left for the same users
+    persisted = 0
+    with database_read(db_path) as conn:
+        for chunk in _chunked(user_ids):
+            placeholders = ",".join("?" * len(chunk))
+            persisted += conn.execute(f"""
+                SELECT COUNT(*) FROM user_signals
+                WHERE window = ? AND computed_at >= ? AND user_id IN ({placeholders})
+            """, (window, run_start, *chunk)).fetchone()[0]
+
+    logger.info("\n✅ Parallel signal computation complete!")
+    logger.info(f"   Success: {success_count}/{total_users}")
+    logger.info(f"   Errors: {error_count}/{total_users}")
+    if failed_shards:
+        logger.info(f"   Failed shards: {', '.join(str(idx + 1) for idx in failed_shards)}")
+    logger.info(f"   Reconciliation: {persisted} user_signals rows written for window {window}")
+    if persisted < success_count:
+        logger.warning(f"Reconciliation mismatch: saved {success_count} users but found {persisted} rows")
+
+    return success_count, error_count
+
+
+# ---------------------------------------------------------------------------
+# Incremental recomputation
+#
+# Triggers on transactions, accounts and liabilities append to
+# signal_change_log. Each window records the last change_id it has consumed in
+# signal_watermarks, so an incremental run only recomputes users with newer
+# changes (plus users that have no signals for the window yet).
+# ---------------------------------------------------------------------------
+
+def get_change_high_water(db_path: str = "db/spend_sense.db") -> Optional[int]:
+    """Latest change_id in the change log, or None if change tracking is not installed."""
+    try:
+        with database_read(db_path) as conn:
+            return conn.execute("SELECT COALESCE(MAX(change_id), 0) FROM signal_change_log").fetchone()[0]
+    except DatabaseError as e:
+        logger.warning(f"Change tracking unavailable: {e}")
+        return None
+
+
+def get_changed_user_ids(window: str, high_water: int, db_path: str = "db/spend_sense.db") -> List[str]:
+    """Users with changes after the window's watermark, or without signals for the window."""
+    with database_read(db_path) as conn:
+        row = conn.execute(
+            "SELECT last_change_id FROM signal_watermarks WHERE window = ?", (window,)
+        ).fetchone()
+        last_change_id = row['last_change_id'] if row else 0
+
+        rows = conn.execute("""
+            SELECT user_id FROM users
+            WHERE user_id IN (
+                SELECT user_id FROM signal_change_log WHERE change_id > ? AND change_id <= ?
+            )
+            OR user_id NOT IN (SELECT user_id FROM user_signals WHERE window = ?)
+        """, (last_change_id, high_water, window)).fetchall()
+
+    return [row['user_id'] for row in rows]
+
+
+def advance_signal_watermark(window: str, high_water: int, db_path: str = "db/spend_sense.db"):
+    """Record that changes up to high_water are reflected in the window's signals.
+
+    Change log rows consumed by every window that has signals, by the daily
+    aggregate refresh (from change 0 until it first runs) and by every other
+    watermark are pruned.
+    """
+    with database_transaction(db_path) as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO signal_watermarks (window, last_change_id, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+        """, (window, high_water))
+        conn.execute("""
+            DELETE FROM signal_change_log
+            WHERE change_id <= (
+                SELECT MIN(last_change_id) FROM (
+                    SELECT COALESCE(w.last_change_id, 0) AS last_change_id
+                    FROM (SELECT DISTINCT window FROM user_signals) s
+                    LEFT JOIN signal_watermarks w ON w.window = s.window
+                    UNION ALL
+                    SELECT COALESCE((SELECT last_change_id FROM signal_watermarks WHERE window = ?), 0)
+                    UNION ALL
+                    SELECT last_change_id FROM signal_watermarks
+                )
+            )
+        """, (AGGREGATES_WATERMARK,))
+
+
+def compute_all_user_signals(window_days: int = 180, db_path: str = "db/spend_sense.db", limit: int = None,
+                             bulk: bool = False, workers: Optional[int] = None, incremental: bool = False,
+                             windows: Optional[List[int]] = None, aggregates: bool = False,
+                             batch_size: int = SIGNALS_BATCH_SIZE, snapshot_dir: Optional[str] = None,
+                             max_memory_mb: Optional[float] = None,
+                             progress: Optional[Callable[[int, int], None]] = None):
+    """Compute signals for all users in the database.
+
+    With bulk=True the source tables are read once and signals are computed for
+    the whole population with grouped operations (see compute_bulk_user_signals).
+    With workers > 1 users are sharded across a process pool instead.
+    With incremental=True only users whose data changed since the window's last
+    run are recomputed. With windows, every listed window is computed from one
+    read of the widest window and written in one batch (window_days is ignored).
+    With aggregates=True signals are computed from the user_daily_aggregates
+    rollup instead of raw transaction rows. Signals are written batch_size rows
+    per transaction. With snapshot_dir, the bulk, multi-window and parallel
+    modes memory-map transactions from a columnar snapshot (see
+    scripts/snapshot_transactions.py) instead of querying them. With
+    max_memory_mb, users are streamed in chunks sized to that budget and each
+    chunk's signals (for every window) are saved before the next is read, and
+    progress(users_done, errors), if given, is called after each chunk (it may
+    raise to stop the run). Per-stage
+    timings are recorded in stage_timer and saved to signal_run_stats as one run.
+    """
+    try:
+        # Tables added by later migrations must exist before any signals are saved
+        ensure_schema_current(db_path)
+        stage_timer.reset()
+        window_labels = [f'{days}d' for days in (windows or [window_days])]
+        # Read before computing so changes made during the run are picked up next time
+        high_water = get_change_high_water(db_path)
+
+        user_ids = None
+        if incremental:
+            if high_water is None:
+                logger.warning("Incremental mode unavailable, falling back to a full recompute")
+            else:
+                changed = set()
+                for window in window_labels:
+                    changed.update(get_changed_user_ids(window, high_water, db_path))
+                user_ids = sorted(changed)
+                logger.info(f"Incremental run: {len(user_ids)} users changed since last "
+                            f"{', '.join(window_labels)} run")
+                if limit:
+                    user_ids = user_ids[:limit]
+
+        if snapshot_dir and (max_memory_mb or not (windows or (workers and workers > 1) or (bulk and not aggregates))):
+            logger.warning("A transaction snapshot is only used by the bulk, multi-window and parallel modes")
+
+        if max_memory_mb:
+            mode = 'streaming'
+            success_count, error_count = _save_streaming_user_signals(windows or [window_days], db_path, limit,
+                                                                      user_ids, batch_size, max_memory_mb,
+                                                                      progress)
+        elif windows:
+            mode = 'multi_window'
+            success_count, error_count = _save_multi_window_signals(windows, db_path, limit, user_ids,
+                                                                    batch_size, snapshot_dir)
+        elif workers and workers > 1:
+            mode = 'parallel'
+            success_count, error_count = compute_all_user_signals_parallel(
+                window_days, db_path, limit, workers, user_ids=user_ids, batch_size=batch_size,
+                snapshot_dir=snapshot_dir
+            )
+        elif bulk or aggregates:
+            mode = 'aggregates' if aggregates else 'bulk'
+            success_count, error_count = _save_bulk_user_signals(window_days, db_path, limit, user_ids,
+                                                                 aggregates=aggregates, batch_size=batch_size,
+                                                                 snapshot_dir=snapshot_dir)
+        else:
+            mode = 'sequential'
+            success_count, error_count = _compute_user_signals_sequential(window_days, db_path, limit, user_ids,
+                                                                          batch_size)
+
+        save_stage_stats(mode, window_labels, db_path)
+
+        # Only a complete, error-free run may consume the change log
+        if high_water is not None and error_count == 0 and not limit:
+            for window in window_labels:
+                advance_signal_watermark(window, high_water, db_path)
 
         return success_count, error_count
 
@@ -434,25 +1369,224 @@ def compute_all_user_signals(window_days: int = 180, db_path: str = "db/spend_se
         raise
 
 
+def save_stage_stats(mode: str, window_labels: List[str], db_path: str) -> Optional[str]:
+    """Flush the stage timings recorded so far to signal_run_stats as one run.
+
+    Returns:
+        The run_id, or None if nothing was recorded or the stats could not be saved
+    """
+    summary = stage_timer.summary()
+    if not summary:
+        return None
+
+    run_id = uuid.uuid4().hex
+    try:
+        save_signal_run_stats(run_id, summary, db_path, mode=mode, windows=','.join(window_labels))
+    except DatabaseError as e:
+        # Timing is diagnostic only; never fail a signal run over it
+        logger.warning(f"Could not save signal run stats: {e}")
+        return None
+    logger.debug(f"Saved stage timings for run {run_id}")
+    return run_id
+
+
+def log_stage_summary():
+    """Log the per-stage timing table for the current run."""
+    for line in format_stage_summary(stage_timer.summary(), "\n⏱️  Stage timings:"):
+        logger.info(line)
+
+
+def _save_signal_rows(rows, db_path: str, batch_size: int) -> Tuple[int, int]:
+    """Persist (user_id, window, signals_dict) rows in batches; returns (success_count, error_count)."""
+    rows = list(rows)
+    with stage_timer.stage('save', len(rows)):
+        try:
+            return save_user_signals_bulk(rows, db_path, batch_size=batch_size), 0
+        except DatabaseError as e:
+            logger.error(f"❌ Error saving signals for {len(rows)} rows: {e}")
+            return 0, len(rows)
+
+
+def _compute_user_signals_sequential(window_days: int, db_path: str, limit: Optional[int],
+                                     user_ids: Optional[List[str]] = None,
+                                     batch_size: int = SIGNALS_BATCH_SIZE):
+    """Compute signals one user at a time, saving them batch_size users per transaction."""
+    if user_ids is None:
+        with database_read(db_path) as conn:
+            # Get all user IDs
+            query = "SELECT DISTINCT user_id FROM users"
+            if limit:
+                query += f" LIMIT {limit}"
+            user_ids = [row['user_id'] for row in conn.execute(query).fetchall()]
+
+    total_users = len(user_ids)
+    logger.info(f"Computing signals for {total_users} users...")
+
+    success_count = 0
+    error_count = 0
+    pending = []
+
+    for idx, user_id in enumerate(user_ids, 1):
+        try:
+            logger.info(f"[{idx}/{total_users}] Computing signals for {user_id}...")
+            signals = compute_user_signals(user_id, window_days, db_path)
+            pending.append((user_id, f'{window_days}d', signals.model_dump()))
+            logger.info(f"✅ Computed signals for {user_id} (quality: {signals.data_quality_score:.2f})")
+
+        except Exception as e:
+            error_count += 1
+            logger.error(f"❌ Error computing signals for {user_id}: {e}")
+
+        # Save to database
+        if len(pending) >= batch_size or (idx == total_users and pending):
+            saved, failed = _save_signal_rows(pending, db_path, batch_size)
+            success_count += saved
+            error_count += failed
+            pending = []
+
+    logger.info("\n✅ Signal computation complete!")
+    logger.info(f"   Success: {success_count}/{total_users}")
+    logger.info(f"   Errors: {error_count}/{total_users}")
+
+    return success_count, error_count
+
+
+def _save_bulk_user_signals(window_days: int, db_path: str, limit: Optional[int],
+                            user_ids: Optional[List[str]] = None, aggregates: bool = False,
+                            batch_size: int = SIGNALS_BATCH_SIZE, snapshot_dir: Optional[str] = None):
+    """Bulk-compute signals for all (or the given) users and save them."""
+    if aggregates:
+        signals_by_user = compute_aggregate_user_signals(window_days, db_path, user_ids=user_ids, limit=limit)
+    else:
+        signals_by_user = compute_bulk_user_signals(window_days, db_path, user_ids=user_ids, limit=limit,
+                                                    snapshot_dir=snapshot_dir)
+
+    total_users = len(signals_by_user)
+    logger.info(f"Saving bulk-computed signals for {total_users} users...")
+
+    success_count, error_count = _save_signal_rows(
+        ((user_id, f'{window_days}d', signals.model_dump()) for user_id, signals in signals_by_user.items()),
+        db_path, batch_size
+    )
+
+    logger.info("\n✅ Bulk signal computation complete!")
+    logger.info(f"   Success: {success_count}/{total_users}")
+    logger.info(f"   Errors: {error_count}/{total_users}")
+
+    return success_count, error_count
+
+
+def _save_multi_window_signals(windows: List[int], db_path: str, limit: Optional[int],
+                               user_ids: Optional[List[str]] = None,
+                               batch_size: int = SIGNALS_BATCH_SIZE, snapshot_dir: Optional[str] = None):
+    """Compute every window in one pass and write the rows in batches."""
+    signals_by_window = compute_multi_window_signals(windows, db_path, user_ids=user_ids, limit=limit,
+                                                     snapshot_dir=snapshot_dir)
+
+    rows = [
+        (user_id, window, signals.model_dump())
+        for window, signals_by_user in signals_by_window.items()
+        for user_id, signals in signals_by_user.items()
+    ]
+    total_rows = len(rows)
+    success_count, error_count = _save_signal_rows(rows, db_path, batch_size)
+
+    logger.info("\n✅ Multi-window signal computation complete!")
+    logger.info(f"   Windows: {', '.join(signals_by_window)}")
+    logger.info(f"   Success: {success_count}/{total_rows} rows")
+    logger.info(f"   Errors: {error_count}/{total_rows} rows")
+
+    return success_count, error_count
+
+
+def _save_streaming_user_signals(windows: List[int], db_path: str, limit: Optional[int],
+                                 user_ids: Optional[List[str]] = None,
+                                 batch_size: int = SIGNALS_BATCH_SIZE, max_memory_mb: float = 512,
+                                 progress: Optional[Callable[[int, int], None]] = None):
+    """Stream users in memory-bounded chunks, saving each chunk before reading the next."""
+    logger.info(f"Streaming signal computation within {max_memory_mb} MB per chunk...")
+
+    success_count = 0
+    error_count = 0
+    users_done = 0
+    for chunk_number, signals_by_window in enumerate(
+            compute_streaming_user_signals(windows, db_path, max_memory_mb, user_ids=user_ids, limit=limit), 1):
+        rows = [
+            (user_id, window, signals.model_dump())
+            for window, signals_by_user in signals_by_window.items()
+            for user_id, signals in signals_by_user.items()
+        ]
+        saved, failed = _save_signal_rows(rows, db_path, batch_size)
+        success_count += saved
+        error_count += failed
+        users_done += len(next(iter(signals_by_window.values())))
+        logger.info(f"✅ Chunk {chunk_number} complete: {len(rows)} rows (progress: {users_done} users)")
+        if progress:
+            progress(users_done, error_count)
+
+    logger.info("\n✅ Streaming signal computation complete!")
+    logger.info(f"   Windows: {', '.join(f'{days}d' for days in windows)}")
+    logger.info(f"   Success: {success_count} rows")
+    logger.info(f"   Errors: {error_count} rows")
+
+    return success_count, error_count
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Compute user signals from transactions')
     parser.add_argument('--window-days', type=int, default=180, help='Time window in days (default: 180)')
     parser.add_argument('--db-path', default='db/spend_sense.db', help='Database path')
     parser.add_argument('--limit', type=int, help='Limit number of users to process')
     parser.add_argument('--user-id', help='Compute signals for a single user')
+    parser.add_argument('--windows', type=lambda value: [int(days) for days in value.split(',')],
+                        help='Comma-separated windows in days (e.g. 30,90,180) computed from one scan')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Read source tables once and compute all users with grouped operations')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only recompute users whose data changed since the last run for this window '
+                             '(by default every user is recomputed)')
+    parser.add_argument('--from-aggregates', action='store_true',
+                        help='Compute from the user_daily_aggregates rollup instead of raw transactions')
+    parser.add_argument('--workers', type=int,
+                        help='Shard users across N worker processes (implies bulk computation per shard)')
+    parser.add_argument('--batch-size', type=int, default=SIGNALS_BATCH_SIZE,
+                        help=f'Signal rows written per transaction (default: {SIGNALS_BATCH_SIZE})')
+    parser.add_argument('--snapshot',
+                        help='Memory-map transactions from this columnar snapshot directory '
+                             '(see scripts/snapshot_transactions.py) instead of querying them')
+    parser.add_argument('--max-memory-mb', type=float,
+                        help='Stream users in chunks sized to fit this working memory budget. '
+                             'Soft limit: a user with more transactions than fit is read whole')
 
     args = parser.parse_args()
 
     try:
-        if args.user_id:
+        ensure_schema_current(args.db_path)
+        if args.user_id and args.windows:
+            logger.info(f"Computing {args.windows} day signals for user {args.user_id}...")
+            signals_by_window = compute_multi_window_signals(args.windows, args.db_path, user_ids=[args.user_id])
+            save_user_signals_bulk([
+                (args.user_id, window, signals_by_user[args.user_id].model_dump())
+                for window, signals_by_user in signals_by_window.items()
+            ], args.db_path)
+            save_stage_stats('single_user', list(signals_by_window), args.db_path)
+            logger.info(f"✅ Signals computed and saved for {args.user_id}")
+        elif args.user_id:
             logger.info(f"Computing signals for user {args.user_id}...")
             signals = compute_user_signals(args.user_id, args.window_days, args.db_path)
             signals_dict = signals.model_dump()
-            save_user_signals(args.user_id, f'{args.window_days}d', signals_dict, args.db_path)
+            with stage_timer.stage('save', 1):
+                save_user_signals(args.user_id, f'{args.window_days}d', signals_dict, args.db_path)
+            save_stage_stats('single_user', [f'{args.window_days}d'], args.db_path)
             logger.info(f"✅ Signals computed and saved for {args.user_id}")
             logger.info(f"   Data quality: {signals.data_quality_score:.2f}")
         else:
-            compute_all_user_signals(args.window_days, args.db_path, args.limit)
+            compute_all_user_signals(args.window_days, args.db_path, args.limit, bulk=args.bulk,
+                                     workers=args.workers, incremental=args.incremental,
+                                     windows=args.windows, aggregates=args.from_aggregates,
+                                     batch_size=args.batch_size, snapshot_dir=args.snapshot,
+                                     max_memory_mb=args.max_memory_mb)
+        log_stage_summary()
 
     except Exception as e:
         logger.error(f"Signal computation failed: {e}")
@@ -10,7 +10,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from src.db.connection import get_user_signals, database_transaction
+from src.db.connection import get_user_signals, database_read, ensure_schema_current
 from src.features.schema import UserSignals
 from src.recommend.recommendation_engine import RecommendationEngine, save_recommendations
 from loguru import logger
@@ -19,7 +19,7 @@ from loguru import logger
 def generate_for_user(user_id: str, db_path: str = "db/spend_sense.db", max_recs: int = 5):
     """Generate recommendations for a single user."""
     # Check consent status
-    with database_transaction(db_path) as conn:
+    with database_read(db_path) as conn:
         user_row = conn.execute(
             "SELECT consent_status FROM users WHERE user_id = ?", (user_id,)
         ).fetchone()
@@ -75,7 +75,7 @@ def generate_for_user(user_id: str, db_path: str = "db/spend_sense.db", max_recs
 
 def generate_for_all_users(db_path: str = "db/spend_sense.db", max_recs: int = 5):
     """Generate recommendations for all users with signals."""
-    with database_transaction(db_path) as conn:
+    with database_read(db_path) as conn:
         users = conn.execute("SELECT DISTINCT user_id FROM user_signals WHERE window = '180d'").fetchall()
         user_ids = [row['user_id'] for row in users]
     
@@ -98,6 +98,7 @@ def main():
     parser.add_argument('--max-recs', type=int, default=5, help='Maximum recommendations per user')
     
     args = parser.parse_args()
+    ensure_schema_current(args.db_path)
     
     if args.all:
         generate_for_all_users(args.db_path, args.max_recs)
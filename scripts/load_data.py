@@ -6,31 +6,122 @@ import pandas as pd
 import argparse
 from pathlib import Path
 from loguru import logger
-from src.db.connection import initialize_db, database_transaction, DatabaseError
+from src.db.connection import (
+    initialize_db, database_read, database_transaction, get_connection, DatabaseError, get_table_columns,
+    run_change_tracking_migration, run_txn_class_migration
+)
 from src.ingest.transaction_transformer import load_and_transform_formatted_transactions
+from src.features.daily_aggregates import refresh_daily_aggregates
+from typing import Dict, Iterable, List
+import itertools
 import time
 
+# CSV rows parsed and inserted per executemany call
+LOAD_CHUNK_ROWS = 50_000
+
+def _table_objects(conn, table_name: str, object_type: str) -> List[tuple]:
+    """(name, sql) of the explicitly created indexes or triggers on a table."""
+    return conn.execute("""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = ? AND tbl_name = ? AND sql IS NOT NULL
+    """, (object_type, table_name)).fetchall()
+
+def _chunk_rows(chunk: pd.DataFrame) -> Iterable[tuple]:
+    """Rows of a chunk as plain Python values, with NaN as NULL."""
+    return chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+
+def bulk_load_frames(table_name: str, frames: Iterable[pd.DataFrame], db_path: str,
+                     replace: bool = True) -> Dict[str, float]:
+    """
+    Stream DataFrame chunks into an existing table without changing its schema.
+
+    The whole load is one transaction on a dedicated connection with
+    PRAGMA synchronous=OFF. The table's secondary indexes and change-log
+    triggers are dropped first and recreated from their saved definitions
+    at the end, so each index is built once instead of updated per row, and
+    the primary key, defaults and column types from db/schema.sql are kept.
+    Frame columns the table doesn't have are skipped with a warning; table
+    columns the frames don't have get their defaults.
+
+    Args:
+        table_name: Table to load (must already exist)
+        frames: DataFrame chunks to insert
+        db_path: Database path
+        replace: Delete the table's existing rows first
+
+    Returns:
+        Dict with rows, seconds and rows_per_sec
+    """
+    table_columns = get_table_columns(table_name, db_path)
+    if not table_columns:
+        raise DatabaseError(f"load_{table_name}", f"Table {table_name} does not exist; initialize the database first")
+
+    start = time.perf_counter()
+    rows = 0
+    conn = get_connection(db_path)
+    try:
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("BEGIN IMMEDIATE")
+        indexes = _table_objects(conn, table_name, 'index')
+        triggers = _table_objects(conn, table_name, 'trigger')
+        for name, _ in indexes:
+            conn.execute(f'DROP INDEX "{name}"')
+        for name, _ in triggers:
+            conn.execute(f'DROP TRIGGER "{name}"')
+        if replace:
+            conn.execute(f"DELETE FROM {table_name}")
+
+        insert_sql, columns = None, None
+        for chunk in frames:
+            if columns is None:
+                columns = [column for column in chunk.columns if column in table_columns]
+                skipped = [column for column in chunk.columns if column not in table_columns]
+                if skipped:
+                    logger.warning(f"Skipping columns not in {table_name}: {', '.join(skipped)}")
+                insert_sql = (f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                              f"VALUES ({', '.join('?' for _ in columns)})")
+            conn.executemany(insert_sql, _chunk_rows(chunk[columns]))
+            rows += len(chunk)
+
+        for _, sql in indexes + triggers:
+            conn.execute(sql)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise DatabaseError(f"load_{table_name}", str(e))
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - start
+    stats = {'rows': rows, 'seconds': seconds, 'rows_per_sec': rows / seconds if seconds > 0 else 0.0}
+    logger.info(f"Bulk loaded {rows} rows into {table_name} in {seconds:.2f}s "
+                f"({stats['rows_per_sec']:,.0f} rows/sec, {len(indexes)} indexes rebuilt)")
+    return stats
+
 def load_csv_to_table(csv_path: str, table_name: str, db_path: str) -> int:
-    """Load CSV data into database table."""
+    """Replace a table's rows with a CSV's, streaming it through bulk_load_frames."""
     try:
-        # Read CSV
-        df = pd.read_csv(csv_path)
+        chunks = pd.read_csv(csv_path, chunksize=LOAD_CHUNK_ROWS)
+        first = next(chunks, None)
 
-        if df.empty:
+        if first is None or first.empty:
             logger.warning(f"No data in {csv_path}")
             return 0
 
-        # Load into database
-        with database_transaction(db_path) as conn:
-            # Insert data
-            df.to_sql(table_name, conn, if_exists='replace', index=False)
+        bulk_load_frames(table_name, itertools.chain([first], chunks), db_path)
 
-            # Verify insertion
+        # Verify insertion
+        with database_read(db_path) as conn:
             count = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
 
         logger.info(f"Loaded {count} records into {table_name}")
         return count
 
+    except pd.errors.EmptyDataError:
+        logger.warning(f"No data in {csv_path}")
+        return 0
+    except DatabaseError:
+        raise
     except Exception as e:
         raise DatabaseError(f"load_{table_name}", str(e))
 
@@ -55,11 +146,24 @@ def load_formatted_transactions(csv_path: str, db_path: str, mode: str = "append
             return 0
 
         # Load into database
-        with database_transaction(db_path) as conn:
-            if_exists = mode if mode in ['append', 'replace'] else 'append'
-            transformed.to_sql('transactions', conn, if_exists=if_exists, index=False)
+        replace = mode == 'replace'
+        bulk_load_frames('transactions', [transformed], db_path, replace=replace)
+        with database_read(db_path) as conn:
             count = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
 
+        # The change-log triggers are off during a bulk load, so log the users it touched
+        if replace:
+            record_reloaded_users(db_path)
+        else:
+            record_loaded_users(db_path, transformed['user_id'].unique().tolist(), 'transactions')
+
+        # Classify the new rows once so signal computation can filter on txn_class
+        run_txn_class_migration(db_path)
+
+        # Keep the daily rollup current for the users just loaded
+        with database_transaction(db_path) as conn:
+            refresh_daily_aggregates(conn, transformed['user_id'].unique().tolist())
+
         logger.info(f"Loaded {len(transformed)} formatted transactions into database (total: {count})")
         return len(transformed)
 
@@ -67,6 +171,33 @@ def load_formatted_transactions(csv_path: str, db_path: str, mode: str = "append
         raise DatabaseError("load_formatted_transactions", str(e))
 
 
+def record_loaded_users(db_path: str, user_ids: List[str], source_table: str):
+    """Log users whose rows a bulk load appended, for the next incremental signal run."""
+    with database_transaction(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (?, ?, 'load')",
+            [(user_id, source_table) for user_id in user_ids]
+        )
+
+
+def record_reloaded_users(db_path: str):
+    """Mark every loaded user as changed after a replace load.
+
+    Bulk loads bypass the change-log triggers, so they are (re-)installed and
+    each user is logged once for the next incremental signal run.
+    """
+    run_change_tracking_migration(db_path)
+    with database_transaction(db_path) as conn:
+        conn.execute("""
+            INSERT INTO signal_change_log (user_id, source_table, operation)
+            SELECT user_id, 'load', 'reload' FROM (
+                SELECT user_id FROM users
+                UNION
+                SELECT DISTINCT user_id FROM transactions
+            )
+        """)
+
+
 def load_all_data(data_dir: str = "data/synthetic", db_path: str = "db/spend_sense.db") -> dict:
     """Load all CSV files into database."""
     start_time = time.time()
@@ -102,24 +233,39 @@ def load_all_data(data_dir: str = "data/synthetic", db_path: str = "db/spend_sen
         count = load_csv_to_table(str(csv_path), table_name, db_path)
         results[table_name] = count
 
+    record_reloaded_users(db_path)
+
+    logger.info("Classifying transactions...")
+    run_txn_class_migration(db_path)
+
+    logger.info("Rebuilding daily aggregates...")
+    with database_transaction(db_path) as conn:
+        rollup_rows = refresh_daily_aggregates(conn)
+    logger.info(f"Built {rollup_rows} daily aggregate rows")
+
     duration = time.time() - start_time
     logger.info(f"Data loading completed in {duration:.2f} seconds")
 
     return results
 
+# Foreign key checks run after every load; src/db/hot_queries.py checks their query plans
+ORPHANED_ACCOUNTS_SQL = "SELECT COUNT(*) FROM accounts WHERE user_id NOT IN (SELECT user_id FROM users)"
+ORPHANED_TRANSACTIONS_SQL = "SELECT COUNT(*) FROM transactions WHERE user_id NOT IN (SELECT user_id FROM users)"
+INVALID_TRANSACTION_ACCOUNTS_SQL = "SELECT COUNT(*) FROM transactions WHERE account_id NOT IN (SELECT account_id FROM accounts)"
+INVALID_LIABILITY_ACCOUNTS_SQL = "SELECT COUNT(*) FROM liabilities WHERE account_id NOT IN (SELECT account_id FROM accounts)"
+INTEGRITY_CHECKS = [
+    (ORPHANED_ACCOUNTS_SQL, "Orphaned accounts"),
+    (ORPHANED_TRANSACTIONS_SQL, "Orphaned transactions"),
+    (INVALID_TRANSACTION_ACCOUNTS_SQL, "Invalid account references"),
+    (INVALID_LIABILITY_ACCOUNTS_SQL, "Invalid liability references")
+]
+
 def validate_data_integrity(db_path: str = "db/spend_sense.db") -> bool:
     """Validate data integrity after loading."""
     try:
-        with database_transaction(db_path) as conn:
+        with database_read(db_path) as conn:
             # Check foreign key constraints
-            checks = [
-                ("SELECT COUNT(*) FROM accounts WHERE user_id NOT IN (SELECT user_id FROM users)", "Orphaned accounts"),
-                ("SELECT COUNT(*) FROM transactions WHERE user_id NOT IN (SELECT user_id FROM users)", "Orphaned transactions"),
-                ("SELECT COUNT(*) FROM transactions WHERE account_id NOT IN (SELECT account_id FROM accounts)", "Invalid account references"),
-                ("SELECT COUNT(*) FROM liabilities WHERE account_id NOT IN (SELECT account_id FROM accounts)", "Invalid liability references")
-            ]
-
-            for query, description in checks:
+            for query, description in INTEGRITY_CHECKS:
                 result = conn.execute(query).fetchone()[0]
                 if result > 0:
                     logger.error(f"Data integrity issue: {description} - {result} records")
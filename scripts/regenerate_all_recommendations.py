@@ -9,7 +9,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from src.db.connection import database_transaction
+from src.db.connection import database_transaction, ensure_schema_current
 from scripts.generate_recommendations import generate_for_all_users
 from loguru import logger
 
@@ -61,6 +61,8 @@ def main():
             print("❌ Cancelled")
             return
     
+    ensure_schema_current(args.db_path)
+
     # Wipe existing recommendations
     deleted_count = wipe_all_recommendations(args.db_path)
     
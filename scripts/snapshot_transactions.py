@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Export the transactions table to a memory-mappable columnar snapshot
+Signal runs read it with --snapshot instead of querying SQLite
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from loguru import logger
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.db.connection import ensure_schema_current
+from src.features.transaction_snapshot import EXPORT_CHUNK_ROWS, export_transaction_snapshot
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export transactions to a directory of .npy column files')
+    parser.add_argument('--db-path', default='db/spend_sense.db', help='Database path')
+    parser.add_argument('--output', default='data/snapshots/transactions',
+                        help='Snapshot directory (replaced if it exists)')
+    parser.add_argument('--chunk-rows', type=int, default=EXPORT_CHUNK_ROWS,
+                        help=f'Rows read per chunk while exporting (default: {EXPORT_CHUNK_ROWS})')
+
+    args = parser.parse_args()
+
+    try:
+        ensure_schema_current(args.db_path)
+        manifest = export_transaction_snapshot(args.db_path, args.output, args.chunk_rows)
+        logger.info(f"✅ Snapshot written to {args.output}")
+        logger.info(f"   Rows: {manifest['rows']}")
+        logger.info(f"   Users: {manifest['users']}")
+    except Exception as e:
+        logger.error(f"Snapshot export failed: {e}")
+        sys.exit(1)
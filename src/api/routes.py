@@ -6,19 +6,31 @@ from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 from loguru import logger
+import asyncio
 import time
+from contextlib import asynccontextmanager
 
 from src.features.schema import UserSignals
 from src.personas.persona_classifier import classify_persona, PersonaMatch
 from src.recommend.recommendation_engine import RecommendationEngine, Recommendation
 from src.recommend.signal_mapper import map_signals_to_triggers
-from src.db.connection import database_transaction, get_user_signals
+from src.db.connection import (
+    database_read, database_transaction, ensure_schema_current, get_pool_stats, get_user_signals
+)
+from src.db.write_queue import get_write_queue, get_write_queue_stats
 from src.guardrails.guardrails import guardrails, GuardrailViolation
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Apply pending schema migrations before serving requests."""
+    ensure_schema_current()
+    yield
+
 app = FastAPI(
     title="SpendSense API",
     description="Explainable Financial Education Platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -33,6 +45,40 @@ app.add_middleware(
 # Initialize recommendation engine
 recommendation_engine = RecommendationEngine()
 
+# Hot statements; src/db/hot_queries.py checks their query plans
+# Feedback row for a recommendation, selected only if it exists and belongs to the user
+FEEDBACK_SOURCE_SQL = """
+    SELECT :feedback_id, user_id, rec_id, content_id, :helpful, :comment, :created_at
+    FROM recommendations
+    WHERE rec_id = :rec_id AND user_id = :user_id
+"""
+RECORD_FEEDBACK_SQL = f"""
+    INSERT INTO feedback (feedback_id, user_id, rec_id, content_id, helpful, comment, created_at)
+    {FEEDBACK_SOURCE_SQL}
+"""
+
+# Operator queue listing, newest first; {where_clause} is one of APPROVAL_STATUS_FILTERS or empty
+APPROVAL_QUEUE_SQL = """
+    SELECT
+        rec_id,
+        user_id,
+        content_id,
+        rationale,
+        created_at,
+        approved,
+        delivered,
+        viewed_at
+    FROM recommendations
+    {where_clause}
+    ORDER BY created_at DESC
+    LIMIT :limit
+"""
+APPROVAL_STATUS_FILTERS = {
+    "pending": "WHERE approved IS NULL",
+    "approved": "WHERE approved = 1",
+    "rejected": "WHERE approved = 0",
+}
+
 # Request/Response models
 class RecommendationResponse(BaseModel):
     """API response for recommendations."""
@@ -75,7 +121,7 @@ class FeedbackRequest(BaseModel):
 def check_user_consent(user_id: str) -> bool:
     """Check if user has consented to recommendations."""
     try:
-        with database_transaction() as conn:
+        with database_read() as conn:
             result = conn.execute("""
                 SELECT consent_status FROM users WHERE user_id = ?
             """, (user_id,)).fetchone()
@@ -110,8 +156,8 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+    """Health check endpoint (includes connection pool metrics)."""
+    return {"status": "healthy", "db_pools": get_pool_stats(), "write_queues": get_write_queue_stats()}
 
 @app.post("/users")
 async def create_user(request: UserCreateRequest):
@@ -235,40 +281,33 @@ async def record_feedback(request: FeedbackRequest):
         import uuid
         from datetime import datetime
         
-        # Verify recommendation exists
-        with database_transaction() as conn:
-            rec = conn.execute("""
-                SELECT rec_id, content_id, user_id FROM recommendations WHERE rec_id = ?
-            """, (request.rec_id,)).fetchone()
-            
+        # Record feedback if the recommendation exists and belongs to the user, checked
+        # in the same statement; group-committed with other queued writes, awaited until durable
+        feedback_id = f"feedback_{uuid.uuid4().hex[:12]}"
+        inserted = await asyncio.wrap_future(get_write_queue().execute(RECORD_FEEDBACK_SQL, {
+            'feedback_id': feedback_id,
+            'user_id': request.user_id,
+            'rec_id': request.rec_id,
+            'helpful': request.helpful,
+            'comment': request.comment,
+            'created_at': datetime.now().isoformat()
+        }))
+        
+        if not inserted:
+            # Nothing was written; tell a missing recommendation from someone else's
+            with database_read() as conn:
+                rec = conn.execute(
+                    "SELECT user_id FROM recommendations WHERE rec_id = ?", (request.rec_id,)
+                ).fetchone()
             if not rec:
                 raise HTTPException(
                     status_code=404,
                     detail=f"Recommendation {request.rec_id} not found"
                 )
-            
-            # Verify user_id matches
-            if rec['user_id'] != request.user_id:
-                raise HTTPException(
-                    status_code=403,
-                    detail="User ID does not match recommendation"
-                )
-            
-            # Record feedback
-            feedback_id = f"feedback_{uuid.uuid4().hex[:12]}"
-            conn.execute("""
-                INSERT INTO feedback 
-                (feedback_id, user_id, rec_id, content_id, helpful, comment, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                feedback_id,
-                request.user_id,
-                request.rec_id,
-                rec['content_id'],
-                request.helpful,
-                request.comment,
-                datetime.now().isoformat()
-            ))
+            raise HTTPException(
+                status_code=403,
+                detail="User ID does not match recommendation"
+            )
         
         logger.info(f"Feedback recorded: {feedback_id} (helpful={request.helpful})")
         
@@ -304,31 +343,12 @@ async def get_approval_queue(
         from src.recommend.content_schema import load_content_catalog
         
         # Build query based on status
-        if status == "pending":
-            where_clause = "WHERE approved IS NULL"
-        elif status == "approved":
-            where_clause = "WHERE approved = 1"
-        elif status == "rejected":
-            where_clause = "WHERE approved = 0"
-        else:
-            where_clause = ""
+        where_clause = APPROVAL_STATUS_FILTERS.get(status, "")
         
-        with database_transaction() as conn:
-            results = conn.execute(f"""
-                SELECT 
-                    rec_id,
-                    user_id,
-                    content_id,
-                    rationale,
-                    created_at,
-                    approved,
-                    delivered,
-                    viewed_at
-                FROM recommendations
-                {where_clause}
-                ORDER BY created_at DESC
-                LIMIT ?
-            """, (limit,)).fetchall()
+        with database_read() as conn:
+            results = conn.execute(
+                APPROVAL_QUEUE_SQL.format(where_clause=where_clause), {'limit': limit}
+            ).fetchall()
             
             if not results:
                 return {
@@ -517,21 +537,15 @@ async def approve_recommendation(rec_id: str, request: ApprovalRequest):
         Success message
     """
     try:
-        with database_transaction() as conn:
-            # Check if recommendation exists
-            result = conn.execute("""
-                SELECT rec_id FROM recommendations WHERE rec_id = ?
-            """, (rec_id,)).fetchone()
-            
-            if not result:
-                raise HTTPException(status_code=404, detail=f"Recommendation {rec_id} not found")
-            
-            # Update approval status
-            conn.execute("""
-                UPDATE recommendations 
-                SET approved = ?, delivered = ?
-                WHERE rec_id = ?
-            """, (request.approved, request.approved, rec_id))
+        # Update approval status; no row updated means the recommendation doesn't exist
+        updated = await asyncio.wrap_future(get_write_queue().execute("""
+            UPDATE recommendations 
+            SET approved = ?, delivered = ?
+            WHERE rec_id = ?
+        """, (request.approved, request.approved, rec_id)))
+        
+        if not updated:
+            raise HTTPException(status_code=404, detail=f"Recommendation {rec_id} not found")
         
         action = "approved" if request.approved else "rejected"
         logger.info(f"Recommendation {rec_id} {action}")
@@ -561,12 +575,11 @@ async def mark_recommendation_viewed(rec_id: str):
     try:
         from datetime import datetime
         
-        with database_transaction() as conn:
-            conn.execute("""
-                UPDATE recommendations 
-                SET viewed_at = ?
-                WHERE rec_id = ?
-            """, (datetime.now().isoformat(), rec_id))
+        await asyncio.wrap_future(get_write_queue().execute("""
+            UPDATE recommendations 
+            SET viewed_at = ?
+            WHERE rec_id = ?
+        """, (datetime.now().isoformat(), rec_id)))
         
         logger.info(f"Recommendation {rec_id} marked as viewed")
         
@@ -1,12 +1,15 @@
 """
 Database connection management with transaction safety and monitoring
 """
+import os
 import sqlite3
 import json
+import threading
 import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from datetime import datetime
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple
 from loguru import logger
 
 class DatabaseError(Exception):
@@ -39,25 +42,246 @@ def get_connection(db_path: str = "db/spend_sense.db") -> sqlite3.Connection:
     except sqlite3.Error as e:
         raise DatabaseError("connection", str(e))
 
+# Connection pools: database_transaction and database_read borrow pre-configured
+# connections instead of connecting (and re-running the PRAGMAs) on every use
+POOL_SIZE = int(os.getenv("SPENDSENSE_DB_POOL_SIZE", "8"))  # Max open connections per database
+POOL_IDLE_TIMEOUT = float(os.getenv("SPENDSENSE_DB_POOL_IDLE_SECONDS", "300"))  # Idle connections older than this are closed
+POOL_WAIT_TIMEOUT = 30.0  # Seconds to wait for a connection when the pool is exhausted
+
+class ConnectionPool:
+    """Bounded pool of connections to one database file.
+
+    Idle connections are reused most-recently-released first, health-checked
+    before being handed out (and dropped if the file was replaced), and closed
+    once idle for longer than idle_timeout. Borrowers beyond max_size wait for
+    a release. hits/misses/waits and wait time are kept for stats(). A
+    read_only pool opens its connections with PRAGMA query_only, so any write
+    through them fails.
+    """
+
+    def __init__(self, db_path: str, max_size: int = POOL_SIZE, idle_timeout: float = POOL_IDLE_TIMEOUT,
+                 wait_timeout: float = POOL_WAIT_TIMEOUT, read_only: bool = False):
+        self.db_path = db_path
+        self.read_only = read_only
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.wait_timeout = wait_timeout
+        self.pid = os.getpid()
+        self._idle: List[Tuple[sqlite3.Connection, float, Optional[Tuple[int, int]]]] = []
+        self._file_ids: Dict[int, Optional[Tuple[int, int]]] = {}
+        self._open = 0
+        self._cond = threading.Condition()
+        self._metrics = {'hits': 0, 'misses': 0, 'waits': 0, 'wait_ms': 0.0, 'timeouts': 0,
+                         'health_check_failures': 0, 'reaped': 0}
+
+    def _file_id(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.db_path)
+            return (stat.st_dev, stat.st_ino)
+        except OSError:
+            return None
+
+    def _healthy(self, conn: sqlite3.Connection, file_id) -> bool:
+        if file_id is None or file_id != self._file_id():
+            return False  # The database file was deleted or replaced since this connection opened
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _close(self, conn: sqlite3.Connection):
+        self._file_ids.pop(id(conn), None)
+        self._open -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _reap_locked(self, now: float):
+        keep = []
+        for conn, released_at, file_id in self._idle:
+            if now - released_at > self.idle_timeout:
+                self._close(conn)
+                self._metrics['reaped'] += 1
+            else:
+                keep.append((conn, released_at, file_id))
+        self._idle = keep
+
+    def acquire(self) -> sqlite3.Connection:
+        """Borrow a connection, opening one if none is idle and the pool has room."""
+        waited_since = None
+        with self._cond:
+            while True:
+                self._reap_locked(time.monotonic())
+                while self._idle:
+                    conn, _, file_id = self._idle.pop()
+                    if self._healthy(conn, file_id):
+                        self._metrics['hits'] += 1
+                        self._record_wait(waited_since)
+                        return conn
+                    self._metrics['health_check_failures'] += 1
+                    self._close(conn)
+
+                if self._open < self.max_size:
+                    self._open += 1
+                    self._metrics['misses'] += 1
+                    self._record_wait(waited_since)
+                    break
+
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    self._metrics['waits'] += 1
+                remaining = self.wait_timeout - (time.monotonic() - waited_since)
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    if not self._idle and self._open >= self.max_size:
+                        self._metrics['timeouts'] += 1
+                        self._record_wait(waited_since)
+                        raise DatabaseError("pool", f"No connection available for {self.db_path} "
+                                                    f"after {self.wait_timeout}s ({self.max_size} in use)")
+
+        # Connect outside the lock; the slot was reserved above
+        try:
+            conn = get_connection(self.db_path)
+            if self.read_only:
+                conn.execute("PRAGMA query_only=ON")
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._file_ids[id(conn)] = self._file_id()
+        return conn
+
+    def _record_wait(self, waited_since: Optional[float]):
+        if waited_since is not None:
+            self._metrics['wait_ms'] += (time.monotonic() - waited_since) * 1000
+
+    def release(self, conn: sqlite3.Connection, discard: bool = False):
+        """Return a borrowed connection; discard=True closes it instead of keeping it."""
+        if not discard and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+        with self._cond:
+            if discard:
+                self._close(conn)
+            else:
+                self._idle.append((conn, time.monotonic(), self._file_ids.get(id(conn))))
+            self._cond.notify()
+
+    def reap_idle(self) -> int:
+        """Close connections idle past idle_timeout now; returns how many were closed."""
+        with self._cond:
+            before = self._metrics['reaped']
+            self._reap_locked(time.monotonic())
+            return self._metrics['reaped'] - before
+
+    def close(self):
+        """Close every idle connection (borrowed ones are closed when released)."""
+        with self._cond:
+            for conn, _, _ in self._idle:
+                self._close(conn)
+            self._idle = []
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/wait counters plus current open, idle and in-use connection counts."""
+        with self._cond:
+            lookups = self._metrics['hits'] + self._metrics['misses']
+            return {
+                **self._metrics,
+                'hit_rate': self._metrics['hits'] / lookups if lookups else 0.0,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+                'max_size': self.max_size,
+                'read_only': self.read_only,
+            }
+
+    @property
+    def name(self) -> str:
+        return f"{self.db_path} (read)" if self.read_only else self.db_path
+
+_pools: Dict[Tuple[str, bool], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path: str = "db/spend_sense.db", max_size: Optional[int] = None,
+             idle_timeout: Optional[float] = None, read_only: bool = False) -> ConnectionPool:
+    """The pool for db_path, created on first use (max_size/idle_timeout apply to a new pool).
+
+    Each database has a read-write pool and a separate read_only pool.
+    """
+    key = (_schema_cache_key(db_path), read_only)
+    with _pools_lock:
+        pool = _pools.get(key)
+        # A forked worker must not share its parent's connections
+        if pool is None or pool.pid != os.getpid():
+            pool = _pools[key] = ConnectionPool(
+                db_path,
+                max_size=max_size or POOL_SIZE,
+                idle_timeout=POOL_IDLE_TIMEOUT if idle_timeout is None else idle_timeout,
+                read_only=read_only,
+            )
+        return pool
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """stats() of every pool in this process, keyed by pool name (the database path,
+    suffixed with " (read)" for read-only pools)."""
+    with _pools_lock:
+        pools = [pool for pool in _pools.values() if pool.pid == os.getpid()]
+    return {pool.name: pool.stats() for pool in pools}
+
+def close_pools():
+    """Close idle connections in every pool and forget the pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        if pool.pid == os.getpid():
+            pool.close()
+
 @contextmanager
 def database_transaction(db_path: str = "db/spend_sense.db"):
-    """Context manager for database transactions with automatic retry."""
+    """Context manager for database transactions with automatic retry.
+
+    Connections are borrowed from the database's ConnectionPool and returned
+    afterwards (in-memory databases get a private connection each time).
+    """
+    pool = None if db_path == ":memory:" else get_pool(db_path)
     conn = None
     max_retries = 3
     retry_delay = 0.1  # 100ms
+
+    def release(discard: bool = False):
+        if pool:
+            pool.release(conn, discard=discard)
+        else:
+            conn.close()
+
+    def abandon():
+        """Roll back and give the connection up, dropping it if it can't roll back."""
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            release(discard=True)
+            return
+        release()
     
     for attempt in range(max_retries + 1):
         try:
-            conn = get_connection(db_path)
+            conn = pool.acquire() if pool else get_connection(db_path)
             conn.execute("BEGIN IMMEDIATE")  # Exclusive write lock
             yield conn
             conn.commit()
+            release()
+            conn = None
             break
             
         except sqlite3.OperationalError as e:
             if conn:
-                conn.rollback()
-                conn.close()
+                abandon()
                 conn = None
             
             if "database is locked" in str(e).lower() and attempt < max_retries:
@@ -70,155 +294,751 @@ def database_transaction(db_path: str = "db/spend_sense.db"):
                 
         except Exception as e:
             if conn:
-                conn.rollback()
-                conn.close()
+                abandon()
                 conn = None
             raise DatabaseError("transaction", str(e))
+
+        except BaseException:
+            # e.g. KeyboardInterrupt: still hand the connection back before propagating
+            if conn:
+                abandon()
+                conn = None
+            raise
     
-    # Ensure connection is closed if we somehow exit the loop without success
+    # Ensure connection is released if we somehow exit the loop without success
     if conn:
-        conn.close()
+        release()
+
+@contextmanager
+def database_read(db_path: str = "db/spend_sense.db"):
+    """Context manager for read-only work.
 
-def run_demographic_migration(db_path: str = "db/spend_sense.db"):
+    Runs a deferred transaction on a query_only connection from the database's
+    read pool. In WAL mode a deferred transaction takes no lock, so readers
+    neither queue behind each other's BEGIN IMMEDIATE nor wait for a writer,
+    and every query in the block sees the same snapshot. Writes raise.
+    """
+    pool = None if db_path == ":memory:" else get_pool(db_path, read_only=True)
+    if pool:
+        conn = pool.acquire()
+    else:
+        conn = get_connection(db_path)
+        conn.execute("PRAGMA query_only=ON")
+    discard = False
+
+    try:
+        conn.execute("BEGIN")
+        yield conn
+    except Exception as e:
+        raise DatabaseError("read", str(e))
+    finally:
+        # Nothing to commit; ending the transaction releases the snapshot
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            discard = True
+        if pool:
+            pool.release(conn, discard=discard)
+        else:
+            conn.close()
+
+# Schema capability probe: column sets per (resolved db_path, table), read
+# once and reused until a migration or loader changes the schema
+_schema_cache: Dict[Tuple[str, str], frozenset] = {}
+# Applied schema version per resolved db_path, read by get_schema_version
+_schema_versions: Dict[str, Optional[int]] = {}
+
+def _schema_cache_key(db_path: str) -> str:
+    return str(Path(db_path).resolve())
+
+def get_table_columns(table: str, db_path: str = "db/spend_sense.db",
+                      conn: Optional[sqlite3.Connection] = None) -> frozenset:
+    """Column names of a table (empty if it doesn't exist), cached per db_path.
+
+    Args:
+        table: Table name
+        db_path: Database path, used as the cache key
+        conn: Open connection to db_path to probe with instead of opening one
+    """
+    key = (_schema_cache_key(db_path), table)
+    columns = _schema_cache.get(key)
+    if columns is None:
+        probe_conn = conn or get_connection(db_path)
+        try:
+            columns = frozenset(row[1] for row in probe_conn.execute(f"PRAGMA table_info({table})"))
+        except sqlite3.Error as e:
+            raise DatabaseError("schema_probe", str(e))
+        finally:
+            if conn is None:
+                probe_conn.close()
+        _schema_cache[key] = columns
+        logger.debug(f"Probed schema for {table}: {len(columns)} columns")
+    return columns
+
+def has_column(table: str, column: str, db_path: str = "db/spend_sense.db",
+               conn: Optional[sqlite3.Connection] = None) -> bool:
+    """True if table has column, using the cached schema probe."""
+    return column in get_table_columns(table, db_path, conn)
+
+def invalidate_schema_cache(db_path: Optional[str] = None):
+    """Forget probed schemas and schema versions for db_path (or for every database)."""
+    if db_path is None:
+        _schema_cache.clear()
+        _schema_versions.clear()
+        return
+    key = _schema_cache_key(db_path)
+    for cached in [cached for cached in _schema_cache if cached[0] == key]:
+        del _schema_cache[cached]
+    _schema_versions.pop(key, None)
+
+def _migrate_demographics(conn: sqlite3.Connection):
     """Run migration to add demographic columns to users table if they don't exist."""
+    # Check if demographic columns exist
+    cursor = conn.execute("PRAGMA table_info(users)")
+    columns = [row[1] for row in cursor.fetchall()]
+    
+    migrations_needed = []
+    if 'age' not in columns:
+        migrations_needed.append("ALTER TABLE users ADD COLUMN age INTEGER")
+    if 'age_range' not in columns:
+        migrations_needed.append("ALTER TABLE users ADD COLUMN age_range TEXT")
+    if 'gender' not in columns:
+        migrations_needed.append("ALTER TABLE users ADD COLUMN gender TEXT")
+    if 'race_ethnicity' not in columns:
+        migrations_needed.append("ALTER TABLE users ADD COLUMN race_ethnicity TEXT")
+    if 'demographic_group' not in columns:
+        migrations_needed.append("ALTER TABLE users ADD COLUMN demographic_group TEXT")
+    
+    # Run migrations
+    for migration in migrations_needed:
+        conn.execute(migration)
+        logger.info(f"Applied migration: {migration}")
+    
+    # Check if index exists
+    indexes = conn.execute("""
+        SELECT name FROM sqlite_master 
+        WHERE type='index' AND name='idx_users_demographic_group'
+    """).fetchone()
+    
+    if not indexes:
+        conn.execute("CREATE INDEX idx_users_demographic_group ON users(demographic_group)")
+        logger.info("Created index: idx_users_demographic_group")
+    
+    if migrations_needed:
+        logger.info("Demographic migration completed successfully")
+    else:
+        logger.debug("Demographic columns already exist, no migration needed")
+
+def _migrate_decision_trace(conn: sqlite3.Connection):
+    """Run migration to add decision_trace column to recommendations table if it doesn't exist."""
+    # Check if decision_trace column exists
+    cursor = conn.execute("PRAGMA table_info(recommendations)")
+    columns = [row[1] for row in cursor.fetchall()]
+    
+    if 'decision_trace' not in columns:
+        conn.execute("ALTER TABLE recommendations ADD COLUMN decision_trace JSON")
+        logger.info("Applied migration: Added decision_trace column to recommendations table")
+    else:
+        logger.debug("decision_trace column already exists, no migration needed")
+
+# Change tracking for incremental signal recomputation (mirrors db/schema.sql)
+# (table the statement depends on, statement)
+CHANGE_TRACKING_STATEMENTS = [
+    (None, """CREATE TABLE IF NOT EXISTS signal_change_log (
+        change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        source_table TEXT NOT NULL,
+        operation TEXT NOT NULL,
+        changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )"""),
+    (None, """CREATE TABLE IF NOT EXISTS signal_watermarks (
+        window TEXT PRIMARY KEY,
+        last_change_id INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )"""),
+    ('transactions', """CREATE TRIGGER IF NOT EXISTS trg_transactions_insert_log AFTER INSERT ON transactions BEGIN
+        INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (NEW.user_id, 'transactions', 'insert');
+    END"""),
+    ('transactions', """CREATE TRIGGER IF NOT EXISTS trg_transactions_update_log AFTER UPDATE ON transactions BEGIN
+        INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (NEW.user_id, 'transactions', 'update');
+        INSERT INTO signal_change_log (user_id, source_table, operation)
+            SELECT OLD.user_id, 'transactions', 'update' WHERE OLD.user_id IS NOT NEW.user_id;
+    END"""),
+    ('transactions', """CREATE TRIGGER IF NOT EXISTS trg_transactions_delete_log AFTER DELETE ON transactions BEGIN
+        INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (OLD.user_id, 'transactions', 'delete');
+    END"""),
+    ('accounts', """CREATE TRIGGER IF NOT EXISTS trg_accounts_insert_log AFTER INSERT ON accounts BEGIN
+        INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (NEW.user_id, 'accounts', 'insert');
+    END"""),
+    ('accounts', """CREATE TRIGGER IF NOT EXISTS trg_accounts_update_log AFTER UPDATE ON accounts BEGIN
+        INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (NEW.user_id, 'accounts', 'update');
+        INSERT INTO signal_change_log (user_id, source_table, operation)
+            SELECT OLD.user_id, 'accounts', 'update' WHERE OLD.user_id IS NOT NEW.user_id;
+    END"""),
+    ('accounts', """CREATE TRIGGER IF NOT EXISTS trg_accounts_delete_log AFTER DELETE ON accounts BEGIN
+        INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (OLD.user_id, 'accounts', 'delete');
+    END"""),
+    ('liabilities', """CREATE TRIGGER IF NOT EXISTS trg_liabilities_insert_log AFTER INSERT ON liabilities BEGIN
+        INSERT INTO signal_change_log (user_id, source_table, operation)
+            SELECT user_id, 'liabilities', 'insert' FROM accounts WHERE account_id = NEW.account_id;
+    END"""),
+    ('liabilities', """CREATE TRIGGER IF NOT EXISTS trg_liabilities_update_log AFTER UPDATE ON liabilities BEGIN
+        INSERT INTO signal_change_log (user_id, source_table, operation)
+            SELECT user_id, 'liabilities', 'update' FROM accounts WHERE account_id = NEW.account_id;
+    END"""),
+    ('liabilities', """CREATE TRIGGER IF NOT EXISTS trg_liabilities_delete_log AFTER DELETE ON liabilities BEGIN
+        INSERT INTO signal_change_log (user_id, source_table, operation)
+            SELECT user_id, 'liabilities', 'delete' FROM accounts WHERE account_id = OLD.account_id;
+    END"""),
+]
+
+def _migrate_change_tracking(conn: sqlite3.Connection):
+    """Create the signal change log, watermarks and their triggers if missing.
+
+    Also re-installs triggers after a loader has replaced a tracked table.
+    """
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    for table, statement in CHANGE_TRACKING_STATEMENTS:
+        # Triggers can only be created once their table exists
+        if table and table not in existing:
+            continue
+        conn.execute(statement)
+    logger.debug("Change tracking migration applied")
+
+def _migrate_change_tracking_deletes(conn: sqlite3.Connection):
+    """Log account and liability deletes, and the previous owner of a reassigned account."""
+    # trg_accounts_update_log gained the OLD.user_id insert; IF NOT EXISTS won't replace it
+    conn.execute("DROP TRIGGER IF EXISTS trg_accounts_update_log")
+    _migrate_change_tracking(conn)
+
+def run_change_tracking_migration(db_path: str = "db/spend_sense.db"):
+    """Re-install change tracking, e.g. after a loader has replaced a tracked table."""
     try:
         with database_transaction(db_path) as conn:
-            # Check if demographic columns exist
-            cursor = conn.execute("PRAGMA table_info(users)")
-            columns = [row[1] for row in cursor.fetchall()]
-            
-            migrations_needed = []
-            if 'age' not in columns:
-                migrations_needed.append("ALTER TABLE users ADD COLUMN age INTEGER")
-            if 'age_range' not in columns:
-                migrations_needed.append("ALTER TABLE users ADD COLUMN age_range TEXT")
-            if 'gender' not in columns:
-                migrations_needed.append("ALTER TABLE users ADD COLUMN gender TEXT")
-            if 'race_ethnicity' not in columns:
-                migrations_needed.append("ALTER TABLE users ADD COLUMN race_ethnicity TEXT")
-            if 'demographic_group' not in columns:
-                migrations_needed.append("ALTER TABLE users ADD COLUMN demographic_group TEXT")
-            
-            # Run migrations
-            for migration in migrations_needed:
-                conn.execute(migration)
-                logger.info(f"Applied migration: {migration}")
-            
-            # Check if index exists
-            indexes = conn.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='index' AND name='idx_users_demographic_group'
-            """).fetchone()
-            
-            if not indexes:
-                conn.execute("CREATE INDEX idx_users_demographic_group ON users(demographic_group)")
-                logger.info("Created index: idx_users_demographic_group")
-            
-            if migrations_needed:
-                logger.info("Demographic migration completed successfully")
-            else:
-                logger.debug("Demographic columns already exist, no migration needed")
-                
+            _migrate_change_tracking(conn)
     except Exception as e:
-        logger.warning(f"Demographic migration failed (may already be applied): {e}")
+        logger.warning(f"Change tracking migration failed (may already be applied): {e}")
+    finally:
+        invalidate_schema_cache(db_path)
 
-def run_decision_trace_migration(db_path: str = "db/spend_sense.db"):
-    """Run migration to add decision_trace column to recommendations table if it doesn't exist."""
+def _migrate_daily_aggregates(conn: sqlite3.Connection):
+    """Create the user_daily_aggregates rollup table if it doesn't exist."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_daily_aggregates (
+            user_id TEXT NOT NULL,
+            day DATE NOT NULL,
+            category_class INTEGER NOT NULL,
+            txn_count INTEGER NOT NULL,
+            amount_sum REAL NOT NULL,
+            amount_abs_sum REAL NOT NULL,
+            amount_sq_sum REAL NOT NULL,
+            outflow_sum REAL NOT NULL,
+            amount_min REAL,
+            amount_max REAL,
+            fraud_count INTEGER NOT NULL DEFAULT 0,
+            fraud_declined_count INTEGER NOT NULL DEFAULT 0,
+            fraud_high_risk_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day, category_class)
+        )
+    """)
+    logger.debug("Daily aggregates migration applied")
+
+# Clears a stored txn_class when a column its classification reads changes, so the
+# row is classified again on read or by the next classify_stored_transactions run.
+# A statement that sets txn_class itself keeps the value it set (mirrors db/schema.sql)
+TXN_CLASS_RESET_TRIGGER_SQL = """CREATE TRIGGER IF NOT EXISTS trg_transactions_reset_class
+    AFTER UPDATE OF amount, merchant_name, category_primary, category_detailed, account_id, user_id ON transactions
+    WHEN NEW.txn_class IS NOT NULL AND NEW.txn_class IS OLD.txn_class BEGIN
+        UPDATE transactions SET txn_class = NULL WHERE rowid = NEW.rowid;
+    END"""
+
+def _migrate_txn_class_reset(conn: sqlite3.Connection):
+    """Install the trigger that clears txn_class when a classified transaction is edited."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(transactions)").fetchall()]
+    if 'txn_class' in columns:
+        conn.execute(TXN_CLASS_RESET_TRIGGER_SQL)
+        logger.debug("Transaction class reset trigger installed")
+
+def _migrate_txn_class(conn: sqlite3.Connection):
+    """Add the txn_class column to transactions if missing and classify unclassified rows."""
+    from src.features.transaction_classes import classify_stored_transactions
+
+    cursor = conn.execute("PRAGMA table_info(transactions)")
+    columns = [row[1] for row in cursor.fetchall()]
+    if not columns:
+        return
+
+    if 'txn_class' not in columns:
+        conn.execute("ALTER TABLE transactions ADD COLUMN txn_class INTEGER")
+        logger.info("Applied migration: Added txn_class column to transactions table")
+    _migrate_txn_class_reset(conn)
+
+    classified = classify_stored_transactions(conn)
+    if classified:
+        logger.info(f"Classified {classified} transactions")
+
+def run_txn_class_migration(db_path: str = "db/spend_sense.db"):
+    """Add txn_class if missing and classify unclassified rows, e.g. after a load."""
     try:
         with database_transaction(db_path) as conn:
-            # Check if decision_trace column exists
-            cursor = conn.execute("PRAGMA table_info(recommendations)")
-            columns = [row[1] for row in cursor.fetchall()]
-            
-            if 'decision_trace' not in columns:
-                conn.execute("ALTER TABLE recommendations ADD COLUMN decision_trace JSON")
-                logger.info("Applied migration: Added decision_trace column to recommendations table")
-            else:
-                logger.debug("decision_trace column already exists, no migration needed")
-                
+            _migrate_txn_class(conn)
     except Exception as e:
-        logger.warning(f"Decision trace migration failed (may already be applied): {e}")
+        logger.warning(f"Transaction class migration failed (may already be applied): {e}")
+    finally:
+        invalidate_schema_cache(db_path)
+
+# Scalar UserSignals fields mirrored into user_signal_values, with their column types
+SIGNAL_VALUE_COLUMNS = (
+    ('credit_utilization_max', 'REAL'),
+    ('has_interest_charges', 'INTEGER'),
+    ('is_overdue', 'INTEGER'),
+    ('minimum_payment_only', 'INTEGER'),
+    ('income_pay_gap', 'INTEGER'),
+    ('cash_flow_buffer', 'REAL'),
+    ('income_variability', 'REAL'),
+    ('subscription_count', 'INTEGER'),
+    ('monthly_subscription_spend', 'REAL'),
+    ('subscription_share', 'REAL'),
+    ('savings_growth_rate', 'REAL'),
+    ('monthly_savings_inflow', 'REAL'),
+    ('emergency_fund_months', 'REAL'),
+    ('monthly_bank_fees', 'REAL'),
+    ('bank_fee_count', 'INTEGER'),
+    ('has_overdraft_fees', 'INTEGER'),
+    ('has_atm_fees', 'INTEGER'),
+    ('has_maintenance_fees', 'INTEGER'),
+    ('fraud_transaction_count', 'INTEGER'),
+    ('fraud_rate', 'REAL'),
+    ('has_fraud_history', 'INTEGER'),
+    ('fraud_risk_score', 'REAL'),
+    ('impossible_travel_count', 'INTEGER'),
+    ('geo_velocity_max', 'REAL'),
+    ('insufficient_data', 'INTEGER'),
+    ('data_quality_score', 'REAL'),
+)
+
+SIGNAL_VALUE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_signal_values_quality ON user_signal_values(window, data_quality_score)",
+    "CREATE INDEX IF NOT EXISTS idx_signal_values_insufficient ON user_signal_values(window, insufficient_data)",
+    "CREATE INDEX IF NOT EXISTS idx_signal_values_fraud_risk ON user_signal_values(window, fraud_risk_score)",
+]
+
+_INSERT_SIGNAL_VALUES_SQL = f"""
+    INSERT OR REPLACE INTO user_signal_values (user_id, window, {', '.join(name for name, _ in SIGNAL_VALUE_COLUMNS)},
+                                               computation_error_count)
+    VALUES (?, ?, {', '.join('?' for _ in SIGNAL_VALUE_COLUMNS)}, ?)
+"""
+
+def _signal_value(value, sql_type: str):
+    """Coerce one signal value to its column type (None stays NULL)."""
+    if value is None:
+        return None
+    try:
+        if sql_type == 'INTEGER':
+            return int(value)
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _signal_value_row(user_id: str, window: str, signals: Dict[str, Any]) -> Tuple:
+    """Typed user_signal_values row for one signals dict."""
+    values = tuple(_signal_value(signals.get(name), sql_type) for name, sql_type in SIGNAL_VALUE_COLUMNS)
+    return (user_id, window) + values + (len(signals.get('computation_errors') or []),)
+
+def _migrate_signal_values(conn: sqlite3.Connection):
+    """Create the typed user_signal_values table and backfill it from stored signal blobs.
+
+    On databases that already have the table, adds any signal columns it lacks.
+    """
+    columns = ",\n".join(f"    {name} {sql_type}" for name, sql_type in SIGNAL_VALUE_COLUMNS)
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    if 'user_signal_values' in existing:
+        # Signals added after the table was created start out NULL until the next run
+        present = {row[1] for row in conn.execute("PRAGMA table_info(user_signal_values)")}
+        for name, sql_type in SIGNAL_VALUE_COLUMNS:
+            if name not in present:
+                conn.execute(f"ALTER TABLE user_signal_values ADD COLUMN {name} {sql_type}")
+                logger.info(f"Applied migration: Added {name} to user_signal_values")
+        return
+    if 'user_signals' not in existing:
+        return
+
+    conn.execute(f"""
+        CREATE TABLE user_signal_values (
+            user_id TEXT NOT NULL,
+            window TEXT NOT NULL,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        {columns},
+            computation_error_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, window)
+        )
+    """)
+    for statement in SIGNAL_VALUE_INDEXES:
+        conn.execute(statement)
+
+    backfilled = 0
+    for row in conn.execute("SELECT user_id, window, signals FROM user_signals").fetchall():
+        try:
+            signals = json.loads(row['signals'])
+        except (TypeError, ValueError):
+            continue
+        conn.execute(_INSERT_SIGNAL_VALUES_SQL, _signal_value_row(row['user_id'], row['window'], signals))
+        backfilled += 1
+    conn.execute("""
+        UPDATE user_signal_values SET computed_at = (
+            SELECT s.computed_at FROM user_signals s
+            WHERE s.user_id = user_signal_values.user_id AND s.window = user_signal_values.window
+        )
+    """)
+    logger.info(f"Applied migration: Created user_signal_values ({backfilled} rows backfilled)")
+
+def run_signal_values_migration(db_path: str = "db/spend_sense.db"):
+    """Create or extend user_signal_values on db_path outside the versioned migrations."""
+    try:
+        with database_transaction(db_path) as conn:
+            _migrate_signal_values(conn)
+    except Exception as e:
+        logger.warning(f"Signal values migration failed (may already be applied): {e}")
+    finally:
+        invalidate_schema_cache(db_path)
+
+def _migrate_signal_run_stats(conn: sqlite3.Connection):
+    """Create the signal_run_stats table if it doesn't exist."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS signal_run_stats (
+            run_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            mode TEXT,
+            windows TEXT,
+            calls INTEGER NOT NULL,
+            rows INTEGER NOT NULL,
+            total_ms REAL NOT NULL,
+            p50_ms REAL NOT NULL,
+            p95_ms REAL NOT NULL,
+            max_ms REAL NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (run_id, stage)
+        )
+    """)
+    logger.debug("Signal run stats migration applied")
+
+def _migrate_jobs(conn: sqlite3.Connection):
+    """Create the jobs table if it doesn't exist."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            job_type TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            params JSON,
+            users_total INTEGER,
+            users_done INTEGER NOT NULL DEFAULT 0,
+            error_count INTEGER NOT NULL DEFAULT 0,
+            users_per_second REAL,
+            error_message TEXT,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+    logger.debug("Jobs migration applied")
+
+def _migrate_job_owner(conn: sqlite3.Connection):
+    """Add the owner_pid column to jobs if missing."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)").fetchall()]
+    if columns and 'owner_pid' not in columns:
+        conn.execute("ALTER TABLE jobs ADD COLUMN owner_pid INTEGER")
+        logger.info("Applied migration: Added owner_pid column to jobs table")
+
+def _migrate_job_owner_identity(conn: sqlite3.Connection):
+    """Add the owner_identity column to jobs if missing."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)").fetchall()]
+    if columns and 'owner_identity' not in columns:
+        conn.execute("ALTER TABLE jobs ADD COLUMN owner_identity TEXT")
+        logger.info("Applied migration: Added owner_identity column to jobs table")
+
+# Operator queue listings, newest first: by approval status and unfiltered
+RECOMMENDATION_QUEUE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_recommendations_approval ON recommendations(approved, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_recommendations_created ON recommendations(created_at)",
+]
+
+def _migrate_recommendation_queue_indexes(conn: sqlite3.Connection):
+    """Index recommendations for the operator approval queue."""
+    for statement in RECOMMENDATION_QUEUE_INDEXES:
+        conn.execute(statement)
+    logger.debug("Recommendation queue indexes migration applied")
+
+# Versioned schema migrations, applied in order by migrate_db: (version, name,
+# migration(conn)). Append new entries with the next version and never edit or
+# renumber one that has shipped. Migrations still check before they change
+# anything, since databases from before schema_version have an unknown subset applied
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, 'demographics', _migrate_demographics),
+    (2, 'decision_trace', _migrate_decision_trace),
+    (3, 'change_tracking', _migrate_change_tracking),
+    (4, 'daily_aggregates', _migrate_daily_aggregates),
+    (5, 'txn_class', _migrate_txn_class),
+    (6, 'signal_values', _migrate_signal_values),
+    (7, 'signal_run_stats', _migrate_signal_run_stats),
+    (8, 'jobs', _migrate_jobs),
+    (9, 'recommendation_queue_indexes', _migrate_recommendation_queue_indexes),
+    (10, 'change_tracking_deletes', _migrate_change_tracking_deletes),
+    (11, 'txn_class_reset', _migrate_txn_class_reset),
+    (12, 'job_owner', _migrate_job_owner),
+    (13, 'job_owner_identity', _migrate_job_owner_identity),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+_SCHEMA_VERSION_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Serializes migrate_db within a process; BEGIN IMMEDIATE serializes it across processes
+_migration_lock = threading.Lock()
+
+def _read_schema_version(conn: sqlite3.Connection) -> Optional[int]:
+    """Highest applied migration, or None if the database has no schema_version table."""
+    try:
+        # MAX over the INTEGER PRIMARY KEY is a single b-tree lookup
+        return conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        return None
+
+def get_schema_version(db_path: str = "db/spend_sense.db", refresh: bool = False) -> Optional[int]:
+    """Applied schema version of db_path (None if it has no schema_version table).
+
+    The version is read once and cached until invalidate_schema_cache(db_path)
+    or refresh=True.
+    """
+    key = _schema_cache_key(db_path)
+    if refresh or key not in _schema_versions:
+        with database_read(db_path) as conn:
+            _schema_versions[key] = _read_schema_version(conn)
+    return _schema_versions[key]
+
+def migrate_db(db_path: str = "db/spend_sense.db") -> int:
+    """Apply pending MIGRATIONS to db_path in order and record each in schema_version.
+
+    All pending migrations run in one write transaction under a process-wide
+    lock, and the version is re-read inside it, so concurrent callers apply
+    each migration once. A failing migration rolls the whole run back.
+
+    Returns:
+        Number of migrations applied
+    """
+    with _migration_lock:
+        if get_schema_version(db_path) == SCHEMA_VERSION:
+            return 0
+        try:
+            with database_transaction(db_path) as conn:
+                conn.execute(_SCHEMA_VERSION_TABLE_SQL)
+                version = _read_schema_version(conn)
+                applied = 0
+                for number, name, migration in MIGRATIONS:
+                    if number <= version:
+                        continue
+                    migration(conn)
+                    conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (number, name))
+                    logger.info(f"Applied schema migration {number}: {name}")
+                    applied += 1
+        except Exception as e:
+            raise DatabaseError("migration", str(e))
+        finally:
+            invalidate_schema_cache(db_path)
+
+        _schema_versions[_schema_cache_key(db_path)] = SCHEMA_VERSION
+        return applied
+
+def _has_base_schema(db_path: str) -> bool:
+    """Whether db_path holds the tables schema.sql creates (it may predate schema_version)."""
+    with database_read(db_path) as conn:
+        return conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'").fetchone() is not None
+
+def ensure_schema_current(db_path: str = "db/spend_sense.db") -> int:
+    """Bring an initialized database up to SCHEMA_VERSION; called by every entry point on startup.
+
+    A missing or empty database is left alone: migrating it would record it as
+    current without the tables schema.sql creates, so initialize_db would then
+    skip them.
+
+    Returns:
+        Number of migrations applied
+    """
+    if db_path != ":memory:" and not Path(db_path).exists():
+        return 0
+    # Re-read: another process (a loader, an older deploy) may have changed the file
+    if get_schema_version(db_path, refresh=True) is None and not _has_base_schema(db_path):
+        return 0
+    return migrate_db(db_path)
 
 def initialize_db(schema_path: str = "db/schema.sql", db_path: str = "db/spend_sense.db", force: bool = False):
     """Initialize database from schema file.
-    
+
+    An existing database is brought up to SCHEMA_VERSION by migrate_db instead;
+    once it is current that costs one read of schema_version.
+
     Args:
         schema_path: Path to schema SQL file
         db_path: Path to database file
-        force: If True, drop existing tables and recreate. If False, skip if tables exist.
+        force: If True, drop existing tables and recreate. If False, only migrate if tables exist.
     """
     try:
         if not Path(schema_path).exists():
             raise DatabaseError("initialization", f"Schema file not found: {schema_path}")
-        
-        with database_transaction(db_path) as conn:
-            # Check if database is already initialized
-            if not force:
-                try:
-                    result = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'").fetchone()
-                    if result:
-                        logger.info(f"Database already initialized: {db_path} (use force=True to reinitialize)")
-                        # Run migrations for existing databases
-                        run_demographic_migration(db_path)
-                        run_decision_trace_migration(db_path)
-                        return
-                except sqlite3.Error:
-                    pass  # Table doesn't exist, proceed with initialization
-            
-            # If force=True, drop existing tables
-            if force:
-                logger.info("Dropping existing tables...")
-                conn.execute("DROP TABLE IF EXISTS recommendations")
-                conn.execute("DROP TABLE IF EXISTS persona_assignments")
-                conn.execute("DROP TABLE IF EXISTS user_signals")
-                conn.execute("DROP TABLE IF EXISTS liabilities")
-                conn.execute("DROP TABLE IF EXISTS transactions")
-                conn.execute("DROP TABLE IF EXISTS accounts")
-                conn.execute("DROP TABLE IF EXISTS users")
-            
-            # Create tables from schema
-            with open(schema_path) as f:
-                schema_sql = f.read()
-            conn.executescript(schema_sql)
-        
+
+        if not force:
+            # Always re-read: the file may have been replaced since the version was cached
+            version = get_schema_version(db_path, refresh=True)
+            if version is None and _has_base_schema(db_path):
+                # Databases from before schema_version have tables but no version yet
+                version = 0
+            if version is not None:
+                applied = migrate_db(db_path)
+                logger.info(f"Database already initialized: {db_path} "
+                            f"(schema version {SCHEMA_VERSION}, {applied} migrations applied; "
+                            f"use force=True to reinitialize)")
+                return
+
+        try:
+            with database_transaction(db_path) as conn:
+                # If force=True, drop existing tables
+                if force:
+                    logger.info("Dropping existing tables...")
+                    conn.execute("DROP TABLE IF EXISTS schema_version")
+                    conn.execute("DROP TABLE IF EXISTS jobs")
+                    conn.execute("DROP TABLE IF EXISTS signal_run_stats")
+                    conn.execute("DROP TABLE IF EXISTS user_daily_aggregates")
+                    conn.execute("DROP TABLE IF EXISTS signal_watermarks")
+                    conn.execute("DROP TABLE IF EXISTS signal_change_log")
+                    conn.execute("DROP TABLE IF EXISTS recommendations")
+                    conn.execute("DROP TABLE IF EXISTS persona_assignments")
+                    conn.execute("DROP TABLE IF EXISTS user_signal_values")
+                    conn.execute("DROP TABLE IF EXISTS user_signals")
+                    conn.execute("DROP TABLE IF EXISTS liabilities")
+                    conn.execute("DROP TABLE IF EXISTS transactions")
+                    conn.execute("DROP TABLE IF EXISTS accounts")
+                    conn.execute("DROP TABLE IF EXISTS users")
+
+                # Create tables from schema
+                with open(schema_path) as f:
+                    schema_sql = f.read()
+                conn.executescript(schema_sql)
+                # schema.sql is the latest schema, so every migration counts as applied
+                conn.execute(_SCHEMA_VERSION_TABLE_SQL)
+                conn.executemany("INSERT OR IGNORE INTO schema_version (version, name) VALUES (?, ?)",
+                                 [(number, name) for number, name, _ in MIGRATIONS])
+        finally:
+            invalidate_schema_cache(db_path)
+        _schema_versions[_schema_cache_key(db_path)] = SCHEMA_VERSION
+
         logger.info(f"Database initialized successfully: {db_path}")
-        
+
     except Exception as e:
         raise DatabaseError("initialization", str(e))
 
+def _json_default(obj):
+    """JSON serializer for objects not serializable by default json code"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+# Shared encoder so batch writes don't rebuild one per row
+_signals_encoder = json.JSONEncoder(default=_json_default)
+
+# Rows written per transaction by save_user_signals_bulk
+SIGNALS_BATCH_SIZE = 500
+
 def save_user_signals(user_id: str, window: str, signals: Dict[str, Any], db_path: str = "db/spend_sense.db"):
     """Save computed signals to database."""
     try:
-        # Handle datetime serialization
-        def json_serializer(obj):
-            """JSON serializer for objects not serializable by default json code"""
-            from datetime import datetime
-            if isinstance(obj, datetime):
-                return obj.isoformat()
-            raise TypeError(f"Type {type(obj)} not serializable")
-        
-        # Serialize signals with datetime handling
-        signals_json = json.dumps(signals, default=json_serializer)
+        signals_json = _signals_encoder.encode(signals)
         
         with database_transaction(db_path) as conn:
             conn.execute("""
                 INSERT OR REPLACE INTO user_signals (user_id, window, signals)
                 VALUES (?, ?, ?)
             """, (user_id, window, signals_json))
+            conn.execute(_INSERT_SIGNAL_VALUES_SQL, _signal_value_row(user_id, window, signals))
         
         logger.debug(f"Saved signals for user {user_id}, window {window}")
         
     except Exception as e:
         raise DatabaseError("save_signals", str(e))
 
+def save_user_signals_bulk(rows: Iterable[Tuple[str, str, Dict[str, Any]]], db_path: str = "db/spend_sense.db",
+                           batch_size: int = SIGNALS_BATCH_SIZE) -> int:
+    """Save many (user_id, window, signals) rows in batched transactions.
+
+    Rows are written with executemany, committing every batch_size rows, so a
+    failure only rolls back the batch in progress.
+
+    Returns:
+        Number of rows written
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    written = 0
+    try:
+        batch = []
+        for user_id, window, signals in rows:
+            batch.append(((user_id, window, _signals_encoder.encode(signals)),
+                          _signal_value_row(user_id, window, signals)))
+            if len(batch) >= batch_size:
+                written += _write_signal_batch(batch, db_path)
+                batch = []
+        if batch:
+            written += _write_signal_batch(batch, db_path)
+
+        logger.debug(f"Saved {written} user_signals rows")
+        return written
+
+    except Exception as e:
+        raise DatabaseError("save_signals_bulk", f"{e} ({written} rows committed)")
+
+def _write_signal_batch(batch: List[Tuple[Tuple, Tuple]], db_path: str) -> int:
+    """Write one batch of (blob row, typed row) pairs in its own transaction."""
+    with database_transaction(db_path) as conn:
+        conn.executemany("""
+            INSERT OR REPLACE INTO user_signals (user_id, window, signals)
+            VALUES (?, ?, ?)
+        """, [blob_row for blob_row, _ in batch])
+        conn.executemany(_INSERT_SIGNAL_VALUES_SQL, [value_row for _, value_row in batch])
+    return len(batch)
+
+def save_signal_run_stats(run_id: str, stats: Dict[str, Dict[str, Any]], db_path: str = "db/spend_sense.db",
+                          mode: Optional[str] = None, windows: Optional[str] = None) -> int:
+    """Save one signal_run_stats row per stage of a run (stats as produced by StageTimer.summary())."""
+    try:
+        with database_transaction(db_path) as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO signal_run_stats
+                    (run_id, stage, mode, windows, calls, rows, total_ms, p50_ms, p95_ms, max_ms)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (run_id, stage, mode, windows, values['calls'], values['rows'], values['total_ms'],
+                 values['p50_ms'], values['p95_ms'], values['max_ms'])
+                for stage, values in stats.items()
+            ])
+        return len(stats)
+
+    except Exception as e:
+        raise DatabaseError("save_run_stats", str(e))
+
+# Per-request signal lookup; src/db/hot_queries.py checks its query plan
+USER_SIGNALS_SQL = "SELECT signals FROM user_signals WHERE user_id = :user_id AND window = :window"
+
 def get_user_signals(user_id: str, window: str, db_path: str = "db/spend_sense.db") -> Optional[Dict[str, Any]]:
     """Retrieve user signals from database."""
     try:
-        with database_transaction(db_path) as conn:
-            result = conn.execute("""
-                SELECT signals FROM user_signals 
-                WHERE user_id = ? AND window = ?
-            """, (user_id, window)).fetchone()
+        with database_read(db_path) as conn:
+            result = conn.execute(USER_SIGNALS_SQL, {'user_id': user_id, 'window': window}).fetchone()
         
         if result:
             return json.loads(result['signals'])
@@ -0,0 +1,173 @@
+"""
+Hot SQL statements and the query plans they must keep
+Each entry takes its statement from the module that runs it (module-level
+constants with named parameters), so a change to the SQL on a request or
+pipeline hot path is checked here too, and lists the indexes its EXPLAIN
+QUERY PLAN has to use. tests/test_query_plans.py checks every entry against a
+populated database, and benchmarks/query_plans.py times them at 1M rows
+"""
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Tuple
+
+from scripts.compute_signals import (
+    BASE_TRANSACTION_COLUMNS, CHUNK_CURSOR_CLAUSE, TRANSACTION_CHUNK_SQL, TRANSACTIONS_SQL, USER_ACCOUNTS_SQL,
+    USER_LIABILITIES_SQL, USER_WINDOW_CLAUSE
+)
+from scripts.load_data import (
+    INVALID_LIABILITY_ACCOUNTS_SQL, INVALID_TRANSACTION_ACCOUNTS_SQL, ORPHANED_ACCOUNTS_SQL,
+    ORPHANED_TRANSACTIONS_SQL
+)
+from src.api.routes import APPROVAL_QUEUE_SQL, APPROVAL_STATUS_FILTERS, FEEDBACK_SOURCE_SQL
+from src.db.connection import USER_SIGNALS_SQL
+from src.features.daily_aggregates import CHANGED_USERS_SQL
+from src.guardrails.guardrails import CONSENT_CHECK_SQL, RATE_LIMIT_COUNT_SQL
+from src.recommend.recommendation_engine import RECENTLY_VIEWED_CONTENT_SQL
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    """A hot statement and the plan it must keep."""
+    name: str
+    source: str  # Where the statement runs
+    sql: str  # Named parameters, filled from a sample-values mapping
+    uses: Tuple[str, ...]  # Index names (or plan fragments) that must appear in the plan
+    full_scans: Tuple[str, ...] = ()  # Tables the statement is allowed to read in full
+
+
+# Transaction reads pick their projection per schema; it doesn't change the plan
+_TRANSACTION_PROJECTION = ", ".join(BASE_TRANSACTION_COLUMNS)
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery(
+        name='consent_check',
+        source='src/guardrails/guardrails.py:Guardrails.check_consent',
+        sql=CONSENT_CHECK_SQL,
+        uses=('sqlite_autoindex_users_1',),
+    ),
+    HotQuery(
+        name='rate_limit_count',
+        source='src/guardrails/guardrails.py:Guardrails.check_rate_limit',
+        sql=RATE_LIMIT_COUNT_SQL,
+        uses=('idx_recommendations_user_created',),
+    ),
+    HotQuery(
+        name='recently_viewed_content',
+        source='src/recommend/recommendation_engine.py:RecommendationEngine._get_recent_content_ids',
+        sql=RECENTLY_VIEWED_CONTENT_SQL,
+        uses=('idx_recommendations_user_created',),
+    ),
+    HotQuery(
+        name='operator_queue_pending',
+        source='src/api/routes.py:get_approval_queue',
+        sql=APPROVAL_QUEUE_SQL.format(where_clause=APPROVAL_STATUS_FILTERS['pending']),
+        uses=('idx_recommendations_approval',),
+    ),
+    HotQuery(
+        name='operator_queue_all',
+        source='src/api/routes.py:get_approval_queue',
+        sql=APPROVAL_QUEUE_SQL.format(where_clause=""),
+        uses=('idx_recommendations_created',),
+    ),
+    HotQuery(
+        # The SELECT half of RECORD_FEEDBACK_SQL: read-only, so it can be timed too
+        name='feedback_source',
+        source='src/api/routes.py:record_feedback',
+        sql=FEEDBACK_SOURCE_SQL,
+        uses=('sqlite_autoindex_recommendations_1',),
+    ),
+    HotQuery(
+        name='user_signals_lookup',
+        source='src/db/connection.py:get_user_signals',
+        sql=USER_SIGNALS_SQL,
+        uses=('sqlite_autoindex_user_signals_1',),
+    ),
+    HotQuery(
+        name='user_transactions_window',
+        source='scripts/compute_signals.py:compute_user_signals',
+        sql=TRANSACTIONS_SQL.format(projection=_TRANSACTION_PROJECTION, where_clause=USER_WINDOW_CLAUSE),
+        uses=('idx_transactions_user_date',),
+    ),
+    HotQuery(
+        name='user_accounts',
+        source='scripts/compute_signals.py:compute_user_signals',
+        sql=USER_ACCOUNTS_SQL,
+        uses=('idx_accounts_user_type',),
+    ),
+    HotQuery(
+        name='user_liabilities',
+        source='scripts/compute_signals.py:compute_user_signals',
+        sql=USER_LIABILITIES_SQL,
+        uses=('sqlite_autoindex_liabilities_1', 'idx_accounts_user_type'),
+    ),
+    HotQuery(
+        name='transaction_chunk',
+        source='scripts/compute_signals.py:_read_transaction_chunk',
+        sql=TRANSACTION_CHUNK_SQL.format(projection=_TRANSACTION_PROJECTION, cursor_clause=CHUNK_CURSOR_CLAUSE),
+        uses=('idx_transactions_user_date',),
+    ),
+    HotQuery(
+        name='changed_users',
+        source='src/features/daily_aggregates.py:refresh_changed_daily_aggregates',
+        sql=CHANGED_USERS_SQL,
+        uses=('INTEGER PRIMARY KEY',),
+    ),
+    HotQuery(
+        name='orphaned_accounts',
+        source='scripts/load_data.py:validate_data_integrity',
+        sql=ORPHANED_ACCOUNTS_SQL,
+        uses=('sqlite_autoindex_users_1',),
+    ),
+    HotQuery(
+        name='orphaned_transactions',
+        source='scripts/load_data.py:validate_data_integrity',
+        sql=ORPHANED_TRANSACTIONS_SQL,
+        uses=('sqlite_autoindex_users_1',),
+    ),
+    HotQuery(
+        name='invalid_transaction_accounts',
+        source='scripts/load_data.py:validate_data_integrity',
+        sql=INVALID_TRANSACTION_ACCOUNTS_SQL,
+        uses=('sqlite_autoindex_accounts_1',),
+        # Nothing else reads transactions by account_id, so it gets no index of its own
+        full_scans=('transactions',),
+    ),
+    HotQuery(
+        name='invalid_liability_accounts',
+        source='scripts/load_data.py:validate_data_integrity',
+        sql=INVALID_LIABILITY_ACCOUNTS_SQL,
+        uses=('sqlite_autoindex_accounts_1',),
+    ),
+]
+
+# "SCAN t" without "USING ..." reads the whole table (older SQLite prints "SCAN TABLE t")
+_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+
+
+def explain_query_plan(conn: sqlite3.Connection, query: HotQuery, params: Mapping[str, Any]) -> List[str]:
+    """The detail column of EXPLAIN QUERY PLAN for query, one line per plan step."""
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query.sql}", params)]
+
+
+def plan_problems(query: HotQuery, plan: List[str]) -> List[str]:
+    """Ways plan falls short of what query expects (empty when it's fine)."""
+    problems = [f"does not use {expected}" for expected in query.uses
+                if not any(expected in step for step in plan)]
+    for step in plan:
+        scan = _FULL_SCAN.match(step)
+        if scan and scan.group(1) not in query.full_scans:
+            problems.append(f"scans all of {scan.group(1)}")
+        if 'USE TEMP B-TREE FOR ORDER BY' in step:
+            problems.append("sorts its result instead of reading it in index order")
+    return problems
+
+
+def check_query_plans(conn: sqlite3.Connection, params: Mapping[str, Any]) -> Dict[str, List[str]]:
+    """plan_problems for every HOT_QUERIES entry, keyed by name; only entries with problems are listed."""
+    report = {}
+    for query in HOT_QUERIES:
+        problems = plan_problems(query, explain_query_plan(conn, query, params))
+        if problems:
+            report[query.name] = problems
+    return report
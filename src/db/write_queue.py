@@ -0,0 +1,196 @@
+"""
+Group-commit write queue
+Small writes from many callers are handed to one writer thread per database,
+which applies everything that queued up in one transaction and acknowledges
+each write once that transaction has committed
+"""
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Sequence, Union
+
+from loguru import logger
+
+from src.db.connection import DatabaseError, database_transaction
+
+WRITE_BATCH_SIZE = int(os.getenv("SPENDSENSE_WRITE_BATCH_SIZE", "256"))  # Max writes per group commit
+WRITE_BATCH_DELAY_MS = float(os.getenv("SPENDSENSE_WRITE_BATCH_DELAY_MS", "5"))  # Max wait for a batch to fill
+# A batch is committed early once no new write has arrived for this long
+WRITE_IDLE_GAP_MS = float(os.getenv("SPENDSENSE_WRITE_IDLE_GAP_MS", "0.1"))
+
+# A queued write: called with the writer's connection inside the batch transaction
+WriteOperation = Callable[[sqlite3.Connection], Any]
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Single writer thread that applies queued writes as group commits.
+
+    The writer takes the first queued write, then keeps collecting until
+    max_batch writes are queued, max_delay_ms has passed, or no write has
+    arrived for idle_gap_ms, and runs them all in one database_transaction.
+    Writes submitted while a batch commits wait for the next one, so batches
+    grow with load without delaying a lone write. Each write runs inside its
+    own savepoint, so a failing write is rolled back and reported on its own
+    future without failing the rest of the batch. Futures resolve only after
+    the commit, so a completed future means the write is durable.
+    """
+
+    def __init__(self, db_path: str, max_batch: int = WRITE_BATCH_SIZE,
+                 max_delay_ms: float = WRITE_BATCH_DELAY_MS, idle_gap_ms: float = WRITE_IDLE_GAP_MS):
+        self.db_path = db_path
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay_ms / 1000
+        self.idle_gap = idle_gap_ms / 1000
+        self.pid = os.getpid()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._metrics = {'writes': 0, 'failed_writes': 0, 'batches': 0, 'failed_batches': 0,
+                         'max_batch': 0, 'commit_ms': 0.0}
+        self._thread = threading.Thread(target=self._run, name='spendsense-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, operation: WriteOperation) -> Future:
+        """Queue operation(conn); the future resolves to its return value once committed."""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise DatabaseError("write_queue", f"Write queue for {self.db_path} is closed")
+            self._queue.put((future, operation))
+        return future
+
+    def execute(self, sql: str, params: Union[Sequence, Mapping[str, Any]] = ()) -> Future:
+        """Queue one statement; the future resolves to its rowcount."""
+        return self.submit(lambda conn: conn.execute(sql, params).rowcount)
+
+    def executemany(self, sql: str, rows: Iterable[Sequence]) -> Future:
+        """Queue one statement over many rows, applied atomically; resolves to the rowcount."""
+        rows = list(rows)
+        return self.submit(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    def flush(self, timeout: Optional[float] = None):
+        """Block until everything queued so far has been committed."""
+        self.submit(lambda conn: None).result(timeout=timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Commit what is queued, then stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Write and batch counters, average batch size and current queue depth."""
+        with self._lock:
+            batches = self._metrics['batches']
+            return {
+                **self._metrics,
+                'avg_batch': self._metrics['writes'] / batches if batches else 0.0,
+                'queued': self._queue.qsize(),
+            }
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = min(deadline - time.monotonic(), self.idle_gap)
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch):
+        outcomes = []
+        start = time.perf_counter()
+        try:
+            with database_transaction(self.db_path) as conn:
+                for future, operation in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    conn.execute("SAVEPOINT queued_write")
+                    try:
+                        outcomes.append((future, operation(conn), None))
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO queued_write")
+                        if isinstance(e, sqlite3.Error):
+                            e = DatabaseError("write", str(e))
+                        outcomes.append((future, None, e))
+                    conn.execute("RELEASE queued_write")
+        except Exception as e:
+            # The commit failed, so nothing in the batch was written
+            logger.error(f"Group commit of {len(batch)} writes failed: {e}")
+            error = e if isinstance(e, DatabaseError) else DatabaseError("write", str(e))
+            with self._lock:
+                self._metrics['failed_batches'] += 1
+                self._metrics['failed_writes'] += len(batch)
+            for future, _ in batch:
+                if future.running():
+                    future.set_exception(error)
+            return
+
+        with self._lock:
+            self._metrics['batches'] += 1
+            self._metrics['writes'] += len(outcomes)
+            self._metrics['failed_writes'] += sum(1 for _, _, error in outcomes if error)
+            self._metrics['max_batch'] = max(self._metrics['max_batch'], len(outcomes))
+            self._metrics['commit_ms'] += (time.perf_counter() - start) * 1000
+        for future, result, error in outcomes:
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+_queues: Dict[str, WriteQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_write_queue(db_path: str = "db/spend_sense.db") -> WriteQueue:
+    """The write queue for db_path, started on first use."""
+    key = str(Path(db_path).resolve())
+    with _queues_lock:
+        write_queue = _queues.get(key)
+        # The writer thread does not survive a fork
+        if write_queue is None or write_queue.pid != os.getpid():
+            write_queue = _queues[key] = WriteQueue(db_path)
+        return write_queue
+
+
+def get_write_queue_stats() -> Dict[str, Dict[str, Any]]:
+    """stats() of every write queue in this process, keyed by database path."""
+    with _queues_lock:
+        queues = [write_queue for write_queue in _queues.values() if write_queue.pid == os.getpid()]
+    return {write_queue.db_path: write_queue.stats() for write_queue in queues}
+
+
+def close_write_queues():
+    """Commit pending writes and stop every writer thread."""
+    with _queues_lock:
+        queues = list(_queues.values())
+        _queues.clear()
+    for write_queue in queues:
+        if write_queue.pid == os.getpid():
+            write_queue.close()
+
+
+# Queued writes have been promised to callers; commit them before the interpreter exits
+atexit.register(close_write_queues)
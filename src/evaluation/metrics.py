@@ -9,7 +9,7 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from loguru import logger
 
-from src.db.connection import database_transaction
+from src.db.connection import database_read
 from src.features.schema import UserSignals
 from src.recommend.content_schema import load_content_catalog
 from src.personas.persona_classifier import classify_persona
@@ -114,7 +114,7 @@ class RecommendationEvaluator:
     
     def _get_users_data(self) -> pd.DataFrame:
         """Get user data for evaluation."""
-        with database_transaction(self.db_path) as conn:
+        with database_read(self.db_path) as conn:
             return pd.read_sql_query("""
                 SELECT user_id, consent_status
                 FROM users
@@ -124,7 +124,7 @@ class RecommendationEvaluator:
         """Get recent recommendations data."""
         cutoff_date = datetime.now() - timedelta(days=window_days)
         
-        with database_transaction(self.db_path) as conn:
+        with database_read(self.db_path) as conn:
             return pd.read_sql_query("""
                 SELECT 
                     r.rec_id,
@@ -140,7 +140,7 @@ class RecommendationEvaluator:
     
     def _get_signals_data(self) -> pd.DataFrame:
         """Get user signals data."""
-        with database_transaction(self.db_path) as conn:
+        with database_read(self.db_path) as conn:
             return pd.read_sql_query("""
                 SELECT 
                     user_id, signals, window, computed_at
@@ -501,7 +501,7 @@ def calculate_aggregate_relevance() -> dict:
         
         catalog = load_content_catalog("data/content/catalog.json")
         
-        with database_transaction() as conn:
+        with database_read() as conn:
             # Get all recommendations with user signals
             results = conn.execute("""
                 SELECT 
@@ -591,22 +591,15 @@ def calculate_fairness_metrics() -> dict:
         Dictionary with fairness metrics
     """
     try:
-        from src.db.connection import database_transaction
+        from src.db.connection import database_read, get_table_columns
         
-        with database_transaction() as conn:
+        with database_read() as conn:
             # Check if users table has demographic columns
             # In MVP, we may not have demographics - check schema
-            schema_info = conn.execute("""
-                SELECT sql FROM sqlite_master 
-                WHERE type='table' AND name='users'
-            """).fetchone()
-            
-            has_demographics = False
-            if schema_info and schema_info[0]:
-                sql = schema_info[0].lower()
-                has_demographics = any(
-                    col in sql for col in ['age', 'gender', 'income_level', 'location', 'demographic_group']
-                )
+            user_columns = get_table_columns('users', conn=conn)
+            has_demographics = any(
+                col in user_columns for col in ['age', 'gender', 'income_level', 'location', 'demographic_group']
+            )
             
             if not has_demographics:
                 return {
@@ -2,10 +2,35 @@
 Bank fee signal detection
 Detects overdraft fees, ATM fees, maintenance fees from transactions
 """
+import numpy as np
 import pandas as pd
 from typing import Dict
 from loguru import logger
 
+from src.features.transaction_classes import (
+    CLASS_FEE, CLASS_FEE_ATM, CLASS_FEE_MAINTENANCE, CLASS_FEE_OVERDRAFT, has_class, transaction_classes
+)
+
+_NO_FEES = {
+    'monthly_bank_fees': 0.0,
+    'bank_fee_count': 0,
+    'has_overdraft_fees': False,
+    'has_atm_fees': False,
+    'has_maintenance_fees': False
+}
+
+def _fee_signals(fee_count: int, fee_total: float, fee_class_bits: int, window_days: int) -> Dict:
+    """Build bank fee signals from a user's fee count, total and OR-ed class bits."""
+    months_in_window = window_days / 30.0
+    monthly_fees = abs(fee_total) / months_in_window if months_in_window > 0 else 0.0
+    return {
+        'monthly_bank_fees': round(monthly_fees, 2),
+        'bank_fee_count': int(fee_count),
+        'has_overdraft_fees': bool(fee_class_bits & CLASS_FEE_OVERDRAFT),
+        'has_atm_fees': bool(fee_class_bits & CLASS_FEE_ATM),
+        'has_maintenance_fees': bool(fee_class_bits & CLASS_FEE_MAINTENANCE)
+    }
+
 def detect_bank_fees(transactions: pd.DataFrame, window_days: int = 180) -> Dict:
     """Detect bank fees from transaction data.
     
@@ -17,67 +42,49 @@ def detect_bank_fees(transactions: pd.DataFrame, window_days: int = 180) -> Dict
         Dictionary with bank fee signals
     """
     if transactions.empty:
-        return {
-            'monthly_bank_fees': 0.0,
-            'bank_fee_count': 0,
-            'has_overdraft_fees': False,
-            'has_atm_fees': False,
-            'has_maintenance_fees': False
-        }
-    
-    # Fee categories (adjust based on your transaction categories)
-    fee_keywords = {
-        'overdraft': ['overdraft', 'od fee', 'nsf', 'insufficient funds'],
-        'atm': ['atm fee', 'atm surcharge', 'atm withdrawal fee'],
-        'maintenance': ['maintenance fee', 'monthly fee', 'service charge', 'account fee']
-    }
-    
-    # Convert merchant_name and category to lowercase for matching
-    transactions_lower = transactions.copy()
-    transactions_lower['merchant_lower'] = transactions_lower['merchant_name'].str.lower().fillna('')
-    transactions_lower['category_lower'] = transactions_lower['category_primary'].str.lower().fillna('')
+        return dict(_NO_FEES)
     
-    # Detect fee transactions
-    fee_transactions = transactions_lower[
-        (transactions_lower['amount'] < 0) &  # Fees are negative
-        (
-            transactions_lower['category_primary'].isin(['Bank Fees', 'Service Charge', 'ATM Fee']) |
-            transactions_lower['merchant_lower'].str.contains('fee|charge|overdraft', case=False, na=False)
-        )
-    ]
+    # Fee rows and fee types come from the transaction class bits (no frame copies)
+    classes = transaction_classes(transactions)
+    fee_mask = has_class(classes, CLASS_FEE)
     
-    if fee_transactions.empty:
-        return {
-            'monthly_bank_fees': 0.0,
-            'bank_fee_count': 0,
-            'has_overdraft_fees': False,
-            'has_atm_fees': False,
-            'has_maintenance_fees': False
-        }
+    if not fee_mask.any():
+        return dict(_NO_FEES)
     
-    # Calculate monthly average
-    total_fees = abs(fee_transactions['amount'].sum())
-    months_in_window = window_days / 30.0
-    monthly_fees = total_fees / months_in_window if months_in_window > 0 else 0.0
+    fee_class_bits = int(np.bitwise_or.reduce(classes[fee_mask].to_numpy()))
+    return _fee_signals(fee_mask.sum(), transactions['amount'][fee_mask].sum(), fee_class_bits, window_days)
+
+def detect_bank_fees_by_user(transactions: pd.DataFrame, window_days: int = 180) -> Dict[str, Dict]:
+    """Detect bank fees for many users in one pass.
     
-    # Detect specific fee types
-    has_overdraft = fee_transactions['merchant_lower'].str.contains(
-        '|'.join(fee_keywords['overdraft']), case=False, na=False
-    ).any()
+    Args:
+        transactions: DataFrame with transaction data for many users (needs user_id)
+        window_days: Number of days in analysis window
+        
+    Returns:
+        Dictionary of user_id -> bank fee signals (users without fees are omitted)
+    """
+    if transactions.empty:
+        return {}
     
-    has_atm = fee_transactions['merchant_lower'].str.contains(
-        '|'.join(fee_keywords['atm']), case=False, na=False
-    ).any() or fee_transactions['category_lower'].str.contains('atm', case=False, na=False).any()
+    classes = transaction_classes(transactions)
+    fee_mask = has_class(classes, CLASS_FEE)
+    if not fee_mask.any():
+        return {}
     
-    has_maintenance = fee_transactions['merchant_lower'].str.contains(
-        '|'.join(fee_keywords['maintenance']), case=False, na=False
-    ).any()
+    fee_users = transactions['user_id'][fee_mask]
+    fee_classes = classes[fee_mask]
+    summary = pd.DataFrame({
+        'count': fee_classes.groupby(fee_users).size(),
+        'total': transactions['amount'][fee_mask].groupby(fee_users).sum(),
+        # OR of the fee type bits seen for each user
+        'bits': sum(
+            has_class(fee_classes, bit).groupby(fee_users).any() * bit
+            for bit in (CLASS_FEE_OVERDRAFT, CLASS_FEE_ATM, CLASS_FEE_MAINTENANCE)
+        ),
+    })
     
     return {
-        'monthly_bank_fees': round(monthly_fees, 2),
-        'bank_fee_count': len(fee_transactions),
-        'has_overdraft_fees': bool(has_overdraft),
-        'has_atm_fees': bool(has_atm),
-        'has_maintenance_fees': bool(has_maintenance)
+        user_id: _fee_signals(count, total, int(bits), window_days)
+        for user_id, count, total, bits in zip(summary.index, summary['count'], summary['total'], summary['bits'])
     }
-
@@ -0,0 +1,72 @@
+"""
+Credit signal computation
+Computes utilization, interest and overdue signals for many users at once
+"""
+import pandas as pd
+from typing import Dict
+
+# Signals for users without liabilities
+CREDIT_DEFAULTS = {
+    'credit_utilization_max': None,
+    'has_interest_charges': False,
+    'is_overdue': False,
+    'minimum_payment_only': False
+}
+
+def compute_credit_signals_by_user(accounts: pd.DataFrame, liabilities: pd.DataFrame) -> Dict[str, Dict]:
+    """Compute credit signals for every user that has liabilities.
+
+    Liabilities are attributed to users by merging on account_id, and
+    utilization is the grouped max of balance / limit over credit card
+    accounts with a positive limit.
+
+    Args:
+        accounts: DataFrame with user_id, account_id, subtype, current_balance, credit_limit
+        liabilities: DataFrame with account_id, apr_percentage, is_overdue
+
+    Returns:
+        Dictionary of user_id -> credit signals (users without liabilities are omitted)
+    """
+    if liabilities.empty:
+        return {}
+
+    linked = liabilities.drop(columns='user_id', errors='ignore').merge(
+        accounts[['account_id', 'user_id']], on='account_id', how='inner'
+    )
+    if linked.empty:
+        return {}
+
+    if 'is_overdue' in linked.columns:
+        overdue = linked['is_overdue'].fillna(0).astype(bool)
+    else:
+        overdue = False
+    flags = pd.DataFrame({
+        'user_id': linked['user_id'],
+        'has_interest_charges': pd.to_numeric(linked['apr_percentage'], errors='coerce').gt(0),
+        'is_overdue': overdue,
+    }).groupby('user_id').any()
+
+    # Utilization over credit cards with a usable limit (missing balances count as 0)
+    credit_limit = pd.to_numeric(accounts['credit_limit'], errors='coerce')
+    balance = pd.to_numeric(accounts['current_balance'], errors='coerce').fillna(0)
+    eligible = (accounts['subtype'] == 'credit card') & (credit_limit > 0)
+    utilization = (balance[eligible] / credit_limit[eligible]).groupby(
+        accounts.loc[eligible, 'user_id']
+    ).max().rename('credit_utilization_max')
+
+    combined = flags.join(utilization, how='left')
+    utilization_values = combined['credit_utilization_max'].astype(object).where(
+        combined['credit_utilization_max'].notna(), None
+    )
+
+    return {
+        user_id: {
+            'credit_utilization_max': float(max_util) if max_util is not None else None,
+            'has_interest_charges': bool(has_interest),
+            'is_overdue': bool(is_overdue),
+            'minimum_payment_only': False  # Simplified - would need payment history
+        }
+        for user_id, max_util, has_interest, is_overdue in zip(
+            combined.index, utilization_values, combined['has_interest_charges'], combined['is_overdue']
+        )
+    }
@@ -0,0 +1,276 @@
+"""
+Per-user daily transaction rollup
+Maintains user_daily_aggregates (one row per user, day and category class) and
+derives window signals from it instead of from raw transaction rows
+"""
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.features.fraud_detection import HIGH_RISK_FRAUD_TYPES, combine_fraud_risk_factors
+from src.features.subscriptions import subscription_signals_by_user
+from src.features.transaction_classes import (
+    CLASS_FEE, CLASS_FEE_ATM, CLASS_FEE_MAINTENANCE, CLASS_FEE_OVERDRAFT, CLASS_INCOME, CLASS_SAVINGS_DEPOSIT,
+    CLASS_SUBSCRIPTION, STORED_CLASS_SQL
+)
+
+_HIGH_RISK_SQL = ", ".join(f"'{t}'" for t in HIGH_RISK_FRAUD_TYPES)
+
+# Watermark key in signal_watermarks for change-log driven refreshes
+AGGREGATES_WATERMARK = 'daily_aggregates'
+
+# Users with change-log entries in (low, high]; src/db/hot_queries.py checks its query plan
+CHANGED_USERS_SQL = "SELECT DISTINCT user_id FROM signal_change_log WHERE change_id > :low AND change_id <= :high"
+
+# SQLite's default limit on host parameters is 999; stay well below it
+_IN_CLAUSE_CHUNK = 900
+
+
+# Optional transaction columns and the value used when a table lacks them
+# (e.g. after a loader replaced the table from a CSV without them)
+_OPTIONAL_COLUMNS = {'is_fraud': '0', 'status': 'NULL', 'transaction_type': 'NULL', 'txn_class': 'NULL'}
+
+
+def _rollup_select(where_clause: str, columns: Iterable[str]) -> str:
+    """SELECT producing user_daily_aggregates rows from raw transactions."""
+    columns = set(columns)
+    source = ", ".join(
+        ["t.*"] + [f"{default} AS {name}" for name, default in _OPTIONAL_COLUMNS.items() if name not in columns]
+    )
+    return f"""
+        SELECT
+            t.user_id,
+            date(t.date) AS day,
+            {STORED_CLASS_SQL} AS category_class,
+            COUNT(*) AS txn_count,
+            SUM(t.amount) AS amount_sum,
+            SUM(ABS(t.amount)) AS amount_abs_sum,
+            SUM(t.amount * t.amount) AS amount_sq_sum,
+            SUM(CASE WHEN t.amount < 0 THEN -t.amount ELSE 0 END) AS outflow_sum,
+            MIN(t.amount) AS amount_min,
+            MAX(t.amount) AS amount_max,
+            SUM(CASE WHEN t.is_fraud = 1 THEN 1 ELSE 0 END) AS fraud_count,
+            SUM(CASE WHEN t.is_fraud = 1 AND t.status = 'declined' THEN 1 ELSE 0 END) AS fraud_declined_count,
+            SUM(CASE WHEN t.is_fraud = 1 AND t.transaction_type IN ({_HIGH_RISK_SQL}) THEN 1 ELSE 0 END)
+                AS fraud_high_risk_count
+        FROM (SELECT {source} FROM transactions t) t
+        WHERE {where_clause}
+        GROUP BY t.user_id, day, category_class
+    """
+
+
+def _set_refresh_watermark(conn: sqlite3.Connection, change_id: int):
+    conn.execute("""
+        INSERT OR REPLACE INTO signal_watermarks (window, last_change_id, updated_at)
+        VALUES (?, ?, CURRENT_TIMESTAMP)
+    """, (AGGREGATES_WATERMARK, change_id))
+
+
+def refresh_daily_aggregates(conn: sqlite3.Connection, user_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Rebuild rollup rows for the given users (or everyone) from raw transactions.
+
+    A full rebuild reflects every logged change, so it also moves the
+    change-log refresh watermark up to the newest change.
+
+    Args:
+        conn: Connection inside a write transaction
+        user_ids: Users to refresh; None rebuilds the whole table
+
+    Returns:
+        Number of rollup rows written
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(transactions)")]
+
+    if user_ids is None:
+        conn.execute("DELETE FROM user_daily_aggregates")
+        cursor = conn.execute("INSERT INTO user_daily_aggregates " + _rollup_select("1", columns))
+        _set_refresh_watermark(conn, conn.execute(
+            "SELECT COALESCE(MAX(change_id), 0) FROM signal_change_log").fetchone()[0])
+        return cursor.rowcount
+
+    user_ids = list(user_ids)
+    written = 0
+    for start in range(0, len(user_ids), _IN_CLAUSE_CHUNK):
+        chunk = user_ids[start:start + _IN_CLAUSE_CHUNK]
+        placeholders = ", ".join("?" * len(chunk))
+        conn.execute(f"DELETE FROM user_daily_aggregates WHERE user_id IN ({placeholders})", chunk)
+        cursor = conn.execute(
+            "INSERT INTO user_daily_aggregates " + _rollup_select(f"t.user_id IN ({placeholders})", columns), chunk
+        )
+        written += cursor.rowcount
+    return written
+
+
+def refresh_changed_daily_aggregates(conn: sqlite3.Connection) -> int:
+    """
+    Refresh rollup rows for users in signal_change_log since the last refresh.
+
+    Returns:
+        Number of users refreshed
+    """
+    high_water = conn.execute("SELECT COALESCE(MAX(change_id), 0) FROM signal_change_log").fetchone()[0]
+    row = conn.execute(
+        "SELECT last_change_id FROM signal_watermarks WHERE window = ?", (AGGREGATES_WATERMARK,)
+    ).fetchone()
+    last_change_id = row[0] if row else 0
+
+    user_ids = [r[0] for r in conn.execute(CHANGED_USERS_SQL, {'low': last_change_id, 'high': high_water})]
+    if user_ids:
+        refresh_daily_aggregates(conn, user_ids)
+
+    _set_refresh_watermark(conn, high_water)
+    logger.debug(f"Refreshed daily aggregates for {len(user_ids)} users")
+    return len(user_ids)
+
+
+def load_window_aggregates(conn: sqlite3.Connection, cutoff_date,
+                           user_ids: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load rollup rows on or after cutoff_date for the given users (or everyone)."""
+    query = "SELECT * FROM user_daily_aggregates WHERE day >= ?"
+    if user_ids is None:
+        return pd.read_sql_query(query, conn, params=(str(cutoff_date),))
+
+    parts = []
+    for start in range(0, max(len(user_ids), 1), _IN_CLAUSE_CHUNK):
+        chunk = user_ids[start:start + _IN_CLAUSE_CHUNK]
+        placeholders = ", ".join("?" * len(chunk))
+        parts.append(pd.read_sql_query(
+            query + f" AND user_id IN ({placeholders})", conn, params=(str(cutoff_date), *chunk)
+        ))
+    return pd.concat(parts, ignore_index=True)
+
+
+def load_subscription_candidates(conn: sqlite3.Connection, cutoff_date,
+                                 user_ids: Optional[List[str]] = None) -> pd.DataFrame:
+    """Outflows and subscription-class rows on or after cutoff_date.
+
+    Recurring payment detection needs individual charges, so subscription
+    signals read these raw rows instead of the rollup.
+    """
+    query = f"""
+        SELECT t.user_id, t.merchant_name, t.category_primary, t.date, t.amount, {STORED_CLASS_SQL} AS txn_class
+        FROM transactions t
+        WHERE t.date >= ? AND (t.amount < 0 OR ({STORED_CLASS_SQL} & {CLASS_SUBSCRIPTION}) != 0) {{user_filter}}
+    """
+    if user_ids is None:
+        return pd.read_sql_query(query.format(user_filter=""), conn, params=(str(cutoff_date),))
+
+    parts = []
+    for start in range(0, max(len(user_ids), 1), _IN_CLAUSE_CHUNK):
+        chunk = user_ids[start:start + _IN_CLAUSE_CHUNK]
+        placeholders = ", ".join("?" * len(chunk))
+        parts.append(pd.read_sql_query(
+            query.format(user_filter=f"AND t.user_id IN ({placeholders})"), conn,
+            params=(str(cutoff_date), *chunk)
+        ))
+    return pd.concat(parts, ignore_index=True)
+
+
+def _rows_with(aggregates: pd.DataFrame, class_bit: int) -> pd.DataFrame:
+    return aggregates[(aggregates['category_class'] & class_bit) != 0]
+
+
+def aggregate_income_signals(aggregates: pd.DataFrame) -> Dict[str, dict]:
+    """Income pay gap and variability from income rollup rows."""
+    income = _rows_with(aggregates, CLASS_INCOME)
+    if income.empty:
+        return {}
+
+    stats = income.groupby('user_id').agg(
+        n=('txn_count', 'sum'), first=('day', 'min'), last=('day', 'max'),
+        total=('amount_sum', 'sum'), sq_total=('amount_sq_sum', 'sum'),
+    )
+    stats = stats[stats['n'] >= 2]
+    span_days = (pd.to_datetime(stats['last']) - pd.to_datetime(stats['first'])).dt.days
+    mean = stats['total'] / stats['n']
+    std = np.sqrt((stats['sq_total'] / stats['n'] - mean * mean).clip(lower=0.0))
+
+    return {
+        user_id: {
+            'income_pay_gap': int(days / (n - 1)),
+            'cash_flow_buffer': None,
+            'income_variability': float(user_std / user_mean) if user_mean > 0 else None
+        }
+        for user_id, n, days, user_mean, user_std in zip(stats.index, stats['n'], span_days, mean, std)
+    }
+
+
+def aggregate_subscription_signals(aggregates: pd.DataFrame, candidates: pd.DataFrame,
+                                   window_days: int) -> Dict[str, dict]:
+    """Subscription signals from raw candidate rows, with total spend from the rollup."""
+    total_spend = aggregates.groupby('user_id')['outflow_sum'].sum()
+    return subscription_signals_by_user(candidates, window_days, total_spend)
+
+
+def aggregate_savings_signals(aggregates: pd.DataFrame, window_days: int) -> Dict[str, dict]:
+    """Monthly savings inflow from savings deposit rollup rows."""
+    deposits = _rows_with(aggregates, CLASS_SAVINGS_DEPOSIT)
+    inflow = deposits.groupby('user_id')['amount_sum'].sum() / (window_days / 30.0)
+    return {
+        user_id: {
+            'savings_growth_rate': None,
+            'monthly_savings_inflow': float(value),
+            'emergency_fund_months': None
+        }
+        for user_id, value in inflow.items()
+    }
+
+
+def aggregate_bank_fee_signals(aggregates: pd.DataFrame, window_days: int) -> Dict[str, dict]:
+    """Bank fee totals and fee-type flags from fee rollup rows."""
+    fees = _rows_with(aggregates, CLASS_FEE)
+    if fees.empty:
+        return {}
+
+    months_in_window = window_days / 30.0
+    results = {}
+    for user_id, group in fees.groupby('user_id'):
+        classes = group['category_class']
+        total_fees = abs(group['amount_sum'].sum())
+        results[user_id] = {
+            'monthly_bank_fees': round(total_fees / months_in_window if months_in_window > 0 else 0.0, 2),
+            'bank_fee_count': int(group['txn_count'].sum()),
+            'has_overdraft_fees': bool(((classes & CLASS_FEE_OVERDRAFT) != 0).any()),
+            'has_atm_fees': bool(((classes & CLASS_FEE_ATM) != 0).any()),
+            'has_maintenance_fees': bool(((classes & CLASS_FEE_MAINTENANCE) != 0).any())
+        }
+    return results
+
+
+def aggregate_fraud_signals(aggregates: pd.DataFrame) -> Dict[str, dict]:
+    """Fraud count, rate and risk score from rollup fraud counters (the rollup has no geo velocity)."""
+    if aggregates.empty:
+        return {}
+
+    totals = aggregates.groupby('user_id')[
+        ['txn_count', 'fraud_count', 'fraud_declined_count', 'fraud_high_risk_count']
+    ].sum()
+
+    rates = (totals['fraud_count'] / totals['txn_count']).where(totals['txn_count'] > 0, 0.0)
+
+    results = {}
+    for user_id, fraud_count, fraud_rate, declined, high_risk in zip(
+        totals.index, totals['fraud_count'], rates, totals['fraud_declined_count'], totals['fraud_high_risk_count']
+    ):
+        fraud_count = int(fraud_count)
+        results[user_id] = {
+            'fraud_transaction_count': fraud_count,
+            'fraud_rate': float(fraud_rate),
+            'has_fraud_history': fraud_count > 0,
+            'fraud_risk_score': combine_fraud_risk_factors(fraud_count, float(fraud_rate),
+                                                           int(declined), int(high_risk))
+        }
+    return results
+
+
+def aggregate_activity(aggregates: pd.DataFrame) -> pd.DataFrame:
+    """Per-user transaction count and most recent day (for data quality)."""
+    if aggregates.empty:
+        return pd.DataFrame(columns=['count', 'most_recent'])
+    activity = aggregates.groupby('user_id').agg(count=('txn_count', 'sum'), most_recent=('day', 'max'))
+    activity['most_recent'] = pd.to_datetime(activity['most_recent'])
+    return activity
@@ -2,9 +2,18 @@
 Extract fraud-related signals from transactions
 """
 from typing import Dict, Any, Optional
+import numpy as np
 import pandas as pd
 from loguru import logger
 
+from src.features.geo_velocity import (
+    DATE_ONLY_RESOLUTION_HOURS, GEO_VELOCITY_DEFAULTS, geo_velocity_from_arrays, geo_velocity_signals,
+    geo_velocity_signals_by_user
+)
+
+# Fraud transaction types that raise the risk score
+HIGH_RISK_FRAUD_TYPES = ['transfer', 'refund']
+
 
 def extract_fraud_signals(transactions: pd.DataFrame) -> Dict[str, Any]:
     """
@@ -19,15 +28,20 @@ def extract_fraud_signals(transactions: pd.DataFrame) -> Dict[str, Any]:
         - fraud_rate: Fraction of transactions that are fraud
         - has_fraud_history: Boolean indicating if user has fraud
         - fraud_risk_score: Risk score (0.0-1.0) based on fraud patterns
+        - impossible_travel_count: Consecutive transactions too far apart to travel between
+        - geo_velocity_max: Highest implied travel speed (km/h), None without located pairs
     """
     if transactions.empty:
         return {
             'fraud_transaction_count': 0,
             'fraud_rate': 0.0,
             'has_fraud_history': False,
-            'fraud_risk_score': 0.0
+            'fraud_risk_score': 0.0,
+            **GEO_VELOCITY_DEFAULTS
         }
     
+    geo_signals = geo_velocity_signals(transactions)
+    
     # Check if is_fraud column exists
     if 'is_fraud' not in transactions.columns:
         logger.warning("is_fraud column not found in transactions, returning zero fraud signals")
@@ -35,7 +49,8 @@ def extract_fraud_signals(transactions: pd.DataFrame) -> Dict[str, Any]:
             'fraud_transaction_count': 0,
             'fraud_rate': 0.0,
             'has_fraud_history': False,
-            'fraud_risk_score': 0.0
+            'fraud_risk_score': 0.0,
+            **geo_signals
         }
     
     # Calculate basic fraud metrics
@@ -52,7 +67,8 @@ def extract_fraud_signals(transactions: pd.DataFrame) -> Dict[str, Any]:
         'fraud_transaction_count': fraud_count,
         'fraud_rate': fraud_rate,
         'has_fraud_history': has_fraud_history,
-        'fraud_risk_score': risk_score
+        'fraud_risk_score': risk_score,
+        **geo_signals
     }
 
 
@@ -75,6 +91,46 @@ def calculate_fraud_risk_score(
     if fraud_count == 0:
         return 0.0
     
+    declined_fraud = 0
+    high_risk_count = 0
+    fraud_transactions = transactions[transactions['is_fraud'] == 1]
+    
+    # Check for declined fraud transactions (caught fraud)
+    if 'status' in transactions.columns:
+        declined_fraud = int((fraud_transactions['status'] == 'declined').sum())
+    
+    # Check for unusual patterns in fraud transactions
+    if 'transaction_type' in transactions.columns:
+        # Transfers and refunds in fraud might indicate higher risk
+        high_risk_count = int(fraud_transactions['transaction_type'].isin(HIGH_RISK_FRAUD_TYPES).sum())
+    
+    return combine_fraud_risk_factors(fraud_count, fraud_rate, declined_fraud, high_risk_count)
+
+
+def combine_fraud_risk_factors(
+    fraud_count: int,
+    fraud_rate: float,
+    declined_fraud_count: int = 0,
+    high_risk_count: int = 0
+) -> float:
+    """
+    Combine fraud counts into a risk score.
+    
+    Shared by the per-user path and by callers that aggregate fraud counts
+    without a transaction frame (e.g. the daily aggregate rollup).
+    
+    Args:
+        fraud_count: Number of fraud transactions
+        fraud_rate: Fraction of transactions that are fraud
+        declined_fraud_count: Fraud transactions with status 'declined'
+        high_risk_count: Fraud transactions of a high-risk type
+        
+    Returns:
+        Risk score between 0.0 and 1.0
+    """
+    if fraud_count == 0:
+        return 0.0
+    
     # Base score from fraud rate (scaled)
     base_score = min(fraud_rate * 10, 1.0)  # Scale fraud rate to 0-1
     
@@ -85,24 +141,13 @@ def calculate_fraud_risk_score(
     if fraud_count > 1:
         risk_factors.append(0.1 * min(fraud_count / 5, 1.0))  # Cap at 0.1
     
-    # Factor 2: Check for declined fraud transactions (caught fraud)
-    if 'status' in transactions.columns:
-        fraud_transactions = transactions[transactions['is_fraud'] == 1]
-        if not fraud_transactions.empty:
-            declined_fraud = (fraud_transactions['status'] == 'declined').sum()
-            if declined_fraud > 0:
-                # Declined fraud suggests detection, but still indicates risk
-                risk_factors.append(0.05)
-    
-    # Factor 3: Check for unusual patterns in fraud transactions
-    if 'transaction_type' in transactions.columns:
-        fraud_transactions = transactions[transactions['is_fraud'] == 1]
-        if not fraud_transactions.empty:
-            # Transfers and refunds in fraud might indicate higher risk
-            high_risk_types = ['transfer', 'refund']
-            high_risk_count = fraud_transactions['transaction_type'].isin(high_risk_types).sum()
-            if high_risk_count > 0:
-                risk_factors.append(0.05 * min(high_risk_count / fraud_count, 1.0))
+    # Factor 2: Declined fraud suggests detection, but still indicates risk
+    if declined_fraud_count > 0:
+        risk_factors.append(0.05)
+    
+    # Factor 3: Transfers and refunds in fraud might indicate higher risk
+    if high_risk_count > 0:
+        risk_factors.append(0.05 * min(high_risk_count / fraud_count, 1.0))
     
     # Combine base score with risk factors
     total_score = base_score + sum(risk_factors)
@@ -111,6 +156,146 @@ def calculate_fraud_risk_score(
     return min(total_score, 1.0)
 
 
+def fraud_risk_scores(
+    fraud_count: np.ndarray,
+    fraud_rate: np.ndarray,
+    declined_fraud_count: np.ndarray,
+    high_risk_count: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized combine_fraud_risk_factors over arrays of per-user counts.
+    
+    Factors are added in the same order as the scalar version (an absent
+    factor adds exactly 0.0), so scores are bit-for-bit identical.
+    """
+    fraud_count = np.asarray(fraud_count, dtype='float64')
+    has_fraud = fraud_count > 0
+    safe_count = np.where(has_fraud, fraud_count, 1.0)
+    
+    base_score = np.minimum(np.asarray(fraud_rate, dtype='float64') * 10, 1.0)
+    extra = np.where(fraud_count > 1, 0.1 * np.minimum(fraud_count / 5, 1.0), 0.0)
+    extra = extra + np.where(np.asarray(declined_fraud_count) > 0, 0.05, 0.0)
+    extra = extra + np.where(np.asarray(high_risk_count) > 0,
+                             0.05 * np.minimum(np.asarray(high_risk_count) / safe_count, 1.0), 0.0)
+    return np.where(has_fraud, np.minimum(base_score + extra, 1.0), 0.0)
+
+
+def _fraud_signals_by_user(user_ids, total_count, fraud_count, declined_count, high_risk_count,
+                           geo_signals: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Fraud signal dicts from per-user count arrays (users with no transactions are omitted)."""
+    total_count = np.asarray(total_count, dtype='int64')
+    fraud_count = np.asarray(fraud_count, dtype='int64')
+    present = total_count > 0
+    fraud_rate = np.divide(fraud_count, total_count, out=np.zeros(len(total_count)), where=present)
+    scores = fraud_risk_scores(fraud_count, fraud_rate, declined_count, high_risk_count)
+    
+    return {
+        user_id: {
+            'fraud_transaction_count': int(count),
+            'fraud_rate': float(rate),
+            'has_fraud_history': bool(count > 0),
+            'fraud_risk_score': float(score),
+            **geo_signals.get(user_id, GEO_VELOCITY_DEFAULTS)
+        }
+        for user_id, count, rate, score, keep in zip(user_ids, fraud_count, fraud_rate, scores, present)
+        if keep
+    }
+
+
+def extract_fraud_signals_by_user(transactions: pd.DataFrame) -> Dict[str, Dict]:
+    """Fraud signals for many users with one grouped pass.
+    
+    Matches extract_fraud_signals() for each user's rows.
+    
+    Args:
+        transactions: DataFrame with transaction data for many users (needs user_id)
+        
+    Returns:
+        Dictionary of user_id -> fraud signals (users without transactions are omitted)
+    """
+    if transactions.empty:
+        return {}
+    
+    user_codes, user_ids = pd.factorize(transactions['user_id'])
+    total_count = np.bincount(user_codes, minlength=len(user_ids))
+    zeros = np.zeros(len(user_ids), dtype='int64')
+    geo_signals = geo_velocity_signals_by_user(transactions)
+    if 'is_fraud' not in transactions.columns:
+        logger.warning("is_fraud column not found in transactions, returning zero fraud signals")
+        return _fraud_signals_by_user(user_ids, total_count, zeros, zeros, zeros, geo_signals)
+    
+    is_fraud = transactions['is_fraud'].to_numpy(dtype='float64')
+    fraud_count = np.bincount(user_codes, weights=np.nan_to_num(is_fraud), minlength=len(user_ids))
+    fraud_mask = is_fraud == 1
+    
+    declined_count = zeros
+    if 'status' in transactions.columns:
+        declined = fraud_mask & (transactions['status'] == 'declined').to_numpy()
+        declined_count = np.bincount(user_codes[declined], minlength=len(user_ids))
+    
+    high_risk_count = zeros
+    if 'transaction_type' in transactions.columns:
+        high_risk = fraud_mask & transactions['transaction_type'].isin(HIGH_RISK_FRAUD_TYPES).to_numpy()
+        high_risk_count = np.bincount(user_codes[high_risk], minlength=len(user_ids))
+    
+    return _fraud_signals_by_user(user_ids, total_count, fraud_count, declined_count, high_risk_count, geo_signals)
+
+
+def extract_fraud_signals_from_snapshot(snapshot, user_ids=None, start_date=None) -> Dict[str, Dict]:
+    """Fraud signals for many users straight from a columnar transaction snapshot.
+    
+    Counts are taken from the memory-mapped code columns with bincount, so
+    no DataFrame is built. Matches extract_fraud_signals_by_user() on
+    snapshot.to_frame(user_ids, start_date).
+    
+    Args:
+        snapshot: TransactionSnapshot (see src/features/transaction_snapshot.py)
+        user_ids: Users to score (None for all)
+        start_date: Earliest transaction date to include
+        
+    Returns:
+        Dictionary of user_id -> fraud signals (users without transactions are omitted)
+    """
+    positions = snapshot.row_positions(user_ids, start_date)
+    snapshot_users = snapshot.dictionaries['user_id'][:-1]
+    user_codes = np.asarray(snapshot.columns['user_id'][positions])
+    
+    def code_of(column: str, values) -> np.ndarray:
+        return np.flatnonzero(np.isin(snapshot.dictionaries[column][:-1], values))
+    
+    is_fraud = np.asarray(snapshot.columns['is_fraud'][positions])
+    fraud_mask = is_fraud == 1
+    declined = fraud_mask & np.isin(snapshot.columns['status'][positions], code_of('status', ['declined']))
+    high_risk = fraud_mask & np.isin(snapshot.columns['transaction_type'][positions],
+                                     code_of('transaction_type', HIGH_RISK_FRAUD_TYPES))
+    
+    n = len(snapshot_users)
+    latitude = np.asarray(snapshot.columns['latitude'][positions])
+    longitude = np.asarray(snapshot.columns['longitude'][positions])
+    located = ~(np.isnan(latitude) | np.isnan(longitude))
+    # Snapshot days carry no time of day
+    max_speed, impossible, pairs = geo_velocity_from_arrays(
+        user_codes[located], np.asarray(snapshot.columns['day'][positions])[located] * 24.0,
+        np.full(int(located.sum()), DATE_ONLY_RESOLUTION_HOURS), latitude[located], longitude[located], n
+    )
+    geo_signals = {
+        snapshot_users[code]: {
+            'impossible_travel_count': int(impossible[code]),
+            'geo_velocity_max': float(max_speed[code])
+        }
+        for code in np.flatnonzero(pairs)
+    }
+    
+    return _fraud_signals_by_user(
+        snapshot_users,
+        np.bincount(user_codes, minlength=n),
+        np.bincount(user_codes, weights=is_fraud, minlength=n),
+        np.bincount(user_codes[declined], minlength=n),
+        np.bincount(user_codes[high_risk], minlength=n),
+        geo_signals,
+    )
+
+
 def get_fraud_transactions(transactions: pd.DataFrame) -> pd.DataFrame:
     """
     Get all fraud transactions from a DataFrame.
@@ -0,0 +1,135 @@
+"""
+Geo-velocity fraud signals
+Flags consecutive transactions whose locations are too far apart for the time
+between them, with one vectorized haversine pass over every user's located rows
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Implied speed (km/h) above which travel between two transactions is impossible;
+# faster than a commercial flight
+MAX_TRAVEL_SPEED_KMH = 1000.0
+
+# Floor on the time between two transactions, so identical timestamps don't divide by zero
+MIN_ELAPSED_HOURS = 1 / 60
+
+# A date without a time of day could be any moment of that day
+DATE_ONLY_RESOLUTION_HOURS = 24.0
+
+# Floor on the time between two transactions when either carries only a date: the
+# average gap between two random times of one day, so ordinary same-day or
+# overnight travel doesn't read as instantaneous
+DATE_ONLY_MIN_ELAPSED_HOURS = 8.0
+
+GEO_VELOCITY_DEFAULTS = {
+    'impossible_travel_count': 0,
+    'geo_velocity_max': None,
+}
+
+# Group key used when a frame has no user_id column (one user's transactions)
+_SINGLE_USER = '_'
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km between arrays of points given in degrees."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(values, dtype='float64')) for values in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def geo_velocity_from_arrays(user_codes: np.ndarray, hours: np.ndarray, resolution_hours: np.ndarray,
+                             latitude: np.ndarray, longitude: np.ndarray, n_users: int):
+    """
+    Per-user max implied speed and impossible-travel count from located rows.
+
+    Rows are sorted by (user, time, latitude, longitude), so the result does
+    not depend on input order. The time between consecutive rows is the
+    shortest gap their timestamps allow (a date-only row may fall anywhere in
+    its day), but at least DATE_ONLY_MIN_ELAPSED_HOURS when either row carries
+    only a date. Taking the widest gap instead would put date-only rows a day
+    apart 48 hours apart, too long for any distance to exceed
+    MAX_TRAVEL_SPEED_KMH.
+
+    Args:
+        user_codes: Integer user code per row (0..n_users-1)
+        hours: Row timestamp in hours since the epoch (start of day for date-only rows)
+        resolution_hours: Uncertainty of each timestamp (24 for date-only rows, else 0)
+        latitude: Row latitude in degrees
+        longitude: Row longitude in degrees
+        n_users: Number of user codes
+
+    Returns:
+        (max_speed_kmh, impossible_count, pair_count), each an array indexed by user code
+    """
+    max_speed = np.zeros(n_users)
+    impossible = np.zeros(n_users, dtype='int64')
+    pairs = np.zeros(n_users, dtype='int64')
+    if len(user_codes) < 2:
+        return max_speed, impossible, pairs
+
+    order = np.lexsort((longitude, latitude, hours, user_codes))
+    user_codes, hours, resolution_hours = user_codes[order], hours[order], resolution_hours[order]
+    latitude, longitude = latitude[order], longitude[order]
+
+    same_user = user_codes[1:] == user_codes[:-1]
+    pair_users = user_codes[1:][same_user]
+    distance = haversine_km(latitude[:-1], longitude[:-1], latitude[1:], longitude[1:])[same_user]
+    # From the end of the earlier row's possible times to the start of the later row's
+    gap = hours[1:] - (hours[:-1] + resolution_hours[:-1])
+    date_only = (resolution_hours[1:] > 0) | (resolution_hours[:-1] > 0)
+    elapsed = np.maximum(gap, np.where(date_only, DATE_ONLY_MIN_ELAPSED_HOURS, MIN_ELAPSED_HOURS))[same_user]
+    speed = distance / elapsed
+
+    np.maximum.at(max_speed, pair_users, speed)
+    pairs += np.bincount(pair_users, minlength=n_users)
+    impossible += np.bincount(pair_users[speed > MAX_TRAVEL_SPEED_KMH], minlength=n_users)
+    return max_speed, impossible, pairs
+
+
+def geo_velocity_signals_by_user(transactions: pd.DataFrame) -> Dict[str, Dict]:
+    """Impossible-travel count and max implied travel speed for many users in one pass.
+
+    Args:
+        transactions: DataFrame with date, latitude, longitude and (optionally) user_id
+
+    Returns:
+        Dictionary of user_id -> geo velocity signals (users with fewer than two
+        located transactions are omitted)
+    """
+    if transactions.empty or not {'latitude', 'longitude'} <= set(transactions.columns):
+        return {}
+
+    latitude = pd.to_numeric(transactions['latitude'], errors='coerce')
+    longitude = pd.to_numeric(transactions['longitude'], errors='coerce')
+    located = (latitude.notna() & longitude.notna()).to_numpy()
+    if located.sum() < 2:
+        return {}
+
+    if 'user_id' in transactions.columns:
+        user_codes, user_ids = pd.factorize(transactions['user_id'][located])
+    else:
+        user_codes, user_ids = np.zeros(int(located.sum()), dtype='int64'), [_SINGLE_USER]
+
+    timestamps = pd.to_datetime(pd.Series(transactions['date'].to_numpy()[located]), format='mixed')
+    seconds = timestamps.to_numpy().astype('datetime64[s]').astype('int64')
+    # Rows at exactly midnight are taken to carry only a date
+    resolution = np.where(seconds % 86400 == 0, DATE_ONLY_RESOLUTION_HOURS, 0.0)
+
+    max_speed, impossible, pairs = geo_velocity_from_arrays(
+        user_codes, seconds / 3600.0, resolution,
+        latitude.to_numpy()[located], longitude.to_numpy()[located], len(user_ids)
+    )
+    return {
+        user_id: {'impossible_travel_count': int(count), 'geo_velocity_max': float(speed)}
+        for user_id, speed, count, n in zip(user_ids, max_speed, impossible, pairs)
+        if n > 0
+    }
+
+
+def geo_velocity_signals(transactions: pd.DataFrame) -> Dict[str, Optional[float]]:
+    """Geo velocity signals for one user's transactions."""
+    return next(iter(geo_velocity_signals_by_user(transactions).values()), dict(GEO_VELOCITY_DEFAULTS))
@@ -41,6 +41,8 @@ class UserSignals(BaseModel):
     fraud_rate: float = Field(0.0, ge=0.0, le=1.0, description="Fraction of transactions that are fraud (0.0-1.0)")
     has_fraud_history: bool = Field(False, description="True if user has any fraud transactions")
     fraud_risk_score: float = Field(0.0, ge=0.0, le=1.0, description="Risk score based on fraud patterns (0.0-1.0)")
+    impossible_travel_count: int = Field(0, ge=0, description="Consecutive transactions too far apart to travel between in time")
+    geo_velocity_max: Optional[float] = Field(None, ge=0.0, description="Highest implied travel speed between consecutive located transactions (km/h)")
     
     # Data quality flags
     insufficient_data: bool = Field(False, description="True if below minimum thresholds")
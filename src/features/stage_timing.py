@@ -0,0 +1,121 @@
+"""
+Signal pipeline stage timing
+Records wall time and row counts per pipeline stage into small log-bucket
+histograms, so a slow run can be traced to the stage that caused it
+"""
+import math
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Bucket upper bounds grow by 10% from 1µs, so percentiles are within ~10%
+_BUCKET_BASE = 1.1
+_MIN_SECONDS = 1e-6
+
+
+class StageHistogram:
+    """Call count, row count, total/max time and a bucketed latency distribution for one stage."""
+
+    __slots__ = ('count', 'rows', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, seconds: float, rows: int = 0):
+        self.count += 1
+        self.rows += rows
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = 0 if seconds <= _MIN_SECONDS else int(math.log(seconds / _MIN_SECONDS, _BUCKET_BASE)) + 1
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def merge(self, state: Dict):
+        """Fold in another histogram's to_dict() state (e.g. from a worker process)."""
+        self.count += state['count']
+        self.rows += state['rows']
+        self.total += state['total']
+        self.max = max(self.max, state['max'])
+        for bucket, count in state['buckets'].items():
+            self.buckets[int(bucket)] = self.buckets.get(int(bucket), 0) + count
+
+    def percentile(self, q: float) -> float:
+        """Approximate q-quantile (0-1) in seconds, never above the observed max."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        cumulative = 0
+        for bucket in sorted(self.buckets):
+            cumulative += self.buckets[bucket]
+            if cumulative >= rank:
+                return min(_MIN_SECONDS * _BUCKET_BASE ** bucket, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'rows': self.rows, 'total': self.total, 'max': self.max,
+                'buckets': dict(self.buckets)}
+
+
+class StageTimer:
+    """Per-stage histograms for one signal run."""
+
+    def __init__(self):
+        self._stages: Dict[str, StageHistogram] = {}
+
+    def reset(self):
+        self._stages = {}
+
+    def record(self, stage: str, seconds: float, rows: int = 0):
+        self._stages.setdefault(stage, StageHistogram()).add(seconds, rows)
+
+    @contextmanager
+    def stage(self, stage: str, rows: int = 0):
+        """Time the enclosed block as one call of stage (recorded even if it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, rows)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Picklable state of every stage, for merging into another timer."""
+        return {stage: histogram.to_dict() for stage, histogram in self._stages.items()}
+
+    def merge(self, snapshot: Dict[str, Dict]):
+        for stage, state in snapshot.items():
+            self._stages.setdefault(stage, StageHistogram()).merge(state)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-stage calls, rows, total and p50/p95/max in milliseconds, in recording order."""
+        return {
+            stage: {
+                'calls': histogram.count,
+                'rows': histogram.rows,
+                'total_ms': histogram.total * 1000,
+                'p50_ms': histogram.percentile(0.5) * 1000,
+                'p95_ms': histogram.percentile(0.95) * 1000,
+                'max_ms': histogram.max * 1000,
+            }
+            for stage, histogram in self._stages.items()
+        }
+
+
+def format_stage_summary(summary: Dict[str, Dict], title: Optional[str] = None) -> List[str]:
+    """Render a summary() as aligned text lines, slowest stage (by total) first."""
+    lines = [title] if title else []
+    if not summary:
+        return lines + ["   (no stages recorded)"]
+    width = max(len(stage) for stage in summary)
+    lines.append(f"   {'stage':<{width}}  {'calls':>7}  {'rows':>10}  {'total ms':>10}  "
+                 f"{'p50 ms':>8}  {'p95 ms':>8}  {'max ms':>8}")
+    for stage, stats in sorted(summary.items(), key=lambda item: item[1]['total_ms'], reverse=True):
+        lines.append(f"   {stage:<{width}}  {stats['calls']:>7}  {stats['rows']:>10}  {stats['total_ms']:>10.1f}  "
+                     f"{stats['p50_ms']:>8.2f}  {stats['p95_ms']:>8.2f}  {stats['max_ms']:>8.2f}")
+    return lines
+
+
+# Process-wide timer the signal pipeline records into
+stage_timer = StageTimer()
@@ -0,0 +1,142 @@
+"""
+Subscription signal detection
+Finds recurring payments (same user and merchant, steady cadence and amount)
+for a whole population in one vectorized pass, and derives subscription signals
+from them plus any transactions already classed as subscriptions
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.features.transaction_classes import CLASS_SUBSCRIPTION, has_class, transaction_classes
+
+# A payment series needs this many charges before it can count as recurring
+MIN_RECURRING_OCCURRENCES = 3
+
+# Accepted median gap between charges, in days (inclusive)
+RECURRING_CADENCES = {
+    'weekly': (6, 8),
+    'monthly': (26, 35),
+}
+
+# Max coefficient of variation of charge amounts within a series
+MAX_AMOUNT_VARIATION = 0.2
+
+# Recurring money movement that is not a subscription (matched case-insensitively)
+NON_SUBSCRIPTION_CATEGORY_PATTERN = 'Transfer|Payment'
+
+
+def _excluded_categories(categories: pd.Series) -> pd.Series:
+    """Rows whose category is money movement, evaluating each distinct category once."""
+    distinct = pd.Series(categories.dropna().unique())
+    excluded = set(distinct[distinct.str.contains(NON_SUBSCRIPTION_CATEGORY_PATTERN, case=False, na=False)])
+    return categories.isin(excluded)
+
+
+def detect_recurring_transactions(transactions: pd.DataFrame) -> pd.Series:
+    """Flag outflows that belong to a recurring (weekly or monthly) payment series.
+
+    Rows are sorted once by (user, merchant, date); gaps between consecutive
+    charges and amount stability are then computed per series with numpy and a
+    single groupby, so the cost does not depend on the number of users.
+
+    Args:
+        transactions: DataFrame with merchant_name, date, amount and (optionally) user_id
+            and category_primary (transfers and payments are never recurring subscriptions)
+
+    Returns:
+        Boolean Series aligned with transactions
+    """
+    if transactions.empty:
+        return pd.Series(False, index=transactions.index)
+
+    candidates = (transactions['amount'] < 0) & transactions['merchant_name'].notna()
+    if 'category_primary' in transactions.columns:
+        candidates &= ~_excluded_categories(transactions['category_primary'])
+    if candidates.sum() < MIN_RECURRING_OCCURRENCES:
+        return pd.Series(False, index=transactions.index)
+
+    merchant_codes = pd.factorize(transactions['merchant_name'][candidates])[0]
+    if 'user_id' in transactions.columns:
+        user_codes = pd.factorize(transactions['user_id'][candidates])[0]
+    else:
+        user_codes = np.zeros(len(merchant_codes), dtype='int64')
+    days = (
+        pd.to_datetime(transactions['date'][candidates], format='mixed')
+        .to_numpy().astype('datetime64[D]').astype('int64')
+    )
+    amounts = np.abs(transactions['amount'][candidates].to_numpy(dtype='float64'))
+
+    order = np.lexsort((days, merchant_codes, user_codes))
+    user_codes, merchant_codes = user_codes[order], merchant_codes[order]
+    days, amounts = days[order], amounts[order]
+
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = (user_codes[1:] != user_codes[:-1]) | (merchant_codes[1:] != merchant_codes[:-1])
+    series_ids = np.cumsum(starts) - 1
+    gaps = np.diff(days, prepend=days[0]).astype('float64')
+    gaps[starts] = np.nan
+
+    stats = pd.DataFrame({
+        'series': series_ids, 'gap': gaps, 'amount': amounts, 'amount_sq': amounts * amounts
+    }).groupby('series').agg(
+        occurrences=('amount', 'size'),
+        median_gap=('gap', 'median'),
+        amount_mean=('amount', 'mean'),
+        amount_sq_mean=('amount_sq', 'mean'),
+    )
+    amount_std = np.sqrt((stats['amount_sq_mean'] - stats['amount_mean'] ** 2).clip(lower=0.0))
+
+    on_cadence = np.zeros(len(stats), dtype=bool)
+    for low, high in RECURRING_CADENCES.values():
+        on_cadence |= stats['median_gap'].between(low, high).to_numpy()
+    stable = (amount_std <= MAX_AMOUNT_VARIATION * stats['amount_mean']).to_numpy()
+    is_recurring = (stats['occurrences'] >= MIN_RECURRING_OCCURRENCES).to_numpy() & on_cadence & stable
+
+    flags = np.zeros(len(transactions), dtype=bool)
+    flags[np.flatnonzero(candidates.to_numpy())[order]] = is_recurring[series_ids]
+    return pd.Series(flags, index=transactions.index)
+
+
+def subscription_mask(transactions: pd.DataFrame) -> pd.Series:
+    """Transactions classed as subscriptions or detected as recurring payments."""
+    classed = has_class(transaction_classes(transactions), CLASS_SUBSCRIPTION)
+    return classed | detect_recurring_transactions(transactions)
+
+
+def subscription_signals_by_user(transactions: pd.DataFrame, window_days: int,
+                                 total_spend: Optional[pd.Series] = None) -> Dict[str, Dict]:
+    """Subscription count, monthly spend and share of spend for many users.
+
+    Args:
+        transactions: DataFrame with user_id, merchant_name, date, amount (and txn_class)
+        window_days: Number of days in analysis window
+        total_spend: Total outflow per user_id; computed from transactions when omitted
+
+    Returns:
+        Dictionary of user_id -> subscription signals (users without subscriptions are omitted)
+    """
+    if transactions.empty:
+        return {}
+
+    subscription_txns = transactions[subscription_mask(transactions)]
+    if subscription_txns.empty:
+        return {}
+
+    counts = subscription_txns.groupby('user_id')['merchant_name'].nunique()
+    spend = subscription_txns['amount'].abs().groupby(subscription_txns['user_id']).sum()
+    if total_spend is None:
+        outflows = transactions[transactions['amount'] < 0]
+        total_spend = outflows['amount'].abs().groupby(outflows['user_id']).sum()
+    user_totals = total_spend.reindex(spend.index, fill_value=0.0)
+
+    return {
+        user_id: {
+            'subscription_count': int(count),
+            'monthly_subscription_spend': float(user_spend / (window_days / 30.0)),
+            'subscription_share': float(user_spend / user_total) if user_total > 0 else 0.0
+        }
+        for user_id, count, user_spend, user_total in zip(spend.index, counts.reindex(spend.index), spend,
+                                                          user_totals)
+    }
@@ -0,0 +1,187 @@
+"""
+Transaction classification codes
+Classifies each transaction once (at ingest) into a txn_class bitmask so the
+signal functions filter on integer masks instead of re-running string matches
+"""
+import re
+import sqlite3
+from typing import Iterable, Optional
+
+import pandas as pd
+
+# Class bits. A transaction's class is the OR of every bit it matches, so
+# overlapping categories (e.g. a recurring deposit) are counted by each signal.
+CLASS_INCOME = 1
+CLASS_SUBSCRIPTION = 2
+CLASS_FEE = 4
+CLASS_FEE_OVERDRAFT = 8
+CLASS_FEE_ATM = 16
+CLASS_FEE_MAINTENANCE = 32
+CLASS_SAVINGS_DEPOSIT = 64
+
+# Patterns behind each class (matched case-insensitively)
+INCOME_CATEGORY_PATTERN = 'Payroll|Deposit|Income'
+SUBSCRIPTION_CATEGORY_PATTERN = 'Subscription|Recurring'
+SUBSCRIPTION_DETAILED_PATTERN = 'Subscription'
+FEE_CATEGORIES = ['Bank Fees', 'Service Charge', 'ATM Fee']
+FEE_MERCHANT_PATTERN = 'fee|charge|overdraft'
+FEE_KEYWORDS = {
+    'overdraft': ['overdraft', 'od fee', 'nsf', 'insufficient funds'],
+    'atm': ['atm fee', 'atm surcharge', 'atm withdrawal fee'],
+    'maintenance': ['maintenance fee', 'monthly fee', 'service charge', 'account fee']
+}
+
+
+def _like_any(column: str, words: Iterable[str]) -> str:
+    return " OR ".join(f"{column} LIKE '%{word}%'" for word in words)
+
+
+# The same predicates in SQL (LIKE is case-insensitive); expects transactions aliased as t
+_INCOME_SQL = f"t.amount > 0 AND ({_like_any('t.category_primary', INCOME_CATEGORY_PATTERN.lower().split('|'))})"
+_SUBSCRIPTION_SQL = (f"{_like_any('t.category_primary', SUBSCRIPTION_CATEGORY_PATTERN.lower().split('|'))} "
+                     f"OR {_like_any('t.category_detailed', [SUBSCRIPTION_DETAILED_PATTERN.lower()])}")
+_FEE_SQL = (f"t.amount < 0 AND (t.category_primary IN ({', '.join(repr(c) for c in FEE_CATEGORIES)}) "
+            f"OR {_like_any('t.merchant_name', FEE_MERCHANT_PATTERN.split('|'))})")
+_OVERDRAFT_SQL = _like_any('t.merchant_name', FEE_KEYWORDS['overdraft'])
+_ATM_SQL = f"{_like_any('t.merchant_name', FEE_KEYWORDS['atm'])} OR t.category_primary LIKE '%atm%'"
+_MAINTENANCE_SQL = _like_any('t.merchant_name', FEE_KEYWORDS['maintenance'])
+_SAVINGS_DEPOSIT_SQL = ("t.amount > 0 AND EXISTS (SELECT 1 FROM accounts a WHERE a.account_id = t.account_id "
+                        "AND a.user_id = t.user_id AND a.subtype = 'savings')")
+
+CLASS_SQL = f"""(
+    (CASE WHEN {_INCOME_SQL} THEN {CLASS_INCOME} ELSE 0 END)
+    | (CASE WHEN {_SUBSCRIPTION_SQL} THEN {CLASS_SUBSCRIPTION} ELSE 0 END)
+    | (CASE WHEN {_FEE_SQL} THEN {CLASS_FEE}
+         | (CASE WHEN {_OVERDRAFT_SQL} THEN {CLASS_FEE_OVERDRAFT} ELSE 0 END)
+         | (CASE WHEN {_ATM_SQL} THEN {CLASS_FEE_ATM} ELSE 0 END)
+         | (CASE WHEN {_MAINTENANCE_SQL} THEN {CLASS_FEE_MAINTENANCE} ELSE 0 END)
+       ELSE 0 END)
+    | (CASE WHEN {_SAVINGS_DEPOSIT_SQL} THEN {CLASS_SAVINGS_DEPOSIT} ELSE 0 END)
+)"""
+
+# Stored class, classifying on the fly any row ingested before classification ran
+STORED_CLASS_SQL = f"COALESCE(t.txn_class, {CLASS_SQL})"
+
+# SQLite's default limit on host parameters is 999; stay well below it
+_IN_CLAUSE_CHUNK = 900
+
+
+def _text_column(transactions: pd.DataFrame, column: str) -> pd.Series:
+    """A text column, or an all-missing one if the frame doesn't have it."""
+    if column in transactions.columns:
+        return transactions[column]
+    return pd.Series(None, index=transactions.index, dtype=object)
+
+
+# Fee type keywords folded into one case-insensitive pattern (longest first)
+_FEE_KEYWORD_BITS = {
+    keyword: bit
+    for fee_type, bit in (('overdraft', CLASS_FEE_OVERDRAFT), ('atm', CLASS_FEE_ATM),
+                          ('maintenance', CLASS_FEE_MAINTENANCE))
+    for keyword in FEE_KEYWORDS[fee_type]
+}
+_FEE_KEYWORD_RE = re.compile(
+    '|'.join(re.escape(keyword) for keyword in sorted(_FEE_KEYWORD_BITS, key=len, reverse=True)), re.IGNORECASE
+)
+
+
+def _fee_type_bits(merchant_name) -> int:
+    """Fee type bits for one merchant name from a single keyword scan."""
+    if not isinstance(merchant_name, str):
+        return 0
+    bits = 0
+    for keyword in _FEE_KEYWORD_RE.findall(merchant_name):
+        bits |= _FEE_KEYWORD_BITS[keyword.lower()]
+    return bits
+
+
+def _fee_type_classes(merchant: pd.Series, category: pd.Series) -> pd.Series:
+    """Fee type bits for fee rows, scanning each distinct merchant name once."""
+    bits_by_merchant = {name: _fee_type_bits(name) for name in merchant.dropna().unique()}
+    bits = merchant.map(bits_by_merchant).fillna(0).astype('int64')
+    atm_category = category.str.contains('atm', case=False, na=False)
+    return bits | (atm_category * CLASS_FEE_ATM)
+
+
+def classify_transactions(transactions: pd.DataFrame,
+                          savings_account_ids: Optional[Iterable[str]] = None) -> pd.Series:
+    """Compute the txn_class bitmask for each transaction.
+
+    Args:
+        transactions: DataFrame with amount, category_primary, category_detailed, merchant_name
+        savings_account_ids: Savings account ids; CLASS_SAVINGS_DEPOSIT is only set when given
+
+    Returns:
+        Integer Series aligned with transactions
+    """
+    if transactions.empty:
+        return pd.Series(0, index=transactions.index, dtype='int64')
+
+    amount = transactions['amount']
+    category = _text_column(transactions, 'category_primary')
+    merchant = _text_column(transactions, 'merchant_name')
+    detailed = _text_column(transactions, 'category_detailed')
+
+    income = (amount > 0) & category.str.contains(INCOME_CATEGORY_PATTERN, case=False, na=False)
+    subscription = (
+        category.str.contains(SUBSCRIPTION_CATEGORY_PATTERN, case=False, na=False) |
+        detailed.str.contains(SUBSCRIPTION_DETAILED_PATTERN, case=False, na=False)
+    )
+    fee = (amount < 0) & (
+        category.isin(FEE_CATEGORIES) | merchant.str.contains(FEE_MERCHANT_PATTERN, case=False, na=False)
+    )
+
+    classes = income * CLASS_INCOME + subscription * CLASS_SUBSCRIPTION + fee * CLASS_FEE
+    if fee.any():
+        classes = classes | _fee_type_classes(merchant[fee], category[fee]).reindex(classes.index, fill_value=0)
+    if savings_account_ids is not None:
+        savings = (amount > 0) & transactions['account_id'].isin(list(savings_account_ids))
+        classes = classes + savings * CLASS_SAVINGS_DEPOSIT
+    return classes.astype('int64')
+
+
+def transaction_classes(transactions: pd.DataFrame) -> pd.Series:
+    """The txn_class column, classifying any rows that don't have one yet."""
+    if 'txn_class' not in transactions.columns:
+        return classify_transactions(transactions)
+
+    classes = transactions['txn_class']
+    missing = classes.isna()
+    if missing.any():
+        classes = classes.copy()
+        classes[missing] = classify_transactions(transactions[missing])
+    return classes.astype('int64')
+
+
+def has_class(classes: pd.Series, class_bit: int) -> pd.Series:
+    """Boolean mask of rows whose class includes class_bit."""
+    return (classes & class_bit) != 0
+
+
+def classify_stored_transactions(conn: sqlite3.Connection, user_ids: Optional[Iterable[str]] = None,
+                                 only_missing: bool = True) -> int:
+    """
+    Set txn_class on stored transactions.
+
+    Args:
+        conn: Connection inside a write transaction
+        user_ids: Users to classify; None classifies every user
+        only_missing: Only classify rows whose txn_class is NULL
+
+    Returns:
+        Number of rows classified
+    """
+    update = f"UPDATE transactions AS t SET txn_class = {CLASS_SQL} WHERE 1"
+    if only_missing:
+        update += " AND t.txn_class IS NULL"
+
+    if user_ids is None:
+        return conn.execute(update).rowcount
+
+    user_ids = list(user_ids)
+    classified = 0
+    for start in range(0, len(user_ids), _IN_CLAUSE_CHUNK):
+        chunk = user_ids[start:start + _IN_CLAUSE_CHUNK]
+        placeholders = ", ".join("?" * len(chunk))
+        classified += conn.execute(update + f" AND t.user_id IN ({placeholders})", chunk).rowcount
+    return classified
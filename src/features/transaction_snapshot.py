@@ -0,0 +1,284 @@
+"""
+Columnar transaction snapshot
+Exports the transactions table to a directory of numpy column files (sorted by
+user and date, with a per-user offset index) that analytical passes can
+memory-map instead of querying SQLite row by row
+"""
+import json
+import shutil
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.db.connection import DatabaseError, database_read, get_table_columns
+from src.features.transaction_classes import CLASS_SQL, STORED_CLASS_SQL
+
+SNAPSHOT_FORMAT_VERSION = 2
+
+# Numeric columns and their on-disk dtypes
+NUMERIC_COLUMNS = {
+    'day': 'int32',  # Days since 1970-01-01
+    'amount': 'float64',
+    'txn_class': 'int16',
+    'is_fraud': 'int8',
+    'latitude': 'float64',  # NaN = NULL
+    'longitude': 'float64',
+}
+
+# Text columns stored as int32 codes into a per-column dictionary (-1 = NULL)
+DICTIONARY_COLUMNS = [
+    'user_id', 'account_id', 'merchant_name', 'category_primary', 'category_detailed',
+    'payment_channel', 'transaction_type', 'status',
+]
+
+# Optional transaction columns and the value used when a database predates them
+_OPTIONAL_COLUMNS = {
+    'is_fraud': '0', 'transaction_type': 'NULL', 'status': 'NULL', 'latitude': 'NULL', 'longitude': 'NULL'
+}
+
+# Rows fetched from SQLite per chunk while exporting
+EXPORT_CHUNK_ROWS = 200_000
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+def _export_query(columns: frozenset) -> str:
+    optional = [
+        f"t.{name} AS {name}" if name in columns else f"{default} AS {name}"
+        for name, default in _OPTIONAL_COLUMNS.items()
+    ]
+    class_sql = STORED_CLASS_SQL if 'txn_class' in columns else CLASS_SQL
+    return f"""
+        SELECT t.user_id, t.account_id,
+               CAST(julianday(t.date) - 2440587.5 AS INTEGER) AS day,
+               t.amount, t.merchant_name, t.category_primary, t.category_detailed, t.payment_channel,
+               {', '.join(optional)},
+               {class_sql} AS txn_class
+        FROM transactions t
+        ORDER BY t.user_id, t.date
+    """
+
+
+def _encode(values: pd.Series, encoder: Dict[str, int]) -> np.ndarray:
+    """Dictionary codes for values, extending encoder with values it hasn't seen."""
+    for value in values.dropna().unique():
+        if value not in encoder:
+            encoder[value] = len(encoder)
+    return values.map(encoder).fillna(-1).to_numpy(dtype='int32')
+
+
+def export_transaction_snapshot(db_path: str, snapshot_dir: Union[str, Path],
+                                chunk_rows: int = EXPORT_CHUNK_ROWS) -> Dict:
+    """
+    Export the transactions table to a directory of .npy column files.
+
+    Rows are streamed in (user_id, date) order from one read snapshot of the
+    database and written straight into memory-mapped output files, so memory
+    use is bounded by chunk_rows. The directory is built next to snapshot_dir
+    and swapped in at the end, so readers never see a partial snapshot.
+
+    Args:
+        db_path: Database path
+        snapshot_dir: Output directory (replaced if it exists)
+        chunk_rows: Rows fetched per chunk
+
+    Returns:
+        The snapshot manifest
+    """
+    snapshot_dir = Path(snapshot_dir)
+    build_dir = snapshot_dir.with_name(snapshot_dir.name + ".building")
+    if build_dir.exists():
+        shutil.rmtree(build_dir)
+    build_dir.mkdir(parents=True)
+
+    try:
+        # One read snapshot for the whole export, without taking the write lock
+        with database_read(db_path) as conn:
+            columns = get_table_columns('transactions', db_path, conn)
+            total_rows = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+            change_high_water = _change_high_water(conn)
+
+            outputs = {
+                name: np.lib.format.open_memmap(build_dir / f"{name}.npy", mode='w+', dtype=dtype,
+                                                shape=(total_rows,))
+                for name, dtype in {**NUMERIC_COLUMNS, **{name: 'int32' for name in DICTIONARY_COLUMNS}}.items()
+            }
+            encoders = {name: {} for name in DICTIONARY_COLUMNS}
+
+            position = 0
+            for chunk in pd.read_sql_query(_export_query(columns), conn, chunksize=chunk_rows):
+                end = position + len(chunk)
+                outputs['day'][position:end] = chunk['day'].to_numpy(dtype='int32')
+                outputs['amount'][position:end] = chunk['amount'].to_numpy(dtype='float64')
+                outputs['txn_class'][position:end] = chunk['txn_class'].fillna(0).to_numpy(dtype='int16')
+                outputs['is_fraud'][position:end] = chunk['is_fraud'].fillna(0).to_numpy(dtype='int8')
+                for name in ('latitude', 'longitude'):
+                    outputs[name][position:end] = pd.to_numeric(chunk[name], errors='coerce').to_numpy(dtype='float64')
+                for name in DICTIONARY_COLUMNS:
+                    outputs[name][position:end] = _encode(chunk[name], encoders[name])
+                position = end
+
+        if position != total_rows:
+            raise DatabaseError("snapshot_export", f"read {position} rows, expected {total_rows}")
+
+        user_counts = np.bincount(outputs['user_id'], minlength=len(encoders['user_id']))
+        np.save(build_dir / "user_offsets.npy", np.concatenate([[0], np.cumsum(user_counts)]).astype('int64'))
+        for output in outputs.values():
+            output.flush()
+        del outputs
+
+        with open(build_dir / "dictionaries.json", "w") as f:
+            json.dump({name: list(encoder) for name, encoder in encoders.items()}, f)
+
+        manifest = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'rows': total_rows,
+            'users': len(encoders['user_id']),
+            'created_at': datetime.now().isoformat(),
+            'source_db': str(Path(db_path).resolve()),
+            'change_high_water': change_high_water,
+        }
+        with open(build_dir / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    except Exception as e:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        if isinstance(e, DatabaseError):
+            raise
+        raise DatabaseError("snapshot_export", str(e))
+
+    # Swap the finished snapshot in place of any previous one
+    previous_dir = snapshot_dir.with_name(snapshot_dir.name + ".previous")
+    if snapshot_dir.exists():
+        shutil.rmtree(previous_dir, ignore_errors=True)
+        snapshot_dir.rename(previous_dir)
+    build_dir.rename(snapshot_dir)
+    shutil.rmtree(previous_dir, ignore_errors=True)
+
+    logger.info(f"Exported {manifest['rows']} transactions for {manifest['users']} users to {snapshot_dir}")
+    return manifest
+
+
+def _change_high_water(conn: sqlite3.Connection) -> Optional[int]:
+    """Latest change-log id, or None if change tracking is not installed."""
+    try:
+        return conn.execute("SELECT MAX(change_id) FROM signal_change_log").fetchone()[0] or 0
+    except sqlite3.Error:
+        return None
+
+
+def _as_day(value: Union[str, date]) -> int:
+    """Day number (since 1970-01-01) for a date or ISO date string."""
+    return int((np.datetime64(str(value)[:10], 'D') - _EPOCH).astype('int64'))
+
+
+class TransactionSnapshot:
+    """A memory-mapped columnar transaction snapshot.
+
+    Column files are opened with np.load(mmap_mode='r'); nothing is read from
+    disk until rows are selected.
+    """
+
+    def __init__(self, snapshot_dir: Union[str, Path]):
+        self.path = Path(snapshot_dir)
+        with open(self.path / "manifest.json") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format: {self.manifest.get('format_version')}")
+
+        with open(self.path / "dictionaries.json") as f:
+            dictionaries = json.load(f)
+        # A trailing None makes code -1 decode to NULL
+        self.dictionaries = {
+            name: np.array(values + [None], dtype=object) for name, values in dictionaries.items()
+        }
+        self.columns = {
+            name: np.load(self.path / f"{name}.npy", mmap_mode='r')
+            for name in [*NUMERIC_COLUMNS, *DICTIONARY_COLUMNS]
+        }
+        self.user_offsets = np.load(self.path / "user_offsets.npy", mmap_mode='r')
+        self._user_index = {user_id: idx for idx, user_id in enumerate(dictionaries['user_id'])}
+
+    def __len__(self) -> int:
+        return self.manifest['rows']
+
+    @property
+    def user_ids(self) -> List[str]:
+        return list(self.dictionaries['user_id'][:-1])
+
+    def user_rows(self, user_id: str) -> slice:
+        """Row range holding user_id's transactions (empty if the user has none)."""
+        idx = self._user_index.get(user_id)
+        if idx is None:
+            return slice(0, 0)
+        return slice(int(self.user_offsets[idx]), int(self.user_offsets[idx + 1]))
+
+    def row_positions(self, user_ids: Optional[Iterable[str]] = None,
+                      start_date: Optional[Union[str, date]] = None) -> np.ndarray:
+        """Positions of rows for user_ids (all users when None) dated on or after start_date."""
+        if user_ids is None:
+            positions = np.arange(len(self), dtype='int64')
+        else:
+            indexes = np.array(sorted(self._user_index[u] for u in set(user_ids) if u in self._user_index),
+                               dtype='int64')
+            if not len(indexes):
+                return np.empty(0, dtype='int64')
+            starts = np.asarray(self.user_offsets)[indexes]
+            lengths = np.asarray(self.user_offsets)[indexes + 1] - starts
+            # Concatenated ranges [start, start + length) without a Python loop
+            positions = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+            positions += np.arange(lengths.sum(), dtype='int64')
+
+        if start_date is not None:
+            positions = positions[self.columns['day'][positions] >= _as_day(start_date)]
+        return positions
+
+    def to_frame(self, user_ids: Optional[Iterable[str]] = None,
+                 start_date: Optional[Union[str, date]] = None) -> pd.DataFrame:
+        """
+        Transactions as a DataFrame shaped like the signal engine's SQL reads.
+
+        Text columns are rebuilt by indexing the dictionaries with the codes,
+        so rows share the dictionary's string objects; dates are formatted
+        once per distinct day.
+        """
+        positions = self.row_positions(user_ids, start_date)
+        frame = {
+            name: self.dictionaries[name][self.columns[name][positions]]
+            for name in ['user_id', 'account_id']
+        }
+
+        days, day_codes = np.unique(self.columns['day'][positions], return_inverse=True)
+        frame['date'] = (_EPOCH + days.astype('timedelta64[D]')).astype(str).astype(object)[day_codes]
+        frame['amount'] = self.columns['amount'][positions]
+        for name in ['merchant_name', 'category_primary', 'category_detailed', 'payment_channel']:
+            frame[name] = self.dictionaries[name][self.columns[name][positions]]
+        frame['is_fraud'] = self.columns['is_fraud'][positions].astype('int64')
+        for name in ['transaction_type', 'status']:
+            frame[name] = self.dictionaries[name][self.columns[name][positions]]
+        frame['txn_class'] = self.columns['txn_class'][positions].astype('int64')
+        for name in ('latitude', 'longitude'):
+            frame[name] = self.columns[name][positions]
+        return pd.DataFrame(frame)
+
+    def is_stale(self, db_path: str) -> bool:
+        """True if the database has logged changes since this snapshot was exported."""
+        recorded = self.manifest.get('change_high_water')
+        if recorded is None:
+            return False
+        with database_read(db_path) as conn:
+            current = _change_high_water(conn)
+        return current is not None and current > recorded
+
+
+def load_transaction_snapshot(snapshot_dir: Union[str, Path]) -> TransactionSnapshot:
+    """Open a snapshot written by export_transaction_snapshot."""
+    try:
+        return TransactionSnapshot(snapshot_dir)
+    except (OSError, ValueError, KeyError) as e:
+        raise DatabaseError("snapshot_load", f"{snapshot_dir}: {e}")
@@ -9,6 +9,14 @@ from loguru import logger
 from src.recommend.content_schema import ContentItem
 from src.recommend.recommendation_engine import Recommendation
 
+# Per-request lookups; src/db/hot_queries.py checks their query plans
+CONSENT_CHECK_SQL = "SELECT consent_status FROM users WHERE user_id = :user_id"
+RATE_LIMIT_COUNT_SQL = """
+    SELECT COUNT(*) as count
+    FROM recommendations
+    WHERE user_id = :user_id AND created_at >= :today
+"""
+
 class GuardrailViolation(Exception):
     """Raised when a guardrail is violated."""
     def __init__(self, guardrail_name: str, reason: str):
@@ -53,12 +61,10 @@ class Guardrails:
             GuardrailViolation if consent check fails
         """
         try:
-            from src.db.connection import database_transaction
+            from src.db.connection import database_read
             
-            with database_transaction() as conn:
-                result = conn.execute("""
-                    SELECT consent_status FROM users WHERE user_id = ?
-                """, (user_id,)).fetchone()
+            with database_read() as conn:
+                result = conn.execute(CONSENT_CHECK_SQL, {'user_id': user_id}).fetchone()
                 
                 if not result:
                     raise GuardrailViolation(
@@ -219,17 +225,15 @@ class Guardrails:
             GuardrailViolation if rate limit exceeded
         """
         try:
-            from src.db.connection import database_transaction
+            from src.db.connection import database_read
             from datetime import datetime, timedelta
             
             today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
             
-            with database_transaction() as conn:
-                count = conn.execute("""
-                    SELECT COUNT(*) as count
-                    FROM recommendations
-                    WHERE user_id = ? AND created_at >= ?
-                """, (user_id, today_start.isoformat())).fetchone()
+            with database_read() as conn:
+                count = conn.execute(
+                    RATE_LIMIT_COUNT_SQL, {'user_id': user_id, 'today': today_start.isoformat()}
+                ).fetchone()
                 
                 if count and count['count'] >= max_per_day:
                     raise GuardrailViolation(
@@ -0,0 +1,266 @@
+"""
+Background job runner
+Runs dashboard-triggered signal computation on a worker thread and records
+status, progress and throughput in the jobs table, so the UI can poll a job
+instead of blocking on it
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src.db.connection import DatabaseError, database_read, database_transaction
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+ACTIVE_STATUSES = ('queued', 'running')
+
+SIGNAL_JOB_TYPE = 'compute_signals'
+
+# Working memory budget for a background signal run; the run is streamed in
+# chunks of this size, which is also how often progress and cancellation are checked
+DEFAULT_JOB_MEMORY_MB = 256
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested."""
+    pass
+
+
+def _job_row(row) -> Dict[str, Any]:
+    job = dict(row)
+    job['params'] = json.loads(job['params']) if job.get('params') else {}
+    job['cancel_requested'] = bool(job['cancel_requested'])
+    return job
+
+
+def create_job(job_type: str, params: Dict[str, Any], db_path: str = "db/spend_sense.db") -> str:
+    """Record a queued job, owned by this process, and return its id."""
+    job_id = uuid.uuid4().hex
+    with database_transaction(db_path) as conn:
+        conn.execute("""
+            INSERT INTO jobs (job_id, job_type, status, params, owner_pid, owner_identity)
+            VALUES (?, ?, 'queued', ?, ?, ?)
+        """, (job_id, job_type, json.dumps(params), os.getpid(), process_identity(os.getpid())))
+    return job_id
+
+
+def get_job(job_id: str, db_path: str = "db/spend_sense.db") -> Optional[Dict[str, Any]]:
+    """A job's current row, or None if it doesn't exist."""
+    with database_read(db_path) as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return _job_row(row) if row else None
+
+
+def list_jobs(db_path: str = "db/spend_sense.db", limit: int = 20) -> List[Dict[str, Any]]:
+    """Most recent jobs first."""
+    with database_read(db_path) as conn:
+        rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC, rowid DESC LIMIT ?", (limit,)).fetchall()
+    return [_job_row(row) for row in rows]
+
+
+def request_job_cancel(job_id: str, db_path: str = "db/spend_sense.db") -> bool:
+    """Flag a queued or running job for cancellation; returns False if it already finished."""
+    with database_transaction(db_path) as conn:
+        cursor = conn.execute(
+            f"UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND status IN {ACTIVE_STATUSES}",
+            (job_id,)
+        )
+    return cursor.rowcount > 0
+
+
+def process_identity(pid: int) -> Optional[str]:
+    """Boot id and start time of a running process, or None where /proc isn't available.
+
+    A pid is reused once its process exits, and after a container or host
+    restart the same low pids come back; the start time (and, across host
+    reboots, the boot id) tells the new process from the one that owned a job.
+    """
+    try:
+        boot_id = Path('/proc/sys/kernel/random/boot_id').read_text().strip()
+        stat = Path(f'/proc/{pid}/stat').read_text()
+    except OSError:
+        return None
+    # Fields after the parenthesized command name start at field 3; starttime is field 22
+    start_ticks = stat[stat.rindex(')') + 2:].split()[19]
+    return f"{boot_id}:{start_ticks}"
+
+
+def _owner_alive(pid: Optional[int], identity: Optional[str]) -> bool:
+    """Whether the process that recorded a job still runs (no recorded pid counts as gone)."""
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        pass
+    if identity is None:
+        return True
+    current = process_identity(pid)
+    # Without /proc the pid check is all there is
+    return current is None or current == identity
+
+
+def fail_interrupted_jobs(db_path: str = "db/spend_sense.db") -> int:
+    """Mark jobs left queued or running by a process that exited as failed.
+
+    Jobs whose owner process is still alive (another dashboard or worker
+    sharing the database) are left alone. A live process that merely reuses
+    the owner's pid doesn't count: its process_identity differs.
+    """
+    with database_transaction(db_path) as conn:
+        active = conn.execute(
+            f"SELECT job_id, owner_pid, owner_identity FROM jobs WHERE status IN {ACTIVE_STATUSES}"
+        ).fetchall()
+        orphaned = [(row['job_id'],) for row in active if not _owner_alive(row['owner_pid'], row['owner_identity'])]
+        conn.executemany(f"""
+            UPDATE jobs
+            SET status = 'failed', error_message = 'Interrupted: the process running this job exited',
+                finished_at = CURRENT_TIMESTAMP
+            WHERE job_id = ? AND status IN {ACTIVE_STATUSES}
+        """, orphaned)
+    return len(orphaned)
+
+
+def _update_job(job_id: str, db_path: str, **fields):
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    with database_transaction(db_path) as conn:
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+
+class JobRunner:
+    """Runs jobs for one database on a small thread pool.
+
+    Each job's progress is written to its jobs row as it runs. Cancellation is
+    cooperative: the job stops at the next progress checkpoint (the end of a
+    streamed chunk) once cancel() is called or its cancel_requested flag is set.
+    """
+
+    def __init__(self, db_path: str = "db/spend_sense.db", max_workers: int = 1):
+        self.db_path = db_path
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='spendsense-job')
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit_signal_job(self, window_days: int = 180, windows: Optional[List[int]] = None,
+                          max_memory_mb: float = DEFAULT_JOB_MEMORY_MB) -> str:
+        """Queue a full signal computation and return its job id."""
+        params = {'window_days': window_days, 'windows': windows, 'max_memory_mb': max_memory_mb}
+        job_id = create_job(SIGNAL_JOB_TYPE, params, self.db_path)
+        with self._lock:
+            self._cancel_events[job_id] = threading.Event()
+            self._futures[job_id] = self._executor.submit(self._run_signal_job, job_id, params)
+        logger.info(f"Queued signal job {job_id}")
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation; returns False if the job has already finished."""
+        with self._lock:
+            event = self._cancel_events.get(job_id)
+        if event:
+            event.set()
+        return request_job_cancel(job_id, self.db_path)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until a job submitted to this runner finishes; returns its final row."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future:
+            future.result(timeout=timeout)
+        return get_job(job_id, self.db_path)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            events = list(self._cancel_events.values())
+        if not wait:
+            for event in events:
+                event.set()
+        self._executor.shutdown(wait=wait)
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            event = self._cancel_events.get(job_id)
+        if event and event.is_set():
+            return True
+        job = get_job(job_id, self.db_path)
+        return bool(job and job['cancel_requested'])
+
+    def _run_signal_job(self, job_id: str, params: Dict[str, Any]):
+        # Imported here: scripts/ is only importable with the project root on sys.path
+        from scripts.compute_signals import compute_all_user_signals
+
+        try:
+            if self._cancel_requested(job_id):
+                raise JobCancelled()
+
+            with database_read(self.db_path) as conn:
+                users_total = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+            started = time.perf_counter()
+            _update_job(job_id, self.db_path, status='running', users_total=users_total,
+                        started_at=datetime.now().isoformat())
+
+            def progress(users_done: int, errors: int):
+                elapsed = time.perf_counter() - started
+                _update_job(job_id, self.db_path, users_done=users_done, error_count=errors,
+                            users_per_second=users_done / elapsed if elapsed > 0 else None)
+                if self._cancel_requested(job_id):
+                    raise JobCancelled()
+
+            success_count, error_count = compute_all_user_signals(
+                params['window_days'], self.db_path, windows=params.get('windows'),
+                max_memory_mb=params['max_memory_mb'], progress=progress
+            )
+
+            elapsed = time.perf_counter() - started
+            job = get_job(job_id, self.db_path)
+            _update_job(job_id, self.db_path, status='succeeded' if error_count == 0 else 'failed',
+                        error_count=error_count,
+                        users_per_second=job['users_done'] / elapsed if elapsed > 0 else None,
+                        error_message=None if error_count == 0 else f"{error_count} signal rows failed",
+                        finished_at=datetime.now().isoformat())
+            logger.info(f"Signal job {job_id} finished: {success_count} rows saved, {error_count} errors")
+
+        except JobCancelled:
+            _update_job(job_id, self.db_path, status='cancelled', finished_at=datetime.now().isoformat())
+            logger.info(f"Signal job {job_id} cancelled")
+        except Exception as e:
+            logger.error(f"Signal job {job_id} failed: {e}")
+            try:
+                _update_job(job_id, self.db_path, status='failed', error_message=str(e),
+                            finished_at=datetime.now().isoformat())
+            except DatabaseError as update_error:
+                logger.error(f"Could not record failure of job {job_id}: {update_error}")
+        finally:
+            with self._lock:
+                self._cancel_events.pop(job_id, None)
+
+
+_runners: Dict[str, JobRunner] = {}
+_runners_lock = threading.Lock()
+
+
+def get_job_runner(db_path: str = "db/spend_sense.db") -> JobRunner:
+    """The process-wide runner for db_path, created on first use.
+
+    Creating it marks jobs still queued or running from a process that has
+    since exited as failed, since nothing will resume them.
+    """
+    key = str(Path(db_path).resolve())
+    with _runners_lock:
+        runner = _runners.get(key)
+        if runner is None:
+            interrupted = fail_interrupted_jobs(db_path)
+            if interrupted:
+                logger.warning(f"Marked {interrupted} interrupted jobs as failed")
+            runner = _runners[key] = JobRunner(db_path)
+        return runner
@@ -131,6 +131,7 @@ def validate_persona_config(personas: Dict[str, PersonaConfig]) -> List[str]:
         'monthly_bank_fees', 'bank_fee_count', 'has_overdraft_fees', 'has_atm_fees', 'has_maintenance_fees',
         # Fraud detection signals
         'fraud_transaction_count', 'fraud_rate', 'has_fraud_history', 'fraud_risk_score',
+        'impossible_travel_count', 'geo_velocity_max',
         # Data quality flags
         'insufficient_data', 'data_quality_score'
     }
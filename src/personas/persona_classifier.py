@@ -236,23 +236,23 @@ def save_persona_assignment(
 ) -> bool:
     """Save persona assignment to database."""
     try:
-        from src.db.connection import database_transaction
+        from src.db.write_queue import get_write_queue
         import json
         
-        with database_transaction(db_path) as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO persona_assignments 
-                (user_id, window, persona, criteria)
-                VALUES (?, ?, ?, ?)
-            """, (
-                user_id,
-                window,
-                persona_match.persona_id,
-                json.dumps({
-                    "matched_criteria": persona_match.matched_criteria,
-                    "confidence": persona_match.confidence
-                })
-            ))
+        # Group-committed with other queued writes; returns once durable
+        get_write_queue(db_path).execute("""
+            INSERT OR REPLACE INTO persona_assignments 
+            (user_id, window, persona, criteria)
+            VALUES (?, ?, ?, ?)
+        """, (
+            user_id,
+            window,
+            persona_match.persona_id,
+            json.dumps({
+                "matched_criteria": persona_match.matched_criteria,
+                "confidence": persona_match.confidence
+            })
+        )).result()
         
         logger.debug(f"Saved persona assignment for user {user_id}: {persona_match.persona_id}")
         return True
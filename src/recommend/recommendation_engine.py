@@ -16,6 +16,15 @@ from src.recommend.content_schema import (
 )
 from src.recommend.signal_mapper import map_signals_to_triggers, explain_triggers_for_user
 
+# Content a user viewed since a cutoff; src/db/hot_queries.py checks its query plan
+RECENTLY_VIEWED_CONTENT_SQL = """
+    SELECT DISTINCT content_id
+    FROM recommendations
+    WHERE user_id = :user_id
+    AND viewed_at IS NOT NULL
+    AND viewed_at > :since
+"""
+
 @dataclass
 class Recommendation:
     """A single recommendation with rationale."""
@@ -601,18 +610,14 @@ class RecommendationEngine:
     def _get_recent_content_ids(self, user_id: str, days: int) -> List[str]:
         """Get content IDs that user has viewed recently."""
         try:
-            from src.db.connection import database_transaction
+            from src.db.connection import database_read
             
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            with database_transaction() as conn:
-                results = conn.execute("""
-                    SELECT DISTINCT content_id 
-                    FROM recommendations 
-                    WHERE user_id = ? 
-                    AND viewed_at IS NOT NULL 
-                    AND viewed_at > ?
-                """, (user_id, cutoff_date.isoformat())).fetchall()
+            with database_read() as conn:
+                results = conn.execute(
+                    RECENTLY_VIEWED_CONTENT_SQL, {'user_id': user_id, 'since': cutoff_date.isoformat()}
+                ).fetchall()
             
             return [row['content_id'] for row in results]
             
@@ -627,26 +632,28 @@ def save_recommendations(
 ) -> bool:
     """Save recommendations to database."""
     try:
-        from src.db.connection import database_transaction
+        from src.db.write_queue import get_write_queue
         import json
         
-        with database_transaction(db_path) as conn:
-            for rec in recommendations:
+        rows = [
+            (
+                rec.rec_id,
+                user_id,
+                rec.content_id,
+                rec.rationale,
+                datetime.now().isoformat(),
                 # Convert decision_trace to JSON string
-                decision_trace_json = json.dumps(rec.decision_trace) if rec.decision_trace else None
-                
-                conn.execute("""
-                    INSERT INTO recommendations 
-                    (rec_id, user_id, content_id, rationale, created_at, decision_trace)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    rec.rec_id,
-                    user_id,
-                    rec.content_id,
-                    rec.rationale,
-                    datetime.now().isoformat(),
-                    decision_trace_json
-                ))
+                json.dumps(rec.decision_trace) if rec.decision_trace else None
+            )
+            for rec in recommendations
+        ]
+        
+        # Group-committed with other queued writes; returns once durable
+        get_write_queue(db_path).executemany("""
+            INSERT INTO recommendations 
+            (rec_id, user_id, content_id, rationale, created_at, decision_trace)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows).result()
         
         logger.info(f"Saved {len(recommendations)} recommendations for user {user_id}")
         return True
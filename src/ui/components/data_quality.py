@@ -11,7 +11,7 @@ import json
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.append(str(project_root))
 
-from src.db.connection import database_transaction
+from src.db.connection import database_read
 from loguru import logger
 
 def render_data_quality():
@@ -140,15 +140,15 @@ def get_data_quality_metrics(db_path: str = None) -> dict:
     if db_path is None:
         db_path = st.session_state.get('db_path', 'db/spend_sense.db')
     try:
-        with database_transaction(db_path) as conn:
-            # Get all signals with quality scores
+        with database_read(db_path) as conn:
+            # Typed signal columns; blobs are only read for rows that recorded errors
             results = conn.execute("""
                 SELECT 
                     user_id,
-                    window,
-                    signals,
+                    data_quality_score,
+                    computation_error_count,
                     computed_at
-                FROM user_signals
+                FROM user_signal_values
                 WHERE window = '180d'
             """).fetchall()
             
@@ -163,14 +163,11 @@ def get_data_quality_metrics(db_path: str = None) -> dict:
                     'error_users': []
                 }
             
-            # Parse signals and extract quality metrics
             quality_scores = []
             low_quality_users = []
-            error_users = []
             
             for row in results:
-                signals = json.loads(row['signals'])
-                quality_score = signals.get('data_quality_score', 0.0)
+                quality_score = row['data_quality_score'] if row['data_quality_score'] is not None else 0.0
                 quality_scores.append(quality_score)
                 
                 # Track low quality users
@@ -180,15 +177,22 @@ def get_data_quality_metrics(db_path: str = None) -> dict:
                         'quality_score': quality_score,
                         'computed_at': row['computed_at']
                     })
-                
-                # Track users with errors
-                errors = signals.get('computation_errors', [])
-                if errors:
-                    error_users.append({
-                        'user_id': row['user_id'],
-                        'errors': ', '.join(errors),
-                        'quality_score': quality_score
-                    })
+            
+            # Track users with errors
+            error_users = []
+            error_rows = conn.execute("""
+                SELECT v.user_id, v.data_quality_score, s.signals
+                FROM user_signal_values v
+                JOIN user_signals s ON s.user_id = v.user_id AND s.window = v.window
+                WHERE v.window = '180d' AND v.computation_error_count > 0
+            """).fetchall()
+            for row in error_rows:
+                errors = json.loads(row['signals']).get('computation_errors', [])
+                error_users.append({
+                    'user_id': row['user_id'],
+                    'errors': ', '.join(errors),
+                    'quality_score': row['data_quality_score'] if row['data_quality_score'] is not None else 0.0
+                })
             
             # Calculate distribution
             distribution = {
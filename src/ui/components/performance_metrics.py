@@ -11,7 +11,7 @@ from datetime import datetime, timedelta
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.append(str(project_root))
 
-from src.db.connection import database_transaction
+from src.db.connection import database_read
 from loguru import logger
 
 def render_performance_metrics():
@@ -187,7 +187,7 @@ def calculate_performance_metrics(db_path: str = None) -> dict:
     if db_path is None:
         db_path = st.session_state.get('db_path', 'db/spend_sense.db')
     try:
-        with database_transaction(db_path) as conn:
+        with database_read(db_path) as conn:
             # Get recommendation generation times (if we track them)
             # For now, return basic metrics
             total_recs = conn.execute("SELECT COUNT(*) FROM recommendations").fetchone()[0]
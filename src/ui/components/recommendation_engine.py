@@ -10,7 +10,7 @@ from typing import List, Dict, Any
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.append(str(project_root))
 
-from src.db.connection import database_transaction
+from src.db.connection import database_read
 from loguru import logger
 
 @st.cache_data(ttl=300)  # Cache for 5 minutes
@@ -130,47 +130,23 @@ def get_approval_queue(limit: int = 50, status: str = None, db_path: str = None)
         
         logger.info(f"Fetching recommendations: status={status}, limit={limit}, where={where_clause}")
         
-        with database_transaction(db_path) as conn:
-            # Check if decision_trace column exists
-            cursor = conn.execute("PRAGMA table_info(recommendations)")
-            columns = [row[1] for row in cursor.fetchall()]
-            has_decision_trace = 'decision_trace' in columns
-            
-            # Build query based on available columns
-            if has_decision_trace:
-                query = f"""
-                    SELECT 
-                        rec_id,
-                        user_id,
-                        content_id,
-                        rationale,
-                        created_at,
-                        approved,
-                        delivered,
-                        decision_trace
-                    FROM recommendations
-                    {where_clause}
-                    ORDER BY created_at DESC
-                    LIMIT ?
-                """
-            else:
-                # Fallback query without decision_trace
-                logger.info("decision_trace column not found, using fallback query")
-                query = f"""
-                    SELECT 
-                        rec_id,
-                        user_id,
-                        content_id,
-                        rationale,
-                        created_at,
-                        approved,
-                        delivered,
-                        NULL as decision_trace
-                    FROM recommendations
-                    {where_clause}
-                    ORDER BY created_at DESC
-                    LIMIT ?
-                """
+        with database_read(db_path) as conn:
+            # decision_trace is guaranteed by schema migration 2 (see MIGRATIONS)
+            query = f"""
+                SELECT 
+                    rec_id,
+                    user_id,
+                    content_id,
+                    rationale,
+                    created_at,
+                    approved,
+                    delivered,
+                    decision_trace
+                FROM recommendations
+                {where_clause}
+                ORDER BY created_at DESC
+                LIMIT ?
+            """
             
             logger.debug(f"Executing query: {query}")
             results = conn.execute(query, (limit,)).fetchall()
@@ -208,19 +184,14 @@ def get_approval_queue(limit: int = 50, status: str = None, db_path: str = None)
                 
                 # Parse decision_trace if present
                 decision_trace = None
-                try:
-                    # sqlite3.Row doesn't have .get(), use try/except instead
-                    trace_value = row['decision_trace']
-                    if trace_value:
-                        import json
-                        try:
-                            decision_trace = json.loads(trace_value)
-                        except (json.JSONDecodeError, TypeError) as e:
-                            logger.warning(f"Error parsing decision_trace: {e}")
-                            decision_trace = None
-                except (KeyError, IndexError):
-                    # Column doesn't exist or is None
-                    decision_trace = None
+                trace_value = row['decision_trace']
+                if trace_value:
+                    import json
+                    try:
+                        decision_trace = json.loads(trace_value)
+                    except (json.JSONDecodeError, TypeError) as e:
+                        logger.warning(f"Error parsing decision_trace: {e}")
+                        decision_trace = None
                 
                 recommendations.append({
                     "rec_id": row['rec_id'],
@@ -348,14 +319,13 @@ def approve_recommendation(rec_id: str, approved: bool, db_path: str = None):
     if db_path is None:
         db_path = st.session_state.get('db_path', 'db/spend_sense.db')
     try:
-        from src.db.connection import database_transaction
+        from src.db.write_queue import get_write_queue
         
-        with database_transaction(db_path) as conn:
-            conn.execute("""
-                UPDATE recommendations 
-                SET approved = ?, delivered = ?
-                WHERE rec_id = ?
-            """, (approved, approved, rec_id))
+        get_write_queue(db_path).execute("""
+            UPDATE recommendations 
+            SET approved = ?, delivered = ?
+            WHERE rec_id = ?
+        """, (approved, approved, rec_id)).result()
         
         logger.info(f"Recommendation {rec_id} {'approved' if approved else 'rejected'}")
         
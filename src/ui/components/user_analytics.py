@@ -10,7 +10,7 @@ from datetime import datetime, timedelta
 import json
 from typing import Dict, List
 
-from src.db.connection import database_transaction
+from src.db.connection import database_read
 from src.personas.persona_classifier import classify_persona
 from src.features.schema import UserSignals
 from loguru import logger
@@ -18,8 +18,9 @@ from loguru import logger
 def get_user_data(db_path: str) -> pd.DataFrame:
     """Get comprehensive user data for analytics."""
     try:
-        with database_transaction(db_path) as conn:
-            # Get users with their latest signals and recommendations
+        with database_read(db_path) as conn:
+            # Get users with their latest signals and recommendations; the key
+            # signal metrics come from the typed user_signal_values columns
             query = """
             SELECT 
                 u.user_id,
@@ -27,49 +28,38 @@ def get_user_data(db_path: str) -> pd.DataFrame:
                 s.window,
                 s.signals,
                 s.computed_at as signals_computed_at,
-                COUNT(DISTINCT r.rec_id) as total_recommendations,
-                MAX(r.created_at) as last_recommendation_at
+                v.data_quality_score,
+                v.insufficient_data,
+                v.subscription_count,
+                v.credit_utilization_max,
+                v.has_fraud_history,
+                v.fraud_risk_score,
+                COALESCE(r.total_recommendations, 0) as total_recommendations,
+                r.last_recommendation_at
             FROM users u
             LEFT JOIN user_signals s ON u.user_id = s.user_id AND s.window = '180d'
-            LEFT JOIN recommendations r ON u.user_id = r.user_id
-            GROUP BY u.user_id, u.consent_status, s.window, s.signals, s.computed_at
+            LEFT JOIN user_signal_values v ON u.user_id = v.user_id AND v.window = '180d'
+            LEFT JOIN (
+                SELECT user_id, COUNT(DISTINCT rec_id) as total_recommendations,
+                       MAX(created_at) as last_recommendation_at
+                FROM recommendations
+                GROUP BY user_id
+            ) r ON u.user_id = r.user_id
             ORDER BY u.user_id
             """
             
             df = pd.read_sql_query(query, conn)
             
-            # Parse signals JSON
-            if not df.empty and 'signals' in df.columns:
+            if not df.empty:
+                # Parsed blobs are still needed for persona classification
                 df['parsed_signals'] = df['signals'].apply(
                     lambda x: json.loads(x) if x else {}
                 )
-                
-                # Extract key signal metrics
-                df['data_quality_score'] = df['parsed_signals'].apply(
-                    lambda x: x.get('data_quality_score', 0.0)
-                )
-                df['insufficient_data'] = df['parsed_signals'].apply(
-                    lambda x: x.get('insufficient_data', True)
-                )
-                df['subscription_count'] = df['parsed_signals'].apply(
-                    lambda x: x.get('subscription_count', 0)
-                )
-                df['credit_utilization_max'] = df['parsed_signals'].apply(
-                    lambda x: x.get('credit_utilization_max')
-                )
-                # Extract fraud signals
-                df['has_fraud_history'] = df['parsed_signals'].apply(
-                    lambda x: x.get('has_fraud_history', False)
-                )
-                df['fraud_risk_score'] = df['parsed_signals'].apply(
-                    lambda x: x.get('fraud_risk_score', 0.0)
-                )
-            else:
-                # Add empty columns for consistency
-                df['data_quality_score'] = 0.0
-                df['insufficient_data'] = True
-                df['subscription_count'] = 0
-                df['credit_utilization_max'] = None
+                df['data_quality_score'] = df['data_quality_score'].fillna(0.0)
+                df['insufficient_data'] = df['insufficient_data'].fillna(1).astype(bool)
+                df['subscription_count'] = df['subscription_count'].fillna(0).astype(int)
+                df['has_fraud_history'] = df['has_fraud_history'].fillna(0).astype(bool)
+                df['fraud_risk_score'] = df['fraud_risk_score'].fillna(0.0)
             
             return df
             
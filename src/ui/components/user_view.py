@@ -11,7 +11,7 @@ from typing import Optional, Dict, Any
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.append(str(project_root))
 
-from src.db.connection import database_transaction, get_user_signals
+from src.db.connection import database_read, database_transaction, get_user_signals
 from src.features.schema import UserSignals
 from src.recommend.recommendation_engine import RecommendationEngine, save_recommendations
 from loguru import logger
@@ -20,7 +20,7 @@ def get_available_user_ids() -> list:
     """Get list of all available user IDs from database."""
     try:
         db_path = st.session_state.get('db_path', 'db/spend_sense.db')
-        with database_transaction(db_path) as conn:
+        with database_read(db_path) as conn:
             results = conn.execute("""
                 SELECT DISTINCT user_id 
                 FROM users 
@@ -223,7 +223,7 @@ def get_user_consent_status(user_id: str) -> Optional[bool]:
     """Get user's consent status from database."""
     try:
         db_path = st.session_state.get('db_path', 'db/spend_sense.db')
-        with database_transaction(db_path) as conn:
+        with database_read(db_path) as conn:
             result = conn.execute("""
                 SELECT consent_status FROM users WHERE user_id = ?
             """, (user_id,)).fetchone()
@@ -444,7 +444,7 @@ def get_recommendations_from_db(user_id: str) -> list:
     Returns empty list if user has not consented to data sharing.
     """
     try:
-        from src.db.connection import database_transaction
+        from src.db.connection import database_read
         
         # Check consent first - don't return recommendations if no consent
         consent_status = get_user_consent_status(user_id)
@@ -453,7 +453,7 @@ def get_recommendations_from_db(user_id: str) -> list:
             return []
         
         db_path = st.session_state.get('db_path', 'db/spend_sense.db')
-        with database_transaction(db_path) as conn:
+        with database_read(db_path) as conn:
             # Get recent recommendations (last 30 days, approved or pending)
             results = conn.execute("""
                 SELECT 
@@ -618,16 +618,15 @@ def generate_fresh_recommendations(user_id: str) -> bool:
 def mark_recommendation_viewed(rec_id: str):
     """Mark recommendation as viewed."""
     try:
-        from src.db.connection import database_transaction
+        from src.db.write_queue import get_write_queue
         from datetime import datetime
         
         db_path = st.session_state.get('db_path', 'db/spend_sense.db')
-        with database_transaction(db_path) as conn:
-            conn.execute("""
-                UPDATE recommendations
-                SET viewed_at = ?
-                WHERE rec_id = ?
-            """, (datetime.now().isoformat(), rec_id))
+        get_write_queue(db_path).execute("""
+            UPDATE recommendations
+            SET viewed_at = ?
+            WHERE rec_id = ?
+        """, (datetime.now().isoformat(), rec_id)).result()
     except Exception as e:
         logger.warning(f"Could not mark recommendation as viewed: {e}")
 
@@ -50,12 +50,14 @@ import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
 import sys
+import time
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
-from src.db.connection import database_transaction
+from src.db.connection import database_read, ensure_schema_current
+from src.jobs.runner import ACTIVE_STATUSES, get_job, get_job_runner
 from src.ui.components.user_analytics import render_user_analytics
 from src.ui.components.user_view import render_user_view
 from src.ui.components.recommendation_engine import render_recommendation_engine
@@ -64,6 +66,9 @@ from src.ui.components.performance_metrics import render_performance_metrics
 from src.ui.components.system_logs import render_system_logs
 from loguru import logger
 
+# Seconds between progress refreshes while a background signal job runs
+JOB_POLL_SECONDS = 2
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -98,11 +103,17 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def migrate_database(db_path: str) -> int:
+    """Apply pending schema migrations, once per database for the server process."""
+    return ensure_schema_current(db_path)
+
 def initialize_session_state():
     """Initialize Streamlit session state variables."""
     if 'db_path' not in st.session_state:
         # Use environment variable if set, otherwise default
         st.session_state.db_path = os.getenv("DATABASE_PATH", "db/spend_sense.db")
+    migrate_database(st.session_state.db_path)
     
     if 'last_refresh' not in st.session_state:
         st.session_state.last_refresh = None
@@ -112,7 +123,7 @@ def initialize_session_state():
 def get_system_health() -> dict:
     """Get basic system health metrics."""
     try:
-        with database_transaction(st.session_state.db_path) as conn:
+        with database_read(st.session_state.db_path) as conn:
             # User counts
             total_users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
             users_with_signals = conn.execute("SELECT COUNT(DISTINCT user_id) FROM user_signals").fetchone()[0]
@@ -123,8 +134,8 @@ def get_system_health() -> dict:
             
             # Data quality metrics
             avg_data_quality_result = conn.execute("""
-                SELECT AVG(CAST(JSON_EXTRACT(signals, '$.data_quality_score') AS FLOAT))
-                FROM user_signals 
+                SELECT AVG(data_quality_score)
+                FROM user_signal_values
                 WHERE window = '180d'
             """).fetchone()[0]
             avg_data_quality = avg_data_quality_result if avg_data_quality_result is not None else 0.0
@@ -294,7 +305,7 @@ def render_system_overview():
             st.session_state.last_refresh = datetime.now()
             st.rerun()
     with col2:
-        if st.button("🔧 Compute Signals", help="Compute signals for all users (may take 1-2 minutes). After completion, user personas will appear and you can view personalized recommendations.", use_container_width=True):
+        if st.button("🔧 Compute Signals", help="Compute signals for all users in the background. Progress is shown at the top of the page; after completion, user personas will appear and you can view personalized recommendations.", use_container_width=True):
             st.session_state.compute_signals = True
             st.rerun()
     
@@ -356,39 +367,83 @@ def render_system_overview():
             st.error("❌ No user signals found")
             st.info("💡 Click '🔧 Compute Signals' above to generate signals for all users")
 
-def compute_signals_from_dashboard(db_path: str = "db/spend_sense.db"):
-    """Compute signals for all users from dashboard."""
-    try:
-        import subprocess
-        import sys
-        
-        # Get project root (parent of src/)
-        project_root = Path(__file__).parent.parent.parent
-        script_path = project_root / "scripts" / "compute_signals.py"
-        
-        # Set environment with PYTHONPATH
-        env = os.environ.copy()
-        env['PYTHONPATH'] = str(project_root)
-        
-        # Run signal computation script
-        result = subprocess.run(
-            [sys.executable, str(script_path), "--db-path", db_path],
-            capture_output=True,
-            text=True,
-            timeout=300,  # 5 minute timeout
-            cwd=str(project_root),  # Set working directory
-            env=env  # Pass environment with PYTHONPATH
-        )
+def compute_signals_from_dashboard(db_path: str = "db/spend_sense.db") -> str:
+    """Start signal computation for all users as a background job and return its id."""
+    return get_job_runner(db_path).submit_signal_job()
+
+def render_signal_job_status(db_path: str):
+    """Show the dashboard's signal job: live progress while it runs, the outcome once it ends.
+    
+    Returns:
+        True while the job is still queued or running
+    """
+    job_id = st.session_state.get('signal_job_id')
+    if not job_id:
+        return False
+    
+    job = get_job(job_id, db_path)
+    if job is None:
+        del st.session_state.signal_job_id
+        return False
+    
+    if job['status'] in ACTIVE_STATUSES:
+        total = job['users_total'] or 0
+        done = job['users_done']
+        st.info(f"🔄 Computing signals in the background ({job['status']}). You can keep using the dashboard.")
+        st.progress(min(done / total, 1.0) if total else 0.0, text=f"{done}/{total or '?'} users")
+        if job['users_per_second']:
+            st.caption(f"Throughput: {job['users_per_second']:.1f} users/sec · Errors: {job['error_count']}")
+        if st.button("⏹️ Cancel signal computation", key="cancel_signal_job"):
+            get_job_runner(db_path).cancel(job_id)
+            st.rerun()
+        return True
+    
+    # Job finished: report once, then forget it
+    del st.session_state.signal_job_id
+    if job['status'] == 'cancelled':
+        st.warning(f"⏹️ Signal computation cancelled after {job['users_done']} users")
+    elif job['status'] == 'failed':
+        st.error("❌ **Signal computation failed**")
+        st.error(f"Error: {job['error_message']}")
+        st.info("💡 You can also run: `python scripts/compute_signals.py` from the command line")
+    else:
+        # Check if signals actually have data quality > 0
+        with database_read(db_path) as conn:
+            sample_result = conn.execute("""
+                SELECT data_quality_score FROM user_signal_values 
+                WHERE window = '180d' 
+                LIMIT 1
+            """).fetchone()
         
-        if result.returncode == 0:
-            return True, result.stdout
+        if sample_result is None:
+            st.error("❌ **No signals found in database after computation**")
+            st.info("Check Railway logs for errors")
+        elif not sample_result['data_quality_score']:
+            st.warning("⚠️ **Signals computed but data quality is 0.0**")
+            st.info("""
+            **Diagnosis:**
+            - Signals were saved to database
+            - But data_quality_score = 0.0 for all users
+            - This usually means transactions are empty or computation failed
+            
+            **Check:**
+            - Are there transactions in the database?
+            - Check Railway logs for computation errors
+            """)
         else:
-            error_msg = result.stderr or result.stdout or "Unknown error"
-            return False, error_msg
-    except subprocess.TimeoutExpired:
-        return False, "Signal computation timed out after 5 minutes"
-    except Exception as e:
-        return False, f"Error running script: {str(e)}"
+            rate = f" ({job['users_per_second']:.1f} users/sec)" if job['users_per_second'] else ""
+            st.success(f"✅ **Signal computation complete for {job['users_done']} users{rate}!**")
+            st.info("""
+            **What happened:**
+            - Behavioral signals have been computed for all users
+            - User personas should now appear (colored icons instead of gray in User View)
+            
+            **Next steps:**
+            1. Go to "User View" and click a user ID to see their persona
+            2. Recommendations will be auto-generated (or run `python scripts/generate_recommendations.py --all`)
+            """)
+    st.session_state.last_refresh = datetime.now()
+    return False
 
 def main():
     """Main dashboard application."""
@@ -398,73 +453,10 @@ def main():
     # Handle signal computation request
     if st.session_state.get('compute_signals', False):
         st.session_state.compute_signals = False  # Reset flag
-        
-        # Show clear status at top of page
-        st.info("🔄 Computing signals for all users... This may take 1-2 minutes. Please wait.")
-        
-        with st.spinner("⏳ Processing... This may take a few minutes."):
-            success, message = compute_signals_from_dashboard(st.session_state.db_path)
-        
-        # Clear the info message
-        st.empty()
-        
-        if success:
-            # Extract user count from message if available
-            import re
-            user_match = re.search(r'(\d+)\s*users?', message, re.IGNORECASE)
-            user_count = user_match.group(1) if user_match else "all"
-            
-            # Check if signals actually have data quality > 0
-            with database_transaction(st.session_state.db_path) as conn:
-                sample_result = conn.execute("""
-                    SELECT signals FROM user_signals 
-                    WHERE window = '180d' 
-                    LIMIT 1
-                """).fetchone()
-                
-                if sample_result:
-                    import json
-                    sample_signals = json.loads(sample_result['signals'])
-                    sample_quality = sample_signals.get('data_quality_score', 0.0)
-                    
-                    if sample_quality == 0.0:
-                        st.warning("⚠️ **Signals computed but data quality is 0.0**")
-                        st.info(f"""
-                        **Diagnosis:**
-                        - Signals were saved to database
-                        - But data_quality_score = 0.0 for all users
-                        - This usually means transactions are empty or computation failed
-                        
-                        **Check:**
-                        - Are there transactions in the database?
-                        - Check Railway logs for computation errors
-                        - Sample signal keys: {list(sample_signals.keys())[:5]}
-                        """)
-                    else:
-                        st.success(f"✅ **Signal computation complete for {user_count} users!**")
-                        st.info("""
-                        **What happened:**
-                        - Behavioral signals have been computed for all users
-                        - User personas should now appear (colored icons instead of gray in User View)
-                        
-                        **Next steps:**
-                        1. The page will refresh automatically in a moment
-                        2. Go to "User View" and click a user ID to see their persona
-                        3. Recommendations will be auto-generated (or run `python scripts/generate_recommendations.py --all`)
-                        """)
-                else:
-                    st.error("❌ **No signals found in database after computation**")
-                    st.info("Check Railway logs for errors")
-            
-            st.session_state.last_refresh = datetime.now()
-            import time
-            time.sleep(3)  # Give user time to read the message
-            st.rerun()
-        else:
-            st.error(f"❌ **Signal computation failed**")
-            st.error(f"Error: {message}")
-            st.code(message[:500] if len(message) > 500 else message)  # Show error details
-            st.info("💡 You can also run: `python scripts/compute_signals.py` from the command line")
+        if not st.session_state.get('signal_job_id'):
+            st.session_state.signal_job_id = compute_signals_from_dashboard(st.session_state.db_path)
+    
+    signal_job_active = render_signal_job_status(st.session_state.db_path)
     
     # Note: Auto-refresh removed - Streamlit doesn't support true auto-refresh well
     # Users can click "🔄 Refresh Data" button to manually refresh
@@ -496,6 +488,11 @@ def main():
     # Footer
     st.markdown("---")
     st.markdown("*SpendSense Operator Dashboard v1.0*")
+    
+    # Poll the background signal job until it finishes
+    if signal_job_active:
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
@@ -86,3 +86,25 @@ def temp_db_path(tmp_path):
     """Create temporary database path for testing."""
     return str(tmp_path / "test.db")
 
+
+@pytest.fixture
+def populated_db_path(tmp_path):
+    """Create a schema-initialized database loaded with synthetic users."""
+    import sqlite3
+    import pandas as pd
+    from src.db.connection import initialize_db
+    from src.ingest.data_generator import SyntheticDataGenerator
+
+    db_path = str(tmp_path / "populated.db")
+    schema_path = str(Path(__file__).parent.parent / "db" / "schema.sql")
+    initialize_db(schema_path=schema_path, db_path=db_path)
+
+    data = SyntheticDataGenerator(seed=42).generate_all(12)
+    conn = sqlite3.connect(db_path)
+    try:
+        for table in ['users', 'accounts', 'transactions', 'liabilities']:
+            pd.DataFrame(data[table]).to_sql(table, conn, if_exists='append', index=False)
+        conn.commit()
+    finally:
+        conn.close()
+    return db_path
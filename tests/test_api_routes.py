@@ -4,10 +4,19 @@ Tests for API routes
 import pytest
 from unittest.mock import patch, MagicMock
 from src.api.routes import (
-    create_user, update_consent, record_feedback, get_approval_queue,
+    app, create_user, update_consent, record_feedback, get_approval_queue,
     UserCreateRequest, ConsentRequest, FeedbackRequest
 )
-from src.db.connection import database_transaction
+from concurrent.futures import Future
+from src.db.connection import database_read, database_transaction
+from src.db.write_queue import WriteQueue
+
+
+def _committed(result):
+    """A write queue future that has already been acknowledged."""
+    future = Future()
+    future.set_result(result)
+    return future
 
 class TestUserCreation:
     """Test POST /users endpoint."""
@@ -128,7 +137,8 @@ class TestFeedback:
     @pytest.mark.asyncio
     async def test_record_feedback_helpful(self, temp_db_path):
         """Test recording helpful feedback."""
-        with patch('src.api.routes.database_transaction') as mock_db:
+        with patch('src.api.routes.database_read') as mock_db, \
+             patch('src.api.routes.get_write_queue') as mock_queue:
             mock_conn = MagicMock()
             # First query: get recommendation
             mock_rec = MagicMock()
@@ -139,6 +149,7 @@ class TestFeedback:
             }[key]
             mock_conn.execute.return_value.fetchone.return_value = mock_rec
             mock_db.return_value.__enter__.return_value = mock_conn
+            mock_queue.return_value.execute.return_value = _committed(1)
             
             request = FeedbackRequest(
                 user_id="test_user",
@@ -152,11 +163,15 @@ class TestFeedback:
             assert response["helpful"] is True
             assert response["status"] == "recorded"
             assert "feedback_id" in response
+            mock_queue.return_value.execute.assert_called_once()
+            # The existence check is part of the queued insert
+            mock_db.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_record_feedback_not_helpful(self, temp_db_path):
         """Test recording not helpful feedback."""
-        with patch('src.api.routes.database_transaction') as mock_db:
+        with patch('src.api.routes.database_read') as mock_db, \
+             patch('src.api.routes.get_write_queue') as mock_queue:
             mock_conn = MagicMock()
             mock_rec = MagicMock()
             mock_rec.__getitem__.side_effect = lambda key: {
@@ -166,6 +181,7 @@ class TestFeedback:
             }[key]
             mock_conn.execute.return_value.fetchone.return_value = mock_rec
             mock_db.return_value.__enter__.return_value = mock_conn
+            mock_queue.return_value.execute.return_value = _committed(1)
             
             request = FeedbackRequest(
                 user_id="test_user",
@@ -181,10 +197,12 @@ class TestFeedback:
         """Test that missing recommendation returns 404."""
         from fastapi import HTTPException
         
-        with patch('src.api.routes.database_transaction') as mock_db:
+        with patch('src.api.routes.database_read') as mock_db, \
+             patch('src.api.routes.get_write_queue') as mock_queue:
             mock_conn = MagicMock()
             mock_conn.execute.return_value.fetchone.return_value = None  # Recommendation not found
             mock_db.return_value.__enter__.return_value = mock_conn
+            mock_queue.return_value.execute.return_value = _committed(0)  # Nothing inserted
             
             request = FeedbackRequest(
                 user_id="test_user",
@@ -203,7 +221,8 @@ class TestFeedback:
         """Test that user_id mismatch returns 403."""
         from fastapi import HTTPException
         
-        with patch('src.api.routes.database_transaction') as mock_db:
+        with patch('src.api.routes.database_read') as mock_db, \
+             patch('src.api.routes.get_write_queue') as mock_queue:
             mock_conn = MagicMock()
             mock_rec = MagicMock()
             mock_rec.__getitem__.side_effect = lambda key: {
@@ -213,6 +232,7 @@ class TestFeedback:
             }[key]
             mock_conn.execute.return_value.fetchone.return_value = mock_rec
             mock_db.return_value.__enter__.return_value = mock_conn
+            mock_queue.return_value.execute.return_value = _committed(0)  # Nothing inserted
             
             request = FeedbackRequest(
                 user_id="test_user",
@@ -226,13 +246,42 @@ class TestFeedback:
             assert exc_info.value.status_code == 403
             assert "does not match" in exc_info.value.detail.lower()
 
+    @pytest.mark.asyncio
+    async def test_record_feedback_checks_and_inserts_atomically(self, populated_db_path):
+        """Test that the queued insert writes only for an existing recommendation of the user."""
+        from fastapi import HTTPException
+
+        with database_transaction(populated_db_path) as conn:
+            conn.execute("""
+                INSERT INTO recommendations (rec_id, user_id, content_id, rationale)
+                VALUES ('test_rec_123', 'user_000', 'test_content', 'because')
+            """)
+
+        queue = WriteQueue(populated_db_path)
+        try:
+            with patch('src.api.routes.get_write_queue', return_value=queue), \
+                 patch('src.api.routes.database_read', side_effect=lambda: database_read(populated_db_path)):
+                response = await record_feedback(FeedbackRequest(user_id="user_000", rec_id="test_rec_123",
+                                                                 helpful=True))
+                for user_id, rec_id, status in (("user_000", "missing_rec", 404),
+                                                 ("user_001", "test_rec_123", 403)):
+                    with pytest.raises(HTTPException) as exc_info:
+                        await record_feedback(FeedbackRequest(user_id=user_id, rec_id=rec_id, helpful=False))
+                    assert exc_info.value.status_code == status
+        finally:
+            queue.close()
+
+        with database_read(populated_db_path) as conn:
+            rows = conn.execute("SELECT feedback_id, user_id, content_id, helpful FROM feedback").fetchall()
+        assert [tuple(row) for row in rows] == [(response["feedback_id"], 'user_000', 'test_content', 1)]
+
 class TestOperatorReview:
     """Test GET /operator/review endpoint."""
     
     @pytest.mark.asyncio
     async def test_get_approval_queue_pending(self, temp_db_path):
         """Test getting pending recommendations."""
-        with patch('src.api.routes.database_transaction') as mock_db, \
+        with patch('src.api.routes.database_read') as mock_db, \
              patch('src.recommend.content_schema.load_content_catalog') as mock_catalog:
             mock_conn = MagicMock()
             mock_row = MagicMock()
@@ -275,7 +324,7 @@ class TestOperatorReview:
     @pytest.mark.asyncio
     async def test_get_approval_queue_approved(self, temp_db_path):
         """Test getting approved recommendations."""
-        with patch('src.api.routes.database_transaction') as mock_db, \
+        with patch('src.api.routes.database_read') as mock_db, \
              patch('src.recommend.content_schema.load_content_catalog') as mock_catalog:
             mock_conn = MagicMock()
             mock_row = MagicMock()
@@ -314,7 +363,7 @@ class TestOperatorReview:
     @pytest.mark.asyncio
     async def test_get_approval_queue_all(self, temp_db_path):
         """Test getting all recommendations."""
-        with patch('src.api.routes.database_transaction') as mock_db, \
+        with patch('src.api.routes.database_read') as mock_db, \
              patch('src.recommend.content_schema.load_content_catalog') as mock_catalog:
             mock_conn = MagicMock()
             mock_conn.execute.return_value.fetchall.return_value = []
@@ -333,7 +382,7 @@ class TestOperatorReview:
     @pytest.mark.asyncio
     async def test_get_approval_queue_limit(self, temp_db_path):
         """Test that limit parameter works."""
-        with patch('src.api.routes.database_transaction') as mock_db, \
+        with patch('src.api.routes.database_read') as mock_db, \
              patch('src.recommend.content_schema.load_content_catalog') as mock_catalog:
             mock_conn = MagicMock()
             # Return 5 mock rows
@@ -362,3 +411,14 @@ class TestOperatorReview:
             assert "recommendations" in response
             assert response["count"] == 5  # Mock returns 5, but SQL would limit to 3
 
+
+
+class TestStartup:
+    """Schema migration when the API starts."""
+
+    @pytest.mark.asyncio
+    async def test_startup_applies_pending_migrations(self):
+        """Test that the lifespan hook brings the database up to the current schema before serving."""
+        with patch('src.api.routes.ensure_schema_current') as ensure:
+            async with app.router.lifespan_context(app):
+                ensure.assert_called_once_with()
@@ -3,7 +3,7 @@ Tests for bank fee detection
 """
 import pytest
 import pandas as pd
-from src.features.bank_fees import detect_bank_fees
+from src.features.bank_fees import detect_bank_fees, detect_bank_fees_by_user
 
 class TestBankFeeDetection:
     """Test bank fee signal detection."""
@@ -143,3 +143,37 @@ class TestBankFeeDetection:
         # $120 total / 6 months = $20/month
         assert result['monthly_bank_fees'] == pytest.approx(20.0, abs=0.01)
 
+
+
+class TestBankFeeBatchKernel:
+    """Bank fee detection for many users in one pass."""
+
+    def test_batch_matches_per_user(self):
+        """Test that each user's batch result equals detect_bank_fees on their rows."""
+        transactions = pd.DataFrame({
+            'user_id': ['u1', 'u1', 'u1', 'u2', 'u2', 'u3'],
+            'merchant_name': ['Overdraft Fee', 'ATM Surcharge', 'Grocery', 'Monthly Fee', 'NSF Fee', 'Bakery'],
+            'category_primary': ['Bank Fees', 'Bank Fees', 'Food', 'Bank Fees', 'Bank Fees', 'Food'],
+            'amount': [-35.0, -3.0, -50.0, -12.0, -30.0, -4.0],
+        })
+
+        batch = detect_bank_fees_by_user(transactions, window_days=90)
+
+        assert set(batch) == {'u1', 'u2'}
+        for user_id, expected in batch.items():
+            assert detect_bank_fees(transactions[transactions['user_id'] == user_id], window_days=90) == expected
+        assert batch['u2']['has_overdraft_fees'] is True
+        assert batch['u2']['has_maintenance_fees'] is True
+
+    def test_batch_does_not_modify_input(self):
+        """Test that the kernel adds no columns to the caller's frame."""
+        transactions = pd.DataFrame({
+            'user_id': ['u1'], 'merchant_name': ['Overdraft Fee'],
+            'category_primary': ['Bank Fees'], 'amount': [-35.0],
+        })
+        columns = list(transactions.columns)
+
+        detect_bank_fees_by_user(transactions)
+        detect_bank_fees(transactions)
+
+        assert list(transactions.columns) == columns
@@ -0,0 +1,105 @@
+"""
+Tests for the signal pipeline, concurrent read and query plan benchmarks
+"""
+import json
+import pytest
+from benchmarks.db_reads import run_benchmark as run_read_benchmark
+from benchmarks.query_plans import main as query_plans_main
+from benchmarks.query_plans import run_benchmark as run_query_plan_benchmark
+from benchmarks.signals import generate_population, main, resize_transactions, run_benchmark
+from src.db.hot_queries import HOT_QUERIES
+
+
+class TestSignalBenchmark:
+    """Synthetic population building and the benchmark report."""
+
+    def test_population_has_exact_size_and_unique_ids(self):
+        """Test that populations beyond the generator's roster are cloned with unique ids."""
+        population = generate_population(250, seed=7)
+
+        users = population['users']['user_id']
+        assert len(users) == 250
+        assert users.is_unique
+        assert population['accounts']['account_id'].is_unique
+        assert set(population['transactions']['user_id']) <= set(users)
+        assert set(population['liabilities']['account_id']) <= set(population['accounts']['account_id'])
+
+    def test_resize_gives_every_user_the_same_count(self):
+        """Test that transactions are subsampled or topped up to exactly per_user rows."""
+        transactions = generate_population(40, seed=7)['transactions']
+        resized = resize_transactions(transactions, 25, seed=7)
+
+        counts = resized.groupby('user_id').size()
+        assert (counts == 25).all()
+        assert resized['transaction_id'].is_unique
+
+    def test_report_covers_every_phase(self):
+        """Test that a small run reports throughput, memory and stage timings per phase."""
+        report = run_benchmark(users=40, txns_per_user=20, single_sample=3, batch_users=10, modes=['bulk'])
+
+        assert report['build']['users'] == 40
+        assert report['build']['transactions'] == 40 * 20
+        assert report['single_user']['users'] == 3
+        assert report['batch']['users'] == 10
+        bulk = report['full_population']['bulk']
+        assert bulk['success'] == 40 and bulk['errors'] == 0
+        for phase in (report['single_user'], report['batch'], bulk):
+            assert phase['users_per_sec'] > 0
+            assert 'fetch' in phase['stages']
+            assert phase['peak_rss_mb']['self'] > 0
+        json.dumps(report)
+
+    def test_unknown_mode_is_rejected(self):
+        """Test that a typo in --modes fails before any work is done."""
+        with pytest.raises(ValueError):
+            run_benchmark(users=5, modes=['bulkk'])
+
+    def test_cli_writes_json(self, tmp_path):
+        """Test that the command line entry point writes a parseable report."""
+        output = tmp_path / "report.json"
+        main(['--users', '10', '--txns-per-user', '10', '--single-sample', '2', '--batch-users', '5',
+              '--modes', 'aggregates', '--output', str(output), '--verbose'])
+
+        report = json.loads(output.read_text())
+        assert report['config']['modes'] == ['aggregates']
+        assert report['full_population']['aggregates']['success'] == 10
+
+
+class TestReadBenchmark:
+    """The concurrent read benchmark."""
+
+    def test_report_covers_both_modes(self):
+        """Test that a short run reports throughput for each read mode with a writer running."""
+        report = run_read_benchmark(users=20, recs_per_user=3, readers=2, seconds=0.3, write_hold_ms=1)
+
+        assert report['build']['recommendations'] == 60
+        assert set(report['modes']) == {'transaction', 'read'}
+        for result in report['modes'].values():
+            assert result['reads'] > 0 and result['writes'] > 0
+            assert not result['errors']
+        assert report['read_speedup'] > 0
+        json.dumps(report)
+
+
+class TestQueryPlanBenchmark:
+    """The hot query plan benchmark."""
+
+    def test_report_times_every_hot_query(self):
+        """Test that a small run reports a plan and timing for each hot query and no plan problems."""
+        report = run_query_plan_benchmark(rows=1000, repeat=2)
+
+        assert report['build']['recommendations'] == 1000
+        assert report['build']['transactions'] == 1000
+        assert len(report['queries']) == len(HOT_QUERIES)
+        for result in report['queries'].values():
+            assert result['plan']
+            assert result['median_ms'] >= 0
+        assert report['plan_problems'] == {}
+        json.dumps(report)
+
+    def test_check_passes_with_current_schema(self, tmp_path):
+        """Test that --check exits cleanly and the JSON report is written to --output."""
+        output = tmp_path / "plans.json"
+
+        assert query_plans_main(['--rows', '500', '--repeat', '1', '--check', '--output', str(output)]) == 0
+        assert json.loads(output.read_text())['config']['rows'] == 500
@@ -0,0 +1,671 @@
+"""
+Tests for the signal computation script (per-user and bulk paths)
+"""
+import os
+import sqlite3
+import pandas as pd
+import pytest
+from loguru import logger
+from scripts import compute_signals
+from scripts.compute_signals import (
+    compute_user_signals, compute_bulk_user_signals, compute_credit_signals, compute_all_user_signals,
+    compute_aggregate_user_signals, shard_user_ids, get_change_high_water, get_changed_user_ids, compute_multi_window_signals,
+    compute_streaming_user_signals, stream_chunk_rows
+)
+from src.db.connection import (
+    SIGNAL_VALUE_COLUMNS, DatabaseError, get_pool, get_table_columns, get_user_signals, has_column,
+    invalidate_schema_cache, run_signal_values_migration, save_user_signals, save_user_signals_bulk
+)
+from src.features.credit import CREDIT_DEFAULTS, compute_credit_signals_by_user
+from src.features.schema import UserSignals
+from src.features.stage_timing import stage_timer
+
+
+def _all_user_ids(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT user_id FROM users ORDER BY user_id")]
+    finally:
+        conn.close()
+
+
+_compute_shard = compute_signals._compute_shard
+
+
+def _crash_first_shard(*args, **kwargs):
+    """Worker entry point that kills its process the first time any worker calls it."""
+    try:
+        os.close(os.open(os.environ['SPENDSENSE_TEST_CRASH_MARKER'], os.O_CREAT | os.O_EXCL))
+    except FileExistsError:
+        return _compute_shard(*args, **kwargs)
+    os._exit(1)
+
+
+def assert_signals_match(bulk, single):
+    """Compare two UserSignals field by field, ignoring computed_at."""
+    bulk_dict = bulk.model_dump(exclude={'computed_at'})
+    single_dict = single.model_dump(exclude={'computed_at'})
+    assert bulk_dict.keys() == single_dict.keys()
+    for field, expected in single_dict.items():
+        actual = bulk_dict[field]
+        if isinstance(expected, float):
+            assert actual == pytest.approx(expected, rel=1e-9), field
+        else:
+            assert actual == expected, field
+
+
+class TestBulkSignals:
+    """The bulk engine must reproduce the per-user results exactly."""
+
+    @pytest.mark.parametrize("window_days", [30, 180])
+    def test_bulk_matches_per_user(self, populated_db_path, window_days):
+        """Test every user's bulk signals against compute_user_signals."""
+        bulk = compute_bulk_user_signals(window_days, populated_db_path)
+        user_ids = _all_user_ids(populated_db_path)
+
+        assert sorted(bulk) == user_ids
+        for user_id in user_ids:
+            single = compute_user_signals(user_id, window_days, populated_db_path)
+            assert_signals_match(bulk[user_id], single)
+
+    def test_bulk_subset_of_users(self, populated_db_path):
+        """Test computing an explicit subset of users."""
+        user_ids = _all_user_ids(populated_db_path)[:3]
+        bulk = compute_bulk_user_signals(180, populated_db_path, user_ids=user_ids)
+        assert list(bulk) == user_ids
+
+    def test_bulk_unknown_user_gets_defaults(self, populated_db_path):
+        """Test that users without any rows match the per-user defaults."""
+        bulk = compute_bulk_user_signals(180, populated_db_path, user_ids=['no_such_user'])
+        single = compute_user_signals('no_such_user', 180, populated_db_path)
+        assert_signals_match(bulk['no_such_user'], single)
+        assert bulk['no_such_user'].data_quality_score == pytest.approx(0.1)
+
+    def test_bulk_limit(self, populated_db_path):
+        """Test that limit restricts the number of users."""
+        assert len(compute_bulk_user_signals(180, populated_db_path, limit=5)) == 5
+
+    def test_compute_all_bulk_saves_signals(self, populated_db_path):
+        """Test that bulk mode persists one row per user."""
+        success, errors = compute_all_user_signals(180, populated_db_path, bulk=True)
+        assert errors == 0
+
+        conn = sqlite3.connect(populated_db_path)
+        try:
+            count = conn.execute("SELECT COUNT(*) FROM user_signals WHERE window = '180d'").fetchone()[0]
+        finally:
+            conn.close()
+        assert count == success == len(_all_user_ids(populated_db_path))
+
+
+class TestParallelSignals:
+    """Process-pool sharded signal computation."""
+
+    def test_shards_cover_every_user_once(self):
+        """Test that hash sharding is a stable partition of the users."""
+        user_ids = [f"user_{i:03d}" for i in range(100)]
+        shards = shard_user_ids(user_ids, 4)
+
+        assert len(shards) == 4
+        assert sorted(u for shard in shards for u in shard) == user_ids
+        assert shards == shard_user_ids(user_ids, 4)
+
+    def test_parallel_matches_per_user(self, populated_db_path):
+        """Test that worker results persisted by the writer match the per-user path."""
+        success, errors = compute_all_user_signals(180, populated_db_path, workers=2)
+        user_ids = _all_user_ids(populated_db_path)
+        assert errors == 0
+        assert success == len(user_ids)
+
+        saved = {user_id: get_user_signals(user_id, '180d', populated_db_path) for user_id in user_ids}
+        for user_id in user_ids:
+            single = compute_user_signals(user_id, 180, populated_db_path)
+            assert_signals_match(UserSignals(**saved[user_id]), single)
+
+
+    def test_reconciliation_ignores_rows_from_earlier_runs(self, populated_db_path, monkeypatch):
+        """Test that signals left by a previous run don't hide a run that wrote nothing."""
+        compute_all_user_signals(180, populated_db_path, workers=2)
+        conn = sqlite3.connect(populated_db_path)
+        conn.execute("UPDATE user_signals SET computed_at = '2000-01-01 00:00:00'")
+        conn.commit()
+        conn.close()
+        # A writer that reports success without persisting anything
+        monkeypatch.setattr(compute_signals, '_save_signal_rows', lambda rows, db_path, batch_size: (len(rows), 0))
+
+        warnings = []
+        sink_id = logger.add(warnings.append, level="WARNING", format="{message}")
+        try:
+            compute_all_user_signals(180, populated_db_path, workers=2)
+        finally:
+            logger.remove(sink_id)
+
+        user_count = len(_all_user_ids(populated_db_path))
+        assert any(f"saved {user_count} users but found 0 rows" in message for message in warnings)
+
+    def test_crashed_worker_shard_is_retried(self, populated_db_path, tmp_path, monkeypatch):
+        """Test that a worker process exiting mid-shard breaks the pool but its shard is retried."""
+        monkeypatch.setenv('SPENDSENSE_TEST_CRASH_MARKER', str(tmp_path / "crashed"))
+        monkeypatch.setattr(compute_signals, '_compute_shard', _crash_first_shard)
+
+        success, errors = compute_all_user_signals(180, populated_db_path, workers=2)
+
+        assert (tmp_path / "crashed").exists()
+        assert (success, errors) == (len(_all_user_ids(populated_db_path)), 0)
+
+
+class TestIncrementalSignals:
+    """Change-log driven incremental recomputation."""
+
+    def _execute(self, db_path, sql, params=()):
+        conn = sqlite3.connect(db_path)
+        try:
+            result = conn.execute(sql, params).fetchall()
+            conn.commit()
+            return result
+        finally:
+            conn.close()
+
+    def test_loads_are_logged_by_triggers(self, populated_db_path):
+        """Test that inserting transactions records the affected users."""
+        logged = self._execute(populated_db_path,
+                               "SELECT COUNT(DISTINCT user_id) FROM signal_change_log")[0][0]
+        assert logged == len(_all_user_ids(populated_db_path))
+
+    def test_incremental_recomputes_only_changed_users(self, populated_db_path):
+        """Test that only users with new changes or missing signals are recomputed."""
+        compute_all_user_signals(180, populated_db_path, bulk=True)
+        assert compute_all_user_signals(180, populated_db_path, incremental=True) == (0, 0)
+
+        # A new transaction for one user and a missing signals row for another
+        self._execute(populated_db_path, """
+            INSERT INTO transactions (transaction_id, account_id, user_id, date, amount, merchant_name,
+                                      category_primary, category_detailed, payment_channel)
+            VALUES ('txn_incremental', 'acc', 'user_003', date('now'), -9.99, 'Netflix',
+                    'Subscription', 'Subscription', 'online')
+        """)
+        self._execute(populated_db_path, "DELETE FROM user_signals WHERE user_id = 'user_005'")
+
+        assert get_changed_user_ids('180d', get_change_high_water(populated_db_path),
+                                    populated_db_path) == ['user_003', 'user_005']
+        assert compute_all_user_signals(180, populated_db_path, incremental=True) == (2, 0)
+        assert compute_all_user_signals(180, populated_db_path, incremental=True) == (0, 0)
+
+    def test_account_and_liability_deletes_are_logged(self, populated_db_path):
+        """Test that deleting a liability or an account records the user who owned it."""
+        account_id, user_id = self._execute(populated_db_path, """
+            SELECT a.account_id, a.user_id FROM accounts a JOIN liabilities l ON l.account_id = a.account_id LIMIT 1
+        """)[0]
+        self._execute(populated_db_path, "DELETE FROM signal_change_log")
+
+        self._execute(populated_db_path, "DELETE FROM liabilities WHERE account_id = ?", (account_id,))
+        self._execute(populated_db_path, "DELETE FROM accounts WHERE account_id = ?", (account_id,))
+
+        assert self._execute(populated_db_path, """
+            SELECT user_id, source_table, operation FROM signal_change_log ORDER BY change_id
+        """) == [(user_id, 'liabilities', 'delete'), (user_id, 'accounts', 'delete')]
+
+    def test_reassigned_account_logs_both_owners(self, populated_db_path):
+        """Test that moving an account to another user records the old and the new owner."""
+        account_id, old_owner = self._execute(populated_db_path,
+                                              "SELECT account_id, user_id FROM accounts WHERE user_id = 'user_001'")[0]
+        self._execute(populated_db_path, "DELETE FROM signal_change_log")
+
+        self._execute(populated_db_path, "UPDATE accounts SET user_id = 'user_002' WHERE account_id = ?", (account_id,))
+
+        logged = self._execute(populated_db_path, "SELECT user_id FROM signal_change_log WHERE source_table = 'accounts'")
+        assert sorted(row[0] for row in logged) == [old_owner, 'user_002']
+
+    def test_consumed_changes_are_pruned(self, populated_db_path):
+        """Test that the change log is pruned once every window and the rollup have consumed it."""
+        compute_all_user_signals(180, populated_db_path, bulk=True)
+        remaining = self._execute(populated_db_path, "SELECT COUNT(*) FROM signal_change_log")[0][0]
+        assert remaining > 0  # The daily aggregate refresh hasn't run yet
+
+        compute_aggregate_user_signals(180, populated_db_path)
+        compute_all_user_signals(180, populated_db_path, bulk=True)
+        remaining = self._execute(populated_db_path, "SELECT COUNT(*) FROM signal_change_log")[0][0]
+        assert remaining == 0
+
+    def test_prune_keeps_changes_the_rollup_has_not_read(self, populated_db_path):
+        """Test that full runs before the first aggregate refresh leave its changes in the log."""
+        compute_all_user_signals(180, populated_db_path, bulk=True)
+        self._execute(populated_db_path, """
+            INSERT INTO transactions (transaction_id, account_id, user_id, date, amount, merchant_name,
+                                      category_primary, payment_channel)
+            VALUES ('txn_fee', 'acc', 'user_003', date('now'), -35.0, 'Overdraft Fee', 'Bank Fees', 'other')
+        """)
+        compute_all_user_signals(180, populated_db_path, bulk=True)
+
+        from_aggregates = compute_aggregate_user_signals(180, populated_db_path)['user_003']
+        from_transactions = compute_user_signals('user_003', 180, populated_db_path)
+        assert from_transactions.bank_fee_count >= 1
+        assert from_aggregates.bank_fee_count == from_transactions.bank_fee_count
+
+
+class TestMultiWindowSignals:
+    """Several windows derived from one transaction scan."""
+
+    def test_windows_match_per_user(self, populated_db_path):
+        """Test that each derived window matches a dedicated per-user computation."""
+        results = compute_multi_window_signals((30, 90, 180), populated_db_path)
+        assert sorted(results) == ['180d', '30d', '90d']
+
+        for label, days in [('30d', 30), ('90d', 90), ('180d', 180)]:
+            for user_id in _all_user_ids(populated_db_path)[:4]:
+                single = compute_user_signals(user_id, days, populated_db_path)
+                assert_signals_match(results[label][user_id], single)
+                assert results[label][user_id].window == label
+
+    def test_all_window_rows_written(self, populated_db_path):
+        """Test that every (user, window) row is persisted."""
+        success, errors = compute_all_user_signals(db_path=populated_db_path, windows=[30, 180])
+        user_count = len(_all_user_ids(populated_db_path))
+        assert (success, errors) == (2 * user_count, 0)
+
+        conn = sqlite3.connect(populated_db_path)
+        try:
+            rows = dict(conn.execute("SELECT window, COUNT(*) FROM user_signals GROUP BY window").fetchall())
+        finally:
+            conn.close()
+        assert rows == {'30d': user_count, '180d': user_count}
+
+
+class TestStreamingSignals:
+    """Memory-bounded chunked computation over a user_id cursor."""
+
+    @staticmethod
+    def _merge_chunks(chunks):
+        merged = {}
+        for chunk in chunks:
+            for label, signals_by_user in chunk.items():
+                assert not merged.setdefault(label, {}).keys() & signals_by_user.keys()
+                merged[label].update(signals_by_user)
+        return merged
+
+    @pytest.mark.parametrize("chunk_rows", [50, 1000])
+    def test_chunks_match_bulk(self, populated_db_path, chunk_rows):
+        """Test that chunked results equal one bulk pass, including users split across chunks."""
+        chunks = list(compute_streaming_user_signals((30, 180), populated_db_path, chunk_rows=chunk_rows))
+        assert len(chunks) > 1
+        merged = self._merge_chunks(chunks)
+
+        expected = compute_multi_window_signals((30, 180), populated_db_path)
+        for label in ('30d', '180d'):
+            assert merged[label].keys() == expected[label].keys()
+            for user_id, signals in expected[label].items():
+                assert_signals_match(merged[label][user_id], signals)
+
+    def test_users_without_transactions_get_defaults(self, populated_db_path):
+        """Test that users with no rows in the window are still yielded."""
+        conn = sqlite3.connect(populated_db_path)
+        conn.execute("INSERT INTO users (user_id) VALUES ('zzz_no_transactions')")
+        conn.commit()
+        conn.close()
+
+        merged = self._merge_chunks(compute_streaming_user_signals((180,), populated_db_path, chunk_rows=500))
+        assert merged['180d']['zzz_no_transactions'].data_quality_score == 0.1
+
+    def test_limit_and_user_ids(self, populated_db_path):
+        """Test that limit stops after that many users and user_ids restricts the output."""
+        user_ids = _all_user_ids(populated_db_path)
+        limited = self._merge_chunks(compute_streaming_user_signals((180,), populated_db_path,
+                                                                    chunk_rows=500, limit=5))
+        assert sorted(limited['180d']) == user_ids[:5]
+
+        chosen = [user_ids[1], user_ids[-1]]
+        selected = self._merge_chunks(compute_streaming_user_signals((180,), populated_db_path,
+                                                                     chunk_rows=500, user_ids=chosen))
+        assert sorted(selected['180d']) == sorted(chosen)
+
+    def test_user_larger_than_a_chunk_is_read_whole_with_warning(self, populated_db_path):
+        """Test that a user who alone exceeds the chunk budget is kept whole and reported."""
+        warnings = []
+        sink_id = logger.add(warnings.append, level="WARNING", format="{message}")
+        try:
+            merged = self._merge_chunks(compute_streaming_user_signals((180,), populated_db_path, chunk_rows=5))
+        finally:
+            logger.remove(sink_id)
+
+        expected = compute_multi_window_signals((180,), populated_db_path)['180d']
+        assert merged['180d'].keys() == expected.keys()
+        for user_id, signals in expected.items():
+            assert_signals_match(merged['180d'][user_id], signals)
+        assert any("more than the 5-row chunk" in message for message in warnings)
+
+    def test_memory_budget_picks_chunk_size(self):
+        """Test that the chunk size scales with the budget and has a floor."""
+        assert stream_chunk_rows(64, bytes_per_row=1024) == 64 * 1024
+        assert stream_chunk_rows(128, bytes_per_row=1024) == 2 * stream_chunk_rows(64, bytes_per_row=1024)
+        assert stream_chunk_rows(0.001) == 1_000
+
+    def test_compute_all_streaming_saves_every_row(self, populated_db_path):
+        """Test that a budgeted run persists every (user, window) row."""
+        success, errors = compute_all_user_signals(db_path=populated_db_path, windows=[30, 180], max_memory_mb=1)
+        user_count = len(_all_user_ids(populated_db_path))
+        assert (success, errors) == (2 * user_count, 0)
+        assert get_user_signals(_all_user_ids(populated_db_path)[-1], '30d', populated_db_path) is not None
+
+    def test_incremental_streaming_limit_applies_to_changed_users(self, populated_db_path):
+        """Test that an incremental streaming run limits the changed users, not the users table."""
+        user_ids = _all_user_ids(populated_db_path)
+        compute_all_user_signals(180, populated_db_path, bulk=True)
+        conn = sqlite3.connect(populated_db_path)
+        conn.executemany("DELETE FROM user_signals WHERE user_id = ?", [(user_id,) for user_id in user_ids[-3:]])
+        conn.commit()
+        conn.close()
+
+        assert compute_all_user_signals(180, populated_db_path, incremental=True, max_memory_mb=1, limit=2) == (2, 0)
+        assert [get_user_signals(user_id, '180d', populated_db_path) is not None
+                for user_id in user_ids[-3:]] == [True, True, False]
+
+
+class TestSignalPersistence:
+    """Batched writes of user_signals rows."""
+
+    def test_bulk_save_round_trips(self, populated_db_path):
+        """Test that every row is written and readable, across several batches."""
+        user_ids = _all_user_ids(populated_db_path)
+        signals = compute_bulk_user_signals(180, populated_db_path)
+        rows = [(user_id, '180d', signals[user_id].model_dump()) for user_id in user_ids]
+
+        assert save_user_signals_bulk(rows, populated_db_path, batch_size=5) == len(user_ids)
+        for user_id in user_ids:
+            saved = get_user_signals(user_id, '180d', populated_db_path)
+            assert saved['computed_at'] == signals[user_id].computed_at.isoformat()
+            assert saved['subscription_count'] == signals[user_id].subscription_count
+
+    def test_bulk_save_replaces_existing_rows(self, populated_db_path):
+        """Test that saving the same key twice keeps one row with the latest signals."""
+        user_id = _all_user_ids(populated_db_path)[0]
+        save_user_signals_bulk([(user_id, '30d', {'subscription_count': 1})], populated_db_path)
+        save_user_signals_bulk([(user_id, '30d', {'subscription_count': 2})], populated_db_path)
+
+        assert get_user_signals(user_id, '30d', populated_db_path) == {'subscription_count': 2}
+
+    def test_bulk_save_failure_keeps_committed_batches(self, populated_db_path):
+        """Test that a failing row only rolls back its own batch."""
+        rows = [('user_a', '30d', {}), ('user_b', '30d', {}), ('user_c', '30d', {'bad': object()})]
+
+        with pytest.raises(DatabaseError):
+            save_user_signals_bulk(rows, populated_db_path, batch_size=2)
+
+        assert get_user_signals('user_a', '30d', populated_db_path) == {}
+        assert get_user_signals('user_c', '30d', populated_db_path) is None
+
+    def test_bulk_save_borrows_pooled_connections(self, populated_db_path):
+        """Test that each batch is a database_transaction on a connection borrowed from the pool."""
+        pool = get_pool(populated_db_path)
+        before = pool.stats()
+        rows = [(f'user_{idx}', '30d', {}) for idx in range(5)]
+
+        assert save_user_signals_bulk(rows, populated_db_path, batch_size=2) == 5
+
+        after = pool.stats()
+        assert (after['hits'] + after['misses']) - (before['hits'] + before['misses']) == 3
+        assert after['in_use'] == 0
+
+    def test_sequential_run_saves_in_batches(self, populated_db_path):
+        """Test that the per-user path persists every user with a small batch size."""
+        success, errors = compute_all_user_signals(180, populated_db_path, batch_size=5)
+        assert errors == 0
+        for user_id in _all_user_ids(populated_db_path):
+            assert get_user_signals(user_id, '180d', populated_db_path) is not None
+
+
+def _signal_values(db_path, user_id, window):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute(
+            "SELECT * FROM user_signal_values WHERE user_id = ? AND window = ?", (user_id, window)
+        ).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+class TestSignalValues:
+    """Typed user_signal_values rows written alongside the JSON blob."""
+
+    def test_columns_cover_scalar_fields(self):
+        """Test that every numeric and boolean UserSignals field has a typed column."""
+        scalar_fields = {
+            name for name in UserSignals.model_fields
+            if name not in ('computation_errors', 'computed_at', 'window')
+        }
+        assert {name for name, _ in SIGNAL_VALUE_COLUMNS} == scalar_fields
+
+    def test_bulk_save_writes_typed_values(self, populated_db_path):
+        """Test that typed columns match the blob for every saved row."""
+        user_ids = _all_user_ids(populated_db_path)
+        signals = compute_bulk_user_signals(180, populated_db_path)
+        save_user_signals_bulk([(user_id, '180d', signals[user_id].model_dump()) for user_id in user_ids],
+                               populated_db_path, batch_size=5)
+
+        for user_id in user_ids:
+            values = _signal_values(populated_db_path, user_id, '180d')
+            blob = get_user_signals(user_id, '180d', populated_db_path)
+            for name, _ in SIGNAL_VALUE_COLUMNS:
+                if blob[name] is None:
+                    assert values[name] is None, name
+                else:
+                    assert values[name] == pytest.approx(blob[name]), name
+
+    def test_single_save_writes_typed_values(self, populated_db_path):
+        """Test that save_user_signals writes both tables, counting computation errors."""
+        save_user_signals('user_x', '30d', {'data_quality_score': 0.4, 'insufficient_data': True,
+                                            'computation_errors': ['a', 'b']}, populated_db_path)
+
+        values = _signal_values(populated_db_path, 'user_x', '30d')
+        assert values['data_quality_score'] == 0.4
+        assert values['insufficient_data'] == 1
+        assert values['computation_error_count'] == 2
+        assert values['subscription_count'] is None
+
+    def test_failed_batch_writes_neither_table(self, populated_db_path):
+        """Test that a rolled back batch leaves no typed rows behind."""
+        rows = [('user_a', '30d', {'data_quality_score': 1.0}), ('user_c', '30d', {'bad': object()})]
+
+        with pytest.raises(DatabaseError):
+            save_user_signals_bulk(rows, populated_db_path, batch_size=2)
+
+        assert _signal_values(populated_db_path, 'user_a', '30d') is None
+
+    def test_migration_backfills_from_blobs(self, populated_db_path):
+        """Test that an existing database gets the table populated from stored signals."""
+        save_user_signals_bulk([('user_a', '180d', {'data_quality_score': 0.25, 'has_fraud_history': True})],
+                               populated_db_path)
+        conn = sqlite3.connect(populated_db_path)
+        conn.execute("DROP TABLE user_signal_values")
+        conn.commit()
+        conn.close()
+
+        run_signal_values_migration(populated_db_path)
+
+        values = _signal_values(populated_db_path, 'user_a', '180d')
+        assert values['data_quality_score'] == 0.25
+        assert values['has_fraud_history'] == 1
+        assert values['computed_at'] is not None
+
+    def test_run_against_baseline_schema_migrates_first(self, populated_db_path):
+        """Test that a database from before user_signal_values and schema_version still saves signals."""
+        conn = sqlite3.connect(populated_db_path)
+        conn.executescript("""
+            DROP TABLE schema_version;
+            DROP TABLE user_signal_values;
+            DROP TABLE signal_run_stats;
+        """)
+        conn.close()
+        invalidate_schema_cache(populated_db_path)
+
+        success, errors = compute_all_user_signals(180, populated_db_path, bulk=True)
+
+        assert (success, errors) == (len(_all_user_ids(populated_db_path)), 0)
+        assert _signal_values(populated_db_path, _all_user_ids(populated_db_path)[0], '180d') is not None
+
+    def test_migration_adds_new_signal_columns(self, populated_db_path):
+        """Test that a table created before a signal existed gains its column."""
+        conn = sqlite3.connect(populated_db_path)
+        conn.execute("ALTER TABLE user_signal_values DROP COLUMN geo_velocity_max")
+        conn.commit()
+        conn.close()
+
+        run_signal_values_migration(populated_db_path)
+        save_user_signals('user_a', '180d', {'geo_velocity_max': 42.0}, populated_db_path)
+        assert _signal_values(populated_db_path, 'user_a', '180d')['geo_velocity_max'] == 42.0
+
+
+def _run_stats(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute("SELECT * FROM signal_run_stats")]
+    finally:
+        conn.close()
+
+
+class TestStageTimings:
+    """Per-stage timings recorded by the drivers and flushed to signal_run_stats."""
+
+    SIGNAL_STAGES = {'fetch', 'credit', 'income', 'subscriptions', 'savings', 'bank_fees', 'fraud',
+                     'data_quality', 'save'}
+
+    def test_per_user_function_records_every_stage(self, populated_db_path):
+        """Test that compute_user_signals times each stage once with its row count."""
+        user_id = _all_user_ids(populated_db_path)[0]
+        stage_timer.reset()
+        compute_user_signals(user_id, 180, populated_db_path)
+
+        summary = stage_timer.summary()
+        assert set(summary) == self.SIGNAL_STAGES - {'save'}
+        assert all(stats['calls'] == 1 for stats in summary.values())
+        assert len({stats['rows'] for stats in summary.values()}) == 1
+
+    def test_sequential_run_flushes_one_row_per_stage(self, populated_db_path):
+        """Test that a batch run writes one signal_run_stats row per stage for a single run."""
+        compute_all_user_signals(180, populated_db_path)
+
+        rows = _run_stats(populated_db_path)
+        assert {row['stage'] for row in rows} == self.SIGNAL_STAGES
+        assert len({row['run_id'] for row in rows}) == 1
+        fetch = next(row for row in rows if row['stage'] == 'fetch')
+        assert fetch['calls'] == len(_all_user_ids(populated_db_path))
+        assert fetch['mode'] == 'sequential'
+        assert fetch['windows'] == '180d'
+        assert fetch['p50_ms'] <= fetch['p95_ms'] <= fetch['max_ms']
+
+    def test_parallel_run_merges_worker_timings(self, populated_db_path):
+        """Test that stages timed in worker processes reach the parent's run stats."""
+        compute_all_user_signals(180, populated_db_path, workers=2)
+
+        stages = {row['stage']: row for row in _run_stats(populated_db_path)}
+        assert set(stages) == self.SIGNAL_STAGES
+        assert stages['credit']['calls'] == 2
+        assert stages['credit']['mode'] == 'parallel'
+
+    def test_missing_stats_table_does_not_fail_run(self, populated_db_path):
+        """Test that a database without signal_run_stats still computes and saves signals."""
+        conn = sqlite3.connect(populated_db_path)
+        conn.execute("DROP TABLE signal_run_stats")
+        conn.commit()
+        conn.close()
+
+        success, errors = compute_all_user_signals(180, populated_db_path, bulk=True)
+        assert errors == 0
+        assert success == len(_all_user_ids(populated_db_path))
+
+
+class TestSchemaProbe:
+    """Cached schema capability detection."""
+
+    def test_probe_is_cached_until_invalidated(self, populated_db_path):
+        """Test that a schema change is only seen after invalidation."""
+        invalidate_schema_cache(populated_db_path)
+        assert 'is_fraud' in get_table_columns('transactions', populated_db_path)
+        assert not has_column('transactions', 'probe_marker', populated_db_path)
+
+        conn = sqlite3.connect(populated_db_path)
+        try:
+            conn.execute("ALTER TABLE transactions ADD COLUMN probe_marker TEXT")
+            conn.commit()
+        finally:
+            conn.close()
+
+        assert not has_column('transactions', 'probe_marker', populated_db_path)
+        invalidate_schema_cache(populated_db_path)
+        assert has_column('transactions', 'probe_marker', populated_db_path)
+
+    def test_missing_table_has_no_columns(self, populated_db_path):
+        """Test probing a table that does not exist."""
+        assert get_table_columns('no_such_table', populated_db_path) == frozenset()
+
+    def test_legacy_transactions_schema_uses_defaults(self, populated_db_path):
+        """Test that databases without is_fraud/transaction_type/status still compute."""
+        user_id = _all_user_ids(populated_db_path)[0]
+        conn = sqlite3.connect(populated_db_path)
+        try:
+            conn.execute("DROP INDEX idx_transactions_fraud")
+            for column in ('is_fraud', 'transaction_type', 'status'):
+                conn.execute(f"ALTER TABLE transactions DROP COLUMN {column}")
+            conn.commit()
+        finally:
+            conn.close()
+        invalidate_schema_cache(populated_db_path)
+
+        single = compute_user_signals(user_id, 180, populated_db_path)
+        bulk = compute_bulk_user_signals(180, populated_db_path, user_ids=[user_id])
+        assert single.computation_errors == []
+        assert single.fraud_transaction_count == 0
+        assert_signals_match(bulk[user_id], single)
+
+
+class TestCreditKernel:
+    """Vectorized credit signals shared by the per-user and bulk paths."""
+
+    # Hand-built accounts and liabilities: u1 pays interest on a half-used card, u2's only card
+    # has no usable limit and is overdue, u3 has no liabilities and u4 is over one card's limit
+    ACCOUNTS = pd.DataFrame({
+        'user_id': ['u1', 'u1', 'u2', 'u3', 'u4', 'u4'],
+        'account_id': ['a1', 'a2', 'a3', 'a4', 'a5', 'a6'],
+        'subtype': ['credit card', 'credit card', 'credit card', 'checking', 'credit card', 'credit card'],
+        'current_balance': [500.0, None, 900.0, 100.0, 300.0, 1500.0],
+        'credit_limit': [1000.0, 2000.0, 0.0, None, 1000.0, 1000.0],
+    })
+    LIABILITIES = pd.DataFrame({
+        'account_id': ['a1', 'a2', 'a3', 'a5', 'a6'],
+        'apr_percentage': [0.0, 19.9, 0.0, None, 0.0],
+        'is_overdue': [0, 0, 1, None, 0],
+    })
+    EXPECTED = {
+        'u1': {'credit_utilization_max': 0.5, 'has_interest_charges': True, 'is_overdue': False,
+               'minimum_payment_only': False},
+        'u2': {'credit_utilization_max': None, 'has_interest_charges': False, 'is_overdue': True,
+               'minimum_payment_only': False},
+        'u4': {'credit_utilization_max': 1.5, 'has_interest_charges': False, 'is_overdue': False,
+               'minimum_payment_only': False},
+    }
+
+    def test_kernel_computes_expected_signals(self):
+        """Test utilization, interest, overdue and minimum-payment flags for several users at once."""
+        assert compute_credit_signals_by_user(self.ACCOUNTS, self.LIABILITIES) == self.EXPECTED
+
+    @pytest.mark.parametrize("user_id", ['u1', 'u2', 'u3', 'u4'])
+    def test_per_user_function_computes_expected_signals(self, user_id):
+        """Test the per-user function on one user's rows, with defaults for a user without liabilities."""
+        user_accounts = self.ACCOUNTS[self.ACCOUNTS['user_id'] == user_id].drop(columns='user_id')
+        user_liabilities = self.LIABILITIES[self.LIABILITIES['account_id'].isin(user_accounts['account_id'])]
+
+        signals = compute_credit_signals(user_accounts, user_liabilities, pd.DataFrame())
+
+        assert signals == self.EXPECTED.get(user_id, CREDIT_DEFAULTS)
+
+    def test_no_liabilities_returns_defaults(self):
+        """Test that users without liabilities get the default credit signals."""
+        accounts = pd.DataFrame({
+            'account_id': ['a1'], 'subtype': ['credit card'],
+            'current_balance': [100.0], 'credit_limit': [1000.0],
+        })
+        liabilities = pd.DataFrame(columns=['account_id', 'apr_percentage', 'is_overdue'])
+
+        assert compute_credit_signals(accounts, liabilities, pd.DataFrame()) == CREDIT_DEFAULTS
@@ -0,0 +1,196 @@
+"""
+Tests for the pooled SQLite connections behind database_transaction and database_read
+"""
+import os
+import sqlite3
+import threading
+import time
+import pytest
+from src.db.connection import (
+    ConnectionPool, DatabaseError, close_pools, database_read, database_transaction, get_pool, get_pool_stats
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "pool.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (value INTEGER)")
+    conn.commit()
+    conn.close()
+    yield path
+    close_pools()
+
+
+class TestConnectionPool:
+    """Connection reuse, limits, health checks and metrics."""
+
+    def test_transactions_reuse_one_connection(self, db_path):
+        """Test that sequential transactions borrow the same configured connection."""
+        seen = []
+        for value in range(3):
+            with database_transaction(db_path) as conn:
+                conn.execute("INSERT INTO items VALUES (?)", (value,))
+                seen.append(id(conn))
+                assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+        stats = get_pool(db_path).stats()
+        assert len(set(seen)) == 1
+        assert (stats['misses'], stats['hits'], stats['open'], stats['in_use']) == (1, 2, 1, 0)
+        assert get_pool_stats()[db_path]['hit_rate'] == pytest.approx(2 / 3)
+
+    def test_failed_transaction_rolls_back_before_reuse(self, db_path):
+        """Test that a connection is returned clean after the body raises."""
+        with pytest.raises(DatabaseError):
+            with database_transaction(db_path) as conn:
+                conn.execute("INSERT INTO items VALUES (1)")
+                raise ValueError("boom")
+
+        with database_transaction(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+        assert get_pool(db_path).stats()['open'] == 1
+
+    def test_exhausted_pool_waits_for_release(self, db_path):
+        """Test that a borrower past max_size waits and gets the released connection."""
+        pool = ConnectionPool(db_path, max_size=1, wait_timeout=5)
+        held = pool.acquire()
+        threading.Timer(0.05, pool.release, args=(held,)).start()
+
+        assert pool.acquire() is held
+        stats = pool.stats()
+        assert stats['waits'] == 1
+        assert stats['wait_ms'] > 0
+        assert stats['open'] == 1
+        pool.release(held)
+        pool.close()
+
+    def test_exhausted_pool_times_out(self, db_path):
+        """Test that waiting past wait_timeout raises DatabaseError."""
+        pool = ConnectionPool(db_path, max_size=1, wait_timeout=0.05)
+        held = pool.acquire()
+        with pytest.raises(DatabaseError):
+            pool.acquire()
+        assert pool.stats()['timeouts'] == 1
+        pool.release(held)
+        pool.close()
+
+    def test_idle_connections_are_reaped(self, db_path):
+        """Test that connections idle past idle_timeout are closed."""
+        pool = ConnectionPool(db_path, idle_timeout=0.01)
+        pool.release(pool.acquire())
+        time.sleep(0.05)
+
+        assert pool.reap_idle() == 1
+        assert pool.stats()['open'] == 0
+
+    def test_replaced_database_file_is_not_reused(self, db_path):
+        """Test that a pooled connection to a deleted file is dropped by the health check."""
+        with database_transaction(db_path) as conn:
+            conn.execute("INSERT INTO items VALUES (1)")
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        fresh = sqlite3.connect(db_path)
+        fresh.execute("CREATE TABLE items (value INTEGER)")
+        fresh.commit()
+        fresh.close()
+
+        with database_transaction(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+        assert get_pool(db_path).stats()['health_check_failures'] == 1
+
+    def test_concurrent_writers_share_a_small_pool(self, db_path):
+        """Test that many threads complete through a pool smaller than the thread count."""
+        close_pools()
+        pool = get_pool(db_path, max_size=2)
+        errors = []
+
+        def write(value):
+            try:
+                for _ in range(5):
+                    with database_transaction(db_path) as conn:
+                        conn.execute("INSERT INTO items VALUES (?)", (value,))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        with database_transaction(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 40
+        assert pool.stats()['open'] <= 2
+        assert pool.stats()['in_use'] == 0
+
+
+class TestDatabaseRead:
+    """Read-only transactions on the query_only pool."""
+
+    def test_reads_see_committed_rows(self, db_path):
+        """Test that database_read returns data written through database_transaction."""
+        with database_transaction(db_path) as conn:
+            conn.execute("INSERT INTO items VALUES (7)")
+
+        with database_read(db_path) as conn:
+            assert conn.execute("SELECT value FROM items").fetchone()[0] == 7
+            assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+
+    def test_writes_are_rejected(self, db_path):
+        """Test that a write inside database_read raises and changes nothing."""
+        with pytest.raises(DatabaseError):
+            with database_read(db_path) as conn:
+                conn.execute("INSERT INTO items VALUES (1)")
+
+        with database_read(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+    def test_read_pool_is_separate(self, db_path):
+        """Test that reads borrow from their own pool and leave nothing in use."""
+        with database_read(db_path) as conn:
+            read_conn = conn
+        with database_transaction(db_path) as conn:
+            assert conn is not read_conn
+            assert conn.execute("PRAGMA query_only").fetchone()[0] == 0
+
+        stats = get_pool_stats()
+        assert stats[f"{db_path} (read)"]['read_only']
+        assert stats[f"{db_path} (read)"]['in_use'] == 0
+        assert not stats[db_path]['read_only']
+
+    def test_read_does_not_wait_for_writer(self, db_path):
+        """Test that a read completes while another connection holds the write lock."""
+        writer_started = threading.Event()
+        finish_write = threading.Event()
+
+        def write():
+            with database_transaction(db_path) as conn:
+                conn.execute("INSERT INTO items VALUES (1)")
+                writer_started.set()
+                finish_write.wait(5)
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        try:
+            assert writer_started.wait(5)
+            start = time.monotonic()
+            with database_read(db_path) as conn:
+                # The uncommitted insert is not visible
+                assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+            assert time.monotonic() - start < 1
+        finally:
+            finish_write.set()
+            thread.join()
+
+    def test_read_sees_one_snapshot(self, db_path):
+        """Test that rows committed mid-read are not visible until the next read."""
+        with database_read(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+            with database_transaction(db_path) as writer:
+                writer.execute("INSERT INTO items VALUES (1)")
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+        with database_read(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
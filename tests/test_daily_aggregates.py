@@ -0,0 +1,89 @@
+"""
+Tests for the per-user daily aggregate rollup
+"""
+import sqlite3
+import pytest
+from scripts.compute_signals import compute_user_signals, compute_aggregate_user_signals, compute_all_user_signals
+from src.db.connection import database_transaction
+from src.features.daily_aggregates import refresh_daily_aggregates
+from tests.test_compute_signals import _all_user_ids, assert_signals_match
+
+
+def _aggregate_row_count(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM user_daily_aggregates").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestDailyAggregates:
+    """Signals computed from the rollup must match the raw-row per-user results."""
+
+    @pytest.mark.parametrize("window_days", [30, 180])
+    def test_aggregates_match_per_user(self, populated_db_path, window_days):
+        """Test every user's aggregate signals against compute_user_signals."""
+        aggregated = compute_aggregate_user_signals(window_days, populated_db_path)
+        user_ids = _all_user_ids(populated_db_path)
+
+        assert sorted(aggregated) == user_ids
+        for user_id in user_ids:
+            single = compute_user_signals(user_id, window_days, populated_db_path)
+            assert_signals_match(aggregated[user_id], single)
+
+    def test_rollup_is_smaller_than_transactions(self, populated_db_path):
+        """Test that the rollup holds at most one row per user, day and class."""
+        with database_transaction(populated_db_path) as conn:
+            refresh_daily_aggregates(conn)
+            transactions = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+            duplicates = conn.execute("""
+                SELECT COUNT(*) FROM (
+                    SELECT user_id, day, category_class FROM user_daily_aggregates
+                    GROUP BY 1, 2, 3 HAVING COUNT(*) > 1
+                )
+            """).fetchone()[0]
+
+        assert 0 < _aggregate_row_count(populated_db_path) <= transactions
+        assert duplicates == 0
+
+    def test_full_rebuild_consumes_the_change_log(self, populated_db_path):
+        """Test that rebuilding everything moves the refresh watermark to the newest change."""
+        with database_transaction(populated_db_path) as conn:
+            refresh_daily_aggregates(conn)
+            newest = conn.execute("SELECT MAX(change_id) FROM signal_change_log").fetchone()[0]
+            watermark = conn.execute(
+                "SELECT last_change_id FROM signal_watermarks WHERE window = 'daily_aggregates'").fetchone()[0]
+
+        assert watermark == newest > 0
+
+    def test_changed_transactions_are_refolded(self, populated_db_path):
+        """Test that a new transaction reaches the rollup through the change log."""
+        user_id = _all_user_ids(populated_db_path)[0]
+        compute_aggregate_user_signals(180, populated_db_path, user_ids=[user_id])
+
+        conn = sqlite3.connect(populated_db_path)
+        try:
+            account_id = conn.execute(
+                "SELECT account_id FROM accounts WHERE user_id = ? LIMIT 1", (user_id,)
+            ).fetchone()[0]
+            conn.execute("""
+                INSERT INTO transactions (transaction_id, account_id, user_id, date, amount,
+                                          merchant_name, category_primary, category_detailed, payment_channel,
+                                          pending)
+                VALUES ('agg_test_fee', ?, ?, date('now'), -35.0, 'Overdraft Fee', 'Bank Fees',
+                        'Overdraft', 'other', 0)
+            """, (account_id, user_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+        aggregated = compute_aggregate_user_signals(180, populated_db_path, user_ids=[user_id])
+        single = compute_user_signals(user_id, 180, populated_db_path)
+        assert_signals_match(aggregated[user_id], single)
+        assert aggregated[user_id].has_overdraft_fees
+
+    def test_compute_all_from_aggregates_saves_signals(self, populated_db_path):
+        """Test that aggregate mode persists one row per user."""
+        success, errors = compute_all_user_signals(180, populated_db_path, aggregates=True)
+        assert errors == 0
+        assert success == len(_all_user_ids(populated_db_path))
@@ -2,9 +2,12 @@
 Tests for fraud detection functionality
 """
 import pytest
+import numpy as np
 import pandas as pd
 from src.features.fraud_detection import (
     extract_fraud_signals,
+    extract_fraud_signals_by_user,
+    extract_fraud_signals_from_snapshot,
     calculate_fraud_risk_score,
     get_fraud_transactions,
     analyze_fraud_patterns
@@ -150,3 +153,56 @@ class TestFraudDetection:
         assert patterns['total_fraud'] == 0
         assert patterns['patterns'] == {}
 
+
+
+def _random_population(seed=7, users=40, rows=2000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'user_id': rng.choice([f'user_{i:03d}' for i in range(users)], rows),
+        'amount': rng.normal(-50, 100, rows),
+        'is_fraud': (rng.random(rows) < rng.choice([0.0, 0.02, 0.3], rows)).astype(int),
+        'status': rng.choice(['posted', 'declined', 'pending', None], rows),
+        'transaction_type': rng.choice(['purchase', 'transfer', 'refund', 'payment'], rows),
+        'date': [f'2024-{m:02d}-{d:02d}' for m, d in zip(rng.integers(1, 13, rows), rng.integers(1, 29, rows))],
+        'latitude': np.where(rng.random(rows) < 0.1, np.nan, rng.uniform(25, 49, rows)),
+        'longitude': rng.uniform(-124, -67, rows),
+    })
+
+
+class TestBatchFraudSignals:
+    """Population-wide fraud signals via grouped counts."""
+    
+    def test_matches_per_user_exactly(self):
+        """Test that every user's batch signals equal extract_fraud_signals on their rows."""
+        transactions = _random_population()
+        batch = extract_fraud_signals_by_user(transactions)
+        
+        assert batch.keys() == set(transactions['user_id'])
+        for user_id, group in transactions.groupby('user_id'):
+            assert batch[user_id] == extract_fraud_signals(group)
+    
+    def test_missing_optional_columns(self):
+        """Test that frames without status, transaction_type or is_fraud still match."""
+        transactions = _random_population(seed=3, users=10, rows=300)
+        for dropped in (['status'], ['transaction_type'], ['is_fraud'], ['latitude', 'longitude']):
+            frame = transactions.drop(columns=dropped)
+            batch = extract_fraud_signals_by_user(frame)
+            for user_id, group in frame.groupby('user_id'):
+                assert batch[user_id] == extract_fraud_signals(group), dropped
+    
+    def test_empty_frame(self):
+        """Test that an empty frame yields no users."""
+        assert extract_fraud_signals_by_user(pd.DataFrame(columns=['user_id', 'is_fraud'])) == {}
+    
+    def test_snapshot_matches_frame(self, populated_db_path, tmp_path):
+        """Test that scoring from snapshot columns equals scoring the decoded frame."""
+        from src.features.transaction_snapshot import export_transaction_snapshot, load_transaction_snapshot
+        
+        export_transaction_snapshot(populated_db_path, tmp_path / "snap")
+        snapshot = load_transaction_snapshot(tmp_path / "snap")
+        user_ids = snapshot.user_ids[:5]
+        
+        for users, start in [(None, None), (user_ids, '2024-01-01')]:
+            expected = extract_fraud_signals_by_user(snapshot.to_frame(users, start))
+            assert extract_fraud_signals_from_snapshot(snapshot, users, start) == expected
+        assert any(s['fraud_transaction_count'] for s in extract_fraud_signals_from_snapshot(snapshot).values())
@@ -0,0 +1,101 @@
+"""
+Tests for geo-velocity (impossible travel) signals
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.features.fraud_detection import extract_fraud_signals
+from src.features.geo_velocity import (
+    DATE_ONLY_MIN_ELAPSED_HOURS, GEO_VELOCITY_DEFAULTS, MAX_TRAVEL_SPEED_KMH, geo_velocity_signals,
+    geo_velocity_signals_by_user, haversine_km
+)
+from src.features.schema import UserSignals
+from src.personas.persona_classifier import classify_persona
+
+NEW_YORK = (40.7128, -74.0060)
+LOS_ANGELES = (34.0522, -118.2437)
+LONDON = (51.5074, -0.1278)
+SYDNEY = (-33.8688, 151.2093)
+
+
+def _frame(rows, user_id='user_a'):
+    return pd.DataFrame([
+        {'user_id': user_id, 'date': when, 'latitude': lat, 'longitude': lon} for when, (lat, lon) in rows
+    ])
+
+
+class TestGeoVelocity:
+    """Implied travel speed between consecutive located transactions."""
+
+    def test_haversine_known_distance(self):
+        """Test the great-circle distance between New York and Los Angeles."""
+        assert haversine_km(*NEW_YORK, *LOS_ANGELES) == pytest.approx(3936, rel=0.01)
+        assert haversine_km(*NEW_YORK, *NEW_YORK) == 0.0
+
+    def test_timed_transactions_flag_impossible_travel(self):
+        """Test that New York then London an hour later is impossible travel."""
+        signals = geo_velocity_signals(_frame([
+            ('2024-05-01 10:00:00', NEW_YORK),
+            ('2024-05-01 11:00:00', LONDON),
+            ('2024-05-03 09:00:00', LONDON),
+        ]))
+        assert signals['impossible_travel_count'] == 1
+        assert signals['geo_velocity_max'] == pytest.approx(haversine_km(*NEW_YORK, *LONDON))
+        assert signals['geo_velocity_max'] > MAX_TRAVEL_SPEED_KMH
+
+    def test_same_day_date_only_rows_get_the_minimum_gap(self):
+        """Test that same-day rows without a time are taken to be DATE_ONLY_MIN_ELAPSED_HOURS apart."""
+        signals = geo_velocity_signals(_frame([('2024-05-01', NEW_YORK), ('2024-05-01', LONDON)]))
+        assert signals['impossible_travel_count'] == 0
+        assert signals['geo_velocity_max'] == pytest.approx(
+            haversine_km(*NEW_YORK, *LONDON) / DATE_ONLY_MIN_ELAPSED_HOURS
+        )
+
+    def test_date_only_rows_flag_impossible_travel(self):
+        """Test that date-only rows on consecutive days can be impossible travel, and days apart can't."""
+        signals = geo_velocity_signals(_frame([('2024-05-01', NEW_YORK), ('2024-05-02', SYDNEY)]))
+        assert signals['impossible_travel_count'] == 1
+        assert signals['geo_velocity_max'] == pytest.approx(
+            haversine_km(*NEW_YORK, *SYDNEY) / DATE_ONLY_MIN_ELAPSED_HOURS
+        )
+
+        signals = geo_velocity_signals(_frame([('2024-05-01', NEW_YORK), ('2024-05-03', SYDNEY)]))
+        assert signals['impossible_travel_count'] == 0
+        assert signals['geo_velocity_max'] == pytest.approx(haversine_km(*NEW_YORK, *SYDNEY) / 24)
+
+    def test_rows_without_location_are_skipped(self):
+        """Test that unlocated rows neither break pairs nor count as travel."""
+        frame = _frame([('2024-05-01 10:00:00', NEW_YORK), ('2024-05-01 10:30:00', (None, None))])
+        assert geo_velocity_signals(frame) == GEO_VELOCITY_DEFAULTS
+        assert geo_velocity_signals_by_user(frame.drop(columns=['latitude'])) == {}
+
+    def test_batch_matches_per_user_and_ignores_row_order(self):
+        """Test that one pass over many users equals per-user results in any row order."""
+        rng = np.random.default_rng(11)
+        rows = 3000
+        dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 90 * 24, rows), unit='h')
+        transactions = pd.DataFrame({
+            'user_id': rng.choice([f'user_{i:02d}' for i in range(25)], rows),
+            # Half the rows carry only a date
+            'date': np.where(rng.random(rows) < 0.5, dates.strftime('%Y-%m-%d'), dates.strftime('%Y-%m-%d %H:%M:%S')),
+            'latitude': rng.uniform(25, 60, rows),
+            'longitude': rng.uniform(-125, 30, rows),
+        })
+
+        batch = geo_velocity_signals_by_user(transactions)
+        shuffled = geo_velocity_signals_by_user(transactions.sample(frac=1.0, random_state=3))
+        assert batch == shuffled
+        assert any(signals['impossible_travel_count'] for signals in batch.values())
+        for user_id, group in transactions.groupby('user_id'):
+            assert batch[user_id] == geo_velocity_signals(group)
+
+    def test_fraud_signals_and_persona(self):
+        """Test that geo signals flow into fraud signals and the fraud_risk persona."""
+        frame = _frame([('2024-05-01 10:00:00', NEW_YORK), ('2024-05-01 11:00:00', LONDON)])
+        frame['is_fraud'] = 0
+        fraud_signals = extract_fraud_signals(frame)
+        assert fraud_signals['impossible_travel_count'] == 1
+        assert fraud_signals['fraud_transaction_count'] == 0
+
+        match = classify_persona(UserSignals(data_quality_score=0.9, **fraud_signals))
+        assert match.persona_id == 'fraud_risk'
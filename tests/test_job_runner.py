@@ -0,0 +1,150 @@
+"""
+Tests for the background job runner
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from src.jobs.runner import (
+    JobRunner, create_job, get_job, get_job_runner, list_jobs, process_identity, request_job_cancel
+)
+
+
+@pytest.fixture
+def runner(populated_db_path):
+    job_runner = JobRunner(populated_db_path)
+    yield job_runner
+    job_runner.shutdown()
+
+
+def _user_count(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestJobRunner:
+    """Signal computation jobs tracked in the jobs table."""
+
+    def test_signal_job_records_progress_and_succeeds(self, runner, populated_db_path):
+        """Test that a job runs in the background and reports its totals and throughput."""
+        job_id = runner.submit_signal_job(max_memory_mb=1)
+        job = runner.wait(job_id, timeout=120)
+
+        assert job['status'] == 'succeeded'
+        assert job['users_total'] == job['users_done'] == _user_count(populated_db_path)
+        assert job['error_count'] == 0
+        assert job['users_per_second'] > 0
+        assert job['started_at'] and job['finished_at']
+        assert job['params']['max_memory_mb'] == 1
+
+        conn = sqlite3.connect(populated_db_path)
+        signal_rows = conn.execute("SELECT COUNT(*) FROM user_signals WHERE window = '180d'").fetchone()[0]
+        conn.close()
+        assert signal_rows == job['users_total']
+
+    def test_cancel_stops_at_next_chunk(self, runner, populated_db_path, monkeypatch):
+        """Test that a cancelled job stops after the chunk in progress."""
+        checks = []
+        monkeypatch.setattr(runner, '_cancel_requested', lambda job_id: checks.append(job_id) or len(checks) > 1)
+
+        job = runner.wait(runner.submit_signal_job(max_memory_mb=1), timeout=120)
+        assert job['status'] == 'cancelled'
+        assert 0 < job['users_done'] < job['users_total']
+
+    def test_cancel_before_start(self, runner, populated_db_path):
+        """Test that a job cancelled while queued never runs."""
+        job_id = create_job('compute_signals', {}, populated_db_path)
+        assert request_job_cancel(job_id, populated_db_path)
+        runner._run_signal_job(job_id, {'window_days': 180, 'max_memory_mb': 1})
+
+        job = get_job(job_id, populated_db_path)
+        assert job['status'] == 'cancelled'
+        assert job['started_at'] is None
+        assert not request_job_cancel(job_id, populated_db_path)
+
+    def test_failure_is_recorded(self, runner, populated_db_path):
+        """Test that an exception inside the job marks it failed with the message."""
+        conn = sqlite3.connect(populated_db_path)
+        conn.execute("DROP TABLE transactions")
+        conn.commit()
+        conn.close()
+
+        job = runner.wait(runner.submit_signal_job(max_memory_mb=1), timeout=120)
+        assert job['status'] == 'failed'
+        assert 'transactions' in job['error_message']
+
+    def _set_owner(self, db_path, job_id, owner_pid, owner_identity=None):
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "UPDATE jobs SET owner_pid = ?, owner_identity = ? WHERE job_id = ?",
+            (owner_pid, owner_identity, job_id)
+        )
+        conn.commit()
+        conn.close()
+
+    def test_interrupted_jobs_are_failed_on_startup(self, populated_db_path):
+        """Test that jobs left running by a process that exited are marked failed."""
+        # A finished, reaped child's pid belongs to no process
+        exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+        exited.wait()
+        job_id = create_job('compute_signals', {}, populated_db_path)
+        self._set_owner(populated_db_path, job_id, exited.pid)
+        legacy_id = create_job('compute_signals', {}, populated_db_path)
+        self._set_owner(populated_db_path, legacy_id, None)
+
+        runner = get_job_runner(populated_db_path)
+        try:
+            for failed_id in (job_id, legacy_id):
+                job = get_job(failed_id, populated_db_path)
+                assert job['status'] == 'failed'
+                assert 'Interrupted' in job['error_message']
+            assert get_job_runner(populated_db_path) is runner
+            assert list_jobs(populated_db_path)[0]['job_id'] in (job_id, legacy_id)
+        finally:
+            runner.shutdown()
+
+    def test_jobs_of_live_processes_are_kept(self, populated_db_path):
+        """Test that starting a runner leaves jobs owned by a running process alone."""
+        own_id = create_job('compute_signals', {}, populated_db_path)
+        other_id = create_job('compute_signals', {}, populated_db_path)
+        self._set_owner(populated_db_path, other_id, os.getppid(), process_identity(os.getppid()))
+
+        runner = get_job_runner(populated_db_path)
+        try:
+            assert get_job(own_id, populated_db_path)['status'] == 'queued'
+            assert get_job(other_id, populated_db_path)['status'] == 'queued'
+            assert get_job(own_id, populated_db_path)['owner_pid'] == os.getpid()
+        finally:
+            runner.shutdown()
+
+    @pytest.mark.skipif(process_identity(os.getpid()) is None, reason="needs /proc")
+    def test_jobs_of_reused_pids_are_failed(self, populated_db_path):
+        """Test that a live process that only reuses the owner's pid doesn't keep its job."""
+        job_id = create_job('compute_signals', {}, populated_db_path)
+        # The pid is alive, but the process recorded with the job started at another time
+        boot_id = process_identity(os.getppid()).split(':')[0]
+        self._set_owner(populated_db_path, job_id, os.getppid(), f"{boot_id}:0")
+
+        runner = get_job_runner(populated_db_path)
+        try:
+            job = get_job(job_id, populated_db_path)
+            assert job['status'] == 'failed'
+            assert 'Interrupted' in job['error_message']
+        finally:
+            runner.shutdown()
+
+    def test_runner_is_shared_across_path_spellings(self, populated_db_path):
+        """Test that one database gets one runner however its path is written."""
+        db_path = Path(populated_db_path)
+        aliased = str(db_path.parent / '.' / db_path.name)
+
+        runner = get_job_runner(populated_db_path)
+        try:
+            assert get_job_runner(aliased) is runner
+        finally:
+            runner.shutdown()
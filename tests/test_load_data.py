@@ -0,0 +1,121 @@
+"""
+Tests for the schema-preserving CSV bulk loader
+"""
+import sqlite3
+import pandas as pd
+import pytest
+from scripts.load_data import bulk_load_frames, load_all_data, load_csv_to_table
+from src.db.connection import DatabaseError, close_pools
+from src.ingest.data_generator import SyntheticDataGenerator
+
+TABLES = ['users', 'accounts', 'transactions', 'liabilities']
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    """Synthetic users, accounts, transactions and liabilities written as CSVs."""
+    data = SyntheticDataGenerator(seed=42).generate_all(6)
+    data_dir = tmp_path / "synthetic"
+    data_dir.mkdir()
+    for table in TABLES:
+        pd.DataFrame(data[table]).to_csv(data_dir / f"{table}.csv", index=False)
+    return data_dir
+
+
+@pytest.fixture
+def loaded_db_path(tmp_path, csv_dir):
+    db_path = str(tmp_path / "loaded.db")
+    load_all_data(str(csv_dir), db_path)
+    yield db_path
+    close_pools()
+
+
+def _schema_objects(db_path: str, object_type: str) -> set:
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = ?", (object_type,))}
+    finally:
+        conn.close()
+
+
+class TestBulkLoader:
+    """Loading CSVs into the tables created from db/schema.sql."""
+
+    def test_load_keeps_indexes_and_triggers(self, loaded_db_path):
+        """Test that indexes and change-log triggers dropped for the load are rebuilt."""
+        indexes = _schema_objects(loaded_db_path, 'index')
+        assert {'idx_transactions_user_date', 'idx_transactions_merchant', 'idx_accounts_user_type'} <= indexes
+        assert {'trg_transactions_insert_log', 'trg_accounts_insert_log'} <= _schema_objects(loaded_db_path, 'trigger')
+
+        conn = sqlite3.connect(loaded_db_path)
+        try:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM transactions WHERE user_id = ? AND date >= ?", ('u', '2024-01-01')
+            ).fetchall()
+        finally:
+            conn.close()
+        assert any('idx_transactions_user_date' in row[-1] for row in plan)
+
+    def test_load_keeps_primary_key_and_defaults(self, loaded_db_path, csv_dir):
+        """Test that the schema's primary key and column defaults survive the load."""
+        users = pd.read_csv(csv_dir / "users.csv")
+        conn = sqlite3.connect(loaded_db_path)
+        try:
+            with pytest.raises(sqlite3.IntegrityError):
+                conn.execute("INSERT INTO users (user_id) VALUES (?)", (users['user_id'][0],))
+            columns = {row[1]: row for row in conn.execute("PRAGMA table_info(users)")}
+            assert columns['user_id'][5] == 1  # primary key
+            assert columns['created_at'][4] == 'CURRENT_TIMESTAMP'
+        finally:
+            conn.close()
+
+    def test_counts_match_csv_and_reload_replaces(self, loaded_db_path, csv_dir):
+        """Test that every CSV row is loaded once, and loading again replaces rather than appends."""
+        expected = len(pd.read_csv(csv_dir / "transactions.csv"))
+        assert load_csv_to_table(str(csv_dir / "transactions.csv"), 'transactions', loaded_db_path) == expected
+        assert load_csv_to_table(str(csv_dir / "transactions.csv"), 'transactions', loaded_db_path) == expected
+
+    def test_nulls_and_booleans_are_stored_like_to_sql(self, loaded_db_path, csv_dir):
+        """Test that NaN becomes NULL and booleans become 0/1."""
+        transactions = pd.read_csv(csv_dir / "transactions.csv")
+        conn = sqlite3.connect(loaded_db_path)
+        try:
+            nulls = conn.execute("SELECT COUNT(*) FROM transactions WHERE merchant_name IS NULL").fetchone()[0]
+            pending = {row[0] for row in conn.execute("SELECT DISTINCT pending FROM transactions")}
+        finally:
+            conn.close()
+        assert nulls == transactions['merchant_name'].isna().sum()
+        assert pending <= {0, 1}
+
+    def test_bulk_load_reports_throughput(self, loaded_db_path):
+        """Test that a bulk load reports rows and rows/sec, skipping unknown columns."""
+        frame = pd.DataFrame({'user_id': ['bulk_a', 'bulk_b'], 'consent_status': [True, False],
+                              'not_a_column': [1, 2]})
+        stats = bulk_load_frames('users', [frame], loaded_db_path, replace=False)
+
+        assert stats['rows'] == 2
+        assert stats['rows_per_sec'] > 0
+
+    def test_failed_load_leaves_table_untouched(self, loaded_db_path):
+        """Test that a load that fails part way rolls back, keeping old rows and indexes."""
+        conn = sqlite3.connect(loaded_db_path)
+        try:
+            before = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        finally:
+            conn.close()
+
+        duplicate = pd.DataFrame({'user_id': ['dup', 'dup']})
+        with pytest.raises(DatabaseError):
+            bulk_load_frames('users', [duplicate], loaded_db_path)
+
+        conn = sqlite3.connect(loaded_db_path)
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == before
+        finally:
+            conn.close()
+        assert 'idx_users_demographic_group' in _schema_objects(loaded_db_path, 'index')
+
+    def test_missing_table_is_rejected(self, loaded_db_path):
+        """Test that loading into a table that doesn't exist fails instead of creating it."""
+        with pytest.raises(DatabaseError):
+            bulk_load_frames('no_such_table', [pd.DataFrame({'a': [1]})], loaded_db_path)
@@ -0,0 +1,203 @@
+"""
+Tests for versioned schema migrations
+"""
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+from src.db import connection
+from src.db.connection import (
+    MIGRATIONS, SCHEMA_VERSION, DatabaseError, close_pools, ensure_schema_current, get_schema_version, initialize_db,
+    migrate_db
+)
+
+SCHEMA_PATH = str(Path(__file__).parent.parent / "db" / "schema.sql")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    yield str(tmp_path / "migrations.db")
+    close_pools()
+
+
+@pytest.fixture
+def legacy_db_path(db_path):
+    """A database from before schema_version, missing the decision_trace and jobs migrations."""
+    initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+    close_pools()
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE schema_version")
+    conn.execute("DROP TABLE jobs")
+    conn.execute("ALTER TABLE recommendations DROP COLUMN decision_trace")
+    conn.commit()
+    conn.close()
+    connection.invalidate_schema_cache(db_path)
+    return db_path
+
+
+def _applied(db_path: str):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [tuple(row) for row in conn.execute("SELECT version, name FROM schema_version ORDER BY version")]
+    finally:
+        conn.close()
+
+
+def _columns(db_path: str, table: str) -> set:
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    finally:
+        conn.close()
+
+
+class TestSchemaMigrations:
+    """schema_version bookkeeping and applying only pending migrations."""
+
+    def test_registry_is_ordered(self):
+        """Test that migration versions are unique and increasing."""
+        versions = [version for version, _, _ in MIGRATIONS]
+        assert versions == sorted(set(versions))
+        assert SCHEMA_VERSION == versions[-1]
+
+    def test_new_database_is_stamped_current(self, db_path):
+        """Test that a database created from schema.sql records every migration as applied."""
+        initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+
+        assert _applied(db_path) == [(version, name) for version, name, _ in MIGRATIONS]
+        assert get_schema_version(db_path) == SCHEMA_VERSION
+
+    def test_legacy_database_is_migrated(self, legacy_db_path):
+        """Test that a database without schema_version gets missing changes and a version."""
+        initialize_db(schema_path=SCHEMA_PATH, db_path=legacy_db_path)
+
+        assert 'decision_trace' in _columns(legacy_db_path, 'recommendations')
+        assert 'job_id' in _columns(legacy_db_path, 'jobs')
+        assert len(_applied(legacy_db_path)) == len(MIGRATIONS)
+        assert get_schema_version(legacy_db_path) == SCHEMA_VERSION
+
+    def test_accounts_update_trigger_is_replaced(self, db_path):
+        """Test that upgrading replaces the accounts update trigger that only logged the new owner."""
+        initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+        close_pools()
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            DROP TRIGGER trg_accounts_update_log;
+            DROP TRIGGER trg_accounts_delete_log;
+            CREATE TRIGGER trg_accounts_update_log AFTER UPDATE ON accounts BEGIN
+                INSERT INTO signal_change_log (user_id, source_table, operation) VALUES (NEW.user_id, 'accounts', 'update');
+            END;
+        """)
+        conn.execute("DELETE FROM schema_version WHERE version >= 10")
+        conn.commit()
+        conn.close()
+        connection.invalidate_schema_cache(db_path)
+
+        assert migrate_db(db_path) == SCHEMA_VERSION - 9
+
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("INSERT INTO accounts (account_id, user_id, type, subtype) VALUES ('acc', 'old', 'depository', 'checking')")
+            conn.execute("UPDATE accounts SET user_id = 'new' WHERE account_id = 'acc'")
+            conn.execute("DELETE FROM accounts WHERE account_id = 'acc'")
+            logged = conn.execute("SELECT user_id, operation FROM signal_change_log ORDER BY change_id").fetchall()
+        finally:
+            conn.close()
+        assert logged == [('old', 'insert'), ('new', 'update'), ('old', 'update'), ('new', 'delete')]
+
+    def test_ensure_schema_current_migrates_legacy_database(self, legacy_db_path):
+        """Test that the entry-point check applies pending migrations to an initialized database."""
+        assert ensure_schema_current(legacy_db_path) == len(MIGRATIONS)
+        assert ensure_schema_current(legacy_db_path) == 0
+        assert 'decision_trace' in _columns(legacy_db_path, 'recommendations')
+
+    def test_ensure_schema_current_leaves_uninitialized_database(self, db_path):
+        """Test that a missing or empty database isn't stamped current before initialize_db creates it."""
+        assert ensure_schema_current(db_path) == 0
+        assert not os.path.exists(db_path)
+
+        sqlite3.connect(db_path).close()
+        assert ensure_schema_current(db_path) == 0
+        initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+        assert 'user_id' in _columns(db_path, 'users')
+
+    def test_only_pending_migrations_run(self, db_path):
+        """Test that migrations at or below the recorded version are skipped."""
+        initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM schema_version WHERE version = ?", (SCHEMA_VERSION,))
+        conn.commit()
+        conn.close()
+        connection.invalidate_schema_cache(db_path)
+
+        calls = []
+        registry = [(version, name, lambda conn, name=name: calls.append(name)) for version, name, _ in MIGRATIONS]
+        with patch.object(connection, 'MIGRATIONS', registry):
+            assert migrate_db(db_path) == 1
+            assert migrate_db(db_path) == 0
+
+        assert calls == [MIGRATIONS[-1][1]]
+
+    def test_current_database_skips_write_transactions(self, db_path):
+        """Test that re-initializing an up-to-date database never opens a write transaction."""
+        initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+
+        with patch.object(connection, 'database_transaction', side_effect=AssertionError("write transaction")):
+            initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+            assert migrate_db(db_path) == 0
+
+    def test_version_is_cached(self, db_path):
+        """Test that get_schema_version reads the database once until the cache is invalidated."""
+        initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+        with patch.object(connection, 'database_read', side_effect=AssertionError("read")):
+            assert get_schema_version(db_path) == SCHEMA_VERSION
+
+        connection.invalidate_schema_cache(db_path)
+        assert get_schema_version(db_path) == SCHEMA_VERSION
+
+    def test_replaced_file_is_initialized(self, db_path):
+        """Test that initialize_db doesn't trust a version cached for a file that was since replaced."""
+        initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+        close_pools()
+        os.remove(db_path)
+        sqlite3.connect(db_path).close()
+
+        initialize_db(schema_path=SCHEMA_PATH, db_path=db_path)
+
+        assert 'user_id' in _columns(db_path, 'users')
+        assert get_schema_version(db_path) == SCHEMA_VERSION
+
+    def test_failed_migration_rolls_back(self, legacy_db_path):
+        """Test that a failing migration leaves the database unversioned and unchanged."""
+        def broken(conn):
+            raise sqlite3.OperationalError("broken migration")
+
+        registry = MIGRATIONS[:-1] + [(SCHEMA_VERSION, 'broken', broken)]
+        with patch.object(connection, 'MIGRATIONS', registry):
+            with pytest.raises(DatabaseError):
+                migrate_db(legacy_db_path)
+
+        assert get_schema_version(legacy_db_path) is None
+        assert 'decision_trace' not in _columns(legacy_db_path, 'recommendations')
+
+    def test_concurrent_callers_apply_each_migration_once(self, legacy_db_path):
+        """Test that migrate_db from many threads applies the pending migrations exactly once."""
+        applied, errors = [], []
+
+        def migrate():
+            try:
+                applied.append(migrate_db(legacy_db_path))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=migrate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        assert sorted(applied) == [0, 0, 0, len(MIGRATIONS)]
+        assert len(_applied(legacy_db_path)) == len(MIGRATIONS)
@@ -0,0 +1,95 @@
+"""
+Query plan regression tests for the hot SQL statements in src/db/hot_queries.py
+"""
+import os
+import sqlite3
+import pytest
+from benchmarks.query_plans import build_plan_db, sample_params
+from src.db.connection import close_pools
+from src.db.hot_queries import HOT_QUERIES, HotQuery, check_query_plans, explain_query_plan, plan_problems
+
+# Rows per large table in the fixture; set SPENDSENSE_QUERY_PLAN_ROWS=1000000 to check plans at full size
+FIXTURE_ROWS = int(os.getenv("SPENDSENSE_QUERY_PLAN_ROWS", "5000"))
+
+
+@pytest.fixture(scope="module")
+def plan_db(tmp_path_factory):
+    """A populated database and sample parameters for every hot query."""
+    db_path = str(tmp_path_factory.mktemp("query_plans") / "plans.db")
+    build_plan_db(db_path, FIXTURE_ROWS)
+    close_pools()
+    conn = sqlite3.connect(db_path)
+    try:
+        yield conn, sample_params(conn)
+    finally:
+        conn.close()
+
+
+class TestHotQueryPlans:
+    """Every hot statement keeps using its indexes."""
+
+    @pytest.mark.parametrize("query", HOT_QUERIES, ids=[query.name for query in HOT_QUERIES])
+    def test_plan_uses_expected_indexes(self, plan_db, query):
+        """Test that the statement's plan uses its indexes, without full scans or sorts."""
+        conn, params = plan_db
+        plan = explain_query_plan(conn, query, params)
+
+        assert plan_problems(query, plan) == [], plan
+
+    def test_registry_names_are_unique(self):
+        """Test that no two registry entries share a name."""
+        names = [query.name for query in HOT_QUERIES]
+        assert len(names) == len(set(names))
+
+    def test_registry_checks_the_statements_that_run(self):
+        """Test that entries take their SQL from the modules that execute it."""
+        from scripts.compute_signals import USER_WINDOW_CLAUSE
+        from src.guardrails.guardrails import CONSENT_CHECK_SQL
+        queries = {query.name: query for query in HOT_QUERIES}
+
+        assert queries['consent_check'].sql is CONSENT_CHECK_SQL
+        assert USER_WINDOW_CLAUSE in queries['user_transactions_window'].sql
+
+    def test_dropped_index_is_reported(self, tmp_path):
+        """Test that removing an index a hot statement relies on shows up as a plan problem."""
+        db_path = str(tmp_path / "dropped.db")
+        build_plan_db(db_path, 500)
+        close_pools()
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("DROP INDEX idx_recommendations_approval")
+            report = check_query_plans(conn, sample_params(conn))
+        finally:
+            conn.close()
+
+        assert report == {'operator_queue_pending': ["does not use idx_recommendations_approval"]}
+
+    def test_unindexed_sort_is_reported(self, tmp_path):
+        """Test that a listing which falls back to a full scan and sort reports both."""
+        db_path = str(tmp_path / "unsorted.db")
+        build_plan_db(db_path, 500)
+        close_pools()
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("DROP INDEX idx_recommendations_created")
+            report = check_query_plans(conn, sample_params(conn))
+        finally:
+            conn.close()
+
+        assert report['operator_queue_all'] == [
+            "does not use idx_recommendations_created",
+            "scans all of recommendations",
+            "sorts its result instead of reading it in index order",
+        ]
+
+    def test_allowed_full_scan_is_not_reported(self):
+        """Test that full_scans exempts a table from the full-scan check only."""
+        plan = ['SCAN transactions', 'USING INDEX sqlite_autoindex_accounts_1 FOR IN-OPERATOR']
+        query = HotQuery('q', 'test', 'SELECT 1', uses=('sqlite_autoindex_accounts_1',))
+
+        assert plan_problems(query, plan) == ["scans all of transactions"]
+        allowed = HotQuery('q', 'test', 'SELECT 1', uses=('sqlite_autoindex_accounts_1',), full_scans=('transactions',))
+        assert plan_problems(allowed, plan) == []
+        assert plan_problems(allowed, ['SCAN TABLE accounts']) == [
+            "does not use sqlite_autoindex_accounts_1", "scans all of accounts"
+        ]
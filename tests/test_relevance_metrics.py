@@ -194,7 +194,7 @@ class TestAggregateRelevance:
     
     def test_aggregate_relevance_empty(self):
         """Test aggregate relevance with no recommendations."""
-        with patch('src.evaluation.metrics.database_transaction') as mock_db:
+        with patch('src.evaluation.metrics.database_read') as mock_db:
             mock_conn = MagicMock()
             mock_conn.execute.return_value.fetchall.return_value = []
             mock_db.return_value.__enter__.return_value = mock_conn
@@ -208,7 +208,7 @@ class TestAggregateRelevance:
     
     def test_aggregate_relevance_with_data(self):
         """Test aggregate relevance calculation with mock data."""
-        with patch('src.evaluation.metrics.database_transaction') as mock_db, \
+        with patch('src.evaluation.metrics.database_read') as mock_db, \
              patch('src.evaluation.metrics.load_content_catalog') as mock_catalog, \
              patch('src.evaluation.metrics.classify_persona') as mock_classify, \
              patch('src.recommend.signal_mapper.map_signals_to_triggers') as mock_map:
@@ -299,7 +299,7 @@ class TestAggregateRelevance:
     
     def test_aggregate_relevance_high_low_counts(self):
         """Test that high and low relevance counts are calculated correctly."""
-        with patch('src.evaluation.metrics.database_transaction') as mock_db, \
+        with patch('src.evaluation.metrics.database_read') as mock_db, \
              patch('src.evaluation.metrics.load_content_catalog') as mock_catalog, \
              patch('src.evaluation.metrics.classify_persona') as mock_classify, \
              patch('src.recommend.signal_mapper.map_signals_to_triggers') as mock_map:
@@ -0,0 +1,80 @@
+"""
+Tests for signal pipeline stage timing histograms
+"""
+import pytest
+from src.features.stage_timing import StageHistogram, StageTimer, format_stage_summary
+
+
+class TestStageHistogram:
+    """Bucketed latency distribution for one stage."""
+
+    def test_percentiles_are_within_bucket_precision(self):
+        """Test that p50/p95 land within ~10% of the exact quantile and never exceed max."""
+        histogram = StageHistogram()
+        for ms in range(1, 101):
+            histogram.add(ms / 1000, rows=2)
+
+        assert histogram.count == 100
+        assert histogram.rows == 200
+        assert histogram.percentile(0.5) == pytest.approx(0.050, rel=0.11)
+        assert histogram.percentile(0.95) == pytest.approx(0.095, rel=0.11)
+        assert histogram.percentile(1.0) == histogram.max == 0.1
+
+    def test_empty_histogram(self):
+        """Test that an unused histogram reports zeros."""
+        assert StageHistogram().percentile(0.5) == 0.0
+
+    def test_merge_matches_single_histogram(self):
+        """Test that merging worker state equals recording everything in one place."""
+        combined, left, right = StageHistogram(), StageHistogram(), StageHistogram()
+        for i, seconds in enumerate([0.001, 0.002, 0.004, 0.2, 0.0000005]):
+            combined.add(seconds, 1)
+            (left if i % 2 else right).add(seconds, 1)
+        left.merge(right.to_dict())
+
+        assert left.buckets == combined.buckets
+        assert left.count == combined.count
+        assert left.total == pytest.approx(combined.total)
+        assert left.percentile(0.95) == combined.percentile(0.95)
+
+
+class TestStageTimer:
+    """Per-stage timing for a signal run."""
+
+    def test_stage_records_calls_even_on_error(self):
+        """Test that a failing block still counts as a timed call."""
+        timer = StageTimer()
+        with timer.stage('fetch', rows=10):
+            pass
+        with pytest.raises(ValueError):
+            with timer.stage('fetch', rows=5):
+                raise ValueError("boom")
+
+        summary = timer.summary()
+        assert summary['fetch']['calls'] == 2
+        assert summary['fetch']['rows'] == 15
+        assert summary['fetch']['max_ms'] >= summary['fetch']['p50_ms'] >= 0
+
+    def test_snapshot_merge_and_reset(self):
+        """Test that snapshots from another timer merge in and reset clears everything."""
+        worker, parent = StageTimer(), StageTimer()
+        worker.record('credit', 0.01, 3)
+        parent.record('credit', 0.03, 1)
+        parent.merge(worker.snapshot())
+
+        assert parent.summary()['credit']['calls'] == 2
+        assert parent.summary()['credit']['total_ms'] == pytest.approx(40.0)
+
+        parent.reset()
+        assert parent.summary() == {}
+
+    def test_format_orders_by_total(self):
+        """Test that the summary table lists the slowest stage first."""
+        timer = StageTimer()
+        timer.record('income', 0.001)
+        timer.record('fraud', 0.5)
+        lines = format_stage_summary(timer.summary(), "Stage timings:")
+
+        assert lines[0] == "Stage timings:"
+        assert lines[2].split()[0] == 'fraud'
+        assert lines[3].split()[0] == 'income'
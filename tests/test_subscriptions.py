@@ -0,0 +1,86 @@
+"""
+Tests for recurring payment detection and subscription signals
+"""
+import pandas as pd
+import pytest
+from src.features.subscriptions import detect_recurring_transactions, subscription_signals_by_user
+
+
+def _series(user_id, merchant, dates, amount, category='Entertainment'):
+    return pd.DataFrame({
+        'user_id': user_id, 'merchant_name': merchant, 'category_primary': category,
+        'date': dates, 'amount': amount,
+    })
+
+
+class TestRecurrenceDetection:
+    """Cadence and amount stability checks."""
+
+    def test_monthly_and_weekly_series_detected(self):
+        """Test that steady monthly and weekly charges are flagged."""
+        transactions = pd.concat([
+            _series('u1', 'MERCH01', ['2024-01-03', '2024-02-02', '2024-03-04', '2024-04-03'], -15.99),
+            _series('u2', 'MERCH02', ['2024-01-01', '2024-01-08', '2024-01-15'], -9.99),
+        ], ignore_index=True)
+
+        assert detect_recurring_transactions(transactions).all()
+
+    def test_irregular_and_short_series_ignored(self):
+        """Test that uneven gaps, varying amounts and too few charges are not recurring."""
+        transactions = pd.concat([
+            _series('u1', 'Grocer', ['2024-01-01', '2024-01-04', '2024-02-20', '2024-02-21'], -50.0),
+            _series('u1', 'Utility', ['2024-01-01', '2024-02-01', '2024-03-01'], [-20.0, -80.0, -45.0]),
+            _series('u1', 'Streaming', ['2024-01-01', '2024-02-01'], -12.0),
+        ], ignore_index=True)
+
+        assert not detect_recurring_transactions(transactions).any()
+
+    def test_series_are_per_user(self):
+        """Test that the same merchant at different users forms separate series."""
+        transactions = pd.concat([
+            _series('u1', 'Gym', ['2024-01-01', '2024-03-01'], -30.0),
+            _series('u2', 'Gym', ['2024-02-01'], -30.0),
+        ], ignore_index=True)
+
+        assert not detect_recurring_transactions(transactions).any()
+
+    def test_transfers_are_not_subscriptions(self):
+        """Test that recurring transfers and payments are excluded."""
+        transactions = _series('u1', 'Transfer to Savings', ['2024-01-01', '2024-02-01', '2024-03-01'],
+                               -200.0, category='Transfer')
+
+        assert not detect_recurring_transactions(transactions).any()
+
+    def test_result_aligned_with_unsorted_input(self):
+        """Test that flags line up with the caller's row order and index."""
+        transactions = pd.concat([
+            _series('u1', 'Grocer', ['2024-03-09'], -70.0),
+            _series('u1', 'Netflix', ['2024-03-01', '2024-01-01', '2024-02-01'], -15.49),
+        ], ignore_index=True)
+        transactions.index = [10, 20, 30, 40]
+
+        flags = detect_recurring_transactions(transactions)
+
+        assert flags.to_dict() == {10: False, 20: True, 30: True, 40: True}
+
+
+class TestSubscriptionSignalsByUser:
+    """Subscription signals derived from detected recurrences."""
+
+    def test_recurring_charges_drive_signals(self):
+        """Test count, monthly spend and share from a detected monthly charge."""
+        transactions = pd.concat([
+            _series('u1', 'MERCH01', ['2024-01-01', '2024-02-01', '2024-03-01'], -10.0),
+            _series('u1', 'Grocer', ['2024-01-05'], -70.0),
+        ], ignore_index=True)
+
+        signals = subscription_signals_by_user(transactions, window_days=90)
+
+        assert signals['u1']['subscription_count'] == 1
+        assert signals['u1']['monthly_subscription_spend'] == pytest.approx(10.0)
+        assert signals['u1']['subscription_share'] == pytest.approx(0.3)
+
+    def test_no_subscriptions(self):
+        """Test that users without subscriptions are omitted."""
+        transactions = _series('u1', 'Grocer', ['2024-01-05'], -70.0)
+        assert subscription_signals_by_user(transactions, window_days=90) == {}
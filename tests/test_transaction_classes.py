@@ -0,0 +1,186 @@
+"""
+Tests for ingest-time transaction classification
+"""
+import sqlite3
+import pandas as pd
+from scripts.compute_signals import compute_bulk_user_signals, compute_user_signals
+from src.db.connection import run_txn_class_migration
+from src.features.transaction_classes import (
+    CLASS_FEE, CLASS_FEE_ATM, CLASS_FEE_MAINTENANCE, CLASS_FEE_OVERDRAFT, CLASS_INCOME, CLASS_SAVINGS_DEPOSIT,
+    CLASS_SQL, CLASS_SUBSCRIPTION, classify_transactions, transaction_classes
+)
+from tests.test_compute_signals import _all_user_ids, assert_signals_match
+
+
+def _stored_transactions(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query("SELECT * FROM transactions ORDER BY transaction_id", conn)
+    finally:
+        conn.close()
+
+
+class TestClassifyTransactions:
+    """Classification bits computed from transaction text."""
+
+    def test_bits_for_each_class(self):
+        """Test that each kind of transaction gets its bits."""
+        transactions = pd.DataFrame({
+            'account_id': ['chk', 'chk', 'chk', 'chk', 'sav'],
+            'amount': [2500.0, -15.99, -35.0, -3.0, 200.0],
+            'merchant_name': ['ACME Corp', 'Netflix', 'Overdraft Fee', 'ATM Surcharge', 'Transfer'],
+            'category_primary': ['Payroll', 'Entertainment', 'Bank Fees', 'Bank Fees', 'Transfer'],
+            'category_detailed': [None, 'Subscription', None, None, None],
+        })
+
+        classes = classify_transactions(transactions, savings_account_ids=['sav'])
+
+        assert list(classes) == [
+            CLASS_INCOME,
+            CLASS_SUBSCRIPTION,
+            CLASS_FEE | CLASS_FEE_OVERDRAFT,
+            CLASS_FEE | CLASS_FEE_ATM,
+            CLASS_SAVINGS_DEPOSIT,
+        ]
+
+    def test_stored_classes_are_used_and_missing_ones_filled(self):
+        """Test that stored classes win and NULL classes are computed."""
+        transactions = pd.DataFrame({
+            'amount': [-10.0, 1000.0],
+            'merchant_name': ['Anything', 'Employer'],
+            'category_primary': ['Shopping', 'Payroll'],
+            'txn_class': [CLASS_SUBSCRIPTION, None],
+        })
+
+        assert list(transaction_classes(transactions)) == [CLASS_SUBSCRIPTION, CLASS_INCOME]
+
+
+class TestSqlClassification:
+    """CLASS_SQL and classify_transactions implement the same rules."""
+
+    # Rows aimed at each branch of both implementations: case variants, sign checks,
+    # every fee type, missing text and deposits into and out of a savings account
+    ROWS = pd.DataFrame({
+        'transaction_id': [f'txn_{idx:02d}' for idx in range(16)],
+        'user_id': 'u1',
+        'account_id': ['chk'] * 14 + ['sav', 'sav'],
+        'amount': [2500.0, 300.0, -50.0, -9.99, -4.99, -12.0, -25.0, 40.0, -35.0, -3.5, -2.5, -15.0, -38.5,
+                   -20.0, 500.0, -100.0],
+        'merchant_name': ['Employer', 'Venmo', 'Refund', 'Gym', 'Spotify', 'Bank', 'Wire charge', 'Overdraft Fee',
+                          'NSF fee', 'ATM withdrawal fee', 'Bank', 'MONTHLY FEE', 'OD Fee / ATM Surcharge', None,
+                          'Transfer', 'Transfer'],
+        'category_primary': ['payroll', 'Direct Deposit', 'Income', 'Recurring', 'Entertainment',
+                             'Service Charge', 'Transfer', 'Bank Fees', 'Shopping', 'Cash', 'ATM Fee', 'Bank Fees',
+                             'Bank Fees', None, 'Transfer', 'Transfer'],
+        'category_detailed': [None, None, None, None, 'SUBSCRIPTION', None, None, None, None, None, None, None,
+                              None, None, None, None],
+    })
+
+    def _sql_classes(self, rows: pd.DataFrame) -> list:
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.execute("CREATE TABLE accounts (account_id TEXT, user_id TEXT, subtype TEXT)")
+            conn.executemany("INSERT INTO accounts VALUES (?, 'u1', ?)", [('chk', 'checking'), ('sav', 'savings')])
+            rows.to_sql('transactions', conn, index=False)
+            return [row[0] for row in conn.execute(f"SELECT {CLASS_SQL} FROM transactions t ORDER BY transaction_id")]
+        finally:
+            conn.close()
+
+    def test_sql_matches_dataframe_classifier(self):
+        """Test that both implementations give every fixture row the same bits."""
+        expected = list(classify_transactions(self.ROWS, savings_account_ids=['sav']))
+
+        assert self._sql_classes(self.ROWS) == expected
+
+    def test_fixture_rows_get_expected_bits(self):
+        """Test the bits themselves, so the parity test can't pass with both sides wrong."""
+        assert self._sql_classes(self.ROWS) == [
+            CLASS_INCOME, CLASS_INCOME, 0, CLASS_SUBSCRIPTION, CLASS_SUBSCRIPTION, CLASS_FEE, CLASS_FEE, 0,
+            CLASS_FEE | CLASS_FEE_OVERDRAFT, CLASS_FEE | CLASS_FEE_ATM, CLASS_FEE | CLASS_FEE_ATM,
+            CLASS_FEE | CLASS_FEE_MAINTENANCE, CLASS_FEE | CLASS_FEE_OVERDRAFT | CLASS_FEE_ATM, 0,
+            CLASS_SAVINGS_DEPOSIT, 0,
+        ]
+
+
+class TestIngestClassification:
+    """The txn_class column populated in the database."""
+
+    def test_sql_and_pandas_classification_agree(self, populated_db_path):
+        """Test that stored classes match the DataFrame classifier for every row."""
+        run_txn_class_migration(populated_db_path)
+        transactions = _stored_transactions(populated_db_path)
+
+        conn = sqlite3.connect(populated_db_path)
+        try:
+            savings_ids = [row[0] for row in conn.execute("SELECT account_id FROM accounts WHERE subtype = 'savings'")]
+        finally:
+            conn.close()
+
+        assert transactions['txn_class'].notna().all()
+        expected = classify_transactions(transactions, savings_account_ids=savings_ids)
+        assert list(transactions['txn_class'].astype('int64')) == list(expected)
+
+    def test_migration_adds_column_to_legacy_table(self, populated_db_path):
+        """Test that a database without txn_class gets the column and classified rows."""
+        conn = sqlite3.connect(populated_db_path)
+        try:
+            conn.execute("DROP TRIGGER trg_transactions_reset_class")
+            conn.execute("ALTER TABLE transactions DROP COLUMN txn_class")
+            conn.commit()
+        finally:
+            conn.close()
+
+        run_txn_class_migration(populated_db_path)
+
+        transactions = _stored_transactions(populated_db_path)
+        assert transactions['txn_class'].notna().all()
+        conn = sqlite3.connect(populated_db_path)
+        try:
+            assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'trg_transactions_reset_class'").fetchone()
+        finally:
+            conn.close()
+
+    def test_edited_row_is_reclassified(self, populated_db_path):
+        """Test that editing a classified row clears its stored class and the next run sets the new one."""
+        run_txn_class_migration(populated_db_path)
+        conn = sqlite3.connect(populated_db_path)
+        try:
+            transaction_id = conn.execute(
+                "SELECT transaction_id FROM transactions WHERE txn_class = 0 LIMIT 1").fetchone()[0]
+            conn.execute("""
+                UPDATE transactions SET amount = -35.0, merchant_name = 'Overdraft Fee', category_primary = 'Bank Fees'
+                WHERE transaction_id = ?
+            """, (transaction_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+        edited = _stored_transactions(populated_db_path).set_index('transaction_id').loc[[transaction_id]]
+        assert edited['txn_class'].isna().all()
+        assert list(transaction_classes(edited)) == [CLASS_FEE | CLASS_FEE_OVERDRAFT]
+
+        run_txn_class_migration(populated_db_path)
+        stored = _stored_transactions(populated_db_path).set_index('transaction_id')
+        assert stored.loc[transaction_id, 'txn_class'] == CLASS_FEE | CLASS_FEE_OVERDRAFT
+
+    def test_explicit_class_update_is_kept(self, populated_db_path):
+        """Test that an update setting txn_class along with the text keeps the class it set."""
+        run_txn_class_migration(populated_db_path)
+        conn = sqlite3.connect(populated_db_path)
+        try:
+            transaction_id = conn.execute("SELECT transaction_id FROM transactions LIMIT 1").fetchone()[0]
+            conn.execute("UPDATE transactions SET merchant_name = 'Netflix', txn_class = ? WHERE transaction_id = ?",
+                         (CLASS_SUBSCRIPTION, transaction_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+        stored = _stored_transactions(populated_db_path).set_index('transaction_id')
+        assert stored.loc[transaction_id, 'txn_class'] == CLASS_SUBSCRIPTION
+
+    def test_signals_unchanged_by_stored_classes(self, populated_db_path):
+        """Test that per-user and bulk signals agree once classes are stored."""
+        run_txn_class_migration(populated_db_path)
+        bulk = compute_bulk_user_signals(180, populated_db_path)
+        for user_id in _all_user_ids(populated_db_path):
+            assert_signals_match(bulk[user_id], compute_user_signals(user_id, 180, populated_db_path))
@@ -0,0 +1,127 @@
+"""
+Tests for the columnar transaction snapshot
+"""
+import sqlite3
+import numpy as np
+import pandas as pd
+import pytest
+from scripts.compute_signals import compute_all_user_signals, compute_bulk_user_signals, compute_multi_window_signals
+from src.db.connection import DatabaseError
+from src.features.transaction_snapshot import export_transaction_snapshot, load_transaction_snapshot
+from tests.test_compute_signals import assert_signals_match
+
+
+def _query(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+
+class TestTransactionSnapshot:
+    """Export and memory-mapped reads of the transactions table."""
+
+    def test_export_round_trips_columns(self, populated_db_path, tmp_path):
+        """Test that every row comes back with the same values, grouped by user."""
+        manifest = export_transaction_snapshot(populated_db_path, tmp_path / "snap", chunk_rows=50)
+        snapshot = load_transaction_snapshot(tmp_path / "snap")
+
+        expected = _query(populated_db_path, """
+            SELECT user_id, account_id, date, amount, merchant_name, category_primary, is_fraud
+            FROM transactions ORDER BY user_id, date
+        """)
+        frame = snapshot.to_frame()
+
+        assert manifest['rows'] == len(snapshot) == len(expected)
+        assert isinstance(snapshot.columns['amount'], np.memmap)
+        assert snapshot.columns['day'].dtype == np.int32
+        for column in expected.columns:
+            left = frame[column].reset_index(drop=True)
+            if column in ('amount',):
+                np.testing.assert_allclose(left.to_numpy(), expected[column].to_numpy())
+            else:
+                assert sorted(map(str, left)) == sorted(map(str, expected[column])), column
+
+    def test_user_offsets_index_each_user(self, populated_db_path, tmp_path):
+        """Test that the offset index slices out exactly one user's rows."""
+        export_transaction_snapshot(populated_db_path, tmp_path / "snap")
+        snapshot = load_transaction_snapshot(tmp_path / "snap")
+        counts = _query(populated_db_path, "SELECT user_id, COUNT(*) AS n FROM transactions GROUP BY user_id")
+
+        for user_id, count in zip(counts['user_id'], counts['n']):
+            rows = snapshot.user_rows(user_id)
+            assert rows.stop - rows.start == count
+            assert set(snapshot.to_frame([user_id])['user_id']) == {user_id}
+        assert snapshot.user_rows('missing_user') == slice(0, 0)
+        assert snapshot.to_frame(['missing_user']).empty
+
+    def test_start_date_filters_rows(self, populated_db_path, tmp_path):
+        """Test that start_date keeps rows dated on or after it."""
+        export_transaction_snapshot(populated_db_path, tmp_path / "snap")
+        snapshot = load_transaction_snapshot(tmp_path / "snap")
+        cutoff = _query(populated_db_path, "SELECT date FROM transactions ORDER BY date")['date'].iloc[100]
+
+        frame = snapshot.to_frame(start_date=cutoff)
+        expected = _query(populated_db_path, "SELECT COUNT(*) AS n FROM transactions WHERE date >= ?", (cutoff,))
+        assert len(frame) == expected['n'].iloc[0]
+        assert frame['date'].min() >= cutoff
+
+    def test_bulk_signals_match_sql_reads(self, populated_db_path, tmp_path):
+        """Test that signals computed from the snapshot equal those computed from SQLite."""
+        export_transaction_snapshot(populated_db_path, tmp_path / "snap")
+
+        from_sql = compute_bulk_user_signals(180, populated_db_path)
+        from_snapshot = compute_bulk_user_signals(180, populated_db_path, snapshot_dir=str(tmp_path / "snap"))
+        assert from_sql.keys() == from_snapshot.keys()
+        for user_id in from_sql:
+            assert_signals_match(from_snapshot[user_id], from_sql[user_id])
+
+        windows = compute_multi_window_signals((30, 180), populated_db_path, snapshot_dir=str(tmp_path / "snap"))
+        for user_id in from_sql:
+            assert_signals_match(windows['180d'][user_id], from_sql[user_id])
+
+    def test_parallel_run_reads_snapshot(self, populated_db_path, tmp_path):
+        """Test that worker processes can memory-map the snapshot."""
+        export_transaction_snapshot(populated_db_path, tmp_path / "snap")
+        success, errors = compute_all_user_signals(180, populated_db_path, workers=2,
+                                                   snapshot_dir=str(tmp_path / "snap"))
+        assert errors == 0
+        assert success > 0
+
+    def test_changes_after_export_mark_snapshot_stale(self, populated_db_path, tmp_path):
+        """Test that logged changes after the export are detected."""
+        export_transaction_snapshot(populated_db_path, tmp_path / "snap")
+        snapshot = load_transaction_snapshot(tmp_path / "snap")
+        assert not snapshot.is_stale(populated_db_path)
+
+        conn = sqlite3.connect(populated_db_path)
+        conn.execute("UPDATE transactions SET amount = amount WHERE rowid = 1")
+        conn.commit()
+        conn.close()
+        assert snapshot.is_stale(populated_db_path)
+
+    def test_reexport_replaces_snapshot(self, populated_db_path, tmp_path):
+        """Test that exporting again swaps in a complete new snapshot."""
+        export_transaction_snapshot(populated_db_path, tmp_path / "snap")
+        conn = sqlite3.connect(populated_db_path)
+        conn.execute("DELETE FROM transactions WHERE user_id = (SELECT MIN(user_id) FROM transactions)")
+        conn.commit()
+        conn.close()
+
+        manifest = export_transaction_snapshot(populated_db_path, tmp_path / "snap")
+        assert len(load_transaction_snapshot(tmp_path / "snap")) == manifest['rows']
+        assert not [p for p in tmp_path.iterdir() if p.name.startswith("snap.")]
+
+    def test_empty_table_and_missing_snapshot(self, populated_db_path, tmp_path):
+        """Test that an empty table exports and a missing directory raises DatabaseError."""
+        conn = sqlite3.connect(populated_db_path)
+        conn.execute("DELETE FROM transactions")
+        conn.commit()
+        conn.close()
+
+        export_transaction_snapshot(populated_db_path, tmp_path / "snap")
+        assert load_transaction_snapshot(tmp_path / "snap").to_frame().empty
+
+        with pytest.raises(DatabaseError):
+            load_transaction_snapshot(tmp_path / "missing")
@@ -0,0 +1,133 @@
+"""
+Tests for the group-commit write queue
+"""
+import sqlite3
+import threading
+import time
+import pytest
+from src.db.connection import DatabaseError, close_pools
+from src.db.write_queue import WriteQueue, close_write_queues, get_write_queue, get_write_queue_stats
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "queue.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (value INTEGER UNIQUE)")
+    conn.commit()
+    conn.close()
+    yield path
+    close_write_queues()
+    close_pools()
+
+
+def _count(db_path: str) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestWriteQueue:
+    """Batching, acknowledgement and failure isolation."""
+
+    def test_queued_writes_share_one_commit(self, db_path):
+        """Test that writes queued within the batch delay are committed together."""
+        queue = WriteQueue(db_path, max_delay_ms=200, idle_gap_ms=200)
+        futures = [queue.execute("INSERT INTO items VALUES (?)", (value,)) for value in range(10)]
+
+        assert [future.result(timeout=5) for future in futures] == [1] * 10
+        stats = queue.stats()
+        assert (stats['batches'], stats['writes'], stats['max_batch']) == (1, 10, 10)
+        queue.close()
+
+    def test_acknowledged_writes_are_committed(self, db_path):
+        """Test that a resolved future means another connection can read the row."""
+        queue = WriteQueue(db_path)
+        queue.execute("INSERT INTO items VALUES (1)").result(timeout=5)
+
+        assert _count(db_path) == 1
+        queue.close()
+
+    def test_lone_write_is_not_held_for_the_full_delay(self, db_path):
+        """Test that the batch closes once writes stop arriving."""
+        queue = WriteQueue(db_path, max_delay_ms=5000, idle_gap_ms=1)
+        start = time.monotonic()
+        queue.execute("INSERT INTO items VALUES (1)").result(timeout=5)
+
+        assert time.monotonic() - start < 1
+        queue.close()
+
+    def test_batch_size_is_bounded(self, db_path):
+        """Test that no group commit holds more than max_batch writes."""
+        queue = WriteQueue(db_path, max_batch=3, max_delay_ms=200, idle_gap_ms=200)
+        futures = [queue.execute("INSERT INTO items VALUES (?)", (value,)) for value in range(7)]
+        for future in futures:
+            future.result(timeout=5)
+
+        stats = queue.stats()
+        assert stats['max_batch'] <= 3
+        assert stats['batches'] >= 3
+        assert _count(db_path) == 7
+        queue.close()
+
+    def test_failed_write_does_not_fail_its_batch(self, db_path):
+        """Test that a constraint violation is reported on its own future only."""
+        queue = WriteQueue(db_path, max_delay_ms=200, idle_gap_ms=200)
+        first = queue.execute("INSERT INTO items VALUES (1)")
+        duplicate = queue.execute("INSERT INTO items VALUES (1)")
+        last = queue.execute("INSERT INTO items VALUES (2)")
+
+        assert first.result(timeout=5) == 1
+        with pytest.raises(DatabaseError):
+            duplicate.result(timeout=5)
+        assert last.result(timeout=5) == 1
+        assert _count(db_path) == 2
+        assert queue.stats()['failed_writes'] == 1
+        queue.close()
+
+    def test_executemany_is_atomic(self, db_path):
+        """Test that a multi-row write is applied entirely or not at all."""
+        queue = WriteQueue(db_path)
+        assert queue.executemany("INSERT INTO items VALUES (?)", [(1,), (2,)]).result(timeout=5) == 2
+        with pytest.raises(DatabaseError):
+            queue.executemany("INSERT INTO items VALUES (?)", [(3,), (1,)]).result(timeout=5)
+
+        assert _count(db_path) == 2
+        queue.close()
+
+    def test_close_commits_pending_writes(self, db_path):
+        """Test that closing the queue drains it and later submits are refused."""
+        queue = WriteQueue(db_path, max_delay_ms=100, idle_gap_ms=100)
+        futures = [queue.execute("INSERT INTO items VALUES (?)", (value,)) for value in range(5)]
+        queue.close()
+
+        assert all(future.done() for future in futures)
+        assert _count(db_path) == 5
+        with pytest.raises(DatabaseError):
+            queue.execute("INSERT INTO items VALUES (9)")
+
+    def test_concurrent_callers_are_coalesced(self, db_path):
+        """Test that writes from many threads land in fewer commits than writes."""
+        queue = get_write_queue(db_path)
+        errors = []
+
+        def write(offset):
+            try:
+                for value in range(offset, offset + 20):
+                    queue.execute("INSERT INTO items VALUES (?)", (value,)).result(timeout=10)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(n * 100,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        assert _count(db_path) == 160
+        stats = get_write_queue_stats()[db_path]
+        assert stats['writes'] == 160
+        assert stats['batches'] < 160